@@ -59,10 +59,10 @@ st.markdown("基于《建设项目经济评价方法与参数(第三版)》编
 
 # 加载数据
 def load_data():
-    """加载数据"""
-    loader = DataLoader()
-    loader.load_all_sheets()
-    return loader
+    """加载数据（每个会话只打开一次工作簿，工作表在首次使用时才解析）"""
+    if 'data_loader' not in st.session_state:
+        st.session_state.data_loader = DataLoader()
+    return st.session_state.data_loader
 
 # 首次加载数据
 data_loader = load_data()
@@ -2,47 +2,16 @@
 JZGCCW 建设工程财务分析系统 - 界面重构版
 将数据输入移到右侧主区域，左侧边栏只保留功能切换
 """
+import copy
 import streamlit as st
 import pandas as pd
 from data_loader import DataLoader
 from year_generator import YearGenerator, DynamicTableBuilder
 from data_models import InputData
+from result_views import format_dataframe
 import config
 
 
-def format_dataframe(df: pd.DataFrame, decimals: int = 2) -> pd.DataFrame:
-    """
-    格式化DataFrame中的数值列为指定小数位数
-
-    Args:
-        df: 原始DataFrame
-        decimals: 小数位数，默认2位
-
-    Returns:
-        格式化后的DataFrame
-    """
-    df_formatted = df.copy()
-    for col in df_formatted.columns:
-        # 跳过第一列（通常是"项目"列等非数值列）
-        if col == "项目":
-            continue
-
-        # 检查列是否为数值类型
-        if pd.api.types.is_numeric_dtype(df_formatted[col]):
-            # 将列转换为 float 类型，然后格式化为指定小数位数
-            df_formatted[col] = df_formatted[col].astype(float)
-            df_formatted[col] = df_formatted[col].round(decimals)
-        else:
-            # 如果不是数值类型但包含数值字符串，尝试转换
-            try:
-                df_formatted[col] = df_formatted[col].astype(float).round(decimals)
-            except (ValueError, TypeError):
-                # 无法转换，保持原样
-                pass
-
-    return df_formatted
-
-
 # 页面配置
 st.set_page_config(**config.PAGE_CONFIG)
 
@@ -58,13 +27,70 @@ if 'calculated' not in st.session_state:
 
 # 加载数据
 def load_data():
-    """加载数据"""
-    loader = DataLoader()
-    loader.load_all_sheets()
-    return loader
+    """加载数据（每个会话只打开一次工作簿，工作表在首次使用时才解析）"""
+    if 'data_loader' not in st.session_state:
+        st.session_state.data_loader = DataLoader()
+    return st.session_state.data_loader
 
 data_loader = load_data()
 
+
+def render_project_file_section():
+    """渲染项目文件区域：保存当前输入及计算结果，或打开已保存的项目"""
+    from serialization import dump_project, load_project, PROJECT_EXTENSION
+
+    st.subheader("💾 项目文件")
+
+    if st.session_state.calculated:
+        # 同一次计算结果只序列化一次
+        results = st.session_state.calculation_results
+        if st.session_state.get('project_file_source') is not results:
+            engine = st.session_state.calculation_engine
+            st.session_state.project_file = dump_project(
+                st.session_state.calculation_input, results, engine.graph.get("kpis")
+            )
+            st.session_state.project_file_source = results
+        project_name = st.session_state.calculation_input.basic_info.project_name or "项目"
+        st.download_button(
+            "保存项目",
+            data=st.session_state.project_file,
+            file_name=f"{project_name}{PROJECT_EXTENSION}",
+            mime="application/zip",
+            use_container_width=True
+        )
+
+    uploaded = st.file_uploader("打开项目", type=[PROJECT_EXTENSION.lstrip(".")], key="project_upload")
+    # 上传控件在每次重新运行时都会返回同一文件，只在换了文件时载入，避免覆盖之后的修改
+    if uploaded is not None and uploaded.file_id != st.session_state.get('loaded_project_id'):
+        from input_mapping import form_values
+        from calculation_engine import CalculationEngine
+
+        try:
+            project = load_project(uploaded.getvalue())
+            input_data = project.input_data()
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            return
+
+        construction_period = project.construction_period
+        operation_period = project.operation_period
+        st.session_state.update(form_values(input_data))
+        st.session_state.construction_period = construction_period
+        st.session_state.operation_period = operation_period
+        st.session_state.cp_input_main = construction_period
+        st.session_state.op_input_main = operation_period
+
+        # 项目文件中有计算结果时直接恢复，不重新计算
+        st.session_state.calculated = bool(project.table_names)
+        if st.session_state.calculated:
+            year_generator = YearGenerator(construction_period, operation_period)
+            st.session_state.calculation_results = project.results()
+            st.session_state.calculation_input = input_data
+            st.session_state.calculation_engine = CalculationEngine(year_generator, copy.deepcopy(input_data))
+        st.session_state.loaded_project_id = uploaded.file_id
+        st.rerun()
+
+
 # ===== 左侧边栏：功能切换 =====
 with st.sidebar:
     st.header("📋 功能导航")
@@ -103,6 +129,10 @@ with st.sidebar:
     else:
         st.warning("⚠️ 尚未计算")
 
+    st.markdown("---")
+
+    render_project_file_section()
+
 
 # ===== 右侧主区域 =====
 st.title("🏗️ JZGCCW 建设工程财务分析系统")
@@ -113,6 +143,8 @@ st.divider()
 
 def render_data_input_page():
     """渲染数据输入页面"""
+    from asset_register import DEPRECIATION_METHODS
+
     st.header("📝 数据输入")
 
     # ===== 全局设置 =====
@@ -387,6 +419,11 @@ def render_data_input_page():
                 )
 
             with col3:
+                building_depr_method = st.selectbox(
+                    "房屋建筑折旧方法",
+                    options=DEPRECIATION_METHODS,
+                    key="building_depr_method"
+                )
                 st.info("房屋建筑原值：106057.38 万元")
 
             # 机械设备
@@ -413,6 +450,11 @@ def render_data_input_page():
                 )
 
             with col3:
+                equipment_depr_method = st.selectbox(
+                    "机械设备折旧方法",
+                    options=DEPRECIATION_METHODS,
+                    key="equipment_depr_method"
+                )
                 st.info("机械设备原值：0.00 万元")
 
             st.markdown("### 无形资产")
@@ -973,6 +1015,8 @@ def render_data_input_page():
             with col2:
                 repayment_method = st.selectbox("还款方式", options=["等额本金", "等额本息", "按期还息到期还本"], key="repayment_method")
                 grace_period = st.number_input("宽限期（年）", min_value=0, max_value=5, value=2, key="grace_period")
+                loan_limit = st.number_input("借款额度（万元，0为不限）", min_value=0.0, value=0.0, format="%.2f",
+                                             key="loan_limit", help="超出额度的建设期利息由资本金支付")
 
             st.markdown("### 按年借款安排")
 
@@ -1007,17 +1051,26 @@ def render_data_input_page():
 
                     input_data = collect_input_data(st.session_state.construction_period, st.session_state.operation_period)
 
-                    # 创建计算引擎
-                    year_generator = YearGenerator(st.session_state.construction_period, st.session_state.operation_period)
-                    calc_engine = CalculationEngine(year_generator, input_data)
+                    calc_engine = st.session_state.get('calculation_engine')
+                    if (calc_engine is not None and
+                            calc_engine.yg.construction_period == st.session_state.construction_period and
+                            calc_engine.yg.operation_period == st.session_state.operation_period):
+                        # 计算期未变：只重新计算受修改影响的表格
+                        results = calc_engine.update(input_data)
+                    else:
+                        # 创建计算引擎
+                        year_generator = YearGenerator(st.session_state.construction_period, st.session_state.operation_period)
+                        calc_engine = CalculationEngine(year_generator, copy.deepcopy(input_data))
 
-                    # 执行计算
-                    results = calc_engine.run_all_calculations()
+                        # 执行计算
+                        results = calc_engine.run_all_calculations()
 
                     # 保存结果到session state
                     st.session_state.calculated = True
                     st.session_state.calculation_results = results
                     st.session_state.calculation_engine = calc_engine
+                    # 未经计算的原始输入（敏感性分析等以此为基准）
+                    st.session_state.calculation_input = input_data
 
                     st.success("✅ 计算完成！")
                     st.info("📊 请在【计算结果】页面查看计算表格")
@@ -1035,37 +1088,68 @@ def render_results_page():
     # 检查是否有计算结果
     if 'calculated' in st.session_state and st.session_state.calculated:
         if 'calculation_results' in st.session_state and st.session_state.calculation_results:
-            results = st.session_state.calculation_results
+            from result_views import FORMATS, PARQUET_AVAILABLE, get_views
 
-            # 显示所有表格
-            available_sheets = list(results.keys())
+            results = st.session_state.calculation_results
+            # 同一次计算结果只取一次缓存；显示表和下载内容在第一次用到时生成
+            if st.session_state.get('result_views_source') is not results:
+                st.session_state.result_views = get_views(results)
+                st.session_state.result_views_source = results
+            views = st.session_state.result_views
 
-            if not available_sheets:
+            if not views.names:
                 st.warning("暂无可显示的计算表")
             else:
-                # 直接显示所有计算结果表格
-                for sheet_name in available_sheets:
-                    st.markdown(f"#### {config.SHEET_MAPPING.get(sheet_name, sheet_name)}")
-
-                    # 显示计算结果表格（格式化为2位小数）
-                    df = results[sheet_name]
-                    df_display = format_dataframe(df, decimals=2)
-                    st.dataframe(
-                        df_display,
-                        use_container_width=True,
-                        height=min(400, 100 + len(df) * 30)
-                    )
+                formats = [fmt for fmt in FORMATS if fmt != "parquet" or PARQUET_AVAILABLE]
+                mimes = {"csv": "text/csv", "parquet": "application/octet-stream"}
 
-                    # 下载按钮（使用格式化后的数据，也是2位小数）
-                    csv = df_display.to_csv(index=False, encoding='utf-8-sig')
-                    st.download_button(
-                        label=f"下载 {config.SHEET_MAPPING.get(sheet_name, sheet_name)}",
-                        data=csv,
-                        file_name=f"{sheet_name}_result.csv",
-                        mime="text/csv"
-                    )
+                sheet_name = st.selectbox(
+                    "选择计算表",
+                    views.names,
+                    format_func=lambda x: f"{x.strip()} - {views.title(x)}"
+                )
+                st.markdown(f"#### {views.title(sheet_name)}")
+
+                # 显示计算结果表格（格式化为2位小数）
+                df_display = views.display(sheet_name)
+                st.dataframe(
+                    df_display,
+                    use_container_width=True,
+                    height=min(400, 100 + len(df_display) * 30)
+                )
+
+                # 下载按钮（使用格式化后的数据，也是2位小数）
+                columns = st.columns(len(formats))
+                for column, fmt in zip(columns, formats):
+                    with column:
+                        st.download_button(
+                            label=f"下载 {views.title(sheet_name)}（{fmt.upper()}）",
+                            data=views.download(sheet_name, fmt),
+                            file_name=views.file_name(sheet_name, fmt),
+                            mime=mimes[fmt],
+                            key=f"download_{fmt}"
+                        )
 
-                    st.divider()  # 表格之间的分隔线
+                st.divider()
+                st.markdown(f"#### 全部计算表（{len(views.names)} 个）")
+                columns = st.columns(len(formats))
+                for column, fmt in zip(columns, formats):
+                    with column:
+                        # 打包内容只在点击后生成，之后同一结果直接下载
+                        bundles = st.session_state.setdefault('result_bundles', set())
+                        if (views.fingerprint, fmt) in bundles:
+                            st.download_button(
+                                f"下载全部（{fmt.upper()}，zip）",
+                                data=views.bundle(fmt),
+                                file_name=f"计算结果_{fmt}.zip",
+                                mime="application/zip",
+                                key=f"bundle_{fmt}"
+                            )
+                        elif st.button(f"打包全部（{fmt.upper()}）", key=f"pack_{fmt}"):
+                            with st.spinner("正在打包..."):
+                                views.bundle(fmt)
+                            bundles.add((views.fingerprint, fmt))
+                            st.rerun()
     else:
         # 如果没有计算结果，显示原始Excel数据
         st.markdown("### 选择要查看的原始数据表")
@@ -1111,7 +1195,111 @@ def render_charts_page():
         st.warning("⚠️ 请先在【数据输入】页面完成数据填写并执行计算")
         return
 
-    st.info("📝 图表分析功能待完善")
+    render_sensitivity_section()
+    render_goal_seek_section()
+
+
+def render_goal_seek_section():
+    """渲染目标求解（求使IRR或NPV达到目标值的参数值）"""
+    from goal_seek import GoalSeek
+    from sensitivity import DEFAULT_VARIABLES
+    from batch_engine import BatchEngine, get_input_value
+
+    st.subheader("🎯 目标求解")
+
+    engine = st.session_state.calculation_engine
+    base_input = st.session_state.calculation_input
+    first_year = engine.yg.axis.labels[engine.yg.construction_period]
+    variables = [(path, name) for path, name in DEFAULT_VARIABLES
+                 if not isinstance(get_input_value(base_input, path), dict)]
+    # 不影响财务指标的参数无法求解，不提供选择（按计算输入的指纹缓存，输入不变时重新渲染不再重算）
+    key = (engine.yg.construction_period, engine.yg.operation_period, tuple(sorted(base_input.fingerprint().items())))
+    cached = st.session_state.get("goal_seek_inert")
+    if cached is None or cached[0] != key:
+        cached = (key, set(BatchEngine(engine.yg, base_input).inert_paths([path for path, _ in variables])))
+        st.session_state.goal_seek_inert = cached
+    inert = cached[1]
+    variables = [(path, name) for path, name in variables if path not in inert]
+    variables.insert(0, (f"sales_revenue.annual_revenue[{first_year}]", f"{first_year}销售收入"))
+    names = dict(variables)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        path = st.selectbox("求解参数", list(names), format_func=names.get)
+    with col2:
+        metric = st.radio("目标指标", ["irr", "npv"], key="goal_seek_metric",
+                          format_func=lambda m: "内部收益率(IRR)" if m == "irr" else "净现值(NPV)")
+    with col3:
+        if metric == "irr":
+            target = st.number_input("目标IRR（%）", value=8.0, step=0.5) / 100
+        else:
+            target = st.number_input("目标NPV（万元）", value=0.0, step=100.0)
+
+    if st.button("开始求解"):
+        try:
+            result = GoalSeek(engine.yg, base_input).solve(path, metric, target)
+        except ValueError as e:
+            st.error(f"❌ 求解失败: {e}")
+            return
+
+        base_value = get_input_value(base_input, path)
+        achieved = f"{result.achieved:.4%}" if metric == "irr" else f"{result.achieved:,.2f}"
+        col1, col2, col3 = st.columns(3)
+        col1.metric(names[path], f"{result.value:,.4f}", f"{result.value - base_value:,.4f}")
+        col2.metric("达到的指标值", achieved)
+        col3.metric("试算次数", result.evaluations)
+        if not result.converged:
+            st.warning("⚠️ 达到最大迭代次数，结果可能未完全收敛")
+        with st.expander("试算过程"):
+            st.dataframe(result.history_frame(), use_container_width=True)
+
+
+def render_sensitivity_section():
+    """渲染敏感性分析（龙卷风图、蜘蛛图）"""
+    import altair as alt
+    from sensitivity import SensitivityAnalysis
+
+    st.subheader("🌪️ 敏感性分析")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        variation = st.slider("最大变动幅度（±%）", min_value=5, max_value=50, value=20, step=5) / 100
+    with col2:
+        points = st.select_slider("扰动点数", options=[3, 5, 7, 9, 11], value=11)
+    with col3:
+        metric = st.radio("指标", ["npv", "irr"], format_func=lambda m: "净现值(NPV)" if m == "npv" else "内部收益率(IRR)")
+
+    if st.button("运行敏感性分析"):
+        with st.spinner("正在并行计算各扰动情景..."):
+            engine = st.session_state.calculation_engine
+            analysis = SensitivityAnalysis(engine.yg, st.session_state.calculation_input)
+            st.session_state.sensitivity_result = analysis.run(variation=variation, points=points)
+
+    result = st.session_state.get('sensitivity_result')
+    if result is None:
+        return
+
+    tornado = result.tornado(metric)
+    base = result.base[metric]
+    st.markdown(f"**龙卷风图**（基准值：{base:,.4f}）")
+    # 用altair绘制横向条形图，保持按影响幅度排序（st.bar_chart会按名称重新排序）
+    chart_data = (tornado.set_index("名称")[["低值", "高值"]] - base).reset_index().melt(
+        "名称", var_name="情形", value_name="相对基准值的变化")
+    chart = alt.Chart(chart_data).mark_bar().encode(
+        x=alt.X("相对基准值的变化:Q"),
+        y=alt.Y("名称:N", sort=tornado["名称"].tolist(), title=None),
+        color=alt.Color("情形:N", title=None),
+        tooltip=["名称", "情形", alt.Tooltip("相对基准值的变化:Q", format=",.4f")],
+    )
+    st.altair_chart(chart, use_container_width=True)
+    st.dataframe(tornado, use_container_width=True, hide_index=True)
+
+    st.markdown("**蜘蛛图**")
+    st.line_chart(result.spider(metric))
+
+    if not result.skipped.empty:
+        with st.expander(f"未参与分析的变量（{len(result.skipped)}个）"):
+            st.dataframe(result.skipped, use_container_width=True, hide_index=True)
 
 
 def render_export_page():
@@ -1122,7 +1310,91 @@ def render_export_page():
         st.warning("⚠️ 请先在【数据输入】页面完成数据填写并执行计算")
         return
 
-    st.info("📝 报告导出功能待完善")
+    from report_export import export_report
+    from template_export import export_template
+
+    formats = {
+        "计算表（每个计算表一个工作表）": "_财务分析报告.xlsx",
+        "原工作簿版式（JZGCCW01）": "_财务分析报表.xlsx",
+    }
+    report_format = st.radio("报告格式", list(formats), horizontal=True)
+
+    # 同一次计算结果、同一格式只生成一次报告
+    results = st.session_state.calculation_results
+    if st.session_state.get('report_file_source') is not results:
+        st.session_state.report_files = {}
+        st.session_state.report_file_source = results
+
+    project_name = st.session_state.calculation_input.basic_info.project_name or "项目"
+    report_file = st.session_state.report_files.get(report_format)
+    if report_file is None:
+        if st.button("生成Excel报告", type="primary"):
+            with st.spinner("正在生成报告..."):
+                if report_format.startswith("原工作簿"):
+                    try:
+                        report_file = export_template(
+                            results, st.session_state.calculation_input.basic_info.construction_period, project_name
+                        )
+                    except ValueError as e:
+                        st.error(f"❌ {e}")
+                        return
+                else:
+                    report_file = export_report(results, title=project_name)
+            st.session_state.report_files[report_format] = report_file
+            st.rerun()
+    else:
+        st.download_button(
+            "下载Excel报告",
+            data=report_file,
+            file_name=f"{project_name}{formats[report_format]}",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            type="primary"
+        )
+
+    render_batch_export_section()
+
+
+def render_batch_export_section():
+    """渲染批量导出区域：将项目库中的多个项目或情景导出到一个工作簿或zip"""
+    import os
+    from project_store import DEFAULT_DB_FILE, ProjectStore
+    from report_export import export_batch, iter_store_results
+    from template_export import export_projects
+
+    if not os.path.exists(DEFAULT_DB_FILE):
+        return
+
+    st.divider()
+    st.subheader("📚 批量导出")
+    with ProjectStore(DEFAULT_DB_FILE) as store:
+        runs = store.query().sort_values(["project", "scenario"])
+        if runs.empty:
+            st.info("项目库中没有已保存的情景")
+            return
+
+        labels = {f"{row.project} - {row.scenario}": row.run_id for row in runs.itertuples()}
+        selected = st.multiselect("选择项目/情景", list(labels))
+        modes = ["一个工作簿", "zip（每个情景一个工作簿）", "zip（原工作簿版式）"]
+        mode = st.radio("导出方式", modes, horizontal=True)
+        if selected and st.button("生成批量报告"):
+            zip_mode = mode != modes[0]
+            run_ids = [labels[s] for s in selected]
+            with st.spinner("正在生成报告..."):
+                if mode == modes[2]:
+                    try:
+                        content = export_projects((s, lambda run_id=labels[s]: store.load(run_id)) for s in selected)
+                    except ValueError as e:
+                        st.error(f"❌ {e}")
+                        return
+                else:
+                    content = export_batch(iter_store_results(store, run_ids), mode="zip" if zip_mode else "workbook")
+            st.download_button(
+                "下载批量报告",
+                data=content,
+                file_name="批量报告.zip" if zip_mode else "批量报告.xlsx",
+                mime="application/zip" if zip_mode
+                else "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
 
 
 # ===== 页面渲染逻辑 =====
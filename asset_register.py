@@ -0,0 +1,225 @@
+"""
+资产登记簿
+登记任意数量的资产（含运营期追加、更新改造的资产），每项资产有自己的类别、入账年份、折旧/摊销方法、年限和残值率。
+折旧/摊销按"类别×方法×年限×残值率"分组：每组的各年新增原值与该组的单位折旧核（每元原值在使用第1、2…年的折旧额）
+做卷积，得到各年折旧/摊销额，资产数量再多也只需少数几次向量运算。
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# 5-4折旧表、5-5摊销表中的资产类别（与明细数据的键一致）
+DEPRECIATION_CATEGORIES = ("building", "equipment", "sales_assets")
+AMORTIZATION_CATEGORIES = ("land", "patent", "other_asset", "sales_land")
+CATEGORIES = DEPRECIATION_CATEGORIES + AMORTIZATION_CATEGORIES
+
+
+def straight_line_kernel(life: int, salvage_rate: float) -> np.ndarray:
+    """
+    直线法单位折旧核
+
+    Args:
+        life: 折旧/摊销年限
+        salvage_rate: 残值率（%）
+
+    Returns:
+        ndarray: (life,)每元原值在使用各年的折旧额
+    """
+    return np.full(life, (1 - salvage_rate / 100) / life)
+
+
+def declining_balance_kernel(life: int, salvage_rate: float) -> np.ndarray:
+    """
+    双倍余额递减法单位折旧核
+
+    年折旧率为2/年限，按年初净值计提（不考虑残值）；最后两年改为直线法，将净值扣除残值后的余额平均摊销。
+    残值率较高时，累计折旧不超过原值扣除残值。
+
+    Args:
+        life: 折旧年限
+        salvage_rate: 残值率（%）
+
+    Returns:
+        ndarray: (life,)每元原值在使用各年的折旧额
+    """
+    depreciable = 1 - salvage_rate / 100
+    if life <= 2:
+        return np.full(life, depreciable / life)
+    rate = 2 / life
+    declining = rate * (1 - rate) ** np.arange(life - 2)
+    last_two = ((1 - rate) ** (life - 2) - salvage_rate / 100) / 2
+    kernel = np.concatenate([declining, [last_two, last_two]])
+    return np.diff(np.minimum(np.cumsum(kernel), depreciable), prepend=0.0)
+
+
+def sum_of_years_kernel(life: int, salvage_rate: float) -> np.ndarray:
+    """
+    年数总和法单位折旧核
+
+    第t年折旧率 = 尚可使用年数(life - t + 1) / 年数总和(life × (life + 1) / 2)，基数为原值扣除残值。
+
+    Args:
+        life: 折旧年限
+        salvage_rate: 残值率（%）
+
+    Returns:
+        ndarray: (life,)每元原值在使用各年的折旧额
+    """
+    remaining = np.arange(life, 0, -1, dtype=float)
+    return (1 - salvage_rate / 100) * remaining / remaining.sum()
+
+
+# 折旧/摊销方法到单位折旧核的映射
+KERNELS = {
+    "直线法": straight_line_kernel,
+    "双倍余额递减法": declining_balance_kernel,
+    "年数总和法": sum_of_years_kernel,
+}
+
+DEPRECIATION_METHODS = tuple(KERNELS)
+
+
+@lru_cache(maxsize=1024)
+def _cached_kernel(method: str, life: int, salvage_rate: float) -> np.ndarray:
+    kernel = KERNELS[method](life, salvage_rate) if life > 0 else np.zeros(0)
+    kernel.flags.writeable = False
+    return kernel
+
+
+def depreciation_kernel(method: str, life: int, salvage_rate: float = 0.0) -> np.ndarray:
+    """
+    单位折旧核（按方法、年限、残值率缓存，各资产和各情景共用，返回只读数组）
+
+    Args:
+        method: 折旧/摊销方法（见KERNELS）
+        life: 年限（不大于0时不计提）
+        salvage_rate: 残值率（%）
+
+    Returns:
+        ndarray: 每元原值在使用各年的折旧额
+    """
+    if method not in KERNELS:
+        raise ValueError(f"不支持的折旧方法: {method}（可选: {'、'.join(KERNELS)}）")
+    return _cached_kernel(method, int(life), float(salvage_rate))
+
+
+def kernel_schedule(value, start: int, method: str, life: int, salvage_rate: float, periods: int) -> np.ndarray:
+    """
+    单项原值的各年折旧额
+
+    Args:
+        value: 原值（标量或(S,)）
+        start: 开始折旧的年份下标（0为计算期第1年）
+        method: 折旧/摊销方法
+        life: 年限
+        salvage_rate: 残值率（%）
+        periods: 计算期年数
+
+    Returns:
+        ndarray: (periods,)或(S, periods)
+    """
+    kernel = depreciation_kernel(method, life, salvage_rate)[:max(periods - start, 0)]
+    unit = np.zeros(periods)
+    unit[start:start + kernel.size] = kernel
+    return np.multiply.outer(np.asarray(value, dtype=float), unit)
+
+
+@dataclass(frozen=True)
+class Asset:
+    """登记的一项资产"""
+    name: str                   # 资产名称
+    category: str               # 类别（见CATEGORIES）
+    cost: float                 # 原值（万元）
+    in_service_year: int        # 开始折旧/摊销的年份（计算期第几年）
+    life: int = 0               # 折旧/摊销年限
+    salvage_rate: float = 0.0   # 残值率（%）
+    method: str = "直线法"      # 折旧/摊销方法
+    pattern: Optional[Tuple[float, ...]] = None  # 按各年比例结转（如出售资产按销售进度），给出时不用method
+
+
+class AssetRegister:
+    """资产登记簿"""
+
+    def __init__(self, periods: int):
+        """
+        初始化资产登记簿
+
+        Args:
+            periods: 计算期年数
+        """
+        self.periods = periods
+        self.assets: List[Asset] = []
+
+    def add(self, asset: Asset) -> None:
+        """
+        登记一项资产
+
+        Args:
+            asset: 资产
+        """
+        if asset.category not in CATEGORIES:
+            raise ValueError(f"未知的资产类别: {asset.category}（可选: {'、'.join(CATEGORIES)}）")
+        if asset.pattern is None:
+            depreciation_kernel(asset.method, 0)
+        self.assets.append(asset)
+
+    def extend(self, assets: Sequence[Asset]) -> None:
+        """
+        登记多项资产
+
+        Args:
+            assets: 资产列表
+        """
+        for asset in assets:
+            self.add(asset)
+
+    def _additions(self, assets: Sequence[Asset]) -> np.ndarray:
+        """各年新增原值（入账年份超出计算期的资产不计入）"""
+        index = np.array([asset.in_service_year - 1 for asset in assets], dtype=int)
+        cost = np.array([asset.cost for asset in assets], dtype=float)
+        inside = (index >= 0) & (index < self.periods)
+        return np.bincount(index[inside], weights=cost[inside], minlength=self.periods)
+
+    def schedules(self, categories: Sequence[str] = CATEGORIES) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        各类别的折旧/摊销计划
+
+        Args:
+            categories: 要计算的类别
+
+        Returns:
+            dict: 类别到original_value（各年新增原值）、amount（折旧/摊销额）、net_value（年末净值）的映射
+        """
+        groups: Dict[tuple, List[Asset]] = {}
+        for asset in self.assets:
+            if asset.category in categories:
+                groups.setdefault((asset.category,) + self._kernel_key(asset), []).append(asset)
+
+        result = {category: {"original_value": np.zeros(self.periods), "amount": np.zeros(self.periods)}
+                  for category in categories}
+        for (category, *kernel_key), assets in groups.items():
+            additions = self._additions(assets)
+            kernel = self._kernel(*kernel_key)
+            result[category]["original_value"] += additions
+            if kernel.size:
+                result[category]["amount"] += np.convolve(additions, kernel)[:self.periods]
+
+        for schedule in result.values():
+            schedule["net_value"] = np.maximum(0.0, np.cumsum(schedule["original_value"]) - np.cumsum(schedule["amount"]))
+        return result
+
+    @staticmethod
+    def _kernel_key(asset: Asset) -> tuple:
+        """折旧核相同的资产分为一组"""
+        if asset.pattern is not None:
+            return ("pattern", tuple(asset.pattern))
+        return (asset.method, int(asset.life), float(asset.salvage_rate))
+
+    @staticmethod
+    def _kernel(method: str, *args) -> np.ndarray:
+        if method == "pattern":
+            return np.asarray(args[0], dtype=float)
+        return depreciation_kernel(method, *args)
@@ -0,0 +1,564 @@
+"""
+批量情景计算引擎
+以基准输入加参数覆盖表描述成百上千个情景，按"情景×年份"二维数组一次性计算核心序列和财务指标，
+不再为每个情景构建InputData、CalculationEngine和各计算表。
+"""
+import copy
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from year_generator import YearGenerator
+from data_models import InputData
+from calculations import InvestmentCalculator, DepreciationCalculator
+from circularity import revolver
+from asset_register import DEPRECIATION_METHODS
+from irr_solver import solve_irr
+from loan_engine import METHODS as REPAYMENT_METHODS, plan_schedule
+
+
+# 会影响资产形成/资产销售等派生状态的输入模块：
+# 覆盖这些模块的参数时，按不同的参数组合分别用标量计算器求派生值，其余部分仍按向量计算
+STRUCTURAL_SECTIONS = ("project_investment", "asset_formation", "asset_sales_plan")
+
+# 取值为若干选项之一的文字参数：覆盖表中以选项序号（从0开始）表示，如折旧方法1为"双倍余额递减法"
+CHOICE_FIELDS = {
+    "depreciation_method": DEPRECIATION_METHODS,
+    "repayment_method": REPAYMENT_METHODS,
+}
+
+# 覆盖路径："模块.字段"、"模块.字段.子字段"，可带下标"[2]"（列表）或"[第5年]"（按年字典）
+_PATH_PATTERN = re.compile(r"^(?P<attrs>[A-Za-z_][\w.]*?)(\[(?P<key>[^\]]+)\])?$")
+
+
+def _parse_path(path: str) -> Tuple[List[str], Optional[str]]:
+    """
+    解析覆盖路径
+
+    Args:
+        path: 覆盖路径，如"tax_params.discount_rate"、"sales_revenue.annual_revenue[第5年]"
+
+    Returns:
+        tuple: (属性名列表, 下标)
+    """
+    match = _PATH_PATTERN.match(path)
+    if not match:
+        raise ValueError(f"无法解析的参数路径: {path}")
+    return match.group("attrs").split("."), match.group("key")
+
+
+def _choice_options(path: str) -> Optional[Tuple[str, ...]]:
+    """文字选项参数的可选值，其他参数返回None"""
+    return CHOICE_FIELDS.get(_parse_path(path)[0][-1])
+
+
+def _resolve_owner(input_data: InputData, attrs: List[str], path: str):
+    """沿属性链找到路径最后一级属性所在的对象"""
+    owner = input_data
+    for attr in attrs[:-1]:
+        if not hasattr(owner, attr):
+            raise ValueError(f"参数路径不存在: {path}")
+        owner = getattr(owner, attr)
+    if not hasattr(owner, attrs[-1]):
+        raise ValueError(f"参数路径不存在: {path}")
+    return owner
+
+
+def get_input_value(input_data: InputData, path: str):
+    """
+    读取输入数据中指定路径的值
+
+    Args:
+        input_data: 输入数据
+        path: 参数路径
+
+    Returns:
+        路径对应的值
+    """
+    attrs, key = _parse_path(path)
+    value = getattr(_resolve_owner(input_data, attrs, path), attrs[-1])
+    if key is None:
+        return value
+    if isinstance(value, list):
+        return value[int(key)]
+    if isinstance(value, dict):
+        return value.get(key, 0.0)
+    raise ValueError(f"参数不支持下标: {path}")
+
+
+def apply_override(input_data: InputData, path: str, value, year_generator: YearGenerator) -> None:
+    """
+    将一个参数覆盖写入输入数据（原地修改）
+
+    按年字典字段不带下标时，value写入运营期各年。
+
+    Args:
+        input_data: 输入数据
+        path: 参数路径
+        value: 新值
+        year_generator: 年份生成器
+    """
+    attrs, key = _parse_path(path)
+    owner = _resolve_owner(input_data, attrs, path)
+    current = getattr(owner, attrs[-1])
+
+    if key is not None:
+        if isinstance(current, list):
+            current[int(key)] = value
+        elif isinstance(current, dict):
+            current[key] = value
+        else:
+            raise ValueError(f"参数不支持下标: {path}")
+    elif isinstance(current, dict):
+        axis = year_generator.axis
+        for label, is_operation in zip(axis.labels, axis.operation_mask):
+            if is_operation:
+                current[label] = value
+    else:
+        setattr(owner, attrs[-1], value)
+
+
+class BatchResult:
+    """批量计算结果"""
+
+    def __init__(self, kpis: pd.DataFrame, series: Optional[Dict[str, np.ndarray]], year_labels: List[str]):
+        """
+        初始化批量计算结果
+
+        Args:
+            kpis: 每个情景一行的财务指标
+            series: 序列名称到(情景数, 年数)数组的映射，未请求时为None
+            year_labels: 年份标签
+        """
+        self.kpis = kpis
+        self.series = series
+        self.year_labels = year_labels
+
+    def series_frame(self, name: str) -> pd.DataFrame:
+        """
+        以DataFrame形式获取某一序列（行为情景，列为年份）
+
+        Args:
+            name: 序列名称，如"净现金流"
+
+        Returns:
+            DataFrame
+        """
+        if self.series is None:
+            raise ValueError("计算时未保留序列数据（return_series=False）")
+        return pd.DataFrame(self.series[name], index=self.kpis.index, columns=self.year_labels)
+
+
+class BatchEngine:
+    """批量情景计算引擎"""
+
+    def __init__(self, year_generator: YearGenerator, input_data: InputData):
+        """
+        初始化批量计算引擎
+
+        Args:
+            year_generator: 年份生成器
+            input_data: 基准输入数据（不会被修改，应为未经计算的原始输入）
+        """
+        self.yg = year_generator
+        self.input = input_data
+
+    def evaluate(self, overrides: pd.DataFrame, return_series: bool = False, irr_guess=None) -> BatchResult:
+        """
+        批量计算各情景
+
+        Args:
+            overrides: 参数覆盖表，每行一个情景，每列一个参数路径；NaN表示沿用基准值
+            return_series: 是否返回各情景的年度序列
+            irr_guess: IRR求解初值（标量或每个情景一个），如相邻情景上一次的结果
+
+        Returns:
+            BatchResult: 各情景财务指标（及年度序列）
+        """
+        axis = self.yg.axis
+        params = _ScenarioParams(self.input, overrides, self.yg)
+        construction = axis.construction_mask
+        operation = axis.operation_mask
+
+        # ---------- 派生状态（资产形成） ----------
+        derived = self._derived_values(params)
+        total_ex_interest = derived["total_ex_interest"]          # (S,)
+        fixed_asset_total = derived["fixed_asset_total"]          # (S,)
+
+        # ---------- 投资与建设期利息 ----------
+        construction_years = self.yg.construction_period
+        avg_annual = total_ex_interest / construction_years if construction_years > 0 else np.zeros_like(total_ex_interest)
+        annual = avg_annual[:, None] * construction
+        investment = annual * 0.7 + annual * 0.2 + annual * 0.1
+
+        interest_rate = params.scalar("bank_loan_plan.interest_rate")
+        loan = self._loan_schedule(params)
+        construction_interest = loan["interest"] * construction
+        total_investment = total_ex_interest + construction_interest.sum(axis=1)
+
+        # ---------- 收入与经营成本 ----------
+        revenue = params.series("sales_revenue.annual_revenue") * operation
+
+        material = sum(params.series(f"material_cost.material_{i}") for i in range(1, 9)) * operation
+        fuel = sum(params.series(f"fuel_cost.fuel_{i}") for i in range(1, 9)) * operation
+
+        salary = (
+            params.scalar("labor_cost.admin_persons") * params.scalar("labor_cost.admin_salary") +
+            params.scalar("labor_cost.tech_persons") * params.scalar("labor_cost.tech_salary") +
+            params.scalar("labor_cost.security_persons") * params.scalar("labor_cost.security_salary") +
+            params.scalar("labor_cost.cleaning_persons") * params.scalar("labor_cost.cleaning_salary")
+        )
+        labor = salary * (1 + params.scalar("labor_cost.welfare_rate"))
+        repair = fixed_asset_total * params.scalar("other_costs.repair_rate")
+
+        operating_cost = material + fuel + labor[:, None] * operation + repair[:, None] * operation
+
+        # ---------- 资产销售收入与借款利息 ----------
+        ratio_count = min(len(self.input.asset_sales_plan.annual_sales_ratios), 10)
+        sales_ratios = np.column_stack([
+            params.scalar(f"asset_sales_plan.annual_sales_ratios[{i}]") for i in range(ratio_count)
+        ] or [np.zeros(params.size)]) / 100.0
+        asset_sales = params.scalar("asset_sales_plan.total_sales_price")[:, None] * self._place_operation(sales_ratios)
+        interest = loan["interest"] * operation
+
+        # ---------- 利润 ----------
+        operating_revenue = revenue + asset_sales
+        surtax_rate = (params.scalar("tax_params.city_tax_rate") + params.scalar("tax_params.education_tax_rate"))
+        surtax = operating_revenue * surtax_rate[:, None]
+        depreciation = self._depreciation_series(params)
+        total_cost = operating_cost * operation + depreciation["depreciation"] + depreciation["amortization"]
+        gross_profit = operating_revenue - surtax - total_cost - interest
+        corporate_tax_rate = params.scalar("tax_params.corporate_tax_rate")
+        income_tax = np.where(gross_profit > 0, gross_profit * corporate_tax_rate[:, None], 0.0)
+        net_profit = gross_profit - income_tax
+
+        # ---------- 短期借款与财务现金流（付现成本为总成本的80%） ----------
+        inflow = operating_revenue
+        operating_outflow = operating_cost * 0.8 + surtax + interest + income_tax
+        additional_investment = depreciation["additional_investment"]
+        facility = revolver(np.where(operation, inflow - operating_outflow - loan["principal"] - additional_investment, 0.0),
+                            interest_rate)
+        outflow = np.where(construction, investment, operating_outflow + facility["利息"]) + additional_investment
+        net_cashflow = inflow - outflow
+        cumulative_cashflow = np.cumsum(net_cashflow, axis=1)
+
+        # ---------- 财务指标 ----------
+        discount_rate = params.scalar("tax_params.discount_rate")
+        discount_factors = (1 + discount_rate[:, None]) ** np.arange(axis.total_period)
+        npv = np.sum(net_cashflow / discount_factors, axis=1)
+
+        recovered = cumulative_cashflow >= 0
+        payback_period = np.where(recovered.any(axis=1), recovered.argmax(axis=1) + 1, axis.total_period)
+
+        irr_result = solve_irr(net_cashflow, irr_guess)
+
+        kpis = pd.DataFrame({
+            "total_investment": total_investment,
+            "npv": npv,
+            "irr": irr_result.rate,
+            "payback_period": payback_period,
+            "irr_no_root": irr_result.no_root,
+            "irr_multiple_roots": irr_result.multiple_roots,
+        }, index=params.index)
+
+        series = None
+        if return_series:
+            series = {
+                "投资": investment,
+                "建设期利息": construction_interest,
+                "折旧": depreciation["depreciation"],
+                "摊销": depreciation["amortization"],
+                "营业收入": operating_revenue,
+                "营业税金及附加": surtax,
+                "经营成本": operating_cost,
+                "财务费用": interest,
+                "利润总额": gross_profit,
+                "所得税": income_tax,
+                "净利润": net_profit,
+                "现金流入": inflow,
+                "现金流出": outflow,
+                "净现金流": net_cashflow,
+                "累计净现金流": cumulative_cashflow,
+            }
+
+        return BatchResult(kpis, series, axis.labels)
+
+    def inert_paths(self, paths: Sequence[str]) -> List[str]:
+        """
+        找出不影响财务指标的参数
+
+        各参数单独扰动一次（非零值+10%，零值取1，文字选项取下一个选项，列表字段扰动第1个元素，
+        按年字典字段扰动运营期各年），NPV、IRR、投资回收期均与基准情景相同的参数视为不影响财务指标。
+        不能扰动的参数（如文字字段）也视为不影响。
+
+        Args:
+            paths: 参数路径列表
+
+        Returns:
+            list: 不影响财务指标的参数路径（保持传入顺序）
+        """
+        inert, columns = [], {}
+        for path in paths:
+            column = f"{path}[0]" if isinstance(get_input_value(self.input, path), list) else path
+            base = get_input_value(self.input, column)
+            options = _choice_options(column)
+            if options:
+                value = (options.index(base) + 1) % len(options)
+            elif isinstance(base, dict):
+                values = self.yg.axis.from_year_dict(base)[self.yg.axis.operation_mask]
+                value = values.mean() * 1.1 if values.any() else 1.0
+            elif isinstance(base, (int, float, np.number)) and not isinstance(base, bool):
+                value = base * 1.1 if base else 1.0
+            else:
+                inert.append(path)
+                continue
+            columns[path] = (column, value)
+
+        if columns:
+            overrides = pd.DataFrame(np.nan, index=range(len(columns) + 1),
+                                     columns=list(dict.fromkeys(column for column, _ in columns.values())))
+            for row, (column, value) in enumerate(columns.values(), start=1):
+                overrides.loc[row, column] = value
+            kpis = self.evaluate(overrides).kpis[["npv", "irr", "payback_period"]].to_numpy(dtype=float)
+            unchanged = np.isclose(kpis[1:], kpis[0], rtol=1e-12, atol=1e-8, equal_nan=True).all(axis=1)
+            inert.extend(path for path, same in zip(columns, unchanged) if same)
+        return [path for path in paths if path in inert]
+
+    def _derived_values(self, params: "_ScenarioParams") -> Dict[str, np.ndarray]:
+        """
+        计算依赖资产形成的派生值
+
+        投资和资产形成的计算对数组逐元素成立：把覆盖的结构性参数以(S,)数组写入输入副本，
+        用InvestmentCalculator一次算出所有情景的值。
+
+        Args:
+            params: 情景参数
+
+        Returns:
+            dict: total_ex_interest、fixed_asset_total，均为(S,)
+        """
+        vector_input = self._structural_copy()
+        for path in params.structural_columns:
+            if _choice_options(path) is None:
+                apply_override(vector_input, path, params.scalar(path), self.yg)
+
+        investment_calc = InvestmentCalculator(self.yg, vector_input)
+        total = investment_calc.calculate_total_investment()
+        asset_formation = investment_calc.calculate_asset_formation()
+
+        def per_scenario(value):
+            return np.broadcast_to(np.asarray(value, dtype=float), (params.size,))
+
+        return {
+            "total_ex_interest": per_scenario(total["项目总投资（不含利息）"]),
+            "fixed_asset_total": per_scenario(asset_formation.fixed_asset_total),
+        }
+
+    def _place_operation(self, values: np.ndarray) -> np.ndarray:
+        """把(S, K)的运营期第1年起的序列放入(S, N)年度矩阵（超出计算期的部分截断）"""
+        axis = self.yg.axis
+        result = np.zeros((values.shape[0], axis.total_period))
+        count = min(values.shape[1], self.yg.operation_period)
+        start = self.yg.construction_period
+        result[:, start:start + count] = values[:, :count]
+        return result
+
+    def _loan_schedule(self, params: "_ScenarioParams") -> Dict[str, np.ndarray]:
+        """
+        计算各情景的借款利息和还本序列
+
+        利率按情景向量计算；借款金额、年份、还款年数、借款额度等其他借款参数按不同的取值组合分别生成借款计划，
+        建设期利息与标量引擎一样由plan_schedule资本化计入借款提款。
+
+        Args:
+            params: 情景参数
+
+        Returns:
+            dict: "interest"、"principal"，均为(S, N)
+        """
+        rate = params.scalar("bank_loan_plan.interest_rate")
+        columns = [
+            path for path in params.columns
+            if _parse_path(path)[0][0] == "bank_loan_plan" and path != "bank_loan_plan.interest_rate"
+        ]
+        if columns:
+            matrix = np.column_stack([params.scalar(path) for path in columns])
+            combos, inverse = np.unique(matrix, axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+        else:
+            combos, inverse = np.zeros((1, 0)), np.zeros(params.size, dtype=int)
+
+        loan = {key: np.zeros((params.size, self.yg.axis.total_period)) for key in ("interest", "principal")}
+        for i, combo in enumerate(combos):
+            loan_input = copy.copy(self.input)
+            loan_input.bank_loan_plan = copy.deepcopy(self.input.bank_loan_plan)
+            for path, value in zip(columns, combo):
+                apply_override(loan_input, path,
+                               _native(get_input_value(self.input, path), value, _choice_options(path)), self.yg)
+            selected = inverse == i
+            schedule = plan_schedule(loan_input.bank_loan_plan, self.yg, rate[selected])
+            for key, values in loan.items():
+                values[selected] = schedule[key]
+        return loan
+
+    def _structural_copy(self) -> InputData:
+        """
+        输入的浅副本，其中结构性模块为深副本（覆盖参数时只修改副本，计算器不修改输入）
+
+        Returns:
+            InputData
+        """
+        scenario_input = copy.copy(self.input)
+        for section in STRUCTURAL_SECTIONS:
+            setattr(scenario_input, section, copy.deepcopy(getattr(self.input, section)))
+        return scenario_input
+
+    def _depreciation_series(self, params: "_ScenarioParams") -> Dict[str, np.ndarray]:
+        """
+        计算各情景的折旧、摊销和追加投资序列
+
+        资产销售计划的计算不支持数组，各情景中结构性参数的取值组合通常远少于情景数，
+        每种组合只用现有计算器在输入副本上计算一次，再按情景展开（派生状态按内容缓存，重复的组合直接复用）。
+
+        Args:
+            params: 情景参数
+
+        Returns:
+            dict: depreciation、amortization、additional_investment，均为(S, N)
+        """
+        columns = params.structural_columns
+        if columns:
+            matrix = np.column_stack([params.scalar(path) for path in columns])
+            combos, inverse = np.unique(matrix, axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+        else:
+            combos, inverse = np.zeros((1, 0)), np.zeros(params.size, dtype=int)
+
+        depreciation, amortization, additional_investment = [], [], []
+        for combo in combos:
+            scenario_input = self._structural_copy()
+            for path, value in zip(columns, combo):
+                apply_override(scenario_input, path,
+                               _native(get_input_value(self.input, path), value, _choice_options(path)), self.yg)
+
+            depreciation_calc = DepreciationCalculator(self.yg, scenario_input)
+            depreciation.append(depreciation_calc.get_yearly_depreciation())
+            amortization.append(depreciation_calc.get_yearly_amortization())
+            additional_investment.append(InvestmentCalculator(self.yg, scenario_input).calculate_additional_investment())
+
+        return {
+            "depreciation": np.asarray(depreciation)[inverse],
+            "amortization": np.asarray(amortization)[inverse],
+            "additional_investment": np.asarray(additional_investment)[inverse],
+        }
+
+
+class _ScenarioParams:
+    """基准输入与参数覆盖表合成的情景参数"""
+
+    def __init__(self, input_data: InputData, overrides: pd.DataFrame, year_generator: YearGenerator):
+        self.input = input_data
+        self.yg = year_generator
+        self.index = overrides.index
+        self.size = len(overrides)
+
+        # 校验路径并按"属性路径"归组（同一按年字典可同时有整体覆盖和逐年覆盖）
+        self._columns: Dict[str, np.ndarray] = {}
+        self._keyed: Dict[str, Dict[str, np.ndarray]] = {}
+        for path in overrides.columns:
+            get_input_value(input_data, path)
+            values = pd.to_numeric(overrides[path], errors="raise").to_numpy(dtype=float)
+            options = _choice_options(path)
+            if options and not np.isin(values[~np.isnan(values)], np.arange(len(options))).all():
+                raise ValueError(f"{path} 应为选项序号 0-{len(options) - 1}（{'、'.join(options)}）")
+            attrs, key = _parse_path(path)
+            if key is None:
+                self._columns[path] = values
+            else:
+                self._keyed.setdefault(".".join(attrs), {})[key] = values
+
+        self.columns = list(overrides.columns)
+        self.structural_columns = [
+            path for path in overrides.columns if _parse_path(path)[0][0] in STRUCTURAL_SECTIONS
+        ]
+
+    def scalar(self, path: str) -> np.ndarray:
+        """
+        获取标量参数的情景向量
+
+        Args:
+            path: 参数路径
+
+        Returns:
+            ndarray: (S,)
+        """
+        base = get_input_value(self.input, path)
+        options = _choice_options(path)
+        base = options.index(base) if options else float(base)
+        attrs, key = _parse_path(path)
+        values = self._columns.get(path) if key is None else self._keyed.get(".".join(attrs), {}).get(key)
+        if values is None:
+            return np.full(self.size, base)
+        return np.where(np.isnan(values), base, values)
+
+    def series(self, path: str) -> np.ndarray:
+        """
+        获取按年字典参数的情景矩阵
+
+        Args:
+            path: 参数路径（按年字典字段）
+
+        Returns:
+            ndarray: (S, N)
+        """
+        axis = self.yg.axis
+        base = axis.from_year_dict(get_input_value(self.input, path))
+        whole = self._columns.get(path)
+        keyed = self._keyed.get(path, {})
+        if whole is None and not keyed:
+            return np.broadcast_to(base, (self.size, axis.total_period))
+
+        matrix = np.tile(base, (self.size, 1))
+        if whole is not None:
+            matrix[:, axis.operation_mask] = np.where(
+                np.isnan(whole)[:, None], matrix[:, axis.operation_mask], whole[:, None]
+            )
+        for label, values in keyed.items():
+            if label not in axis.label_index:
+                raise ValueError(f"年份超出计算期: {path}[{label}]")
+            column = axis.label_index[label]
+            matrix[:, column] = np.where(np.isnan(values), matrix[:, column], values)
+        return matrix
+
+
+def _native(base_value, value: float, options: Optional[Tuple[str, ...]] = None):
+    """按基准值的类型还原覆盖值（整数字段保持整数，文字选项参数由序号还原为选项）"""
+    if options:
+        return options[int(value)]
+    if isinstance(base_value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(base_value, (int, np.integer)) and float(value).is_integer():
+        return int(value)
+    return float(value)
+
+
+def evaluate_scenarios(base_input: InputData, overrides: pd.DataFrame,
+                       construction_period: int, operation_period: int,
+                       return_series: bool = False) -> BatchResult:
+    """
+    批量计算情景（便捷函数）
+
+    Args:
+        base_input: 基准输入数据
+        overrides: 参数覆盖表，每行一个情景，每列一个参数路径
+        construction_period: 建设期（年）
+        operation_period: 运营期（年）
+        return_series: 是否返回各情景的年度序列
+
+    Returns:
+        BatchResult: 各情景财务指标（及年度序列）
+    """
+    year_generator = YearGenerator(construction_period, operation_period)
+    return BatchEngine(year_generator, base_input).evaluate(overrides, return_series)
@@ -0,0 +1,287 @@
+"""
+批量导入项目工作簿
+将目录或通配符匹配到的多个JZGCCW格式工作簿（.xls/.xlsx）分发到进程池中并行导入为InputData，
+每个工作簿按input_mapping的映射表一次读取参数工作表。单个文件出错时记录错误并继续导入其余文件。
+导入结果展开为一张列式表（每个工作簿一行，每个输入字段一列），可保存为parquet或csv。
+"""
+from __future__ import annotations
+
+import glob
+import importlib.util
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+from data_models import InputData
+from input_mapping import FIELDS, SERIES, YEARS, COUNT, build_from_form, load_input_data
+from utils import lazy_import
+
+pd = lazy_import("pandas")
+
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+# 工作簿扩展名
+WORKBOOK_EXTENSIONS = (".xls", ".xlsx")
+
+# 列式表中的文件信息列
+FILE_COLUMN = "文件"
+PERIOD_COLUMNS = ("basic_info.construction_period", "basic_info.operation_period")
+
+# 取整数值的字段
+_INTEGER_PATHS = {spec.path for spec in FIELDS if spec.unit in (YEARS, COUNT)}
+
+
+def find_workbooks(source: Union[str, Sequence[str]]) -> List[str]:
+    """
+    查找要导入的工作簿
+
+    Args:
+        source: 目录、通配符（如"projects/**/*.xls"）或文件路径列表
+
+    Returns:
+        list: 排序后的工作簿路径（不含Excel打开时生成的~$临时文件）
+    """
+    if isinstance(source, str):
+        if os.path.isdir(source):
+            paths = [os.path.join(source, name) for name in os.listdir(source)]
+        else:
+            paths = glob.glob(source, recursive=True)
+    else:
+        paths = list(source)
+
+    return sorted(
+        path for path in paths
+        if os.path.splitext(path)[1].lower() in WORKBOOK_EXTENSIONS
+        and not os.path.basename(path).startswith("~$")
+        and os.path.isfile(path)
+    )
+
+
+def flatten_input(input_data: InputData) -> Dict[str, Any]:
+    """
+    将输入数据展开为一行（列名为批量计算引擎的参数路径，按年字段为"路径[年份]"，列表字段为"路径[序号]"）
+
+    Args:
+        input_data: 输入数据
+
+    Returns:
+        dict: 列名到值的映射
+    """
+    row: Dict[str, Any] = {
+        PERIOD_COLUMNS[0]: input_data.basic_info.construction_period,
+        PERIOD_COLUMNS[1]: input_data.basic_info.operation_period,
+    }
+    for spec in FIELDS:
+        owner = input_data
+        for name in spec.path.split("."):
+            owner = getattr(owner, name)
+        row[spec.path] = owner
+
+    for spec in SERIES:
+        value = input_data
+        for name in spec.path.split("."):
+            value = getattr(value, name)
+        items = value.items() if isinstance(value, dict) else enumerate(value)
+        for key, item in items:
+            row[f"{spec.path}[{key}]"] = item
+    return row
+
+
+def input_from_row(row: Dict[str, Any]) -> InputData:
+    """
+    由列式表中的一行还原输入数据（flatten_input的逆操作）
+
+    Args:
+        row: 列名到值的映射（可为DataFrame的一行）
+
+    Returns:
+        InputData: 输入数据对象
+    """
+    from batch_engine import apply_override
+    from year_generator import YearGenerator
+
+    construction_period = int(row[PERIOD_COLUMNS[0]])
+    operation_period = int(row[PERIOD_COLUMNS[1]])
+    yg = YearGenerator(construction_period, operation_period)
+    input_data = build_from_form({}, construction_period, operation_period)
+
+    paths = {spec.path for spec in FIELDS} | {spec.path for spec in SERIES}
+    for column, value in dict(row).items():
+        if column.split("[")[0] not in paths or pd.isna(value):
+            continue
+        if column in _INTEGER_PATHS:
+            value = int(value)
+        apply_override(input_data, column, value, yg)
+    return input_data
+
+
+def _import_one(path: str, construction_period: Optional[int], operation_period: Optional[int],
+                use_cache: bool) -> Dict[str, Any]:
+    """
+    导入单个工作簿（在工作进程中执行）
+
+    Returns:
+        dict: {"path", "row", "error", "seconds"}，出错时row为None
+    """
+    from data_loader import DataLoader
+
+    start = time.perf_counter()
+    loader = None
+    try:
+        loader = DataLoader(path, use_cache=use_cache)
+        input_data = load_input_data(loader, construction_period, operation_period)
+        row, error = flatten_input(input_data), None
+    except Exception as e:  # 单个文件的任何错误都不应中断整批导入
+        row, error = None, f"{type(e).__name__}: {e}"
+    finally:
+        if loader is not None:
+            loader.close()
+    return {"path": path, "row": row, "error": error, "seconds": time.perf_counter() - start}
+
+
+def _import_chunk(paths: Sequence[str], construction_period: Optional[int], operation_period: Optional[int],
+                  use_cache: bool) -> List[Dict[str, Any]]:
+    """导入一组工作簿（在工作进程中执行）"""
+    return [_import_one(path, construction_period, operation_period, use_cache) for path in paths]
+
+
+class BulkImportResult:
+    """批量导入结果"""
+
+    def __init__(self, table: "pd.DataFrame", errors: "pd.DataFrame", seconds: float):
+        """
+        Args:
+            table: 导入成功的工作簿，每个一行（"文件"列为工作簿路径）
+            errors: 导入失败的工作簿及错误信息
+            seconds: 总耗时（秒）
+        """
+        self.table = table
+        self.errors = errors
+        self.seconds = seconds
+
+    def __len__(self) -> int:
+        """导入成功的工作簿数"""
+        return len(self.table)
+
+    def input_data(self, path: str) -> InputData:
+        """
+        还原某个工作簿的输入数据
+
+        Args:
+            path: 工作簿路径（与"文件"列相同）
+
+        Returns:
+            InputData: 输入数据对象
+        """
+        rows = self.table[self.table[FILE_COLUMN] == path]
+        if rows.empty:
+            raise ValueError(f"未导入该工作簿: {path}")
+        return input_from_row(rows.iloc[0])
+
+    def save(self, path: str) -> None:
+        """
+        保存列式表（按扩展名选择.parquet或.csv）
+
+        Args:
+            path: 输出文件路径
+        """
+        ext = os.path.splitext(path)[1].lower()
+        if ext == ".parquet":
+            if not PARQUET_AVAILABLE:
+                raise ValueError("保存为parquet需要安装pyarrow")
+            self.table.to_parquet(path, index=False)
+        elif ext == ".csv":
+            self.table.to_csv(path, index=False, encoding="utf-8-sig")
+        else:
+            raise ValueError(f"不支持的输出格式: {ext}")
+
+
+def load_table(path: str) -> "pd.DataFrame":
+    """
+    读取保存的列式表
+
+    Args:
+        path: .parquet或.csv文件路径
+
+    Returns:
+        DataFrame
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".parquet":
+        return pd.read_parquet(path)
+    if ext == ".csv":
+        return pd.read_csv(path, encoding="utf-8-sig")
+    raise ValueError(f"不支持的文件格式: {ext}")
+
+
+def bulk_import(source: Union[str, Sequence[str]], construction_period: Optional[int] = None,
+                operation_period: Optional[int] = None, max_workers: Optional[int] = None,
+                chunk_size: Optional[int] = None, use_cache: bool = True) -> BulkImportResult:
+    """
+    批量导入工作簿
+
+    Args:
+        source: 目录、通配符或文件路径列表
+        construction_period: 建设期（年），默认取各工作簿中的值
+        operation_period: 运营期（年），默认取各工作簿中的值
+        max_workers: 进程数，默认为CPU核数；为1时在当前进程中串行导入
+        chunk_size: 每次分发给工作进程的文件数，默认按进程数均分为若干块
+        use_cache: 是否使用工作簿快照缓存（再次导入未修改的工作簿时直接读取快照）
+
+    Returns:
+        BulkImportResult: 导入结果
+    """
+    start = time.perf_counter()
+    paths = find_workbooks(source)
+    workers = min(max_workers or os.cpu_count() or 1, max(len(paths), 1))
+    if chunk_size is None:
+        chunk_size = max(1, -(-len(paths) // (workers * 4)))
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    args = (construction_period, operation_period, use_cache)
+
+    if workers == 1 or len(chunks) <= 1:
+        outputs = [_import_chunk(chunk, *args) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_import_chunk, chunk, *args) for chunk in chunks]
+            outputs = []
+            for chunk, future in zip(chunks, futures):
+                try:
+                    outputs.append(future.result())
+                except Exception as e:  # 工作进程异常退出时，该块的文件均记为失败
+                    error = f"{type(e).__name__}: {e}"
+                    outputs.append([{"path": path, "row": None, "error": error, "seconds": 0.0}
+                                    for path in chunk])
+
+    records = [record for output in outputs for record in output]
+    rows = [{FILE_COLUMN: r["path"], **r["row"]} for r in records if r["row"] is not None]
+    errors = [{FILE_COLUMN: r["path"], "错误": r["error"]} for r in records if r["row"] is None]
+    return BulkImportResult(
+        pd.DataFrame(rows),
+        pd.DataFrame(errors, columns=[FILE_COLUMN, "错误"]),
+        time.perf_counter() - start,
+    )
+
+
+def _iter_messages(result: BulkImportResult) -> Iterable[str]:
+    """导入结果摘要"""
+    yield f"导入成功 {len(result)} 个，失败 {len(result.errors)} 个，耗时 {result.seconds:.1f} 秒"
+    for _, error in result.errors.iterrows():
+        yield f"  [失败] {error[FILE_COLUMN]}: {error['错误']}"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="批量导入项目工作簿")
+    parser.add_argument("source", help="目录或通配符，如 projects/**/*.xls")
+    parser.add_argument("output", help="输出文件（.parquet或.csv）")
+    parser.add_argument("--workers", type=int, default=None, help="进程数")
+    parser.add_argument("--no-cache", action="store_true", help="不使用工作簿快照缓存")
+    options = parser.parse_args()
+
+    bulk_result = bulk_import(options.source, max_workers=options.workers, use_cache=not options.no_cache)
+    bulk_result.save(options.output)
+    for message in _iter_messages(bulk_result):
+        print(message)
@@ -0,0 +1,226 @@
+"""
+计算依赖图
+以节点声明各中间结果及其依赖关系，每次运行中每个节点最多计算一次，并记录耗时与命中情况。
+节点可声明所读取的输入路径（"模块"或"模块.字段"），输入变化时只需清除受影响的节点及其下游。
+"""
+import time
+from typing import Any, Callable, Dict, List, Sequence
+
+
+class CalculationNode:
+    """计算节点"""
+
+    def __init__(self, name: str, func: Callable, deps: Sequence[str] = (), description: str = "",
+                 inputs: Sequence[str] = ()):
+        """
+        初始化计算节点
+
+        Args:
+            name: 节点名称
+            func: 计算函数，按deps顺序接收各依赖节点的结果
+            deps: 依赖节点名称
+            description: 节点说明
+            inputs: 直接读取的输入路径，如"tax_params"或"tax_params.discount_rate"
+        """
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.description = description
+        self.inputs = tuple(inputs)
+
+    def reads(self, path: str) -> bool:
+        """
+        节点是否读取指定输入路径
+
+        Args:
+            path: 输入路径（"模块"或"模块.字段"）
+
+        Returns:
+            bool
+        """
+        for item in self.inputs:
+            if item == path or path.startswith(item + ".") or item.startswith(path + "."):
+                return True
+        return False
+
+
+class NodeStats:
+    """节点运行统计"""
+
+    def __init__(self):
+        self.requests = 0      # 请求次数
+        self.hits = 0          # 缓存命中次数
+        self.misses = 0        # 实际计算次数
+        self.elapsed = 0.0     # 计算耗时（秒，不含依赖节点）
+
+    def reset(self):
+        self.requests = 0
+        self.hits = 0
+        self.misses = 0
+        self.elapsed = 0.0
+
+
+class CalculationGraph:
+    """带记忆化的计算依赖图"""
+
+    def __init__(self):
+        self._nodes: Dict[str, CalculationNode] = {}
+        self._cache: Dict[str, Any] = {}
+        self._stats: Dict[str, NodeStats] = {}
+        self._computing: List[str] = []
+
+    def add_node(self, name: str, func: Callable, deps: Sequence[str] = (), description: str = "",
+                 inputs: Sequence[str] = ()) -> None:
+        """
+        注册计算节点
+
+        Args:
+            name: 节点名称
+            func: 计算函数
+            deps: 依赖节点名称
+            description: 节点说明
+            inputs: 直接读取的输入路径
+        """
+        if name in self._nodes:
+            raise ValueError(f"重复的计算节点: {name}")
+        self._nodes[name] = CalculationNode(name, func, deps, description, inputs)
+        self._stats[name] = NodeStats()
+
+    @property
+    def node_names(self) -> List[str]:
+        """按注册顺序返回所有节点名称"""
+        return list(self._nodes)
+
+    def nodes_reading(self, paths: Sequence[str]) -> List[str]:
+        """
+        获取直接读取指定输入路径的节点
+
+        Args:
+            paths: 发生变化的输入路径
+
+        Returns:
+            list: 按注册顺序排列的节点名称
+        """
+        return [name for name, node in self._nodes.items() if any(node.reads(path) for path in paths)]
+
+    def get_node(self, name: str) -> CalculationNode:
+        """
+        获取节点定义
+
+        Args:
+            name: 节点名称
+
+        Returns:
+            CalculationNode
+        """
+        if name not in self._nodes:
+            raise KeyError(f"未知的计算节点: {name}")
+        return self._nodes[name]
+
+    def get(self, name: str) -> Any:
+        """
+        获取节点结果（未计算时先计算其依赖，再计算本节点）
+
+        Args:
+            name: 节点名称
+
+        Returns:
+            节点计算结果
+        """
+        node = self.get_node(name)
+        stats = self._stats[name]
+        stats.requests += 1
+
+        if name in self._cache:
+            stats.hits += 1
+            return self._cache[name]
+
+        if name in self._computing:
+            cycle = " -> ".join(self._computing[self._computing.index(name):] + [name])
+            raise ValueError(f"计算节点存在循环依赖: {cycle}")
+
+        self._computing.append(name)
+        try:
+            dep_values = [self.get(dep) for dep in node.deps]
+            start = time.perf_counter()
+            value = node.func(*dep_values)
+            stats.elapsed += time.perf_counter() - start
+        finally:
+            self._computing.pop()
+
+        stats.misses += 1
+        self._cache[name] = value
+        return value
+
+    def is_cached(self, name: str) -> bool:
+        """节点结果是否已缓存"""
+        return name in self._cache
+
+    def dependents(self, names: Sequence[str]) -> List[str]:
+        """
+        获取直接或间接依赖于指定节点的所有节点（含自身）
+
+        Args:
+            names: 节点名称
+
+        Returns:
+            list: 按注册顺序排列的节点名称
+        """
+        affected = set(names)
+        changed = True
+        while changed:
+            changed = False
+            for node in self._nodes.values():
+                if node.name not in affected and any(dep in affected for dep in node.deps):
+                    affected.add(node.name)
+                    changed = True
+        return [name for name in self._nodes if name in affected]
+
+    def invalidate(self, names: Sequence[str] = None, cascade: bool = True) -> List[str]:
+        """
+        清除节点缓存
+
+        Args:
+            names: 节点名称，为None时清除全部
+            cascade: 是否连同下游节点一起清除
+
+        Returns:
+            list: 被清除的节点名称
+        """
+        if names is None:
+            cleared = list(self._cache)
+            self._cache.clear()
+            return cleared
+
+        cleared = []
+        for name in (self.dependents(names) if cascade else names):
+            if name in self._cache:
+                del self._cache[name]
+                cleared.append(name)
+        return cleared
+
+    def reset_stats(self) -> None:
+        """清零所有节点的运行统计"""
+        for stats in self._stats.values():
+            stats.reset()
+
+    def report(self) -> List[Dict[str, Any]]:
+        """
+        生成各节点的运行统计
+
+        Returns:
+            list: 每个节点一行，包含依赖、请求、命中、计算次数和耗时
+        """
+        rows = []
+        for name, node in self._nodes.items():
+            stats = self._stats[name]
+            rows.append({
+                "节点": name,
+                "依赖": ", ".join(node.deps),
+                "输入": ", ".join(node.inputs),
+                "请求次数": stats.requests,
+                "命中次数": stats.hits,
+                "计算次数": stats.misses,
+                "耗时(ms)": stats.elapsed * 1000,
+            })
+        return rows
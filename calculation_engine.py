@@ -2,10 +2,17 @@
 财务计算引擎
 整合所有计算模块，提供统一的计算接口
 """
-import pandas as pd
-from typing import Dict, List
+from __future__ import annotations
+
+import copy
+import numpy as np
+from typing import Any, Dict, List
 from year_generator import YearGenerator
 from data_models import InputData
+from calc_graph import CalculationGraph
+from irr_solver import solve_irr
+from loan_engine import TABLE_ROWS, plan_schedule
+from circularity import revolver
 from calculations import (
     InvestmentCalculator,
     DepreciationCalculator,
@@ -14,7 +21,9 @@ from calculations import (
     CashFlowCalculator,
     AssetSalesCalculator
 )
-from utils import round_dataframe
+from utils import round_dataframe, lazy_import
+
+pd = lazy_import("pandas")
 
 
 class CalculationEngine:
@@ -39,6 +48,123 @@ class CalculationEngine:
         self.cashflow_calc = CashFlowCalculator(year_generator, input_data)
         self.asset_sales_calc = AssetSalesCalculator(year_generator, input_data)
 
+        # 计算依赖图
+        self.graph = self._build_graph()
+
+        # 上次计算时的输入指纹与变化字段（用于增量计算）
+        self._input_fingerprint = None
+        self.changed_inputs = None
+
+    # 计算表名称（按输出顺序）
+    TABLE_NAMES = [
+        "1建设投资",
+        "2流动资金",
+        "3投资计划",
+        "4还本付息",
+        "5-4折旧",
+        "5-5摊销",
+        "5-1材料",
+        "5-2燃料",
+        "5-3工资",
+        "5总成本",
+        "6收入 ",
+        "7利润",
+        "8财务现金",
+        "9资产负债",
+        "10项目现金",
+        "11资本金现金 ",
+        "12各方现金",
+        "财务分析结果汇总",
+        "土地增值税计算",
+        "房产销售及土增",
+        "资产销售计划",
+    ]
+
+    def _build_graph(self) -> CalculationGraph:
+        """
+        声明计算依赖图
+
+        中间结果与各计算表都注册为节点，节点函数按依赖顺序接收依赖节点的结果，
+        inputs声明节点直接读取的输入字段（上游节点读取的字段无需重复声明）。
+        asset_formation、sales_plan节点返回不可修改的派生状态（不写回input_data），
+        使用资产形成、资产销售结果的节点通过依赖接收它们。
+
+        Returns:
+            CalculationGraph: 计算依赖图
+        """
+        graph = CalculationGraph()
+        add = graph.add_node
+
+        # ---------- 中间结果 ----------
+        add("asset_formation", self.investment_calc.calculate_asset_formation, description="资产形成",
+            inputs=["project_investment", "asset_sales_plan.land_sell_ratio"])
+        add("sales_plan", self.asset_sales_calc.calculate_annual_sales, ["asset_formation"],
+            "资产销售计划", inputs=["asset_sales_plan"])
+        add("total_investment", self.investment_calc.calculate_total_investment, description="项目总投资",
+            inputs=["project_investment"])
+        add("investment_by_year",
+            lambda total: self.investment_calc.calculate_investment_by_year(total["项目总投资（不含利息）"]),
+            ["total_investment"], "各年投资分布")
+        add("loan_schedule", lambda: plan_schedule(self.input.bank_loan_plan, self.yg),
+            description="借款还本付息（建设期利息资本化）", inputs=["bank_loan_plan"])
+        add("additional_investment", self.investment_calc.calculate_additional_investment,
+            description="追加资产投资", inputs=["asset_formation.additional_assets"])
+        add("construction_interest", self.investment_calc.calculate_construction_interest,
+            ["loan_schedule"], "建设期利息")
+        add("investment_summary", self.investment_calc.get_investment_summary,
+            ["total_investment", "construction_interest"], "投资汇总")
+        add("yearly_depreciation", self.depreciation_calc.get_yearly_depreciation,
+            ["asset_formation", "sales_plan"], "各年折旧", inputs=["asset_formation"])
+        add("yearly_amortization", self.depreciation_calc.get_yearly_amortization,
+            ["asset_formation", "sales_plan"], "各年摊销", inputs=["asset_formation"])
+        add("depreciation_detail", self.depreciation_calc.get_detailed_depreciation_data,
+            ["asset_formation", "sales_plan"], "折旧明细", inputs=["asset_formation"])
+        add("amortization_detail", self.depreciation_calc.get_detailed_amortization_data,
+            ["asset_formation", "sales_plan"], "摊销明细", inputs=["asset_formation"])
+        add("product_revenue", self.profit_calc.calculate_product_revenue, description="产品销售收入",
+            inputs=["sales_revenue"])
+        add("operating_costs", lambda asset: self.cost_calc.get_yearly_costs(asset_formation=asset),
+            ["asset_formation"], "经营成本（不含折旧摊销）",
+            inputs=["material_cost", "fuel_cost", "labor_cost", "other_costs"])
+        add("total_costs", self._compute_total_costs,
+            ["operating_costs", "yearly_depreciation", "yearly_amortization"], "总成本")
+        add("sales_series", self._compute_sales_series, ["sales_plan"], "资产销售年度数据")
+        add("profit", self._profit_series, ["product_revenue", "total_costs", "sales_series", "loan_schedule"],
+            "利润", inputs=["tax_params.corporate_tax_rate", "tax_params.city_tax_rate",
+                           "tax_params.education_tax_rate"])
+        add("revolver", self._revolver_series, ["profit", "operating_costs", "loan_schedule", "additional_investment"],
+            "短期借款")
+        add("finance_cashflow", self._finance_cashflow_series,
+            ["investment_by_year", "profit", "operating_costs", "revolver", "additional_investment"], "财务现金流")
+        add("kpis", self._compute_kpis, ["finance_cashflow", "investment_summary"], "财务指标",
+            inputs=["tax_params.discount_rate"])
+
+        # ---------- 计算表 ----------
+        add("1建设投资", self._create_investment_table, ["investment_summary"], inputs=["project_investment"])
+        add("2流动资金", self._create_working_capital_table)
+        add("3投资计划", self._create_investment_plan_table, ["investment_by_year"])
+        add("4还本付息", self._create_loan_repayment_table, ["loan_schedule", "revolver"])
+        add("5-4折旧", self._create_depreciation_table, ["depreciation_detail"])
+        add("5-5摊销", self._create_amortization_table, ["amortization_detail"])
+        add("5-1材料", self._create_material_cost_table, inputs=["material_cost"])
+        add("5-2燃料", self._create_fuel_cost_table, inputs=["fuel_cost"])
+        add("5-3工资", self._create_welfare_cost_table, inputs=["labor_cost"])
+        add("5总成本", self._create_total_cost_table, ["total_costs"])
+        add("6收入 ", self._create_revenue_table, ["profit"])
+        add("7利润", self._create_profit_table, ["profit"])
+        add("8财务现金", self._create_finance_cashflow_table, ["finance_cashflow"])
+        add("9资产负债", self._create_balance_sheet_table,
+            ["asset_formation", "yearly_depreciation", "investment_summary", "product_revenue"])
+        add("10项目现金", self._create_project_cashflow_table, ["8财务现金"])
+        add("11资本金现金 ", self._create_equity_cashflow_table, ["8财务现金"])
+        add("12各方现金", self._create_investor_cashflow_table, ["product_revenue"])
+        add("财务分析结果汇总", self._create_financial_indicators_table, ["kpis"])
+        add("土地增值税计算", self._create_land_tax_table, ["investment_summary", "product_revenue"])
+        add("房产销售及土增", self._create_property_sale_table, ["product_revenue"])
+        add("资产销售计划", self._create_asset_sales_table, ["sales_plan", "sales_series"])
+
+        return graph
+
     def run_all_calculations(self) -> Dict[str, pd.DataFrame]:
         """
         运行所有计算，生成所有计算表
@@ -46,66 +172,136 @@ class CalculationEngine:
         Returns:
             dict: 表名到DataFrame的映射
         """
-        results = {}
+        # 记录本次计算的输入指纹（用于之后的增量计算）
+        self._input_fingerprint = self.input.fingerprint()
+        self.changed_inputs = None
 
-        # ⚠️ 关键：必须先完成资产形成计算，其他计算才能正常工作
-        self.investment_calc.calculate_asset_formation()
-        self.asset_sales_calc.calculate_annual_sales()
+        self.graph.invalidate()
+        self.graph.reset_stats()
 
-        # 1. 投资估算表
-        results["1建设投资"] = self._create_investment_table()
+        return {name: self.graph.get(name) for name in self.TABLE_NAMES}
 
-        # 2. 流动资金估算表
-        results["2流动资金"] = self._create_working_capital_table()
+    def update(self, input_data: InputData) -> Dict[str, pd.DataFrame]:
+        """
+        增量计算：与上次计算的输入逐字段比较，只重新计算受变化影响的节点及其下游计算表
 
-        # 3. 投资计划表
-        results["3投资计划"] = self._create_investment_plan_table()
+        引擎保存input_data的副本，调用方可以在调用之间继续修改同一个对象。
 
-        # 4. 借款还本付息表
-        results["4还本付息"] = self._create_loan_repayment_table()
+        Args:
+            input_data: 新的输入数据
 
-        # 5. 折旧摊销表
-        results["5-4折旧"] = self._create_depreciation_table()
-        results["5-5摊销"] = self._create_amortization_table()
+        Returns:
+            dict: 表名到DataFrame的映射（未受影响的表为上次结果）
+        """
+        if self._input_fingerprint is None:
+            self._bind_input(copy.deepcopy(input_data))
+            return self.run_all_calculations()
 
-        # 6. 材料燃料工资表
-        results["5-1材料"] = self._create_material_cost_table()
-        results["5-2燃料"] = self._create_fuel_cost_table()
-        results["5-3工资"] = self._create_welfare_cost_table()
+        self.set_input(input_data)
+        return {name: self.graph.get(name) for name in self.TABLE_NAMES}
 
-        # 5. 总成本表
-        results["5总成本"] = self._create_total_cost_table()
+    def set_input(self, input_data: InputData) -> List[str]:
+        """
+        切换到新的输入并使受影响的节点失效，但不立即计算
 
-        # 6. 收入表
-        results["6收入 "] = self._create_revenue_table()
+        之后可以只请求需要的节点（如graph.get("kpis")），未受影响的中间结果直接复用缓存。
+        引擎保存input_data的副本，input_data不会被修改。
 
-        # 7. 利润表
-        results["7利润"] = self._create_profit_table()
+        Args:
+            input_data: 新的输入数据
 
-        # 8. 现金流表
-        results["8财务现金"] = self._create_finance_cashflow_table()
-        results["9资产负债"] = self._create_balance_sheet_table()
-        results["10项目现金"] = self._create_project_cashflow_table()
-        results["11资本金现金 "] = self._create_equity_cashflow_table()
-        results["12各方现金"] = self._create_investor_cashflow_table()
+        Returns:
+            list: 发生变化的输入字段
+        """
+        fingerprint = input_data.fingerprint()
+        previous = self._input_fingerprint or {}
+        self.changed_inputs = sorted(
+            path for path in set(fingerprint) | set(previous)
+            if fingerprint.get(path) != previous.get(path)
+        )
+
+        self._bind_input(copy.deepcopy(input_data))
+        self._input_fingerprint = fingerprint
+
+        if previous:
+            self.graph.invalidate(self.graph.nodes_reading(self.changed_inputs))
+        else:
+            self.graph.invalidate()
+        self.graph.reset_stats()
+        return self.changed_inputs
+
+    def _bind_input(self, input_data: InputData) -> None:
+        """将引擎及各计算器切换到新的输入对象"""
+        self.input = input_data
+        for calc in (self.investment_calc, self.depreciation_calc, self.cost_calc,
+                     self.profit_calc, self.cashflow_calc, self.asset_sales_calc):
+            calc.input = input_data
 
-        # 9. 财务指标汇总
-        results["财务分析结果汇总"] = self._create_financial_indicators_table()
+    def get_calculation_report(self) -> pd.DataFrame:
+        """
+        获取最近一次计算的节点统计（请求、命中、计算次数及耗时）
 
-        # 10. 土地增值税相关表格
-        results["土地增值税计算"] = self._create_land_tax_table()
-        results["房产销售及土增"] = self._create_property_sale_table()
+        Returns:
+            DataFrame: 每个计算节点一行
+        """
+        return pd.DataFrame(self.graph.report())
 
-        # 11. 资产销售计划表
-        results["资产销售计划"] = self._create_asset_sales_table()
+    def _compute_total_costs(self, operating_costs, depreciation, amortization) -> Dict[str, np.ndarray]:
+        """在经营成本基础上填入折旧费、摊销费（均取自资产登记簿，分别与5-4折旧表、5-5摊销表的合计一致）"""
+        return {**operating_costs, "折旧费": depreciation, "摊销费": amortization}
 
-        return results
+    def _compute_sales_series(self, sales_plan) -> Dict[str, np.ndarray]:
+        """
+        计算资产销售的年度向量（建设期无销售）
+
+        Args:
+            sales_plan: 资产销售计划
 
-    def _create_investment_table(self) -> pd.DataFrame:
+        Returns:
+            dict: 销售成本、销售收入、土地摊销
+        """
+        axis = self.yg.axis
+        return {
+            "销售成本": axis.operation_values(sales_plan.annual_sales_cost),
+            "销售收入": axis.operation_values(sales_plan.annual_sales_revenue),
+            "土地摊销": axis.operation_values(sales_plan.annual_land_amortization),
+        }
+
+    def _compute_kpis(self, cashflow: Dict[str, np.ndarray], investment_summary: Dict[str, float]) -> Dict[str, Any]:
+        """
+        计算财务指标
+
+        Args:
+            cashflow: 财务现金流年度向量
+            investment_summary: 投资汇总
+
+        Returns:
+            dict: total_investment、npv、irr、irr_no_root、irr_multiple_roots、payback_period、discount_rate
+        """
+        net_cashflows = cashflow["净现金流"]
+
+        # 计算NPV
+        discount_rate = self.input.tax_params.discount_rate
+        npv = self.cashflow_calc.calculate_net_present_value(net_cashflows, discount_rate)
+
+        # 计算IRR（无解时为NaN）
+        irr_result = solve_irr(net_cashflows)
+
+        # 计算回收期
+        payback_period = self.cashflow_calc.calculate_payback_period(cashflow["累计净现金流"])
+
+        return {
+            "total_investment": investment_summary["项目总投资（含利息）"],
+            "npv": npv,
+            "irr": float(irr_result.rate[0]),
+            "irr_no_root": bool(irr_result.no_root[0]),
+            "irr_multiple_roots": bool(irr_result.multiple_roots[0]),
+            "payback_period": payback_period,
+            "discount_rate": discount_rate,
+        }
+
+    def _create_investment_table(self, investment_summary: Dict[str, float]) -> pd.DataFrame:
         """创建建设投资估算表"""
-        # 先计算资产形成
-        self.investment_calc.calculate_asset_formation()
-        investment_summary = self.investment_calc.get_investment_summary()
 
         data = [
             ["项目", "金额（万元）", "说明"],
@@ -114,10 +310,10 @@ class CalculationEngine:
             ["设备安装费", self.input.project_investment.building_installation_cost, "含税投资"],
             ["生产设备购置费", self.input.project_investment.production_equipment_cost, "含税投资"],
             ["生产设备安装费", self.input.project_investment.production_installation_cost, "含税投资"],
-            ["工程费小计", self.investment_calc.calculate_total_investment()["工程费合计"], ""],
-            ["工程建设其他费", self.investment_calc.calculate_total_investment()["工程建设其他费合计"], ""],
-            ["基本预备费", self.investment_calc.calculate_total_investment()["基本预备费"], ""],
-            ["涨价预备费", self.investment_calc.calculate_total_investment()["涨价预备费"], ""],
+            ["工程费小计", investment_summary["工程费合计"], ""],
+            ["工程建设其他费", investment_summary["工程建设其他费合计"], ""],
+            ["基本预备费", investment_summary["基本预备费"], ""],
+            ["涨价预备费", investment_summary["涨价预备费"], ""],
             ["建设期利息", investment_summary["建设期利息合计"], ""],
             ["流动资金", investment_summary["流动资金"], ""],
             ["项目总投资合计", investment_summary["项目总投资（含利息）"], ""]
@@ -127,116 +323,35 @@ class CalculationEngine:
 
     def _create_working_capital_table(self) -> pd.DataFrame:
         """创建流动资金估算表 - 横向展示"""
-        years = self.yg.generate_year_names()
-
-        # 构建数据字典：指标名称 -> 各年份数据
-        data = {"项目": ["流动资金（万元）"]}
-        for year in years:
-            year_num = self.yg.get_year_index(year)
-            # 简化：运营期各年流动资金固定为90万元
-            if self.yg.is_operation_year(year_num):
-                data[year] = [90.0]
-            else:
-                data[year] = [0.0]
+        axis = self.yg.axis
 
-        return round_dataframe(pd.DataFrame(data))
+        # 简化：运营期各年流动资金固定为90万元
+        return round_dataframe(axis.frame(
+            {"项目": ["流动资金（万元）"]},
+            [axis.operation_values(90.0)]
+        ))
 
-    def _create_investment_plan_table(self) -> pd.DataFrame:
+    def _create_investment_plan_table(self, investment_by_year: Dict[str, np.ndarray]) -> pd.DataFrame:
         """创建投资计划表 - 横向展示"""
-        years = self.yg.generate_year_names()
-        investment_by_year = self.investment_calc.calculate_investment_by_year()
+        total = investment_by_year["工程费"] + investment_by_year["其他费"] + investment_by_year["预备费"]
 
-        # 构建数据字典
-        data = {
-            "项目": ["工程费", "其他费", "预备费", "合计"],
-        }
+        return round_dataframe(self.yg.axis.frame(
+            {"项目": ["工程费", "其他费", "预备费", "合计"]},
+            [investment_by_year["工程费"], investment_by_year["其他费"], investment_by_year["预备费"], total]
+        ))
 
-        for year in years:
-            inv = investment_by_year[year]
-            total = sum(inv.values())
-            data[year] = [inv["工程费"], inv["其他费"], inv["预备费"], total]
+    def _create_loan_repayment_table(self, schedule: Dict[str, np.ndarray],
+                                     facility: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """创建借款还本付息计划表 - 横向展示（各笔借款的还本付息计划按年合计，及短期借款）"""
+        axis = self.yg.axis
 
-        return round_dataframe(pd.DataFrame(data))
+        return round_dataframe(axis.frame(
+            {"项目": [label for label, _ in TABLE_ROWS] + ["其中：资本化利息", "短期借款余额", "短期借款利息"]},
+            [schedule[key] for _, key in TABLE_ROWS] +
+            [schedule["capitalized"], facility["循环借款余额"], facility["利息"]]
+        ))
 
-    def _create_loan_repayment_table(self) -> pd.DataFrame:
-        """创建借款还本付息计划表 - 横向展示"""
-        years = self.yg.generate_year_names()
-        loan_plan = self.input.bank_loan_plan
-
-        # 获取借款数据（简化：假设所有借款在建设期均匀分布）
-        loan_amounts = {}
-        total_loan = 0.0
-        for year in years:
-            year_num = self.yg.get_year_index(year)
-            if self.yg.is_construction_year(year_num):
-                # 建设期每年借款
-                loan_amount = 30000.0  # 简化：每年借款3万元
-                loan_amounts[year] = loan_amount
-                total_loan += loan_amount
-            else:
-                loan_amounts[year] = 0.0
-
-        # 计算还本付息
-        interest_rate = loan_plan.interest_rate / 100
-        repayment_years = loan_plan.repayment_period if hasattr(loan_plan, 'repayment_period') else 15
-        repayment_method = loan_plan.repayment_method if hasattr(loan_plan, 'repayment_method') else "等额本金"
-
-        balance = 0.0
-        annual_principal = 0.0
-        if repayment_years > 0:
-            annual_principal = total_loan / repayment_years  # 等额本金
-
-        # 构建数据字典
-        data = {
-            "项目": [
-                "期初借款余额",
-                "当期借款",
-                "当期应计利息",
-                "当期还本付息",
-                "其中：还本",
-                "付息",
-                "期末借款余额"
-            ]
-        }
-
-        cumulative_balance = 0.0
-        repayment_start_year = self.yg.construction_period + 1  # 运营期开始还款
-
-        for year in years:
-            year_num = self.yg.get_year_index(year)
-
-            # 累计借款余额
-            cumulative_balance += loan_amounts[year]
-
-            if year_num < repayment_start_year:
-                # 宽限期：只付息不还本
-                principal_payment = 0.0
-                interest_payment = cumulative_balance * interest_rate
-            elif cumulative_balance > 0:
-                # 还款期
-                principal_payment = min(annual_principal, cumulative_balance)
-                interest_payment = cumulative_balance * interest_rate
-                cumulative_balance -= principal_payment
-            else:
-                # 已还清
-                principal_payment = 0.0
-                interest_payment = 0.0
-
-            total_payment = principal_payment + interest_payment
-
-            data[year] = [
-                max(0, cumulative_balance + principal_payment),  # 期初余额
-                loan_amounts[year],  # 当期借款
-                interest_payment,  # 当期应计利息
-                total_payment,  # 当期还本付息
-                principal_payment,  # 还本
-                interest_payment,  # 付息
-                max(0, cumulative_balance)  # 期末余额
-            ]
-
-        return round_dataframe(pd.DataFrame(data))
-
-    def _create_depreciation_table(self) -> pd.DataFrame:
+    def _create_depreciation_table(self, depreciation_data: Dict[str, Dict]) -> pd.DataFrame:
         """
         创建固定资产折旧费、成本摊销估算表（按照5-4折旧表结构）
 
@@ -246,46 +361,17 @@ class CalculationEngine:
         - 行12-15: 销售固定资产 - 销售固定资产成本、固定资产成本摊销额、剩余待销售资产净值
         - 行16-19: 合计 - 原值、当期折旧、摊销、净值
         """
-        years = self.yg.generate_year_names()
-        depreciation_data = self.depreciation_calc.get_detailed_depreciation_data()
-        asset = self.input.asset_formation
-
-        # 构建表格数据
-        rows = []
-
-        # 1. 建筑物（20年）
-        rows.append(["1. 建筑物（20年）", ""] + [""] * len(years))  # 标题行
-        rows.append(["", "原值"] + depreciation_data["building"]["original_value"])
-        rows.append(["", "当期折旧费"] + depreciation_data["building"]["depreciation"])
-        rows.append(["", "净值"] + depreciation_data["building"]["net_value"])
-
-        # 2. 机器设备（10年）
-        rows.append(["2. 机器设备（10年）", ""] + [""] * len(years))  # 标题行
-        rows.append(["", "原值"] + depreciation_data["equipment"]["original_value"])
-        rows.append(["", "当期折旧费"] + depreciation_data["equipment"]["depreciation"])
-        rows.append(["", "净值"] + depreciation_data["equipment"]["net_value"])
-
-        # 3. 销售固定资产
-        rows.append(["3. 销售固定资产", ""] + [""] * len(years))  # 标题行
-        rows.append(["", "销售固定资产成本"] + depreciation_data["sales_assets"]["cost"])
-        rows.append(["", "固定资产成本摊销额"] + depreciation_data["sales_assets"]["amortization"])
-        rows.append(["", "剩余待销售资产净值"] + depreciation_data["sales_assets"]["remaining"])
-
-        # 4. 合计
-        rows.append(["4. 合计", ""] + [""] * len(years))  # 标题行
-        rows.append(["", "原值"] + depreciation_data["total"]["original_value"])
-        rows.append(["", "当期折旧、摊销"] + depreciation_data["total"]["depreciation_amortization"])
-        rows.append(["", "净值"] + depreciation_data["total"]["net_value"])
-
-        # 构建列名
-        columns = ["项目", "说明"] + years
-
-        df = pd.DataFrame(rows, columns=columns)
+        items = [
+            ("1. 建筑物（20年）", "building", [("原值", "original_value"), ("当期折旧费", "depreciation"), ("净值", "net_value")]),
+            ("2. 机器设备（10年）", "equipment", [("原值", "original_value"), ("当期折旧费", "depreciation"), ("净值", "net_value")]),
+            ("3. 销售固定资产", "sales_assets", [("销售固定资产成本", "cost"), ("固定资产成本摊销额", "amortization"), ("剩余待销售资产净值", "remaining")]),
+            ("4. 合计", "total", [("原值", "original_value"), ("当期折旧、摊销", "depreciation_amortization"), ("净值", "net_value")]),
+        ]
 
         # 四舍五入，保留2位小数
-        return round_dataframe(df)
+        return round_dataframe(self._build_grouped_table(items, depreciation_data))
 
-    def _create_amortization_table(self) -> pd.DataFrame:
+    def _create_amortization_table(self, amortization_data: Dict[str, Dict]) -> pd.DataFrame:
         """
         创建摊销表 - 按照5-5摊销表结构
 
@@ -296,122 +382,89 @@ class CalculationEngine:
         - 行15-18: 销售地产土地权摊销 - 原值、当期摊销费、净值
         - 行19-22: 合计 - 原值、当期摊销费、净值
         """
-        years = self.yg.generate_year_names()
-        amortization_data = self.depreciation_calc.get_detailed_amortization_data()
+        sub_rows = [("原值", "original_value"), ("当期摊销费", "amortization"), ("净值", "net_value")]
+        items = [
+            ("1. 土地使用权（50年）", "land", sub_rows),
+            ("2. 专利权（6年）", "patent", sub_rows),
+            ("3. 其他资产（5年）", "other_asset", sub_rows),
+            ("4. 销售地产土地权摊销", "sales_land", sub_rows),
+            ("5. 合计", "total", sub_rows),
+        ]
 
-        # 构建表格数据
-        rows = []
+        # 四舍五入，保留2位小数
+        return round_dataframe(self._build_grouped_table(items, amortization_data))
 
-        # 1. 土地使用权（50年）
-        rows.append(["1. 土地使用权（50年）", ""] + [""] * len(years))  # 标题行
-        rows.append(["", "原值"] + amortization_data["land"]["original_value"])
-        rows.append(["", "当期摊销费"] + amortization_data["land"]["amortization"])
-        rows.append(["", "净值"] + amortization_data["land"]["net_value"])
-
-        # 2. 专利权（6年）
-        rows.append(["2. 专利权（6年）", ""] + [""] * len(years))  # 标题行
-        rows.append(["", "原值"] + amortization_data["patent"]["original_value"])
-        rows.append(["", "当期摊销费"] + amortization_data["patent"]["amortization"])
-        rows.append(["", "净值"] + amortization_data["patent"]["net_value"])
-
-        # 3. 其他资产（5年）
-        rows.append(["3. 其他资产（5年）", ""] + [""] * len(years))  # 标题行
-        rows.append(["", "原值"] + amortization_data["other_asset"]["original_value"])
-        rows.append(["", "当期摊销费"] + amortization_data["other_asset"]["amortization"])
-        rows.append(["", "净值"] + amortization_data["other_asset"]["net_value"])
-
-        # 4. 销售地产土地权摊销
-        rows.append(["4. 销售地产土地权摊销", ""] + [""] * len(years))  # 标题行
-        rows.append(["", "原值"] + amortization_data["sales_land"]["original_value"])
-        rows.append(["", "当期摊销费"] + amortization_data["sales_land"]["amortization"])
-        rows.append(["", "净值"] + amortization_data["sales_land"]["net_value"])
-
-        # 5. 合计
-        rows.append(["5. 合计", ""] + [""] * len(years))  # 标题行
-        rows.append(["", "原值"] + amortization_data["total"]["original_value"])
-        rows.append(["", "当期摊销费"] + amortization_data["total"]["amortization"])
-        rows.append(["", "净值"] + amortization_data["total"]["net_value"])
-
-        # 构建列名
-        columns = ["项目", "说明"] + years
-
-        df = pd.DataFrame(rows, columns=columns)
+    def _build_grouped_table(self, items, data) -> pd.DataFrame:
+        """
+        构建带分组标题行的"项目/说明"两列表格（5-4折旧、5-5摊销）
 
-        # 四舍五入，保留2位小数
-        return round_dataframe(df)
+        Args:
+            items: [(分组标题, 数据键, [(说明, 子数据键), ...]), ...]
+            data: 折旧/摊销明细数据（年度向量）
+
+        Returns:
+            DataFrame: 项目、说明 + 各年份列
+        """
+        names, notes, rows = [], [], []
+        for title, key, sub_rows in items:
+            # 标题行
+            names.append(title)
+            notes.append("")
+            rows.append("")
+            for note, sub_key in sub_rows:
+                names.append("")
+                notes.append(note)
+                rows.append(data[key][sub_key])
+
+        return self.yg.axis.frame({"项目": names, "说明": notes}, rows)
+
+    def _create_cost_items_table(self, cost_items) -> pd.DataFrame:
+        """
+        创建按项目列示的成本估算表（含合计行）
+
+        Args:
+            cost_items: [(项目名称, 按年存储的字典), ...]
+
+        Returns:
+            DataFrame: 横向展示的成本表
+        """
+        axis = self.yg.axis
+        rows = [axis.from_year_dict(cost_dict) for _, cost_dict in cost_items]
+
+        # 添加合计行
+        total = axis.zeros()
+        for row in rows:
+            total = total + row
+
+        return round_dataframe(axis.frame(
+            {"项目": [name for name, _ in cost_items] + ["合计"]},
+            rows + [total]
+        ))
 
     def _create_material_cost_table(self) -> pd.DataFrame:
         """创建外购原材料费估算表 - 横向展示"""
-        years = self.yg.generate_year_names()
         mat_cost = self.input.material_cost
 
-        # 构建数据字典
-        data = {
-            "项目": []
-        }
-
         # 添加材料项目
-        material_items = [
+        return self._create_cost_items_table([
             ("材料1", mat_cost.material_1),
             ("材料2", mat_cost.material_2),
             # 可以继续添加更多材料
-        ]
-
-        for item_name, cost_dict in material_items:
-            data["项目"].append(item_name)
-            for year in years:
-                if year not in data:
-                    data[year] = []
-                data[year].append(cost_dict.get(year, 0.0))
-
-        # 添加合计行
-        total_row = []
-        for year in years:
-            total = sum(data[year])
-            total_row.append(total)
-        data["项目"].append("合计")
-        for year in years:
-            data[year].append(total_row[years.index(year)])
-
-        return round_dataframe(pd.DataFrame(data))
+        ])
 
     def _create_fuel_cost_table(self) -> pd.DataFrame:
         """创建外购燃料及动力费估算表 - 横向展示"""
-        years = self.yg.generate_year_names()
         fuel_cost = self.input.fuel_cost
 
-        # 构建数据字典
-        data = {
-            "项目": []
-        }
-
         # 添加燃料项目
-        fuel_items = [
+        return self._create_cost_items_table([
             ("燃料动力1", fuel_cost.fuel_1),
             # 可以继续添加更多燃料
-        ]
-
-        for item_name, cost_dict in fuel_items:
-            data["项目"].append(item_name)
-            for year in years:
-                if year not in data:
-                    data[year] = []
-                data[year].append(cost_dict.get(year, 0.0))
-
-        # 添加合计行
-        total_row = []
-        for year in years:
-            total = sum(data[year])
-            total_row.append(total)
-        data["项目"].append("合计")
-        for year in years:
-            data[year].append(total_row[years.index(year)])
-
-        return round_dataframe(pd.DataFrame(data))
+        ])
 
     def _create_welfare_cost_table(self) -> pd.DataFrame:
         """创建工资及福利费估算表 - 横向展示"""
-        years = self.yg.generate_year_names()
+        axis = self.yg.axis
         labor = self.input.labor_cost
 
         # 计算各年工资福利费用
@@ -423,9 +476,18 @@ class CalculationEngine:
         total_salary = admin_salary + tech_salary + security_salary + cleaning_salary
         total_welfare = total_salary * labor.welfare_rate
 
-        # 构建数据字典
-        data = {
-            "项目": [
+        values = [
+            admin_salary,
+            tech_salary,
+            security_salary,
+            cleaning_salary,
+            total_salary,
+            total_welfare,
+            total_salary + total_welfare
+        ]
+
+        return round_dataframe(axis.frame(
+            {"项目": [
                 "管理人员工资",
                 "技术人员工资",
                 "保安人员工资",
@@ -433,46 +495,21 @@ class CalculationEngine:
                 "工资小计",
                 "福利费",
                 "合计"
-            ]
-        }
-
-        for year in years:
-            year_num = self.yg.get_year_index(year)
-            if self.yg.is_operation_year(year_num):
-                data[year] = [
-                    admin_salary,
-                    tech_salary,
-                    security_salary,
-                    cleaning_salary,
-                    total_salary,
-                    total_welfare,
-                    total_salary + total_welfare
-                ]
-            else:
-                data[year] = [0.0] * 7
+            ]},
+            [axis.operation_values(value) for value in values]
+        ))
 
-        return round_dataframe(pd.DataFrame(data))
-
-    def _create_total_cost_table(self) -> pd.DataFrame:
+    def _create_total_cost_table(self, costs: Dict[str, np.ndarray]) -> pd.DataFrame:
         """创建总成本表 - 横向展示"""
-        years = self.yg.generate_year_names()
-        depreciation_by_year = self.depreciation_calc.get_yearly_depreciation()
-        amortization_by_year = self.depreciation_calc.get_yearly_amortization()
-        costs_by_year = self.cost_calc.get_yearly_costs(depreciation_by_year, amortization_by_year)
-
-        # 构建数据字典
-        data = {
-            "项目": ["折旧费", "摊销费", "材料成本", "燃料成本", "人工成本", "修理费", "总成本"]
-        }
 
-        for year in years:
-            costs = costs_by_year[year]
-            total_cost = (
-                costs["折旧费"] + costs["摊销费"] + costs["材料成本"] +
-                costs["燃料成本"] + costs["人工成本"] + costs["修理费"]
-            )
+        total_cost = (
+            costs["折旧费"] + costs["摊销费"] + costs["材料成本"] +
+            costs["燃料成本"] + costs["人工成本"] + costs["修理费"]
+        )
 
-            data[year] = [
+        return round_dataframe(self.yg.axis.frame(
+            {"项目": ["折旧费", "摊销费", "材料成本", "燃料成本", "人工成本", "修理费", "总成本"]},
+            [
                 costs["折旧费"],
                 costs["摊销费"],
                 costs["材料成本"],
@@ -481,122 +518,155 @@ class CalculationEngine:
                 costs["修理费"],
                 total_cost
             ]
+        ))
 
-        return round_dataframe(pd.DataFrame(data))
-
-    def _create_revenue_table(self) -> pd.DataFrame:
-        """创建收入表 - 横向展示"""
-        years = self.yg.generate_year_names()
+    def _create_revenue_table(self, profit: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """创建收入表 - 横向展示（营业收入、税金及附加与利润表一致）"""
 
-        # 构建数据字典
-        data = {
-            "项目": ["营业收入", "营业税金及附加", "增值税", "营业收入净额"]
-        }
+        revenue = profit["营业收入"]
+        total_tax = profit["营业税金及附加"]
 
-        for year in years:
-            year_num = self.yg.get_year_index(year)
+        return round_dataframe(self.yg.axis.frame(
+            {"项目": ["营业收入", "营业税金及附加", "增值税", "营业收入净额"]},
+            [revenue, total_tax, self.yg.axis.zeros(), revenue - total_tax]
+        ))
 
-            if self.yg.is_operation_year(year_num):
-                revenue = self.input.sales_revenue.annual_revenue.get(year, 0.0)
-
-                # 计算税金（简化）
-                tax_param = self.input.tax_params
-                city_tax = revenue * (tax_param.city_tax_rate / 100)
-                edu_tax = revenue * (tax_param.education_tax_rate / 100)
-                total_tax = city_tax + edu_tax
+    def _profit_series(self, revenue: np.ndarray, costs: Dict[str, np.ndarray], sales_series: Dict[str, np.ndarray],
+                       loan: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        计算利润表各行的年度向量
 
-                data[year] = [revenue, total_tax, 0.0, revenue - total_tax]
-            else:
-                data[year] = [0.0, 0.0, 0.0, 0.0]
+        营业收入含资产销售收入，总成本含折旧摊销（出售资产的成本随折旧摊销结转）；
+        运营期借款利息计入财务费用（建设期利息已资本化）。
 
-        return round_dataframe(pd.DataFrame(data))
-
-    def _create_profit_table(self) -> pd.DataFrame:
-        """创建利润表 - 横向展示"""
-        years = self.yg.generate_year_names()
-        costs_by_year = self.cost_calc.get_yearly_costs({}, {})
+        Args:
+            revenue: 各年产品销售收入
+            costs: 各年总成本明细
+            sales_series: 资产销售年度数据
+            loan: 借款还本付息计划
 
+        Returns:
+            dict: 营业收入、营业税金及附加、总成本、财务费用、利润总额、所得税、净利润
+        """
+        axis = self.yg.axis
         tax_param = self.input.tax_params
 
-        # 构建数据字典
-        data = {
-            "项目": ["营业收入", "总成本", "利润总额", "所得税", "净利润"]
+        operating_revenue = revenue + sales_series["销售收入"]
+        surtax = operating_revenue * (tax_param.city_tax_rate + tax_param.education_tax_rate)
+        total_cost = axis.operation_values(sum(costs.values()))
+        interest = axis.operation_values(loan["interest"])
+        gross_profit = operating_revenue - surtax - total_cost - interest
+        income_tax = np.where(gross_profit > 0, gross_profit * tax_param.corporate_tax_rate, 0.0)
+
+        return {
+            "营业收入": operating_revenue,
+            "营业税金及附加": surtax,
+            "总成本": total_cost,
+            "财务费用": interest,
+            "利润总额": gross_profit,
+            "所得税": income_tax,
+            "净利润": gross_profit - income_tax,
         }
 
-        for year in years:
-            year_num = self.yg.get_year_index(year)
+    def _create_profit_table(self, profit: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """创建利润表 - 横向展示"""
 
-            if self.yg.is_operation_year(year_num):
-                revenue = self.input.sales_revenue.annual_revenue.get(year, 0.0)
-                costs = costs_by_year[year]
-                total_cost = sum(costs.values())
+        return round_dataframe(self.yg.axis.frame(
+            {"项目": list(profit.keys())},
+            list(profit.values())
+        ))
 
-                gross_profit = revenue - total_cost
+    def _operating_outflow(self, profit: Dict[str, np.ndarray], costs: Dict[str, np.ndarray]) -> np.ndarray:
+        """运营期现金流出：付现成本（简化假设：为总成本的80%）、税金及附加、利息和所得税"""
+        return sum(costs.values()) * 0.8 + profit["营业税金及附加"] + profit["财务费用"] + profit["所得税"]
 
-                if gross_profit > 0:
-                    income_tax = gross_profit * (tax_param.corporate_tax_rate / 100)
-                else:
-                    income_tax = 0.0
+    def _revolver_series(self, profit: Dict[str, np.ndarray], costs: Dict[str, np.ndarray],
+                         loan: Dict[str, np.ndarray], additional_investment: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        计算短期借款（循环借款）
 
-                net_profit = gross_profit - income_tax
+        运营期净现金流不足以偿还长期借款本金和支付追加投资时提取短期借款，有盈余时先归还；
+        短期借款利息与余额的循环引用由circularity.revolver求解，利息计入财务现金流出。
 
-                data[year] = [revenue, total_cost, gross_profit, income_tax, net_profit]
-            else:
-                data[year] = [0.0, 0.0, 0.0, 0.0, 0.0]
+        Args:
+            profit: 利润表各行的年度向量
+            costs: 各年经营成本明细
+            loan: 借款还本付息计划
+            additional_investment: 各年追加投资
 
-        return round_dataframe(pd.DataFrame(data))
+        Returns:
+            dict: 循环借款余额、提款、还款、利息、现金余额
+        """
+        axis = self.yg.axis
+        cash = axis.operation_values(profit["营业收入"] - self._operating_outflow(profit, costs) - loan["principal"] -
+                                     additional_investment)
+        return revolver(cash, self.input.bank_loan_plan.interest_rate)
+
+    def _finance_cashflow_series(self, investment_by_year: Dict[str, np.ndarray], profit: Dict[str, np.ndarray],
+                                 costs: Dict[str, np.ndarray], facility: Dict[str, np.ndarray],
+                                 additional_investment: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        计算财务现金流的年度向量
 
-    def _create_finance_cashflow_table(self) -> pd.DataFrame:
-        """创建财务现金流表 - 横向展示"""
-        years = self.yg.generate_year_names()
+        Args:
+            investment_by_year: 各年投资分布
+            profit: 利润表各行的年度向量
+            costs: 各年经营成本明细
+            facility: 短期借款
+            additional_investment: 各年追加投资
 
-        # 构建数据字典
-        data = {
-            "项目": ["现金流入", "现金流出", "净现金流", "累计净现金流"]
-        }
+        Returns:
+            dict: 现金流入、现金流出、净现金流、累计净现金流
+        """
+        axis = self.yg.axis
 
-        # 简化实现
-        cumulative = 0.0
-        for year in years:
-            inflow = 0.0
-            outflow = 0.0
+        # 建设期：主要是投资流出
+        investment = investment_by_year["工程费"] + investment_by_year["其他费"] + investment_by_year["预备费"]
 
-            year_num = self.yg.get_year_index(year)
+        # 运营期：营业收入流入；付现成本、税金及附加、利息、所得税、短期借款利息及追加投资流出
+        inflow = profit["营业收入"]
+        outflow = np.where(axis.construction_mask, investment,
+                           self._operating_outflow(profit, costs) + facility["利息"]) + additional_investment
 
-            if self.yg.is_construction_year(year_num):
-                # 建设期：主要是投资流出
-                inv_by_year = self.investment_calc.calculate_investment_by_year()[year]
-                outflow = sum(inv_by_year.values())
-            else:
-                # 运营期：收入流入，成本流出
-                inflow = self.input.sales_revenue.annual_revenue.get(year, 0.0)
-                costs = self.cost_calc.get_yearly_costs({}, {})[year]
-                outflow = sum(costs.values()) * 0.8  # 简化假设
+        net_cf = inflow - outflow
 
-            net_cf = inflow - outflow
-            cumulative += net_cf
+        return {
+            "现金流入": inflow,
+            "现金流出": outflow,
+            "净现金流": net_cf,
+            "累计净现金流": np.cumsum(net_cf),
+        }
 
-            data[year] = [inflow, outflow, net_cf, cumulative]
+    def _create_finance_cashflow_table(self, cashflow: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """创建财务现金流表 - 横向展示"""
 
-        return round_dataframe(pd.DataFrame(data))
+        return round_dataframe(self.yg.axis.frame(
+            {"项目": list(cashflow.keys())},
+            list(cashflow.values())
+        ))
 
-    def _create_project_cashflow_table(self) -> pd.DataFrame:
+    def _create_project_cashflow_table(self, finance_cashflow_table: pd.DataFrame) -> pd.DataFrame:
         """创建项目投资现金流表 - 横向展示"""
-        # 简化实现
-        return self._create_finance_cashflow_table()
+        # 简化实现：与财务现金流表相同
+        return finance_cashflow_table.copy()
 
-    def _create_equity_cashflow_table(self) -> pd.DataFrame:
+    def _create_equity_cashflow_table(self, finance_cashflow_table: pd.DataFrame) -> pd.DataFrame:
         """创建资本金现金流表 - 横向展示"""
-        # 简化实现
-        return self._create_finance_cashflow_table()
+        # 简化实现：与财务现金流表相同
+        return finance_cashflow_table.copy()
 
-    def _create_investor_cashflow_table(self) -> pd.DataFrame:
+    def _create_investor_cashflow_table(self, revenue: np.ndarray) -> pd.DataFrame:
         """创建投资各方现金流量表 - 横向展示"""
-        years = self.yg.generate_year_names()
+        axis = self.yg.axis
 
-        # 构建数据字典
-        data = {
-            "项目": [
+        # 简化实现：假设投资者每年投入和回收
+        # 建设期：投资者投入；运营期：获得利润分配（假设30%的利润分配给投资者）
+        contribution = axis.construction_values(10000.0)
+        profit = revenue * 0.3
+        zeros = axis.zeros()
+
+        return round_dataframe(axis.frame(
+            {"项目": [
                 "现金流入",
                 "实分利润",
                 "资产处置收益分配",
@@ -608,69 +678,44 @@ class CalculationEngine:
                 "租赁资产支出",
                 "其他现金流出",
                 "净现金流量"
+            ]},
+            [
+                profit,  # 现金流入
+                profit,  # 实分利润
+                zeros,  # 资产处置收益分配
+                zeros,  # 租赁费收入
+                zeros,  # 技术转让或使用收入
+                zeros,  # 其他现金流入
+                contribution,  # 现金流出（投入）
+                contribution,  # 实缴资本
+                zeros,  # 租赁资产支出
+                zeros,  # 其他现金流出
+                profit - contribution  # 净现金流量
             ]
-        }
-
-        # 简化实现：假设投资者每年投入和回收
-        for year in years:
-            year_num = self.yg.get_year_index(year)
-            if self.yg.is_construction_year(year_num):
-                # 建设期：投资者投入
-                data[year] = [
-                    0.0,  # 现金流入
-                    0.0,  # 实分利润
-                    0.0,  # 资产处置收益分配
-                    0.0,  # 租赁费收入
-                    0.0,  # 技术转让或使用收入
-                    0.0,  # 其他现金流入
-                    10000.0,  # 现金流出（投入）
-                    10000.0,  # 实缴资本
-                    0.0,  # 租赁资产支出
-                    0.0,  # 其他现金流出
-                    -10000.0  # 净现金流量
-                ]
-            elif self.yg.is_operation_year(year_num):
-                # 运营期：获得利润分配
-                profit = self.input.sales_revenue.annual_revenue.get(year, 0.0) * 0.3  # 假设30%的利润分配给投资者
-                data[year] = [
-                    profit,  # 现金流入
-                    profit,  # 实分利润
-                    0.0,  # 资产处置收益分配
-                    0.0,  # 租赁费收入
-                    0.0,  # 技术转让或使用收入
-                    0.0,  # 其他现金流入
-                    0.0,  # 现金流出
-                    0.0,  # 实缴资本
-                    0.0,  # 租赁资产支出
-                    0.0,  # 其他现金流出
-                    profit  # 净现金流量
-                ]
-            else:
-                data[year] = [0.0] * 11
-
-        return round_dataframe(pd.DataFrame(data))
+        ))
 
-    def _create_balance_sheet_table(self) -> pd.DataFrame:
+    def _create_balance_sheet_table(self, asset_formation, depreciation_by_year: np.ndarray,
+                                    investment_summary: Dict[str, float], revenue: np.ndarray) -> pd.DataFrame:
         """创建资产负债表 - 横向展示"""
-        years = self.yg.generate_year_names()
-
-        # 获取各年数据
-        asset_formation = self.input.asset_formation
-        depreciation_by_year = self.depreciation_calc.get_yearly_depreciation()
+        axis = self.yg.axis
+        construction = axis.construction_mask
 
         # 获取投资汇总
-        investment_summary = self.investment_calc.get_investment_summary()
+        construction_interest = investment_summary.get("建设期利息合计", 0.0)
 
         # 累计折旧
-        cumulative_depr = {}
-        total_depr = 0.0
-        for year in years:
-            total_depr += depreciation_by_year[year]
-            cumulative_depr[year] = total_depr
-
-        # 构建数据字典
-        data = {
-            "项目": [
+        cumulative_depr = np.cumsum(depreciation_by_year)
+
+        # 运营期（简化实现）
+        net_value = np.maximum(0, asset_formation.fixed_asset_total - cumulative_depr)
+        accumulated_profit = revenue * 0.2  # 简化：累计未分配利润
+
+        def by_period(construction_value, operation_value):
+            """建设期取construction_value，运营期取operation_value"""
+            return np.where(construction, construction_value, operation_value)
+
+        return round_dataframe(axis.frame(
+            {"项目": [
                 "资产",
                 "流动资产",
                 "货币资金",
@@ -692,80 +737,37 @@ class CalculationEngine:
                 "资本公积",
                 "累计未分配利润",
                 "负债及所有者权益合计"
+            ]},
+            [
+                "",  # 资产
+                "",  # 流动资产
+                by_period(1000.0, revenue * 0.1),  # 货币资金
+                by_period(0.0, revenue * 0.05),  # 应收账款
+                by_period(0.0, revenue * 0.02),  # 存货
+                by_period(1000.0, revenue * 0.17),  # 流动资产合计
+                by_period(construction_interest, 0.0),  # 在建工程
+                by_period(0.0, net_value),  # 固定资产净值
+                by_period(0.0, net_value * 0.1),  # 无形及其他资产净值
+                by_period(1000.0 + construction_interest, revenue * 0.17 + net_value * 1.1),  # 资产合计
+                "",  # 负债及所有者权益
+                "",  # 流动负债
+                by_period(500.0, revenue * 0.08),  # 应付账款
+                by_period(500.0, revenue * 0.08),  # 流动负债合计
+                by_period(construction_interest, net_value * 0.5),  # 建设投资借款
+                by_period(500.0 + construction_interest, revenue * 0.08 + net_value * 0.5),  # 负债合计
+                "",  # 所有者权益
+                by_period(500.0, net_value * 0.5),  # 项目资本金
+                by_period(0.0, accumulated_profit * 0.2),  # 资本公积
+                by_period(0.0, accumulated_profit * 0.8),  # 累计未分配利润
+                by_period(500.0 + construction_interest, revenue * 0.17 + net_value * 0.5 + accumulated_profit)  # 负债及所有者权益合计
             ]
-        }
+        ))
 
-        # 简化实现
-        for year in years:
-            year_num = self.yg.get_year_index(year)
-
-            if self.yg.is_construction_year(year_num):
-                # 建设期
-                construction_interest = investment_summary.get("建设期利息合计", 0.0)
-                data[year] = [
-                    "",  # 资产
-                    "",  # 流动资产
-                    1000.0,  # 货币资金
-                    0.0,  # 应收账款
-                    0.0,  # 存货
-                    1000.0,  # 流动资产合计
-                    construction_interest,  # 在建工程
-                    0.0,  # 固定资产净值
-                    0.0,  # 无形及其他资产净值
-                    1000.0 + construction_interest,  # 资产合计
-                    "",  # 负债及所有者权益
-                    "",  # 流动负债
-                    500.0,  # 应付账款
-                    500.0,  # 流动负债合计
-                    construction_interest,  # 建设投资借款
-                    500.0 + construction_interest,  # 负债合计
-                    "",  # 所有者权益
-                    500.0,  # 项目资本金
-                    0.0,  # 资本公积
-                    0.0,  # 累计未分配利润
-                    500.0 + construction_interest  # 负债及所有者权益合计
-                ]
-            else:
-                # 运营期
-                revenue = self.input.sales_revenue.annual_revenue.get(year, 0.0)
-                fixed_asset = asset_formation.fixed_asset_total
-                net_value = max(0, fixed_asset - cumulative_depr[year])
-                accumulated_profit = revenue * 0.2  # 简化：累计未分配利润
-
-                data[year] = [
-                    "",  # 资产
-                    "",  # 流动资产
-                    revenue * 0.1,  # 货币资金
-                    revenue * 0.05,  # 应收账款
-                    revenue * 0.02,  # 存货
-                    revenue * 0.17,  # 流动资产合计
-                    0.0,  # 在建工程
-                    net_value,  # 固定资产净值
-                    net_value * 0.1,  # 无形及其他资产净值
-                    revenue * 0.17 + net_value * 1.1,  # 资产合计
-                    "",  # 负债及所有者权益
-                    "",  # 流动负债
-                    revenue * 0.08,  # 应付账款
-                    revenue * 0.08,  # 流动负债合计
-                    net_value * 0.5,  # 建设投资借款
-                    revenue * 0.08 + net_value * 0.5,  # 负债合计
-                    "",  # 所有者权益
-                    net_value * 0.5,  # 项目资本金
-                    accumulated_profit * 0.2,  # 资本公积
-                    accumulated_profit * 0.8,  # 累计未分配利润
-                    revenue * 0.17 + net_value * 0.5 + accumulated_profit  # 负债及所有者权益合计
-                ]
-
-        return round_dataframe(pd.DataFrame(data))
-
-    def _create_land_tax_table(self) -> pd.DataFrame:
+    def _create_land_tax_table(self, investment_summary: Dict[str, float], product_revenue: np.ndarray) -> pd.DataFrame:
         """创建土地增值税计算表 - 横向展示"""
-        years = self.yg.generate_year_names()
-
-        # 获取投资数据
-        investment_summary = self.investment_calc.get_investment_summary()
+        axis = self.yg.axis
 
-        # 定义项目列表（共13项）
+        # 定义项目列表（共12项）
         items = [
             "1. 房地产转让收入",
             "2. 扣除项目金额",
@@ -781,139 +783,96 @@ class CalculationEngine:
             "7. 土地增值税税额"
         ]
 
-        # 构建数据字典，确保所有列长度一致
-        data = {"项目": items}
-
-        # 为每个年份初始化列表
-        for year in years:
-            data[year] = []
-
         # 简化实现：仅在运营期最后一年计算
-        for year in years:
-            year_num = self.yg.get_year_index(year)
-            if year_num == self.yg.total_period:
-                # 最后一年：计算土地增值税
-                total_investment = investment_summary["项目总投资（含利息）"]
-                revenue = self.input.sales_revenue.annual_revenue.get(year, 0.0)
-
-                land_payment = total_investment * 0.1  # 土地使用权支付金额
-                development_cost = total_investment * 0.6  # 开发成本
-                development_fee = total_investment * 0.05  # 开发费用
-                tax = revenue * 0.055  # 转让税金
-                other_deduction = (land_payment + development_cost) * 0.2  # 其他扣除
-
-                total_deduction = land_payment + development_cost + development_fee + tax + other_deduction
-                added_value = revenue - total_deduction
-                ratio = added_value / total_deduction if total_deduction > 0 else 0
-
-                # 根据比率确定税率和速算扣除系数
-                if ratio <= 0.5:
-                    tax_rate = 0.3
-                    quick_deduction = 0
-                elif ratio <= 1.0:
-                    tax_rate = 0.4
-                    quick_deduction = 0.05
-                elif ratio <= 2.0:
-                    tax_rate = 0.5
-                    quick_deduction = 0.15
-                else:
-                    tax_rate = 0.6
-                    quick_deduction = 0.35
-
-                land_tax = added_value * tax_rate - total_deduction * quick_deduction
-
-                data[year] = [
-                    revenue,
-                    total_deduction,
-                    land_payment,
-                    development_cost,
-                    development_fee,
-                    tax,
-                    other_deduction,
-                    added_value,
-                    ratio,
-                    tax_rate,
-                    quick_deduction,
-                    land_tax
-                ]
-            else:
-                data[year] = [0.0] * len(items)
+        total_investment = investment_summary["项目总投资（含利息）"]
+        revenue = float(product_revenue[-1]) if axis.total_period > 0 else 0.0
+
+        land_payment = total_investment * 0.1  # 土地使用权支付金额
+        development_cost = total_investment * 0.6  # 开发成本
+        development_fee = total_investment * 0.05  # 开发费用
+        tax = revenue * 0.055  # 转让税金
+        other_deduction = (land_payment + development_cost) * 0.2  # 其他扣除
+
+        total_deduction = land_payment + development_cost + development_fee + tax + other_deduction
+        added_value = revenue - total_deduction
+        ratio = added_value / total_deduction if total_deduction > 0 else 0
+
+        # 根据比率确定税率和速算扣除系数
+        if ratio <= 0.5:
+            tax_rate = 0.3
+            quick_deduction = 0
+        elif ratio <= 1.0:
+            tax_rate = 0.4
+            quick_deduction = 0.05
+        elif ratio <= 2.0:
+            tax_rate = 0.5
+            quick_deduction = 0.15
+        else:
+            tax_rate = 0.6
+            quick_deduction = 0.35
+
+        land_tax = added_value * tax_rate - total_deduction * quick_deduction
+
+        last_year_values = [
+            revenue,
+            total_deduction,
+            land_payment,
+            development_cost,
+            development_fee,
+            tax,
+            other_deduction,
+            added_value,
+            ratio,
+            tax_rate,
+            quick_deduction,
+            land_tax
+        ]
 
-        return round_dataframe(pd.DataFrame(data))
+        rows = []
+        for value in last_year_values:
+            row = axis.zeros()
+            if axis.total_period > 0:
+                row[-1] = value
+            rows.append(row)
+
+        return round_dataframe(axis.frame({"项目": items}, rows))
 
-    def _create_property_sale_table(self) -> pd.DataFrame:
+    def _create_property_sale_table(self, revenue: np.ndarray) -> pd.DataFrame:
         """创建房产销售及土增表 - 横向展示"""
-        years = self.yg.generate_year_names()
+        # 简化实现
+        sale_fee = revenue * 0.02  # 销售费用2%
+        sale_tax = revenue * 0.055  # 销售税金5.5%
+
+        # 简化：土地增值税为收入的1%
+        land_tax = revenue * 0.01
+
+        profit = revenue - sale_fee - sale_tax - land_tax
 
-        # 构建数据字典
-        data = {
-            "项目": [
+        return round_dataframe(self.yg.axis.frame(
+            {"项目": [
                 "销售收入",
                 "销售费用",
                 "销售税金及附加",
                 "土地增值税",
                 "营业利润"
-            ]
-        }
+            ]},
+            [revenue, sale_fee, sale_tax, land_tax, profit]
+        ))
 
-        # 简化实现
-        for year in years:
-            year_num = self.yg.get_year_index(year)
-            if self.yg.is_operation_year(year_num):
-                revenue = self.input.sales_revenue.annual_revenue.get(year, 0.0)
-                sale_fee = revenue * 0.02  # 销售费用2%
-                sale_tax = revenue * 0.055  # 销售税金5.5%
-
-                # 简化：土地增值税为收入的1%
-                land_tax = revenue * 0.01
-
-                profit = revenue - sale_fee - sale_tax - land_tax
-
-                data[year] = [
-                    revenue,
-                    sale_fee,
-                    sale_tax,
-                    land_tax,
-                    profit
-                ]
-            else:
-                data[year] = [0.0] * 5
-
-        return round_dataframe(pd.DataFrame(data))
-
-    def _create_financial_indicators_table(self) -> pd.DataFrame:
+    def _create_financial_indicators_table(self, kpis: Dict[str, Any]) -> pd.DataFrame:
         """创建财务指标汇总表"""
-        cashflow_df = self._create_finance_cashflow_table()
-
-        # 从横向表格中获取净现金流数据
-        # 找到"净现金流"这一行
-        net_cf_row = cashflow_df[cashflow_df["项目"] == "净现金流"]
-        cumulative_row = cashflow_df[cashflow_df["项目"] == "累计净现金流"]
-
-        # 提取年份列（跳过"项目"列）
-        year_columns = [col for col in cashflow_df.columns if col != "项目"]
-        net_cashflows = net_cf_row[year_columns].values[0].tolist()
-        cumulative = cumulative_row[year_columns].values[0].tolist()
-
-        # 计算NPV
-        discount_rate = self.input.tax_params.discount_rate / 100
-        npv = self.cashflow_calc.calculate_net_present_value(net_cashflows, discount_rate)
-
-        # 计算IRR
-        try:
-            irr = self.cashflow_calc.calculate_internal_rate_of_return(net_cashflows)
-        except:
-            irr = 0.0
-
-        # 计算回收期
-        payback_period = self.cashflow_calc.calculate_payback_period(cumulative)
+        irr_note = "%"
+        if kpis["irr_no_root"]:
+            irr_note = "%（无解）"
+        elif kpis["irr_multiple_roots"]:
+            irr_note = "%（存在多个解）"
 
         data = [
             ["指标名称", "数值", "说明"],
-            ["项目总投资", self.investment_calc.get_investment_summary()["项目总投资（含利息）"], "万元"],
-            ["净现值(NPV)", npv, f"折现率{discount_rate:.1%}"],
-            ["内部收益率(IRR)", irr * 100 if isinstance(irr, (int, float)) else irr, "%"],
-            ["投资回收期", payback_period, "年"],
+            ["项目总投资", kpis["total_investment"], "万元"],
+            ["净现值(NPV)", kpis["npv"], f"折现率{kpis['discount_rate']:.1%}"],
+            ["内部收益率(IRR)", kpis["irr"] * 100, irr_note],
+            ["投资回收期", kpis["payback_period"], "年"],
             ["建设期", self.yg.construction_period, "年"],
             ["运营期", self.yg.operation_period, "年"],
             ["计算期", self.yg.total_period, "年"]
@@ -921,49 +880,34 @@ class CalculationEngine:
 
         return round_dataframe(pd.DataFrame(data))
 
-    def _create_asset_sales_table(self) -> pd.DataFrame:
+    def _create_asset_sales_table(self, sales_plan, sales_series: Dict[str, np.ndarray]) -> pd.DataFrame:
         """创建资产销售计划表 - 横向展示"""
-        years = self.yg.generate_year_names()
-        
-        # 计算年度销售数据
-        self.asset_sales_calc.calculate_annual_sales()
-        sales_plan = self.input.asset_sales_plan
-        
-        # 构建数据字典
-        data = {
-            "项目": [
+        axis = self.yg.axis
+
+        # 运营期显示销售数据，建设期无销售
+        sales_cost = sales_series["销售成本"]
+        sales_revenue = sales_series["销售收入"]
+        land_amort = sales_series["土地摊销"]
+
+        # 计算当年销售比例
+        if sales_plan.total_sales_price > 0:
+            sales_ratio = sales_revenue / sales_plan.total_sales_price
+        else:
+            sales_ratio = axis.zeros()
+
+        return round_dataframe(axis.frame(
+            {"项目": [
                 "固定资产销售成本",
                 "固定资产销售收入",
                 "土地摊销额",
                 "销售比例",
                 "自持比例"
+            ]},
+            [
+                sales_cost,
+                sales_revenue,
+                land_amort,
+                sales_ratio,
+                np.full(axis.total_period, float(sales_plan.building_hold_ratio))
             ]
-        }
-        
-        for year in years:
-            year_num = self.yg.get_year_index(year)
-            
-            if self.yg.is_operation_year(year_num):
-                # 运营期显示销售数据
-                sales_cost = sales_plan.annual_sales_cost.get(year, 0.0)
-                sales_revenue = sales_plan.annual_sales_revenue.get(year, 0.0)
-                land_amort = sales_plan.annual_land_amortization.get(year, 0.0)
-                
-                # 计算当年销售比例
-                if sales_plan.asset_sales_revenue > 0:
-                    sales_ratio = sales_revenue / sales_plan.asset_sales_revenue
-                else:
-                    sales_ratio = 0.0
-                
-                data[year] = [
-                    sales_cost,
-                    sales_revenue,
-                    land_amort,
-                    sales_ratio,
-                    sales_plan.self_hold_ratio
-                ]
-            else:
-                # 建设期无销售
-                data[year] = [0.0, 0.0, 0.0, 0.0, sales_plan.self_hold_ratio]
-        
-        return round_dataframe(pd.DataFrame(data))
+        ))
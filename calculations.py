@@ -2,11 +2,29 @@
 完整计算模块
 包含所有财务计算逻辑
 """
-import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from year_generator import YearGenerator, DynamicTableBuilder
 from data_models import InputData
+from irr_solver import irr
+from loan_engine import plan_schedule
+from asset_register import AMORTIZATION_CATEGORIES, DEPRECIATION_CATEGORIES, Asset, AssetRegister
+from derived_state import AssetFormationState, SalesPlanState, content_key, memoized
+
+
+def _fraction(ratio):
+    """
+    占比统一为小数（大于1时视为百分比）
+
+    Args:
+        ratio: 占比，标量或按情景排列的数组
+
+    Returns:
+        小数形式的占比
+    """
+    ratio = np.asarray(ratio, dtype=float)
+    value = np.where(ratio > 1.0, ratio / 100.0, ratio)
+    return value if value.ndim else float(value)
 
 
 class InvestmentCalculator:
@@ -24,6 +42,39 @@ class InvestmentCalculator:
         self.input = input_data
         self.builder = DynamicTableBuilder(year_generator)
 
+    @staticmethod
+    def _no_tax_amount(amount, tax_rate):
+        """
+        含税金额换算为不含税金额（金额不为正时取0）
+
+        金额、税率可以是标量，也可以是按情景排列的数组（批量计算时使用）
+
+        Args:
+            amount: 含税金额
+            tax_rate: 税率（%）
+
+        Returns:
+            不含税金额
+        """
+        value = np.where(np.asarray(amount) > 0, np.asarray(amount) / (1 + np.asarray(tax_rate) / 100), 0.0)
+        return value if value.ndim else float(value)
+
+    @staticmethod
+    def _input_tax_amount(amount, tax_rate):
+        """
+        含税金额中的进项税（金额不为正时取0）
+
+        Args:
+            amount: 含税金额
+            tax_rate: 税率（%）
+
+        Returns:
+            进项税额
+        """
+        amount = np.asarray(amount)
+        value = np.where(amount > 0, amount - amount / (1 + np.asarray(tax_rate) / 100), 0.0)
+        return value if value.ndim else float(value)
+
     def calculate_total_investment(self) -> Dict[str, float]:
         """
         计算项目总投资
@@ -32,27 +83,25 @@ class InvestmentCalculator:
             dict: 各项投资金额
         """
         inv = self.input.project_investment
-
-        # 先计算不含税值（确保已计算）
-        inv.calculate_no_tax_values()
+        no_tax = inv.no_tax_values()
 
         # 工程费合计（不含税）
         total_engineering = (
-            inv.building_cost_no_tax +
-            inv.building_equipment_cost_no_tax +
-            inv.building_installation_cost_no_tax +
-            (inv.production_equipment_cost / (1 + inv.equipment_tax_rate / 100) if inv.production_equipment_cost > 0 else 0) +
-            (inv.production_installation_cost / (1 + inv.construction_tax_rate / 100) if inv.production_installation_cost > 0 else 0)
+            no_tax.building_cost +
+            no_tax.building_equipment_cost +
+            no_tax.building_installation_cost +
+            self._no_tax_amount(inv.production_equipment_cost, inv.equipment_tax_rate) +
+            self._no_tax_amount(inv.production_installation_cost, inv.construction_tax_rate)
         )
 
         # 工程建设其他费合计（不含税）
         total_other = (
-            inv.management_fee_no_tax +
-            inv.tech_service_fee_no_tax +
-            inv.supporting_fee_no_tax +
-            inv.land_use_fee_no_tax +
-            inv.patent_fee_no_tax +
-            inv.preparation_fee_no_tax
+            no_tax.management_fee +
+            no_tax.tech_service_fee +
+            no_tax.supporting_fee +
+            no_tax.land_use_fee +
+            no_tax.patent_fee +
+            no_tax.preparation_fee
         )
 
         # 基本预备费（使用用户输入的值，不是计算的）
@@ -72,99 +121,91 @@ class InvestmentCalculator:
             "项目总投资（不含利息）": total_investment
         }
 
-    def calculate_investment_by_year(self) -> Dict[str, Dict[str, float]]:
+    def calculate_investment_by_year(self, total_investment: Optional[float] = None) -> Dict[str, np.ndarray]:
         """
         计算各年投资分布
 
+        Args:
+            total_investment: 项目总投资（不含利息），为None时重新计算
+
         Returns:
-            dict: 各年的投资明细
+            dict: 投资明细名称到年度向量的映射（"工程费"、"其他费"、"预备费"）
         """
-        years = self.yg.generate_year_names()
-        investment_by_year = {}
-
-        total_investment = self.calculate_total_investment()["项目总投资（不含利息）"]
+        if total_investment is None:
+            total_investment = self.calculate_total_investment()["项目总投资（不含利息）"]
 
         # 简化：平均分配到建设期各年（实际应根据投资计划）
         construction_years_count = self.yg.construction_period
         avg_annual_investment = total_investment / construction_years_count if construction_years_count > 0 else 0
+        annual_investment = self.yg.axis.construction_values(avg_annual_investment)
+
+        return {
+            "工程费": annual_investment * 0.7,  # 假设70%是工程费
+            "其他费": annual_investment * 0.2,  # 假设20%是其他费
+            "预备费": annual_investment * 0.1,  # 假设10%是预备费
+        }
 
-        for year in years:
-            year_num = self.yg.get_year_index(year)
-            if self.yg.is_construction_year(year_num):
-                investment_by_year[year] = {
-                    "工程费": avg_annual_investment * 0.7,  # 假设70%是工程费
-                    "其他费": avg_annual_investment * 0.2,  # 假设20%是其他费
-                    "预备费": avg_annual_investment * 0.1,  # 假设10%是预备费
-                }
-            else:
-                investment_by_year[year] = {
-                    "工程费": 0.0,
-                    "其他费": 0.0,
-                    "预备费": 0.0,
-                }
-
-        return investment_by_year
-
-    def calculate_construction_interest(self) -> Dict[str, float]:
+    def calculate_additional_investment(self) -> np.ndarray:
         """
-        计算建设期利息
+        计算追加资产的各年投资（asset_formation.additional_assets，按入账年份支出）
 
         Returns:
-            dict: 各年建设期利息
+            ndarray: 各年追加投资
         """
-        years = self.yg.generate_year_names()
-        interest_by_year = self.yg.initialize_year_data_dict()
-
-        loan_plan = self.input.bank_loan_plan
-        interest_rate = loan_plan.interest_rate / 100 if hasattr(loan_plan, 'interest_rate') else 0.0588
-
-        # 简化计算：假设每年借款在年中投入
-        cumulative_loan = 0.0
+        investment = self.yg.axis.zeros()
+        for item in self.input.asset_formation.additional_assets:
+            investment[int(item["in_service_year"]) - 1] += float(item["cost"])
+        return investment
 
-        for year in years:
-            year_num = self.yg.get_year_index(year)
-
-            if self.yg.is_construction_year(year_num):
-                # 假设每年借款金额（从投资计划中估算）
-                annual_investment = sum(self.calculate_investment_by_year()[year].values())
-
-                # 简化：假设投资中50%是借款
-                annual_loan = annual_investment * 0.5
-
-                # 计算当年利息 = (年初贷款 + 当年贷款/2) * 利率
-                annual_interest = (cumulative_loan + annual_loan / 2) * interest_rate
+    def calculate_construction_interest(self, loan: Optional[Dict[str, np.ndarray]] = None) -> np.ndarray:
+        """
+        计算建设期利息
 
-                interest_by_year[year] = annual_interest
-                cumulative_loan += annual_loan
-            else:
-                interest_by_year[year] = 0.0
+        取借款还本付息计划中建设期各年的应计利息：计划借款按借款年份提款，建设期利息由追加借款支付（资本化），
+        借款与利息的循环引用在loan_engine.plan_schedule中求解，与"4还本付息"表为同一计划。
 
-        total_construction_interest = sum(interest_by_year.values())
+        Args:
+            loan: 借款还本付息计划（plan_schedule的结果），为None时重新计算
 
-        return interest_by_year
+        Returns:
+            ndarray: 各年建设期利息
+        """
+        if loan is None:
+            loan = plan_schedule(self.input.bank_loan_plan, self.yg)
+        return loan["interest"] * self.yg.axis.construction_mask
 
-    def get_investment_summary(self) -> Dict[str, float]:
+    def get_investment_summary(self, total_investment: Optional[Dict[str, float]] = None,
+                               construction_interest: Optional[np.ndarray] = None) -> Dict[str, float]:
         """
         获取投资汇总
 
+        Args:
+            total_investment: calculate_total_investment的结果，为None时重新计算
+            construction_interest: 各年建设期利息，为None时重新计算
+
         Returns:
             dict: 投资汇总数据
         """
-        total_investment = self.calculate_total_investment()
-        construction_interest = self.calculate_construction_interest()
+        if total_investment is None:
+            total_investment = self.calculate_total_investment()
+        if construction_interest is None:
+            construction_interest = self.calculate_construction_interest()
+
+        total_interest = float(construction_interest.sum())
 
         return {
             **total_investment,
-            "建设期利息合计": sum(construction_interest.values()),
-            "项目总投资（含利息）": total_investment["项目总投资（不含利息）"] + sum(construction_interest.values()),
+            "建设期利息合计": total_interest,
+            "项目总投资（含利息）": total_investment["项目总投资（不含利息）"] + total_interest,
             "流动资金": 90.0,  # 从Excel中读取的固定值
         }
 
-    def calculate_asset_formation(self) -> None:
+    def calculate_asset_formation(self) -> AssetFormationState:
         """
         根据Excel Row 32-45计算资产形成
 
-        计算各类资产的原值和分摊
+        计算各类资产的原值和分摊。只读取输入，不写回input.asset_formation；
+        结果按项目投资和出售土地使用权占比的内容缓存，输入相同时直接复用。
 
         Excel计算逻辑：
         1. 工程费（不含税）= 各项工程费不含税之和
@@ -173,35 +214,37 @@ class InvestmentCalculator:
         4. 建设期利息 = 用户输入的值（不是计算的）
         5. 无形资产 = 土地使用费(不含税) + 专利费(不含税)
         6. 其他资产 = 开办费不含税
+
+        Returns:
+            AssetFormationState: 资产形成（不可修改）
         """
         inv = self.input.project_investment
+        land_sell_ratio = self.input.asset_sales_plan.land_sell_ratio
+        return memoized("asset_formation", content_key(inv, land_sell_ratio),
+                        lambda: self._asset_formation(inv, land_sell_ratio))
 
-        # 先计算不含税值
-        inv.calculate_no_tax_values()
-
-        asset = self.input.asset_formation
+    def _asset_formation(self, inv, land_sell_ratio) -> AssetFormationState:
+        """计算资产形成（calculate_asset_formation未命中缓存时调用）"""
+        no_tax = inv.no_tax_values()
 
         # 计算工程费（不含税）
         # Excel中工程费合计(不含税) = 79732.9961
         engineering_no_tax = (
-            inv.building_cost_no_tax +
-            inv.building_equipment_cost_no_tax +
-            inv.building_installation_cost_no_tax +
-            (inv.production_equipment_cost / (1 + inv.equipment_tax_rate / 100) if inv.production_equipment_cost > 0 else 0) +
-            (inv.production_installation_cost / (1 + inv.construction_tax_rate / 100) if inv.production_installation_cost > 0 else 0)
+            no_tax.building_cost +
+            no_tax.building_equipment_cost +
+            no_tax.building_installation_cost +
+            self._no_tax_amount(inv.production_equipment_cost, inv.equipment_tax_rate) +
+            self._no_tax_amount(inv.production_installation_cost, inv.construction_tax_rate)
         )
 
         # 计算固定资产其他费用（不含税，不含开办费）
         # Excel中：10071.1211 = 2815.11 + 5674.62 + 1581.39
         fixed_other_fees_no_tax = (
-            inv.management_fee_no_tax +
-            inv.tech_service_fee_no_tax +
-            inv.supporting_fee_no_tax
+            no_tax.management_fee +
+            no_tax.tech_service_fee +
+            no_tax.supporting_fee
         )
 
-        # 计算开办费（不含税）
-        preparation_fee_no_tax = inv.preparation_fee_no_tax
-
         # 基本预备费（使用用户输入的值）
         # Excel中：10532.08（用户输入，不是计算的）
         basic_reserve = inv.basic_reserve
@@ -212,76 +255,62 @@ class InvestmentCalculator:
 
         # 固定资产形成计算
         # 房屋建筑固定资产
-        asset.building_fixed_asset.engineering_fee = engineering_no_tax
-        asset.building_fixed_asset.other_fixed_fee = fixed_other_fees_no_tax
-        asset.building_fixed_asset.reserve_fee = basic_reserve
-        asset.building_fixed_asset.construction_interest = construction_interest
-        asset.building_fixed_asset.total = (
-            asset.building_fixed_asset.engineering_fee +
-            asset.building_fixed_asset.other_fixed_fee +
-            asset.building_fixed_asset.reserve_fee +
-            asset.building_fixed_asset.construction_interest
-        )
+        building_total = engineering_no_tax + fixed_other_fees_no_tax + basic_reserve + construction_interest
 
         # 机械设备固定资产（本项目为0）
-        asset.equipment_fixed_asset.total = 0.0
+        equipment_total = 0.0
 
         # 无形资产
-        # 土地使用费（不含税，Excel中：6505.72）
-        asset.land_intangible_asset.total = inv.land_use_fee_no_tax
-
-        # 专利权（不含税，Excel中：0）
-        asset.patent_intangible_asset.total = inv.patent_fee_no_tax
-
-        # 销售地产土地权（用于销售的土地使用权摊销）
-        # 原值 = 土地使用权总值 × 销售比例
-        # Excel中：6505.72 × 25% = 1626.43
-        asset.sales_land_intangible_asset.total = asset.land_intangible_asset.total * self.input.asset_sales_plan.land_sell_ratio
+        # 土地使用费（不含税，Excel中：6505.72）；专利权（不含税，Excel中：0）
+        land_total = no_tax.land_use_fee
+        patent_total = no_tax.patent_fee
 
         # 其他资产
         # 开办费不含税（Excel中：294.1029）
-        asset.other_asset.total = preparation_fee_no_tax
+        other_total = no_tax.preparation_fee
 
         # 可抵扣进项税（Excel中：8716.8199）
         # 进项税 = 各项含税费用 - 各项不含税费用
         deductible_input_tax = (
             # 工程费进项税
-            (inv.building_cost - inv.building_cost_no_tax) +
-            (inv.building_equipment_cost - inv.building_equipment_cost_no_tax) +
-            (inv.building_installation_cost - inv.building_installation_cost_no_tax) +
-            (inv.production_equipment_cost - inv.production_equipment_cost / (1 + inv.equipment_tax_rate / 100) if inv.production_equipment_cost > 0 else 0) +
-            (inv.production_installation_cost - inv.production_installation_cost / (1 + inv.construction_tax_rate / 100) if inv.production_installation_cost > 0 else 0) +
+            (inv.building_cost - no_tax.building_cost) +
+            (inv.building_equipment_cost - no_tax.building_equipment_cost) +
+            (inv.building_installation_cost - no_tax.building_installation_cost) +
+            self._input_tax_amount(inv.production_equipment_cost, inv.equipment_tax_rate) +
+            self._input_tax_amount(inv.production_installation_cost, inv.construction_tax_rate) +
             # 工程建设其他费进项税
-            (inv.management_fee - inv.management_fee_no_tax) +
-            (inv.tech_service_fee - inv.tech_service_fee_no_tax) +
-            (inv.supporting_fee - inv.supporting_fee_no_tax) +
-            (inv.patent_fee - inv.patent_fee_no_tax) +
-            (inv.preparation_fee - inv.preparation_fee_no_tax)
+            (inv.management_fee - no_tax.management_fee) +
+            (inv.tech_service_fee - no_tax.tech_service_fee) +
+            (inv.supporting_fee - no_tax.supporting_fee) +
+            (inv.patent_fee - no_tax.patent_fee) +
+            (inv.preparation_fee - no_tax.preparation_fee)
         )
 
-        asset.deductible_input_tax = deductible_input_tax
-
         # 汇总
-        asset.fixed_asset_total = asset.building_fixed_asset.total + asset.equipment_fixed_asset.total
-        asset.intangible_asset_total = (
-            asset.land_intangible_asset.total +
-            asset.patent_intangible_asset.total
-        )
-        asset.other_asset_total = asset.other_asset.total
-
-        # 投资合计 = 固定资产 + 无形资产 + 其他资产 + 进项税
-        asset.investment_total = (
-            asset.fixed_asset_total +
-            asset.intangible_asset_total +
-            asset.other_asset_total +
-            asset.deductible_input_tax
-        )
-
-        # 固定资产原值（不含建设期利息）
-        asset.fixed_asset_original_value = (
-            asset.building_fixed_asset.engineering_fee +
-            asset.building_fixed_asset.other_fixed_fee +
-            asset.building_fixed_asset.reserve_fee
+        fixed_asset_total = building_total + equipment_total
+        intangible_asset_total = land_total + patent_total
+
+        return AssetFormationState(
+            engineering_fee=engineering_no_tax,
+            other_fixed_fee=fixed_other_fees_no_tax,
+            reserve_fee=basic_reserve,
+            construction_interest=construction_interest,
+            building_total=building_total,
+            equipment_total=equipment_total,
+            land_total=land_total,
+            patent_total=patent_total,
+            # 销售地产土地权（用于销售的土地使用权摊销）
+            # 原值 = 土地使用权总值 × 销售比例，Excel中：6505.72 × 25% = 1626.43
+            sales_land_total=land_total * _fraction(land_sell_ratio),
+            other_total=other_total,
+            deductible_input_tax=deductible_input_tax,
+            fixed_asset_total=fixed_asset_total,
+            intangible_asset_total=intangible_asset_total,
+            other_asset_total=other_total,
+            # 投资合计 = 固定资产 + 无形资产 + 其他资产 + 进项税
+            investment_total=fixed_asset_total + intangible_asset_total + other_total + deductible_input_tax,
+            # 固定资产原值（不含建设期利息）
+            fixed_asset_original_value=engineering_no_tax + fixed_other_fees_no_tax + basic_reserve,
         )
 
 
@@ -330,80 +359,102 @@ class DepreciationCalculator:
             return 0.0
         return asset_value / years
 
-    def get_yearly_depreciation(self) -> Dict[str, float]:
+    def _derived_state(self, asset_formation: Optional[AssetFormationState],
+                       sales_plan: Optional[SalesPlanState]) -> Tuple[AssetFormationState, SalesPlanState]:
+        """未给出的资产形成、资产销售计划由输入计算（按输入内容缓存）"""
+        if asset_formation is None:
+            asset_formation = InvestmentCalculator(self.yg, self.input).calculate_asset_formation()
+        if sales_plan is None:
+            sales_plan = AssetSalesCalculator(self.yg, self.input).calculate_annual_sales(asset_formation)
+        return asset_formation, sales_plan
+
+    def get_yearly_depreciation(self, asset_formation: Optional[AssetFormationState] = None,
+                                sales_plan: Optional[SalesPlanState] = None) -> np.ndarray:
         """
-        获取各年折旧额（考虑资产销售，只计算自持部分）
+        获取各年折旧额（即5-4折旧表的合计）
+
+        取资产登记簿中固定资产类别的折旧额合计：自持部分按各自的折旧方法计提，
+        出售部分的成本按年度销售比例结转，追加资产按各自的入账年份计提。
+
+        Args:
+            asset_formation: 资产形成，为None时重新计算
+            sales_plan: 资产销售计划，为None时重新计算
 
         Returns:
-            dict: 各年折旧额
+            ndarray: 各年折旧额
         """
-        result = self.yg.initialize_year_data_dict(default_value=0.0)
-        
-        asset = self.input.asset_formation
-        self_hold_ratio = self.input.asset_sales_plan.self_hold_ratio
-        
-        # 计算自持资产的年度折旧
-        building_depreciation = self.calculate_depreciation(
-            asset.building_fixed_asset.total * self_hold_ratio,  # 只计算自持部分
-            asset.building_fixed_asset.depreciation_years,
-            asset.building_fixed_asset.salvage_rate
-        )
-        
-        equipment_depreciation = self.calculate_depreciation(
-            asset.equipment_fixed_asset.total * self_hold_ratio,
-            asset.equipment_fixed_asset.depreciation_years,
-            asset.equipment_fixed_asset.salvage_rate
-        )
-        
-        total_yearly_depreciation = building_depreciation + equipment_depreciation
-        
-        # 固定资产从运营期开始折旧
-        for year in self.yg.generate_year_names():
-            year_num = self.yg.get_year_index(year)
-            if self.yg.is_operation_year(year_num):
-                result[year] = total_yearly_depreciation
-        
-        return result
+        schedules = self.build_asset_register(asset_formation, sales_plan).schedules(DEPRECIATION_CATEGORIES)
+        return sum(schedule["amount"] for schedule in schedules.values())
 
-    def get_yearly_amortization(self) -> Dict[str, float]:
+    def get_yearly_amortization(self, asset_formation: Optional[AssetFormationState] = None,
+                                sales_plan: Optional[SalesPlanState] = None) -> np.ndarray:
         """
-        获取各年摊销额（考虑资产销售，只计算自持部分）
+        获取各年摊销额（即5-5摊销表的合计）
+
+        与折旧额相同的口径：自持无形资产按年限摊销，出售土地使用权的成本按年度销售比例结转。
+
+        Args:
+            asset_formation: 资产形成，为None时重新计算
+            sales_plan: 资产销售计划，为None时重新计算
+
+        Returns:
+            ndarray: 各年摊销额
+        """
+        schedules = self.build_asset_register(asset_formation, sales_plan).schedules(AMORTIZATION_CATEGORIES)
+        return sum(schedule["amount"] for schedule in schedules.values())
+
+    def build_asset_register(self, asset_formation: Optional[AssetFormationState] = None,
+                             sales_plan: Optional[SalesPlanState] = None) -> AssetRegister:
+        """
+        登记需要折旧摊销的资产
+
+        建设投资形成的资产从运营期第1年开始折旧/摊销，出售部分的成本按年度销售比例结转；
+        asset_formation.additional_assets中的追加资产按各自的入账年份、年限和残值率登记。
+
+        Args:
+            asset_formation: 资产形成，为None时重新计算
+            sales_plan: 资产销售计划（自持和销售数值），为None时重新计算
 
         Returns:
-            dict: 各年摊销额
+            AssetRegister: 资产登记簿
         """
-        result = self.yg.initialize_year_data_dict(default_value=0.0)
-        
         asset = self.input.asset_formation
-        self_hold_ratio = self.input.asset_sales_plan.self_hold_ratio
-        
-        # 计算自持无形资产的年度摊销
-        land_amortization = self.calculate_amortization(
-            asset.land_intangible_asset.total * self_hold_ratio,
-            asset.land_intangible_asset.amortization_years
-        )
-        
-        patent_amortization = self.calculate_amortization(
-            asset.patent_intangible_asset.total * self_hold_ratio,
-            asset.patent_intangible_asset.amortization_years
-        )
-        
-        other_amortization = self.calculate_amortization(
-            asset.other_asset.total * self_hold_ratio,
-            asset.other_asset.amortization_years
-        )
-        
-        total_yearly_amortization = land_amortization + patent_amortization + other_amortization
-        
-        # 无形资产从运营期开始摊销
-        for year in self.yg.generate_year_names():
-            year_num = self.yg.get_year_index(year)
-            if self.yg.is_operation_year(year_num):
-                result[year] = total_yearly_amortization
-        
-        return result
+        formation, sales_plan = self._derived_state(asset_formation, sales_plan)
+
+        start = self.yg.construction_period + 1
+        sales_ratios = sales_plan.sales_ratios
+        building = asset.building_fixed_asset
+        equipment = asset.equipment_fixed_asset
+
+        register = AssetRegister(self.yg.axis.total_period)
+        register.extend([
+            # 建筑物原值 = 自持固定资产数值（Excel中：79543.04 = 106057.38 × 75%）
+            # 年折旧额 = 原值 × (1 - 残值率) / 折旧年限（Excel: 79543.04 * (1 - 5%) / 20 = 3778.29）
+            Asset(building.asset_name, "building", sales_plan.hold_building_value, start,
+                  building.depreciation_years, building.salvage_rate, building.depreciation_method),
+            # 机器设备（假设全部自持，不销售）
+            Asset(equipment.asset_name, "equipment", formation.equipment_total, start,
+                  equipment.depreciation_years, equipment.salvage_rate, equipment.depreciation_method),
+            # 销售固定资产成本 = 出售固定资产数值（Excel中：26514.35 = 106057.38 × 25%），摊销额 = 当年的销售成本
+            Asset("销售固定资产", "sales_assets", sales_plan.sales_building_value, start, pattern=sales_ratios),
+            # 土地使用权原值 = 自持土地使用权数值（Excel中：4879.29 = 6505.72 × 75%）
+            Asset(asset.land_intangible_asset.asset_name, "land", sales_plan.hold_land_value, start,
+                  asset.land_intangible_asset.amortization_years),
+            # 专利权、其他资产全部自持
+            Asset(asset.patent_intangible_asset.asset_name, "patent", formation.patent_total, start,
+                  asset.patent_intangible_asset.amortization_years),
+            Asset(asset.other_asset.asset_name, "other_asset", formation.other_total, start,
+                  asset.other_asset.amortization_years),
+            # 销售地产土地权 = 出售土地使用权数值（Excel中：1626.43 = 6505.72 × 25%），按年度销售比例摊销
+            # Excel中：第1年162.64，第2-4年各487.93
+            Asset(asset.sales_land_intangible_asset.asset_name, "sales_land", sales_plan.sales_land_value, start,
+                  pattern=sales_ratios),
+        ])
+        register.extend([Asset(**{"name": "追加资产", **item}) for item in asset.additional_assets])
+        return register
 
-    def get_detailed_depreciation_data(self) -> Dict[str, Dict]:
+    def get_detailed_depreciation_data(self, asset_formation: Optional[AssetFormationState] = None,
+                                       sales_plan: Optional[SalesPlanState] = None) -> Dict[str, Dict]:
         """
         获取详细的折旧摊销数据（按照5-4折旧表结构）
 
@@ -413,162 +464,44 @@ class DepreciationCalculator:
         3. 固定资产成本摊销额 = 销售固定资产成本 × 年度销售比例
         4. 剩余待销售资产净值 = 销售固定资产成本 - 累计摊销
 
-        Returns:
-            dict: 包含建筑物、机器设备、销售固定资产和合计的详细数据
-        """
-        years = self.yg.generate_year_names()
-        asset = self.input.asset_formation
-        sales_plan = self.input.asset_sales_plan
+        原值行为各年新增原值（建设投资形成的资产计入运营期第1年），折旧额计提到年限为止。
 
-        # 使用资产销售计算器获取正确的自持和销售数值
-        sales_calc = AssetSalesCalculator(self.yg, self.input)
-        sales_calc.calculate_annual_sales()
-
-        # 用于折旧的建筑物原值 = 自持固定资产数值
-        # Excel中：79543.04 = 106057.38 × 75%
-        building_value = sales_calc.get_hold_building_value()
-
-        # 销售固定资产成本 = 出售固定资产数值
-        # Excel中：26514.35 = 106057.38 × 25%
-        sales_assets_cost = sales_calc.get_annual_sales_cost()
-
-        # 销售固定资产成本总额（用于摊销计算）
-        sales_assets_total = sales_plan.sales_building_value
+        Args:
+            asset_formation: 资产形成，为None时重新计算
+            sales_plan: 资产销售计划，为None时重新计算
 
-        # 机器设备原值（假设全部自持，不销售）
-        equipment_value = asset.equipment_fixed_asset.total
+        Returns:
+            dict: 包含建筑物、机器设备、销售固定资产和合计的详细数据（各项为年度向量）
+        """
+        schedules = self.build_asset_register(asset_formation, sales_plan).schedules(DEPRECIATION_CATEGORIES)
+        building, equipment, sales_assets = (schedules[key] for key in DEPRECIATION_CATEGORIES)
 
-        # 初始化结果字典
-        result = {
+        return {
             "building": {
-                "original_value": [],
-                "depreciation": [],
-                "net_value": []
+                "original_value": building["original_value"],
+                "depreciation": building["amount"],
+                "net_value": building["net_value"]
             },
             "equipment": {
-                "original_value": [],
-                "depreciation": [],
-                "net_value": []
+                "original_value": equipment["original_value"],
+                "depreciation": equipment["amount"],
+                "net_value": equipment["net_value"]
             },
             "sales_assets": {
-                "cost": [],
-                "amortization": [],
-                "remaining": []
+                "cost": sales_assets["original_value"],
+                "amortization": sales_assets["amount"],
+                "remaining": sales_assets["net_value"]
             },
             "total": {
-                "original_value": [],
-                "depreciation_amortization": [],
-                "net_value": []
+                # 原值合计 = 建筑物原值 + 机器设备原值 + 销售固定资产成本
+                "original_value": sum(schedules[key]["original_value"] for key in DEPRECIATION_CATEGORIES),
+                "depreciation_amortization": sum(schedules[key]["amount"] for key in DEPRECIATION_CATEGORIES),
+                "net_value": sum(schedules[key]["net_value"] for key in DEPRECIATION_CATEGORIES)
             }
         }
 
-        # 建筑物年折旧额（直线法，考虑残值率）
-        # Excel: 79543.04 * (1 - 5%) / 20 = 3778.29
-        building_annual_depr = (
-            building_value * (1 - asset.building_fixed_asset.salvage_rate / 100) /
-            asset.building_fixed_asset.depreciation_years
-            if asset.building_fixed_asset.depreciation_years > 0 else 0
-        )
-
-        # 机器设备年折旧额（直线法，考虑残值率）
-        equipment_annual_depr = (
-            equipment_value * (1 - asset.equipment_fixed_asset.salvage_rate / 100) /
-            asset.equipment_fixed_asset.depreciation_years
-            if asset.equipment_fixed_asset.depreciation_years > 0 else 0
-        )
-
-        # 计算各年数据
-        cumulative_building_depr = 0.0
-        cumulative_equipment_depr = 0.0
-        cumulative_sales_amortization = 0.0
-
-        for year in years:
-            year_num = self.yg.get_year_index(year)
-            is_construction = self.yg.is_construction_year(year_num)
-            op_year = year_num - self.yg.construction_period if not is_construction else 0
-
-            # 建筑物数据
-            if is_construction:
-                result["building"]["original_value"].append(0.0)
-                result["building"]["depreciation"].append(0.0)
-                result["building"]["net_value"].append(0.0)
-            elif op_year == 1:
-                # 运营期第1年：原值计入（自持固定资产）
-                result["building"]["original_value"].append(building_value)
-                result["building"]["depreciation"].append(building_annual_depr)
-                cumulative_building_depr += building_annual_depr
-                result["building"]["net_value"].append(max(0, building_value - cumulative_building_depr))
-            else:
-                # 运营期第2年及以后
-                result["building"]["original_value"].append(0.0)
-                result["building"]["depreciation"].append(building_annual_depr)
-                cumulative_building_depr += building_annual_depr
-                result["building"]["net_value"].append(max(0, building_value - cumulative_building_depr))
-
-            # 机器设备数据
-            if is_construction:
-                result["equipment"]["original_value"].append(0.0)
-                result["equipment"]["depreciation"].append(0.0)
-                result["equipment"]["net_value"].append(0.0)
-            elif op_year == 1:
-                result["equipment"]["original_value"].append(equipment_value)
-                result["equipment"]["depreciation"].append(equipment_annual_depr)
-                cumulative_equipment_depr += equipment_annual_depr
-                result["equipment"]["net_value"].append(max(0, equipment_value - cumulative_equipment_depr))
-            else:
-                result["equipment"]["original_value"].append(0.0)
-                result["equipment"]["depreciation"].append(equipment_annual_depr)
-                cumulative_equipment_depr += equipment_annual_depr
-                result["equipment"]["net_value"].append(max(0, equipment_value - cumulative_equipment_depr))
-
-            # 销售固定资产数据
-            # Excel中：成本计入在运营期第1年（第4年）
-            if is_construction:
-                result["sales_assets"]["cost"].append(0.0)
-                result["sales_assets"]["amortization"].append(0.0)
-                result["sales_assets"]["remaining"].append(0.0)
-            elif op_year == 1:
-                # 运营期第1年：成本计入
-                result["sales_assets"]["cost"].append(sales_assets_total)
-                # 摊销额 = 当年的销售成本
-                annual_amort = sales_assets_cost.get(year, 0.0)
-                result["sales_assets"]["amortization"].append(annual_amort)
-                cumulative_sales_amortization += annual_amort
-                result["sales_assets"]["remaining"].append(max(0, sales_assets_total - cumulative_sales_amortization))
-            else:
-                # 运营期第2年及以后
-                result["sales_assets"]["cost"].append(0.0)
-                annual_amort = sales_assets_cost.get(year, 0.0)
-                result["sales_assets"]["amortization"].append(annual_amort)
-                cumulative_sales_amortization += annual_amort
-                result["sales_assets"]["remaining"].append(max(0, sales_assets_total - cumulative_sales_amortization))
-
-            # 合计数据
-            if op_year == 1:
-                # 运营期第1年：原值合计
-                # 原值合计 = 建筑物原值 + 机器设备原值 + 销售固定资产成本
-                result["total"]["original_value"].append(building_value + equipment_value + sales_assets_total)
-            else:
-                result["total"]["original_value"].append(0.0)
-
-            # 当期折旧摊销合计
-            idx = len(result["building"]["depreciation"]) - 1
-            result["total"]["depreciation_amortization"].append(
-                result["building"]["depreciation"][idx] +
-                result["equipment"]["depreciation"][idx] +
-                result["sales_assets"]["amortization"][idx]
-            )
-
-            # 净值合计
-            result["total"]["net_value"].append(
-                result["building"]["net_value"][idx] +
-                result["equipment"]["net_value"][idx] +
-                result["sales_assets"]["remaining"][idx]
-            )
-
-        return result
-
-    def get_detailed_amortization_data(self) -> Dict[str, Dict]:
+    def get_detailed_amortization_data(self, asset_formation: Optional[AssetFormationState] = None,
+                                       sales_plan: Optional[SalesPlanState] = None) -> Dict[str, Dict]:
         """
         获取详细的摊销数据（按照5-5摊销表结构）
 
@@ -579,175 +512,28 @@ class DepreciationCalculator:
         4. 销售地产土地权原值 = 出售土地使用权（土地使用权总原值 × 出售占比）
         5. 销售地产土地权摊销 = 出售土地使用权数值 × 年度销售比例
 
+        Args:
+            asset_formation: 资产形成，为None时重新计算
+            sales_plan: 资产销售计划，为None时重新计算
+
         Returns:
-            dict: 包含土地使用权、专利权、其他资产、销售地产土地权摊销和合计的详细数据
+            dict: 包含土地使用权、专利权、其他资产、销售地产土地权摊销和合计的详细数据（各项为年度向量）
         """
-        years = self.yg.generate_year_names()
-        asset = self.input.asset_formation
-        sales_plan = self.input.asset_sales_plan
-
-        # 使用资产销售计算器获取正确的自持和销售数值
-        sales_calc = AssetSalesCalculator(self.yg, self.input)
-        sales_calc.calculate_annual_sales()
+        schedules = self.build_asset_register(asset_formation, sales_plan).schedules(AMORTIZATION_CATEGORIES)
 
-        # 各资产原值
-        # 土地使用权原值 = 自持土地使用权数值
-        # Excel中：4879.29 = 6505.72 × 75%
-        land_value = sales_calc.get_hold_land_value()
-
-        # 销售地产土地权原值 = 出售土地使用权数值
-        # Excel中：1626.43 = 6505.72 × 25%
-        sales_land_value = sales_plan.sales_land_value
-
-        # 专利权原值（全部自持）
-        patent_value = asset.patent_intangible_asset.total
-
-        # 其他资产原值（全部自持）
-        other_asset_value = asset.other_asset.total
-
-        # 销售地产土地权摊销额（按年度）
-        sales_land_amortization = sales_calc.get_annual_land_amortization()
-
-        # 初始化结果字典
-        result = {
-            "land": {
-                "original_value": [],
-                "amortization": [],
-                "net_value": []
-            },
-            "patent": {
-                "original_value": [],
-                "amortization": [],
-                "net_value": []
-            },
-            "other_asset": {
-                "original_value": [],
-                "amortization": [],
-                "net_value": []
-            },
-            "sales_land": {
-                "original_value": [],
-                "amortization": [],
-                "net_value": []
-            },
-            "total": {
-                "original_value": [],
-                "amortization": [],
-                "net_value": []
+        result = {}
+        for key in AMORTIZATION_CATEGORIES:
+            result[key] = {
+                "original_value": schedules[key]["original_value"],
+                "amortization": schedules[key]["amount"],
+                "net_value": schedules[key]["net_value"]
             }
-        }
 
-        # 计算各资产年摊销额（直线法）
-        land_annual_amort = land_value / asset.land_intangible_asset.amortization_years if asset.land_intangible_asset.amortization_years > 0 else 0
-        patent_annual_amort = patent_value / asset.patent_intangible_asset.amortization_years if asset.patent_intangible_asset.amortization_years > 0 else 0
-        other_asset_annual_amort = other_asset_value / asset.other_asset.amortization_years if asset.other_asset.amortization_years > 0 else 0
-
-        # 计算各年数据
-        cumulative_land_amort = 0.0
-        cumulative_patent_amort = 0.0
-        cumulative_other_amort = 0.0
-        cumulative_sales_land_amort = 0.0
-
-        for year in years:
-            year_num = self.yg.get_year_index(year)
-            is_construction = self.yg.is_construction_year(year_num)
-            op_year = year_num - self.yg.construction_period if not is_construction else 0
-
-            # 土地使用权数据（自持部分，50年摊销）
-            if is_construction:
-                result["land"]["original_value"].append(0.0)
-                result["land"]["amortization"].append(0.0)
-                result["land"]["net_value"].append(0.0)
-            elif op_year == 1:
-                # 运营期第1年：原值计入（自持土地使用权）
-                result["land"]["original_value"].append(land_value)
-                result["land"]["amortization"].append(land_annual_amort)
-                cumulative_land_amort += land_annual_amort
-                result["land"]["net_value"].append(max(0, land_value - cumulative_land_amort))
-            else:
-                # 运营期第2年及以后
-                result["land"]["original_value"].append(0.0)
-                result["land"]["amortization"].append(land_annual_amort)
-                cumulative_land_amort += land_annual_amort
-                result["land"]["net_value"].append(max(0, land_value - cumulative_land_amort))
-
-            # 专利权数据（6年摊销）
-            if is_construction:
-                result["patent"]["original_value"].append(0.0)
-                result["patent"]["amortization"].append(0.0)
-                result["patent"]["net_value"].append(0.0)
-            elif op_year == 1:
-                result["patent"]["original_value"].append(patent_value)
-                result["patent"]["amortization"].append(patent_annual_amort)
-                cumulative_patent_amort += patent_annual_amort
-                result["patent"]["net_value"].append(max(0, patent_value - cumulative_patent_amort))
-            else:
-                result["patent"]["original_value"].append(0.0)
-                result["patent"]["amortization"].append(patent_annual_amort)
-                cumulative_patent_amort += patent_annual_amort
-                result["patent"]["net_value"].append(max(0, patent_value - cumulative_patent_amort))
-
-            # 其他资产数据（5年摊销）
-            if is_construction:
-                result["other_asset"]["original_value"].append(0.0)
-                result["other_asset"]["amortization"].append(0.0)
-                result["other_asset"]["net_value"].append(0.0)
-            elif op_year == 1:
-                result["other_asset"]["original_value"].append(other_asset_value)
-                result["other_asset"]["amortization"].append(other_asset_annual_amort)
-                cumulative_other_amort += other_asset_annual_amort
-                result["other_asset"]["net_value"].append(max(0, other_asset_value - cumulative_other_amort))
-            else:
-                result["other_asset"]["original_value"].append(0.0)
-                result["other_asset"]["amortization"].append(other_asset_annual_amort)
-                cumulative_other_amort += other_asset_annual_amort
-                result["other_asset"]["net_value"].append(max(0, other_asset_value - cumulative_other_amort))
-
-            # 销售地产土地权数据（按年度销售比例摊销）
-            # Excel中：第1年162.64，第2-4年各487.93
-            if is_construction:
-                result["sales_land"]["original_value"].append(0.0)
-                result["sales_land"]["amortization"].append(0.0)
-                result["sales_land"]["net_value"].append(0.0)
-            elif op_year == 1:
-                # 运营期第1年：成本计入，按年度销售比例摊销
-                result["sales_land"]["original_value"].append(sales_land_value)
-                annual_amort = sales_land_amortization.get(year, 0.0)
-                result["sales_land"]["amortization"].append(annual_amort)
-                cumulative_sales_land_amort += annual_amort
-                result["sales_land"]["net_value"].append(max(0, sales_land_value - cumulative_sales_land_amort))
-            else:
-                # 运营期第2年及以后：按年度销售比例摊销
-                result["sales_land"]["original_value"].append(0.0)
-                annual_amort = sales_land_amortization.get(year, 0.0)
-                result["sales_land"]["amortization"].append(annual_amort)
-                cumulative_sales_land_amort += annual_amort
-                result["sales_land"]["net_value"].append(max(0, sales_land_value - cumulative_sales_land_amort))
-
-            # 合计数据
-            if op_year == 1:
-                # 运营期第1年：原值合计
-                result["total"]["original_value"].append(land_value + patent_value + other_asset_value + sales_land_value)
-            else:
-                result["total"]["original_value"].append(0.0)
-
-        # 计算摊销费合计和净值合计
-        for idx in range(len(years)):
-            # 摊销费合计
-            result["total"]["amortization"].append(
-                result["land"]["amortization"][idx] +
-                result["patent"]["amortization"][idx] +
-                result["other_asset"]["amortization"][idx] +
-                result["sales_land"]["amortization"][idx]
-            )
-
-            # 净值合计
-            result["total"]["net_value"].append(
-                result["land"]["net_value"][idx] +
-                result["patent"]["net_value"][idx] +
-                result["other_asset"]["net_value"][idx] +
-                result["sales_land"]["net_value"][idx]
-            )
+        result["total"] = {
+            "original_value": sum(schedules[key]["original_value"] for key in AMORTIZATION_CATEGORIES),
+            "amortization": sum(schedules[key]["amount"] for key in AMORTIZATION_CATEGORIES),
+            "net_value": sum(schedules[key]["net_value"] for key in AMORTIZATION_CATEGORIES)
+        }
 
         return result
 
@@ -766,29 +552,33 @@ class CostCalculator:
         self.yg = year_generator
         self.input = input_data
 
-    def calculate_material_cost(self, year: str) -> float:
+    def calculate_material_cost(self) -> np.ndarray:
         """
-        计算某年材料成本
-
-        Args:
-            year: 年份名称
+        计算各年材料成本（8种材料合计）
 
         Returns:
-            float: 年度材料成本
+            ndarray: 各年材料成本
         """
-        return self.input.material_cost.get_total_material_cost(year)
+        mat = self.input.material_cost
+        total = self.yg.axis.zeros()
+        for material in (mat.material_1, mat.material_2, mat.material_3, mat.material_4,
+                         mat.material_5, mat.material_6, mat.material_7, mat.material_8):
+            total += self.yg.axis.from_year_dict(material)
+        return total
 
-    def calculate_fuel_cost(self, year: str) -> float:
+    def calculate_fuel_cost(self) -> np.ndarray:
         """
-        计算某年燃料及动力成本
-
-        Args:
-            year: 年份名称
+        计算各年燃料及动力成本（8种燃料合计）
 
         Returns:
-            float: 年度燃料成本
+            ndarray: 各年燃料成本
         """
-        return self.input.fuel_cost.get_total_fuel_cost(year)
+        fuel = self.input.fuel_cost
+        total = self.yg.axis.zeros()
+        for item in (fuel.fuel_1, fuel.fuel_2, fuel.fuel_3, fuel.fuel_4,
+                     fuel.fuel_5, fuel.fuel_6, fuel.fuel_7, fuel.fuel_8):
+            total += self.yg.axis.from_year_dict(item)
+        return total
 
     def calculate_labor_cost(self) -> float:
         """
@@ -829,44 +619,38 @@ class CostCalculator:
             repair_cost
         )
 
-    def get_yearly_costs(self, depreciation_dict: Dict[str, float],
-                         amortization_dict: Dict[str, float]) -> Dict[str, Dict[str, float]]:
+    def get_yearly_costs(self, depreciation: Optional[np.ndarray] = None,
+                         amortization: Optional[np.ndarray] = None,
+                         asset_formation: Optional[AssetFormationState] = None) -> Dict[str, np.ndarray]:
         """
         获取各年成本明细
 
+        Args:
+            depreciation: 各年折旧额（为None时按0计）
+            amortization: 各年摊销额（为None时按0计）
+            asset_formation: 资产形成（修理费以固定资产合计为基数），为None时重新计算
+
         Returns:
-            dict: 各年成本明细字典
+            dict: 成本项目名称到年度向量的映射
         """
-        result = {}
-        years = self.yg.generate_year_names()
+        axis = self.yg.axis
 
         # 固定成本
         annual_labor_cost = self.calculate_labor_cost()
-        asset_formation = self.input.asset_formation
+        if asset_formation is None:
+            asset_formation = InvestmentCalculator(self.yg, self.input).calculate_asset_formation()
         fixed_asset_value = asset_formation.fixed_asset_total
         annual_repair_cost = self.calculate_repair_cost(fixed_asset_value)
 
-        for year in years:
-            year_num = self.yg.get_year_index(year)
-
+        return {
+            "折旧费": depreciation if depreciation is not None else axis.zeros(),
+            "摊销费": amortization if amortization is not None else axis.zeros(),
             # 材料和燃料成本（只在运营期有）
-            if self.yg.is_operation_year(year_num):
-                material_cost = self.calculate_material_cost(year)
-                fuel_cost = self.calculate_fuel_cost(year)
-            else:
-                material_cost = 0.0
-                fuel_cost = 0.0
-
-            result[year] = {
-                "折旧费": depreciation_dict.get(year, 0.0),
-                "摊销费": amortization_dict.get(year, 0.0),
-                "材料成本": material_cost,
-                "燃料成本": fuel_cost,
-                "人工成本": annual_labor_cost if self.yg.is_operation_year(year_num) else 0.0,
-                "修理费": annual_repair_cost if self.yg.is_operation_year(year_num) else 0.0
-            }
-
-        return result
+            "材料成本": axis.operation_values(self.calculate_material_cost()),
+            "燃料成本": axis.operation_values(self.calculate_fuel_cost()),
+            "人工成本": axis.operation_values(annual_labor_cost),
+            "修理费": axis.operation_values(annual_repair_cost)
+        }
 
 
 class ProfitCalculator:
@@ -883,19 +667,25 @@ class ProfitCalculator:
         self.yg = year_generator
         self.input = input_data
     
-    def calculate_total_revenue(self, year: str) -> float:
+    def calculate_product_revenue(self) -> np.ndarray:
         """
-        计算总收入（包括产品销售收入和固定资产销售收入）
+        计算各年产品销售收入（仅运营期）
 
-        Args:
-            year: 年份
+        Returns:
+            ndarray: 各年产品销售收入
+        """
+        return self.yg.axis.operation_values(self.yg.axis.from_year_dict(self.input.sales_revenue.annual_revenue))
+
+    def calculate_total_revenue(self) -> np.ndarray:
+        """
+        计算各年总收入（包括产品销售收入和固定资产销售收入）
 
         Returns:
-            float: 总收入
+            ndarray: 各年总收入
         """
-        product_revenue = self.input.sales_revenue.annual_revenue.get(year, 0.0)
-        asset_sales_revenue = self.input.asset_sales_plan.annual_sales_revenue.get(year, 0.0)
-        
+        product_revenue = self.yg.axis.from_year_dict(self.input.sales_revenue.annual_revenue)
+        asset_sales_revenue = AssetSalesCalculator(self.yg, self.input).get_annual_sales_revenue()
+
         return product_revenue + asset_sales_revenue
 
     def calculate_gross_profit(self, revenue: float, cost: float) -> float:
@@ -911,19 +701,17 @@ class ProfitCalculator:
         """
         return revenue - cost
 
-    def calculate_taxable_income(self, gross_profit: float) -> float:
+    def calculate_taxable_income(self, gross_profit: np.ndarray) -> np.ndarray:
         """
         计算应纳税所得额
 
         Args:
-            gross_profit: 毛利润
+            gross_profit: 毛利润（标量或年度向量）
 
         Returns:
-            float: 应纳税所得额
+            ndarray: 应纳税所得额（亏损年份为0）
         """
-        if gross_profit <= 0:
-            return 0.0
-        return gross_profit
+        return np.maximum(gross_profit, 0.0)
 
     def calculate_income_tax(self, taxable_income: float) -> float:
         """
@@ -965,17 +753,17 @@ class CashFlowCalculator:
         self.yg = year_generator
         self.input = input_data
 
-    def calculate_investment_cash_flow(self, investment_dict: Dict[str, float]) -> Dict[str, float]:
+    def calculate_investment_cash_flow(self, investment: np.ndarray) -> np.ndarray:
         """
         计算投资现金流
 
         Args:
-            investment_dict: 投资年度分布
+            investment: 各年投资额
 
         Returns:
-            dict: 投资现金流（负值表示流出）
+            ndarray: 投资现金流（负值表示流出）
         """
-        return {year: -value for year, value in investment_dict.items()}
+        return -np.asarray(investment, dtype=float)
 
     def calculate_operating_cash_flow(self, revenue: float, cost: float, tax: float,
                                      depreciation: float) -> float:
@@ -1005,26 +793,22 @@ class CashFlowCalculator:
         Returns:
             float: 净现值
         """
-        npv = 0.0
-        for i, cf in enumerate(cash_flows):
-            # 确保现金流是数值类型
-            cf_value = float(cf) if cf is not None else 0.0
-            npv += cf_value / ((1 + discount_rate) ** i)
-        return npv
+        cash_flows = np.asarray(cash_flows, dtype=float)
+        discount_factors = (1 + discount_rate) ** np.arange(cash_flows.shape[-1])
+        return float(np.sum(cash_flows / discount_factors))
 
     def calculate_internal_rate_of_return(self, cash_flows: List[float]) -> float:
         """
         计算内部收益率（IRR）
-        使用牛顿迭代法
+        使用带区间保护的牛顿迭代法（见irr_solver）
 
         Args:
             cash_flows: 现金流列表
 
         Returns:
-            float: 内部收益率
+            float: 内部收益率，无解时为NaN
         """
-        # 使用numpy的irr函数
-        return np.irr(cash_flows)
+        return irr(cash_flows)
 
     def calculate_payback_period(self, cumulative_cash_flows: List[float]) -> int:
         """
@@ -1036,9 +820,10 @@ class CashFlowCalculator:
         Returns:
             int: 投资回收期（年）
         """
-        for i, cum_cf in enumerate(cumulative_cash_flows):
-            if cum_cf >= 0:
-                return i + 1
+        cumulative_cash_flows = np.asarray(cumulative_cash_flows, dtype=float)
+        recovered = np.flatnonzero(cumulative_cash_flows >= 0)
+        if recovered.size > 0:
+            return int(recovered[0]) + 1
         return len(cumulative_cash_flows)
 
 
@@ -1053,10 +838,13 @@ class AssetSalesCalculator:
         self.yg = year_generator
         self.input = input_data
     
-    def calculate_annual_sales(self):
+    def calculate_annual_sales(self, asset_formation: Optional[AssetFormationState] = None) -> SalesPlanState:
         """
         计算年度资产销售数据
 
+        只读取输入，不写回input.asset_sales_plan（占比的百分比/小数换算也不改动输入）；
+        结果按所读输入的内容缓存，输入相同时直接复用。
+
         逻辑说明：
         1. 出售固定资产数值 = 房屋建筑原值 × 出售固定资产占比
         2. 自持固定资产数值 = 房屋建筑原值 × 自持固定资产占比
@@ -1065,123 +853,115 @@ class AssetSalesCalculator:
         5. 年度销售成本 = 出售固定资产数值 × 年度销售比例
         6. 年度土地摊销 = 出售土地使用权数值 × 年度销售比例
         7. 年度销售收入 = 总销售价格 × 年度销售比例
+
+        Args:
+            asset_formation: 资产形成，为None时重新计算
+
+        Returns:
+            SalesPlanState: 资产销售计划（不可修改）
         """
-        asset = self.input.asset_formation
+        if asset_formation is None:
+            asset_formation = InvestmentCalculator(self.yg, self.input).calculate_asset_formation()
         sales_plan = self.input.asset_sales_plan
 
-        # 检查是否已经计算过（通过检查sales_building_value是否已设置）
-        if sales_plan.sales_building_value > 0:
-            return
-
-        # 获取房屋建筑原值（折旧表中的建筑物原值）
-        building_original_value = asset.building_fixed_asset.total
+        # 房屋建筑原值（折旧表中的建筑物原值）、土地使用权原值
+        building_original_value = float(asset_formation.building_total)
+        land_original_value = float(asset_formation.land_total)
 
-        # 获取土地使用权原值
-        land_original_value = asset.land_intangible_asset.total
+        key = content_key(
+            building_original_value, land_original_value, sales_plan.building_sell_ratio, sales_plan.land_sell_ratio,
+            sales_plan.total_sales_price, list(sales_plan.annual_sales_ratios[:10]),
+            self.yg.construction_period, self.yg.operation_period,
+        )
+        return memoized("sales_plan", key,
+                        lambda: self._annual_sales(building_original_value, land_original_value, sales_plan))
 
-        # 转换百分比为小数（只在第一次时转换）
-        building_sell_ratio = sales_plan.building_sell_ratio / 100.0 if sales_plan.building_sell_ratio > 1.0 else sales_plan.building_sell_ratio
-        land_sell_ratio = sales_plan.land_sell_ratio / 100.0 if sales_plan.land_sell_ratio > 1.0 else sales_plan.land_sell_ratio
+    def _annual_sales(self, building_original_value: float, land_original_value: float, sales_plan) -> SalesPlanState:
+        """计算资产销售计划（calculate_annual_sales未命中缓存时调用）"""
+        # 转换百分比为小数
+        building_sell_ratio = _fraction(sales_plan.building_sell_ratio)
+        land_sell_ratio = _fraction(sales_plan.land_sell_ratio)
 
         # 计算自持占比（1 - 出售占比）
         building_hold_ratio = 1.0 - building_sell_ratio
         land_hold_ratio = 1.0 - land_sell_ratio
 
-        # 保存回sales_plan（只保存一次）
-        sales_plan.building_sell_ratio = building_sell_ratio
-        sales_plan.building_hold_ratio = building_hold_ratio
-        sales_plan.land_sell_ratio = land_sell_ratio
-        sales_plan.land_hold_ratio = land_hold_ratio
-
         # 房屋建筑相关
-        sales_plan.sales_building_value = building_original_value * building_sell_ratio
-        sales_plan.hold_building_value = building_original_value * building_hold_ratio
+        sales_building_value = building_original_value * building_sell_ratio
+        hold_building_value = building_original_value * building_hold_ratio
 
         # 土地使用权相关
-        sales_plan.sales_land_value = land_original_value * land_sell_ratio
-        sales_plan.hold_land_value = land_original_value * land_hold_ratio
-        
-        # 年度销售数据
-        years = self.yg.generate_year_names()
-        operation_years = [y for y in years if self.yg.is_operation_year(self.yg.get_year_index(y))]
-
-        # 转换年度销售比例为小数（固定10年销售期）
-        annual_ratios = [r / 100.0 for r in sales_plan.annual_sales_ratios]
-
-        # 清空旧的年度数据
-        sales_plan.annual_sales_revenue = {}
-        sales_plan.annual_sales_cost = {}
-        sales_plan.annual_land_amortization = {}
-
-        # 按年度分配（固定10年销售期，从运营期第1年开始）
-        # annual_ratios[0]对应运营期第1年，annual_ratios[9]对应运营期第10年
-        for i, year in enumerate(operation_years):
-            if i < 10:  # 最多处理10年销售期
-                ratio = annual_ratios[i]
-
-                # 年度销售收入 = 总销售价格 × 年度销售比例
-                # Excel中 Row 53: 固定资产销售收入（含税）
-                sales_plan.annual_sales_revenue[year] = sales_plan.total_sales_price * ratio
-
-                # 年度销售成本 = 出售固定资产数值 × 年度销售比例
-                # Excel中 Row 51: 用于出售的固定资产 → 传递到"5-4折旧"
-                sales_plan.annual_sales_cost[year] = sales_plan.sales_building_value * ratio
-
-                # 年度土地摊销 = 出售土地使用权数值 × 年度销售比例
-                # Excel中 Row 52: 出售固定资产对应的土地使用权摊销额
-                sales_plan.annual_land_amortization[year] = sales_plan.sales_land_value * ratio
-        
-        # 保留向后兼容的字段
-        sales_plan.self_hold_ratio = sales_plan.building_hold_ratio
-        sales_plan.sales_assets_cost = sales_plan.sales_building_value
-        sales_plan.asset_sales_revenue = sales_plan.total_sales_price
-    
-    def get_annual_sales_revenue(self) -> Dict[str, float]:
+        sales_land_value = land_original_value * land_sell_ratio
+        hold_land_value = land_original_value * land_hold_ratio
+
+        # 年度销售比例（固定10年销售期，从运营期第1年开始），转换为小数
+        # annual_sales_ratios[0]对应运营期第1年，annual_sales_ratios[9]对应运营期第10年
+        sales_ratios = np.asarray(sales_plan.annual_sales_ratios[:10], dtype=float) / 100.0
+        annual_ratios = self.yg.axis.place_operation_series(sales_ratios)
+
+        return SalesPlanState(
+            building_sell_ratio=building_sell_ratio,
+            building_hold_ratio=building_hold_ratio,
+            land_sell_ratio=land_sell_ratio,
+            land_hold_ratio=land_hold_ratio,
+            sales_building_value=sales_building_value,
+            hold_building_value=hold_building_value,
+            sales_land_value=sales_land_value,
+            hold_land_value=hold_land_value,
+            total_sales_price=sales_plan.total_sales_price,
+            sales_ratios=tuple(sales_ratios),
+            # 年度销售收入 = 总销售价格 × 年度销售比例
+            # Excel中 Row 53: 固定资产销售收入（含税）
+            annual_sales_revenue=sales_plan.total_sales_price * annual_ratios,
+            # 年度销售成本 = 出售固定资产数值 × 年度销售比例
+            # Excel中 Row 51: 用于出售的固定资产 → 传递到"5-4折旧"
+            annual_sales_cost=sales_building_value * annual_ratios,
+            # 年度土地摊销 = 出售土地使用权数值 × 年度销售比例
+            # Excel中 Row 52: 出售固定资产对应的土地使用权摊销额
+            annual_land_amortization=sales_land_value * annual_ratios,
+        )
+
+    def get_annual_sales_revenue(self) -> np.ndarray:
         """
         获取年度销售收入
-        
+
         Returns:
-            dict: 各年固定资产销售收入
+            ndarray: 各年固定资产销售收入（只读）
         """
-        self.calculate_annual_sales()
-        return self.input.asset_sales_plan.annual_sales_revenue
-    
-    def get_annual_sales_cost(self) -> Dict[str, float]:
+        return self.calculate_annual_sales().annual_sales_revenue
+
+    def get_annual_sales_cost(self) -> np.ndarray:
         """
         获取年度销售成本
-        
+
         Returns:
-            dict: 各年固定资产销售成本
+            ndarray: 各年固定资产销售成本（只读）
         """
-        self.calculate_annual_sales()
-        return self.input.asset_sales_plan.annual_sales_cost
-    
-    def get_annual_land_amortization(self) -> Dict[str, float]:
+        return self.calculate_annual_sales().annual_sales_cost
+
+    def get_annual_land_amortization(self) -> np.ndarray:
         """
         获取年度土地摊销（出售固定资产对应的土地使用权摊销额）
-        
+
         Returns:
-            dict: 各年土地摊销额
+            ndarray: 各年土地摊销额（只读）
         """
-        self.calculate_annual_sales()
-        return self.input.asset_sales_plan.annual_land_amortization
-    
+        return self.calculate_annual_sales().annual_land_amortization
+
     def get_hold_building_value(self) -> float:
         """
         获取自持固定资产数值（用于折旧）
-        
+
         Returns:
             float: 自持固定资产数值
         """
-        self.calculate_annual_sales()
-        return self.input.asset_sales_plan.hold_building_value
-    
+        return self.calculate_annual_sales().hold_building_value
+
     def get_hold_land_value(self) -> float:
         """
         获取自持土地使用权数值（用于摊销）
-        
+
         Returns:
             float: 自持土地使用权数值
         """
-        self.calculate_annual_sales()
-        return self.input.asset_sales_plan.hold_land_value
+        return self.calculate_annual_sales().hold_land_value
@@ -0,0 +1,222 @@
+"""
+循环引用（不动点）求解器
+建设期利息由借款支付、借款又随利息增加，这类Excel需要"迭代计算"的循环引用写成不动点问题x = g(x)，
+按行批量迭代求解：支持Anderson加速、Steffensen（Aitken）加速和普通迭代，并记录收敛情况。
+在此基础上提供建设期利息资本化（含借款额度不足时的资本金缺口）和循环借款（短期借款）的求解。
+"""
+from typing import Callable, Dict
+
+import numpy as np
+
+
+METHODS = ("anderson", "steffensen", "picard")
+
+
+class FixedPointResult:
+    """批量不动点求解结果"""
+
+    def __init__(self, value: np.ndarray, converged: np.ndarray, residual: np.ndarray,
+                 iterations: int, evaluations: int, history: np.ndarray):
+        """
+        初始化求解结果
+
+        Args:
+            value: 不动点，形状与初值相同
+            converged: (S,)是否收敛
+            residual: (S,)最终残差max|g(x) - x|
+            iterations: 迭代次数
+            evaluations: g的调用次数
+            history: 各次迭代后未收敛行中的最大残差
+        """
+        self.value = value
+        self.converged = converged
+        self.residual = residual
+        self.iterations = iterations
+        self.evaluations = evaluations
+        self.history = history
+
+
+def solve_fixed_point(func: Callable[[np.ndarray], np.ndarray], x0, method: str = "anderson",
+                      tol: float = 1e-9, max_iter: int = 100, memory: int = 5) -> FixedPointResult:
+    """
+    批量求解不动点x = func(x)
+
+    x按行为互相独立的情景：func接收(S, n)数组并返回同形状数组，每次对全部行计算，已收敛的行不再更新。
+
+    Args:
+        func: 迭代函数
+        x0: (S, n)或(n,)初值
+        method: "anderson"（Anderson加速）、"steffensen"（逐元素Aitken加速）或"picard"（普通迭代）
+        tol: 收敛精度（max|g(x) - x|）
+        max_iter: 最大迭代次数
+        memory: Anderson加速使用的历史步数
+
+    Returns:
+        FixedPointResult: 求解结果（未收敛时不报错，由converged标记）
+    """
+    if method not in METHODS:
+        raise ValueError(f"不支持的迭代方法: {method}（可选: {'、'.join(METHODS)}）")
+
+    x0 = np.asarray(x0, dtype=float)
+    shape = x0.shape
+    x = x0.reshape(-1, shape[-1] if shape else 1).copy()
+    evaluations = 0
+
+    def g(values: np.ndarray) -> np.ndarray:
+        nonlocal evaluations
+        evaluations += 1
+        return np.asarray(func(values.reshape(shape)), dtype=float).reshape(x.shape)
+
+    gx = g(x)
+    f = gx - x
+    residual = np.abs(f).max(axis=1)
+    active = residual > tol
+    delta_f, delta_g = [], []
+    history = []
+
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        if not active.any():
+            iterations -= 1
+            break
+
+        if method == "steffensen":
+            # x - (g(x) - x)² / (g(g(x)) - 2g(x) + x)，分母接近0时取g(g(x))
+            ggx = g(gx)
+            curvature = ggx - 2 * gx + x
+            with np.errstate(divide="ignore", invalid="ignore"):
+                accelerated = x - f ** 2 / curvature
+            x_new = np.where((np.abs(curvature) > 1e-14) & np.isfinite(accelerated), accelerated, ggx)
+        elif method == "anderson" and delta_f:
+            # 最小化||f - ΔF·γ||（各行分别求解，带少量正则），x = g(x) - ΔG·γ
+            dF = np.stack(delta_f, axis=-1)
+            dG = np.stack(delta_g, axis=-1)
+            gram = np.einsum("sni,snj->sij", dF, dF)
+            scale = np.trace(gram, axis1=1, axis2=2) / gram.shape[-1]
+            gram += (1e-10 * scale + 1e-300)[:, None, None] * np.eye(gram.shape[-1])
+            gamma = np.linalg.solve(gram, np.einsum("sni,sn->si", dF, f)[..., None])[..., 0]
+            x_new = gx - np.einsum("sni,si->sn", dG, gamma)
+        else:
+            x_new = gx
+
+        x_new = np.where(active[:, None] & np.isfinite(x_new), x_new, x)
+        gx_new = g(x_new)
+        f_new = gx_new - x_new
+        if method == "anderson":
+            delta_f.append(f_new - f)
+            delta_g.append(gx_new - gx)
+            del delta_f[:-memory], delta_g[:-memory]
+        x, gx, f = x_new, gx_new, f_new
+
+        residual = np.where(active, np.abs(f).max(axis=1), residual)
+        history.append(residual[active].max())
+        active &= residual > tol
+
+    converged = residual <= tol
+    return FixedPointResult(x.reshape(shape), converged, residual, iterations, evaluations, np.array(history))
+
+
+def _check(result: FixedPointResult, name: str) -> np.ndarray:
+    """求解结果未收敛时报错，否则返回不动点"""
+    if not result.converged.all():
+        raise ValueError(f"{name}迭代未收敛（残差 {result.residual.max():.3g}，{result.iterations} 次迭代）")
+    return result.value
+
+
+def _rate_column(rate) -> np.ndarray:
+    """利率（标量或(S,)）转为可与(S, N)广播的形状"""
+    rate = np.asarray(rate, dtype=float)
+    return rate[..., None] if rate.ndim else rate
+
+
+def construction_financing(investment, rate, construction, debt_ratio: float = 0.5,
+                           loan_limit=None, method: str = "anderson", tol: float = 1e-9) -> Dict[str, np.ndarray]:
+    """
+    建设期利息资本化
+
+    建设期各年的资金需求为当年投资加当年建设期利息，其中debt_ratio由借款解决（年中提款，当年按半年计息），
+    利息又随借款增加，求解二者的不动点。给出借款额度时，累计借款不超过额度，不足部分由资本金补足。
+
+    Args:
+        investment: (N,)或(S, N)各年投资（建设期以外为0）
+        rate: 年利率（小数），标量或(S,)
+        construction: (N,)建设期掩码
+        debt_ratio: 借款比例
+        loan_limit: 借款额度（标量或(S,)），为None时不限
+        method: 迭代方法（见solve_fixed_point）
+        tol: 收敛精度（万元）
+
+    Returns:
+        dict: "借款"、"建设期利息"、"资本金"、"借款余额"（年末），形状与investment相同
+    """
+    investment = np.asarray(investment, dtype=float)
+    rate = _rate_column(rate)
+    construction = np.asarray(construction, dtype=bool)
+    limit = None if loan_limit is None else _rate_column(loan_limit)
+
+    def interest_on(loan: np.ndarray) -> np.ndarray:
+        opening = np.cumsum(loan, axis=-1) - loan
+        return (opening + loan / 2) * rate * construction
+
+    def iterate(loan: np.ndarray) -> np.ndarray:
+        need = debt_ratio * (investment + interest_on(loan)) * construction
+        if limit is not None:
+            opening = np.cumsum(loan, axis=-1) - loan
+            need = np.clip(need, 0.0, np.maximum(limit - opening, 0.0))
+        return need
+
+    shape = np.broadcast_shapes(investment.shape, np.shape(rate), np.shape(limit) if limit is not None else ())
+    initial = np.broadcast_to(debt_ratio * investment * construction, shape)
+    loan = _check(solve_fixed_point(iterate, initial, method, tol), "建设期利息")
+    interest = interest_on(loan)
+    return {
+        "借款": loan,
+        "建设期利息": interest,
+        "资本金": investment + interest - loan,
+        "借款余额": np.cumsum(loan, axis=-1),
+    }
+
+
+def revolver(cash_flow, rate, opening_cash: float = 0.0, minimum_cash: float = 0.0,
+             method: str = "anderson", tol: float = 1e-9) -> Dict[str, np.ndarray]:
+    """
+    循环借款（短期借款）
+
+    各年现金不足最低现金余额时提取循环借款，有盈余时先归还循环借款；利息按年初、年末余额的平均数计算，
+    计入当年现金流，因此利息与借款余额互为循环引用。
+
+    Args:
+        cash_flow: (N,)或(S, N)未计循环借款及其利息的各年净现金流
+        rate: 循环借款年利率（小数），标量或(S,)
+        opening_cash: 期初现金余额
+        minimum_cash: 最低现金余额
+        method: 迭代方法（见solve_fixed_point）
+        tol: 收敛精度（万元）
+
+    Returns:
+        dict: "循环借款余额"、"提款"、"还款"、"利息"、"现金余额"，形状与cash_flow相同
+    """
+    cash_flow = np.asarray(cash_flow, dtype=float)
+    rate = _rate_column(rate)
+
+    def balances(interest: np.ndarray):
+        # 净头寸 = 超出最低余额的现金 - 循环借款余额，只随现金流和利息变化
+        position = opening_cash - minimum_cash + np.cumsum(cash_flow - interest, axis=-1)
+        return np.maximum(-position, 0.0), minimum_cash + np.maximum(position, 0.0)
+
+    def iterate(interest: np.ndarray) -> np.ndarray:
+        balance, _ = balances(interest)
+        previous = np.concatenate([np.zeros_like(balance[..., :1]), balance[..., :-1]], axis=-1)
+        return rate * (previous + balance) / 2
+
+    initial = np.zeros(np.broadcast_shapes(cash_flow.shape, np.shape(rate)))
+    interest = _check(solve_fixed_point(iterate, initial, method, tol), "循环借款利息")
+    balance, cash = balances(interest)
+    change = np.diff(balance, axis=-1, prepend=0.0)
+    return {
+        "循环借款余额": balance,
+        "提款": np.maximum(change, 0.0),
+        "还款": np.maximum(-change, 0.0),
+        "利息": interest,
+        "现金余额": cash,
+    }
@@ -1,7 +1,6 @@
 """
 配置文件
 """
-import streamlit as st
 
 # 页面配置
 PAGE_CONFIG = {
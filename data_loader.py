@@ -1,34 +1,102 @@
 """
 Excel数据加载模块
 """
-import pandas as pd
-import openpyxl
-from openpyxl.styles import PatternFill
+from __future__ import annotations
+
+import importlib.util
+import os
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+
 import config
-from utils import is_yellow_cell, get_input_module_ranges
+from utils import get_input_module_ranges, lazy_import
+from workbook_cache import WorkbookCache, content_hash
+from fill_mask import read_fill_mask, align_mask, InputCellIndex
+from input_mapping import SALES_PLAN_SUMMARY_CELLS, read_cells
+
+pd = lazy_import("pandas")
 
-# 检查xlrd是否可用
-try:
-    import xlrd
-    XLRD_AVAILABLE = True
-except ImportError:
-    XLRD_AVAILABLE = False
+# 检查xlrd是否可用（只查找不导入，读取时由pandas导入）
+XLRD_AVAILABLE = importlib.util.find_spec("xlrd") is not None
+
+# 进程内共享的输入默认值缓存：(工作簿路径, 内容哈希, 建设期, 运营期) -> 只读的模块取值
+_input_defaults_cache = {}
+_input_defaults_lock = threading.Lock()
 
 
 class DataLoader:
     """Excel数据加载器"""
 
-    def __init__(self, excel_file=None):
+    def __init__(self, excel_file=None, use_cache=True, cache_dir=None, max_cached_sheets=8):
         """
         初始化数据加载器
 
         Args:
             excel_file: Excel文件路径，默认为config.EXCEL_FILE
+            use_cache: 是否使用工作簿快照缓存
+            cache_dir: 快照缓存目录，默认为工作簿所在目录下的.workbook_cache
+            max_cached_sheets: 内存中最多保留的已解析工作表数（最近最少使用的先淘汰）
         """
         self.excel_file = excel_file or config.EXCEL_FILE
         self.input_df = None
         self.yellow_mask = None
+        self.input_cells = None
         self.all_sheets = None
+        self.cache = WorkbookCache(self.excel_file, cache_dir) if use_cache else None
+        self.max_cached_sheets = max_cached_sheets
+
+        # 按需打开的工作簿（xlrd on_demand：只在读取某个工作表时才解析该工作表）
+        self._book = None
+        self._excel = None
+        # 已解析工作表的LRU缓存
+        self._sheets = OrderedDict()
+
+    def _open(self):
+        """
+        打开工作簿（只打开一次，之后复用同一句柄）
+
+        Returns:
+            pd.ExcelFile
+        """
+        if self._excel is None:
+            if XLRD_AVAILABLE:
+                import xlrd
+                self._book = xlrd.open_workbook(self.excel_file, on_demand=True)
+                self._excel = pd.ExcelFile(self._book, engine='xlrd')
+            else:
+                self._excel = pd.ExcelFile(self.excel_file)
+        return self._excel
+
+    def close(self):
+        """关闭工作簿句柄并清空已解析的工作表"""
+        if self._book is not None:
+            self._book.release_resources()
+        self._book = None
+        self._excel = None
+        self._sheets.clear()
+
+    def sheet_names(self):
+        """
+        工作簿中的工作表名称
+
+        Returns:
+            list: 工作表名称
+        """
+        if self.all_sheets is not None:
+            return list(self.all_sheets)
+        if self.cache is not None:
+            names = self.cache.sheet_names()
+            if names is not None:
+                return names
+        return self._open().sheet_names
+
+    def _parse_sheet(self, sheet_name):
+        """使用打开的工作簿句柄解析单个工作表，解析后释放xlrd中该表的原始数据"""
+        df = pd.read_excel(self._open(), sheet_name=sheet_name)
+        if self._book is not None:
+            self._book.unload_sheet(sheet_name)
+        return df
 
     def load_input_sheet(self):
         """
@@ -37,65 +105,85 @@ class DataLoader:
         Returns:
             tuple: (DataFrame, 黄色标记DataFrame)
         """
-        # 使用pandas读取数据
-        if XLRD_AVAILABLE:
-            self.input_df = pd.read_excel(
-                self.excel_file,
-                sheet_name=config.INPUT_SHEET_NAME,
-                engine='xlrd'
+        # 按需读取（有快照时直接读取快照）
+        self.input_df = self.get_sheet(config.INPUT_SHEET_NAME)
+
+        # 黄色（输入）单元格标记：一次读取格式信息得到掩码，与数据一样存入快照
+        if self.cache is not None:
+            self.yellow_mask = self.cache.load_sheet(
+                f"{config.INPUT_SHEET_NAME}#黄色标记", self._read_yellow_mask
             )
         else:
-            self.input_df = pd.read_excel(
-                self.excel_file,
-                sheet_name=config.INPUT_SHEET_NAME
-            )
+            self.yellow_mask = self._read_yellow_mask()
+        self.input_cells = InputCellIndex(self.yellow_mask.to_numpy())
+
+        return self.input_df, self.yellow_mask
 
-        # 暂时创建一个空的黄色标记DataFrame（后续需要用xlrd支持颜色读取）
-        self.yellow_mask = pd.DataFrame(
-            False,
+    def _read_yellow_mask(self):
+        """读取输入工作表的黄色单元格掩码（与input_df对齐）"""
+        mask = read_fill_mask(self.excel_file, config.INPUT_SHEET_NAME)
+        return pd.DataFrame(
+            align_mask(mask, self.input_df.shape),
             index=self.input_df.index,
             columns=self.input_df.columns
         )
 
-        return self.input_df, self.yellow_mask
-
     def load_all_sheets(self):
         """
-        加载所有工作表
+        加载所有工作表（一次性解析全部工作表并常驻内存；只需要个别工作表时应使用get_sheet）
 
         Returns:
             dict: 工作表名称到DataFrame的映射
         """
-        self.all_sheets = {}
-
-        # 使用pandas读取所有工作表
-        if XLRD_AVAILABLE:
-            xls = pd.ExcelFile(self.excel_file, engine='xlrd')
+        if self.cache is not None:
+            self.all_sheets = self.cache.load_all(self._parse_all_sheets)
         else:
-            xls = pd.ExcelFile(self.excel_file)
-
-        for sheet_name in xls.sheet_names:
-            self.all_sheets[sheet_name] = pd.read_excel(xls, sheet_name=sheet_name)
+            self.all_sheets = self._parse_all_sheets()
 
         return self.all_sheets
 
+    def _parse_all_sheets(self):
+        """使用pandas解析工作簿中的所有工作表"""
+        return {sheet_name: self._parse_sheet(sheet_name) for sheet_name in self._open().sheet_names}
+
     def get_sheet(self, sheet_name):
         """
-        获取指定工作表
+        获取指定工作表（首次访问时才解析，已解析的工作表保留在LRU缓存中）
 
         Args:
             sheet_name: 工作表名称
 
         Returns:
-            DataFrame
+            DataFrame，工作表不存在时为None
         """
-        if self.all_sheets is None:
-            self.load_all_sheets()
-        return self.all_sheets.get(sheet_name)
+        if self.all_sheets is not None:
+            return self.all_sheets.get(sheet_name)
+
+        if sheet_name in self._sheets:
+            self._sheets.move_to_end(sheet_name)
+            return self._sheets[sheet_name]
+
+        if self.cache is not None:
+            df = self.cache.load_sheet(sheet_name, lambda: self._parse_sheet_if_exists(sheet_name))
+        else:
+            df = self._parse_sheet_if_exists(sheet_name)
+        if df is None:
+            return None
+
+        self._sheets[sheet_name] = df
+        while len(self._sheets) > self.max_cached_sheets:
+            self._sheets.popitem(last=False)
+        return df
+
+    def _parse_sheet_if_exists(self, sheet_name):
+        """解析工作表，工作簿中没有该工作表时返回None"""
+        if sheet_name not in self._open().sheet_names:
+            return None
+        return self._parse_sheet(sheet_name)
 
     def get_sheet_raw_data(self, sheet_name):
         """
-        获取指定工作表的原始数据（不使用缓存）
+        获取指定工作表的原始数据（直接从工作簿解析，不使用缓存）
 
         Args:
             sheet_name: 工作表名称
@@ -103,10 +191,7 @@ class DataLoader:
         Returns:
             DataFrame
         """
-        if XLRD_AVAILABLE:
-            return pd.read_excel(self.excel_file, sheet_name=sheet_name, engine='xlrd')
-        else:
-            return pd.read_excel(self.excel_file, sheet_name=sheet_name)
+        return self._parse_sheet(sheet_name)
 
     def get_input_module(self, module_name):
         """
@@ -143,93 +228,78 @@ class DataLoader:
         Returns:
             list: [(row, col), ...] 的列表
         """
-        module_df, module_yellow = self.get_input_module(module_name)
-        yellow_coords = []
-
-        for row_idx in range(len(module_yellow)):
-            for col_idx in range(len(module_yellow.columns)):
-                if module_yellow.iloc[row_idx, col_idx]:
-                    yellow_coords.append((row_idx, col_idx))
-
-        return yellow_coords
+        if self.input_cells is None:
+            self.load_input_sheet()
+        return self.input_cells.cells(module_name)
 
     def extract_input_values(self, construction_period=3, operation_period=17):
         """
-        提取所有输入值，生成年份列
+        提取所有输入值
 
         Args:
-            construction_period: 建设期（年）
-            operation_period: 运营期（年）
+            construction_period: 建设期（年），提取的输入值与年份划分无关，保留该参数以兼容现有调用
+            operation_period: 运营期（年），同上
 
         Returns:
             dict: 模块名称到输入数据的映射
         """
-        from utils import generate_years
-
-        years = generate_years(construction_period, operation_period)
         input_data = {}
 
         # 加载所有工作表
         self.load_input_sheet()
+        sheet_values = self.input_df.to_numpy(dtype=object)
 
         for module_name in config.INPUT_MODULES:
             module_df, module_yellow = self.get_input_module(module_name)
 
-            # 提取黄色单元格的值
-            yellow_values = {}
-            for row_idx, col_idx in self.get_yellow_cells_by_module(module_name):
-                value = module_df.iloc[row_idx, col_idx]
-                label = module_df.iloc[row_idx, 0]  # 第一列是标签
+            # 提取黄色单元格的值（按稀疏坐标一次取出）
+            rows, cols = self.input_cells.module_coords(module_name)
+            module_values = module_df.to_numpy(dtype=object)
+            values = module_values[rows, cols]
+            labels = module_values[rows, 0]  # 第一列是标签
+            valid = pd.notna(values) & pd.notna(labels)
+            yellow_values = dict(zip(labels[valid], values[valid]))
 
-                if pd.notna(value) and pd.notna(label):
-                    yellow_values[label] = value
-
-            # 特殊处理"4. 资产销售计划"模块，提取计算后的数值
+            # "4. 资产销售计划"模块另外提供计算后的销售、自持资产数值（单元格见SALES_PLAN_SUMMARY_CELLS）
             if module_name == "4. 资产销售计划":
-                # 第51行（模块中索引3）：用于出售的固定资产（成本），第6列（索引6）
-                # 第54行（模块中索引6）：自持的固定资产，第6列（索引6）
-                # 第55行（模块中索引7）：自持固定资产对应的土地使用权，第6列（索引6）
-
-                # 注意：模块DataFrame的行索引从0开始
-                # Excel第51行（索引50）-> 模块中索引3
-                # Excel第54行（索引53）-> 模块中索引6
-                # Excel第55行（索引54）-> 模块中索引7
-
-                # 出售固定资产数值
-                if len(module_df) > 3:  # 确保有足够的行
-                    sales_building_value = module_df.iloc[3, 6]  # 第6列（索引6）
-                    building_sell_ratio = module_df.iloc[3, 5]   # 第5列（索引5）
-                    if pd.notna(sales_building_value):
-                        yellow_values["sales_building_value"] = sales_building_value
-                    if pd.notna(building_sell_ratio):
-                        yellow_values["building_sell_ratio"] = building_sell_ratio * 100  # 转换为百分比
-
-                # 自持固定资产数值
-                if len(module_df) > 6:
-                    hold_building_value = module_df.iloc[6, 6]
-                    if pd.notna(hold_building_value):
-                        yellow_values["hold_building_value"] = hold_building_value
-
-                # 自持土地使用权数值
-                if len(module_df) > 7:
-                    hold_land_value = module_df.iloc[7, 6]
-                    if pd.notna(hold_land_value):
-                        yellow_values["hold_land_value"] = hold_land_value
-
-                # 出售土地使用权数值（从出售固定资产对应土地使用权的数值推算）
-                # Excel第52行（索引51）-> 模块中索引4
-                if len(module_df) > 4:
-                    sales_land_value = module_df.iloc[4, 6]
-                    land_sell_ratio = module_df.iloc[4, 5]   # 第5列（索引5）
-                    if pd.notna(sales_land_value):
-                        yellow_values["sales_land_value"] = sales_land_value
-                    if pd.notna(land_sell_ratio):
-                        yellow_values["land_sell_ratio"] = land_sell_ratio * 100  # 转换为百分比
+                yellow_values.update(read_cells(sheet_values, SALES_PLAN_SUMMARY_CELLS))
 
             input_data[module_name] = yellow_values
 
         return input_data
 
+    def get_input_defaults(self, construction_period=3, operation_period=17):
+        """
+        获取输入默认值（extract_input_values的结果），在进程内按工作簿内容哈希和计算期缓存
+
+        所有会话共享同一份结果，工作簿内容变化时自动重新提取。返回值为只读映射，不能修改。
+
+        Args:
+            construction_period: 建设期（年）
+            operation_period: 运营期（年）
+
+        Returns:
+            Mapping: 模块名称到输入数据（只读映射）的映射
+        """
+        excel_file = os.path.abspath(self.excel_file)
+        key = (excel_file, content_hash(excel_file), construction_period, operation_period)
+        with _input_defaults_lock:
+            cached = _input_defaults_cache.get(key)
+        if cached is not None:
+            return cached
+
+        values = self.extract_input_values(construction_period, operation_period)
+        frozen = MappingProxyType({
+            module_name: MappingProxyType(dict(module_values))
+            for module_name, module_values in values.items()
+        })
+        with _input_defaults_lock:
+            # 清理该工作簿旧内容的缓存
+            for stale in [k for k in _input_defaults_cache if k[0] == excel_file and k[1] != key[1]]:
+                del _input_defaults_cache[stale]
+            _input_defaults_cache[key] = frozen
+        return frozen
+
     def get_original_results(self, sheet_name):
         """
         获取原始计算结果，用于验证
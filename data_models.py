@@ -2,8 +2,10 @@
 数据结构定义
 基于Excel分析结果定义的数据模型
 """
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+import hashlib
+import pickle
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, Optional
 
 
 @dataclass
@@ -51,81 +53,61 @@ class ProjectInvestment:
     service_tax_rate: float = 0.06      # 服务税率（%）
     land_tax_type: str = "无形资产"      # 土地费用类型
 
-    # 不含税值（由Excel计算，或系统自动计算）
-    # 这些值会根据含税值和税率自动计算
-    building_cost_no_tax: float = 0.0           # 建筑工程费不含税（万元）
-    building_equipment_cost_no_tax: float = 0.0  # 建筑设备费不含税（万元）
-    building_installation_cost_no_tax: float = 0.0  # 建筑设备安装费不含税（万元）
-    management_fee_no_tax: float = 0.0          # 项目管理咨询费不含税（万元）
-    tech_service_fee_no_tax: float = 0.0        # 项目建设技术服务费不含税（万元）
-    supporting_fee_no_tax: float = 0.0          # 配套设施等其他费用不含税（万元）
-    land_use_fee_no_tax: float = 0.0            # 土地使用费不含税（万元）
-    patent_fee_no_tax: float = 0.0              # 专利及专有技术费不含税（万元）
-    preparation_fee_no_tax: float = 0.0        # 生产准备及开办费不含税（万元）
-
-    def calculate_no_tax_values(self):
-        """根据含税值和税率计算不含税值
+    def no_tax_values(self) -> "NoTaxValues":
+        """根据含税值和税率计算不含税值（不修改本对象）
 
         Excel 计算方法：
         1. 进项税 = 含税值 × 税率（直接乘税率）
         2. 不含税值 = 含税值 - 进项税
 
         注意：税率字段存储的是百分比值（如 9.0 表示 9%），计算时需要除以 100
-        """
-        # 建筑工程费（税率9%）
-        building_input_tax = self.building_cost * (self.construction_tax_rate / 100)
-        self.building_cost_no_tax = self.building_cost - building_input_tax
-
-        # 建筑设备费（税率13%）
-        equipment_input_tax = self.building_equipment_cost * (self.equipment_tax_rate / 100)
-        self.building_equipment_cost_no_tax = self.building_equipment_cost - equipment_input_tax
-
-        # 建筑设备安装费（税率9%）
-        installation_input_tax = self.building_installation_cost * (self.construction_tax_rate / 100)
-        self.building_installation_cost_no_tax = self.building_installation_cost - installation_input_tax
-
-        # 管理咨询费（税率6%）
-        management_input_tax = self.management_fee * (self.service_tax_rate / 100)
-        self.management_fee_no_tax = self.management_fee - management_input_tax
-
-        # 技术服务费（税率6%）
-        tech_input_tax = self.tech_service_fee * (self.service_tax_rate / 100)
-        self.tech_service_fee_no_tax = self.tech_service_fee - tech_input_tax
 
-        # 配套设施（税率9%）
-        supporting_input_tax = self.supporting_fee * (self.construction_tax_rate / 100)
-        self.supporting_fee_no_tax = self.supporting_fee - supporting_input_tax
-
-        # 土地使用费（无税率）
-        self.land_use_fee_no_tax = self.land_use_fee
+        Returns:
+            NoTaxValues: 各项费用的不含税值
+        """
+        def no_tax(amount, tax_rate):
+            return amount - amount * (tax_rate / 100)
+
+        return NoTaxValues(
+            building_cost=no_tax(self.building_cost, self.construction_tax_rate),                       # 税率9%
+            building_equipment_cost=no_tax(self.building_equipment_cost, self.equipment_tax_rate),      # 税率13%
+            building_installation_cost=no_tax(self.building_installation_cost, self.construction_tax_rate),
+            management_fee=no_tax(self.management_fee, self.service_tax_rate),                          # 税率6%
+            tech_service_fee=no_tax(self.tech_service_fee, self.service_tax_rate),
+            supporting_fee=no_tax(self.supporting_fee, self.construction_tax_rate),
+            land_use_fee=self.land_use_fee,                                                             # 无税率
+            patent_fee=no_tax(self.patent_fee, self.service_tax_rate),
+            preparation_fee=no_tax(self.preparation_fee, self.construction_tax_rate),
+        )
 
-        # 专利费（税率6%）
-        patent_input_tax = self.patent_fee * (self.service_tax_rate / 100)
-        self.patent_fee_no_tax = self.patent_fee - patent_input_tax
 
-        # 开办费（税率9%）
-        preparation_input_tax = self.preparation_fee * (self.construction_tax_rate / 100)
-        self.preparation_fee_no_tax = self.preparation_fee - preparation_input_tax
+@dataclass(frozen=True)
+class NoTaxValues:
+    """项目投资各项费用的不含税值（万元，由ProjectInvestment.no_tax_values计算）"""
+    building_cost: Any               # 建筑工程费
+    building_equipment_cost: Any     # 建筑设备费
+    building_installation_cost: Any  # 建筑设备安装费
+    management_fee: Any              # 项目管理咨询费
+    tech_service_fee: Any            # 项目建设技术服务费
+    supporting_fee: Any              # 配套设施等其他费用
+    land_use_fee: Any                # 土地使用费
+    patent_fee: Any                  # 专利及专有技术费
+    preparation_fee: Any             # 生产准备及开办费
 
 
 @dataclass
 class FixedAssetDetail:
     """固定资产明细"""
     asset_name: str  # 资产名称（房屋建筑、机械设备）
-    engineering_fee: float = 0.0         # 工程费（万元）
-    other_fixed_fee: float = 0.0          # 固定资产其他费用（万元）
-    reserve_fee: float = 0.0              # 预备费（万元）
-    construction_interest: float = 0.0     # 建设期利息（万元）
-    total: float = 0.0                     # 合计（万元）
     depreciation_years: int = 20           # 折旧年限（年）
     salvage_rate: float = 5.0              # 残值率（%）
+    depreciation_method: str = "直线法"    # 折旧方法（直线法、双倍余额递减法、年数总和法）
 
 
 @dataclass
 class IntangibleAssetDetail:
     """无形资产明细"""
     asset_name: str  # 资产名称（土地使用权、专利权等）
-    total: float = 0.0                     # 合计（万元）
     amortization_years: int = 50            # 摊销年限（年）
 
 
@@ -133,7 +115,6 @@ class IntangibleAssetDetail:
 class OtherAssetDetail:
     """其他资产明细"""
     asset_name: str  # 资产名称（开办费等）
-    total: float = 0.0                     # 合计（万元）
     amortization_years: int = 5             # 摊销年限（年）
 
 
@@ -141,6 +122,9 @@ class OtherAssetDetail:
 class AssetFormation:
     """
     资产形成（根据Excel '1 建筑工程财务模型参数' Row 32-45）
+
+    只包含各类资产的折旧/摊销参数，各类资产的原值、合计由InvestmentCalculator.calculate_asset_formation计算
+    （见derived_state.AssetFormationState）。
     """
     # 固定资产
     building_fixed_asset: FixedAssetDetail = field(default_factory=lambda: FixedAssetDetail(
@@ -176,17 +160,10 @@ class AssetFormation:
         amortization_years=5
     ))
 
-    # 进项税
-    deductible_input_tax: float = 0.0  # 可抵扣建设投资进项税（万元）
-
-    # 汇总
-    fixed_asset_total: float = 0.0      # 固定资产合计（万元）
-    intangible_asset_total: float = 0.0  # 无形资产合计（万元）
-    other_asset_total: float = 0.0      # 其他资产合计（万元）
-    investment_total: float = 0.0       # 投资合计（万元）
-
-    # 固定资产原值（不含建设期利息）
-    fixed_asset_original_value: float = 0.0  # 固定资产原值（不含建设期利息）
+    # 追加资产（运营期新增、更新改造等，登记后计入5-4折旧、5-5摊销表）
+    # 每项为字典：name、category（building/equipment/land/patent/other_asset）、cost（万元）、
+    # in_service_year（计算期第几年开始折旧/摊销）、life（年限）、salvage_rate（残值率%，可省略）
+    additional_assets: List[Dict[str, Any]] = field(default_factory=list)
 
 
 @dataclass
@@ -195,18 +172,10 @@ class AssetSalesPlan:
     资产销售计划
 
     参照Excel"1 建筑工程财务模型参数"第48-55行
+    出售、自持资产的数值和各年销售数据由AssetSalesCalculator.calculate_annual_sales计算（见derived_state.SalesPlanState）。
     """
-    # 房屋建筑相关
-    building_sell_ratio: float = 25.0       # 出售固定资产占比（%），基数是房屋建筑原值
-    building_hold_ratio: float = 0.75        # 自持固定资产占比（%），基数是房屋建筑原值
-    sales_building_value: float = 0.0       # 出售固定资产数值（万元）= 房屋建筑原值 × building_sell_ratio
-    hold_building_value: float = 0.0        # 自持固定资产数值（万元）= 房屋建筑原值 × building_hold_ratio
-
-    # 土地使用权相关
-    land_sell_ratio: float = 25.0           # 出售土地使用权占比（%），基数是土地使用权原值
-    land_hold_ratio: float = 0.75           # 自持土地使用权占比（%），基数是土地使用权原值
-    sales_land_value: float = 0.0           # 出售土地使用权数值（万元）= 土地使用权原值 × land_sell_ratio
-    hold_land_value: float = 0.0             # 自持土地使用权数值（万元）= 土地使用权原值 × land_hold_ratio
+    building_sell_ratio: float = 25.0       # 出售固定资产占比（%，不大于1时按小数），基数是房屋建筑原值
+    land_sell_ratio: float = 25.0           # 出售土地使用权占比（%，不大于1时按小数），基数是土地使用权原值
 
     # 销售价格
     total_sales_price: float = 0.0           # 总销售价格（万元），用户输入
@@ -215,18 +184,8 @@ class AssetSalesPlan:
     # 默认值：第1年10%，第2-4年各30%，第5-10年0%
     annual_sales_ratios: List[float] = field(default_factory=lambda: [10.0, 30.0, 30.0, 30.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0])
 
-    # 年度销售额（按销售比例计算）
-    annual_sales_revenue: Dict[str, float] = field(default_factory=dict)
-
-    # 年度销售成本（用于销售的建设投资部分）
-    annual_sales_cost: Dict[str, float] = field(default_factory=dict)
-
-    # 年度土地摊销（出售固定资产对应的土地使用权摊销额）
-    annual_land_amortization: Dict[str, float] = field(default_factory=dict)
-
-    # 保留向后兼容的字段
+    # 保留向后兼容的字段（表单输入，计算中不使用）
     self_hold_ratio: float = 0.75           # 自持占比（%）
-    sales_assets_cost: float = 0.0          # 销售固定资产成本（万元）
     asset_sales_revenue: float = 0.0        # 固定资产销售收入（含税）
 
 
@@ -248,10 +207,11 @@ class BankLoanPlan:
     """银行借款计划"""
     loan_years: List[int] = field(default_factory=list)    # 借款年份
     loan_amounts: List[float] = field(default_factory=list) # 借款金额
-    interest_rate: float = 0.0588                           # 年利率
+    interest_rate: float = 0.0588                           # 年利率（小数）
     repayment_period: int = 15                              # 还款期限（年）
     repayment_method: str = "等额本金"  # 还款方式
     grace_period: int = 2                                    # 宽限期（年）
+    loan_limit: float = 0.0                                  # 借款额度（万元，含资本化的建设期利息），0为不限
 
 
 @dataclass
@@ -353,9 +313,9 @@ class OtherCosts:
 @dataclass
 class TaxParams:
     """赋税参数及补贴收入"""
-    corporate_tax_rate: float = 0.25    # 企业所得税税率（%）
-    reserve_fund_rate: float = 0.1      # 盈余公积金比率（%）
-    discount_rate: float = 0.06         # 净现值内部收益率ic
+    corporate_tax_rate: float = 0.25    # 企业所得税税率（小数）
+    reserve_fund_rate: float = 0.1      # 盈余公积金比率（小数）
+    discount_rate: float = 0.06         # 净现值内部收益率ic（小数）
     
     # 税收优惠
     loss_carryforward_years: int = 5   # 亏损弥补年限（年）
@@ -387,3 +347,18 @@ class InputData:
     labor_cost: LaborCost = field(default_factory=LaborCost)
     other_costs: OtherCosts = field(default_factory=OtherCosts)
     tax_params: TaxParams = field(default_factory=TaxParams)
+
+    def fingerprint(self) -> Dict[str, str]:
+        """
+        计算各输入模块逐字段的指纹，用于判断哪些输入发生了变化
+
+        Returns:
+            dict: "模块.字段"到摘要的映射，如"tax_params.discount_rate"
+        """
+        result = {}
+        for section in fields(self):
+            module = getattr(self, section.name)
+            for item in fields(module):
+                value = getattr(module, item.name)
+                result[f"{section.name}.{item.name}"] = hashlib.md5(pickle.dumps(value, protocol=4)).hexdigest()
+        return result
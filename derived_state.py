@@ -0,0 +1,148 @@
+"""
+派生状态
+资产形成、资产销售计划等由输入推导出的中间结果，以不可修改的对象返回，不再写回输入数据：
+计算过程中输入只读，同一个InputData可以在多个线程间共享，结果也不依赖各计算器的调用顺序。
+派生状态按所读输入内容的摘要缓存，内容相同的输入（不论是否同一对象）共用同一结果。
+"""
+import hashlib
+import pickle
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Dict, Tuple
+
+import numpy as np
+
+
+# 进程内缓存的派生状态个数
+MAX_CACHED_STATES = 256
+
+
+def _freeze(state) -> None:
+    """把派生状态中的数组换成只读副本（数组内容也不能被调用方修改）"""
+    for item in fields(state):
+        value = getattr(state, item.name)
+        if isinstance(value, np.ndarray):
+            value = value.copy()
+            value.flags.writeable = False
+            object.__setattr__(state, item.name, value)
+
+
+@dataclass(frozen=True, eq=False)
+class AssetFormationState:
+    """
+    资产形成（Excel Row 32-45的计算结果）
+
+    各金额为万元；批量计算时可以是按情景排列的(S,)数组。
+    """
+    engineering_fee: Any              # 工程费（不含税）
+    other_fixed_fee: Any              # 固定资产其他费用（不含税，不含开办费）
+    reserve_fee: Any                  # 预备费（用户输入）
+    construction_interest: Any        # 建设期利息（用户输入）
+    building_total: Any               # 房屋建筑固定资产
+    equipment_total: Any              # 机械设备固定资产（本项目为0）
+    land_total: Any                   # 土地使用权
+    patent_total: Any                 # 专利权
+    sales_land_total: Any             # 销售地产土地权
+    other_total: Any                  # 其他资产（开办费）
+    deductible_input_tax: Any         # 可抵扣进项税
+    fixed_asset_total: Any            # 固定资产合计
+    intangible_asset_total: Any       # 无形资产合计
+    other_asset_total: Any            # 其他资产合计
+    investment_total: Any             # 投资合计
+    fixed_asset_original_value: Any   # 固定资产原值（不含建设期利息）
+
+    def __post_init__(self):
+        _freeze(self)
+
+
+@dataclass(frozen=True, eq=False)
+class SalesPlanState:
+    """
+    资产销售计划（Excel"1 建筑工程财务模型参数"第48-55行的计算结果）
+
+    占比均为小数，各年数值为只读的年度向量。
+    """
+    building_sell_ratio: float        # 出售固定资产占比
+    building_hold_ratio: float        # 自持固定资产占比（折旧、摊销按此比例计提）
+    land_sell_ratio: float            # 出售土地使用权占比
+    land_hold_ratio: float            # 自持土地使用权占比
+    sales_building_value: float       # 出售固定资产数值
+    hold_building_value: float        # 自持固定资产数值
+    sales_land_value: float           # 出售土地使用权数值
+    hold_land_value: float            # 自持土地使用权数值
+    total_sales_price: float          # 总销售价格
+    sales_ratios: Tuple[float, ...]   # 运营期第1-10年的销售比例
+    annual_sales_revenue: np.ndarray  # 各年销售收入
+    annual_sales_cost: np.ndarray     # 各年销售成本
+    annual_land_amortization: np.ndarray  # 各年土地摊销
+
+    def __post_init__(self):
+        _freeze(self)
+
+
+def content_key(*parts) -> str:
+    """
+    输入内容的摘要（按值比较，内容相同的对象摘要相同）
+
+    Args:
+        parts: 计算所读取的输入（dataclass、数值、列表、数组等可pickle的对象）
+
+    Returns:
+        str: 摘要
+    """
+    return hashlib.md5(pickle.dumps(parts, protocol=4)).hexdigest()
+
+
+_states: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+_states_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def memoized(kind: str, key: str, compute: Callable[[], Any]) -> Any:
+    """
+    按摘要缓存的派生状态
+
+    计算在锁外进行，多个线程同时计算同一状态时结果相同，以先写入的为准。
+
+    Args:
+        kind: 派生状态种类
+        key: 所读输入的摘要（见content_key）
+        compute: 计算函数
+
+    Returns:
+        派生状态
+    """
+    cache_key = (kind, key)
+    with _states_lock:
+        if cache_key in _states:
+            _states.move_to_end(cache_key)
+            _stats["hits"] += 1
+            return _states[cache_key]
+        _stats["misses"] += 1
+
+    value = compute()
+    with _states_lock:
+        value = _states.setdefault(cache_key, value)
+        _states.move_to_end(cache_key)
+        while len(_states) > MAX_CACHED_STATES:
+            _states.popitem(last=False)
+    return value
+
+
+def cache_info() -> Dict[str, int]:
+    """
+    派生状态缓存的统计
+
+    Returns:
+        dict: hits（命中次数）、misses（计算次数）、size（缓存个数）
+    """
+    with _states_lock:
+        return {**_stats, "size": len(_states)}
+
+
+def clear_cache() -> None:
+    """清空派生状态缓存及统计"""
+    with _states_lock:
+        _states.clear()
+        _stats["hits"] = _stats["misses"] = 0
@@ -0,0 +1,261 @@
+"""
+单元格填充色提取
+一次读取工作表的格式信息，得到指定填充色（默认黄色，即输入单元格）的布尔掩码：
+.xls通过xlrd（formatting_info=True），.xlsx通过openpyxl只读模式，均只使用公开接口。
+每种格式记录（xf/填充）只判断一次是否为目标颜色，再按各单元格的格式编号整体查表。
+"""
+from __future__ import annotations
+
+import os
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils import get_input_module_ranges, lazy_import
+
+openpyxl = lazy_import("openpyxl")
+
+
+# 黄色（输入单元格）
+YELLOW_RGB = (255, 255, 0)
+
+
+def _rgb_from_hex(value) -> Optional[Tuple[int, int, int]]:
+    """openpyxl颜色值（"FFFFFF00"、"FFFF00"）转为RGB元组"""
+    if not isinstance(value, str) or len(value) not in (6, 8):
+        return None
+    try:
+        return tuple(int(value[i:i + 2], 16) for i in range(len(value) - 6, len(value), 2))
+    except ValueError:
+        return None
+
+
+# 主题颜色在openpyxl中的序号对应主题配色方案（clrScheme）中的元素
+THEME_COLOR_ORDER = ("lt1", "dk1", "lt2", "dk2", "accent1", "accent2", "accent3", "accent4", "accent5", "accent6",
+                     "hlink", "folHlink")
+
+_DRAWINGML = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+
+
+def _theme_colors(theme_xml) -> List[Optional[Tuple[int, int, int]]]:
+    """
+    工作簿主题（openpyxl的Workbook.loaded_theme）中各主题颜色的RGB，按openpyxl的主题颜色序号排列
+
+    Args:
+        theme_xml: 主题XML，没有主题时为None
+
+    Returns:
+        list: 各主题颜色的RGB元组（无法解析时为None）
+    """
+    if not theme_xml:
+        return []
+    try:
+        scheme = ET.fromstring(theme_xml).find(f".//{_DRAWINGML}clrScheme")
+    except ET.ParseError:
+        return []
+    colors = []
+    for name in THEME_COLOR_ORDER:
+        element = scheme.find(f"{_DRAWINGML}{name}") if scheme is not None else None
+        rgb = None
+        if element is not None and len(element):
+            color = element[0]
+            # 系统颜色（如窗口文字色）取其最近一次的实际颜色
+            rgb = _rgb_from_hex(color.get("val") if color.tag == f"{_DRAWINGML}srgbClr" else color.get("lastClr"))
+        colors.append(rgb)
+    return colors
+
+
+def _color_rgb(color, theme_colors: Sequence[Optional[Tuple[int, int, int]]]) -> Optional[Tuple[int, int, int]]:
+    """
+    openpyxl颜色对象转为RGB元组（支持RGB、调色板序号和主题颜色；带明暗调整的主题颜色不视为原色）
+
+    Args:
+        color: openpyxl.styles.colors.Color
+        theme_colors: 各主题颜色的RGB（见_theme_colors）
+
+    Returns:
+        tuple: RGB，无法确定时为None
+    """
+    from openpyxl.styles.colors import COLOR_INDEX
+
+    kind = getattr(color, "type", None)
+    if kind == "rgb":
+        return _rgb_from_hex(color.rgb)
+    if kind == "indexed" and 0 <= color.indexed < len(COLOR_INDEX):
+        return _rgb_from_hex(COLOR_INDEX[color.indexed])
+    if kind == "theme" and not color.tint and 0 <= color.theme < len(theme_colors):
+        return theme_colors[color.theme]
+    return None
+
+
+def _pad_rows(rows: Sequence[Sequence[int]], width: int) -> np.ndarray:
+    """将各行长度不同的格式编号补齐为二维数组（缺失处为-1）"""
+    matrix = np.full((len(rows), width), -1, dtype=np.int64)
+    for i, row in enumerate(rows):
+        matrix[i, :len(row)] = row
+    return matrix
+
+
+def _lookup(style_ids: np.ndarray, is_target: np.ndarray) -> np.ndarray:
+    """按格式编号查表得到掩码（-1或越界的编号为False）"""
+    table = np.append(is_target, False)     # 下标-1对应末尾的False
+    style_ids = np.where((style_ids >= 0) & (style_ids < len(is_target)), style_ids, -1)
+    return table[style_ids]
+
+
+def read_fill_mask_xls(excel_file: str, sheet_name: str, rgb: Tuple[int, int, int] = YELLOW_RGB) -> np.ndarray:
+    """
+    读取.xls工作表的填充色掩码
+
+    Args:
+        excel_file: 工作簿路径
+        sheet_name: 工作表名称
+        rgb: 目标填充色
+
+    Returns:
+        ndarray: (行数, 列数)布尔掩码，[0, 0]对应A1
+    """
+    import xlrd
+
+    book = xlrd.open_workbook(excel_file, formatting_info=True, on_demand=True)
+    try:
+        sheet = book.sheet_by_name(sheet_name)
+        is_target = np.array([
+            xf.background.fill_pattern != 0
+            and book.colour_map.get(xf.background.pattern_colour_index) == rgb
+            for xf in book.xf_list
+        ], dtype=bool)
+        xf_ids = _pad_rows([[sheet.cell_xf_index(r, c) for c in range(sheet.row_len(r))]
+                            for r in range(sheet.nrows)], sheet.ncols)
+        return _lookup(xf_ids, is_target)
+    finally:
+        book.release_resources()
+
+
+def read_fill_mask_xlsx(excel_file: str, sheet_name: str, rgb: Tuple[int, int, int] = YELLOW_RGB) -> np.ndarray:
+    """
+    读取.xlsx工作表的填充色掩码（openpyxl只读模式）
+
+    Args:
+        excel_file: 工作簿路径
+        sheet_name: 工作表名称
+        rgb: 目标填充色
+
+    Returns:
+        ndarray: (行数, 列数)布尔掩码，[0, 0]对应A1
+    """
+    wb = openpyxl.load_workbook(excel_file, read_only=True)
+    try:
+        ws = wb[sheet_name]
+        theme_colors = _theme_colors(wb.loaded_theme)
+        # 同一种填充为同一个对象，每种填充只判断一次颜色
+        fill_is_target: Dict[int, bool] = {}
+
+        def is_target(cell) -> bool:
+            fill = getattr(cell, "fill", None)      # 空单元格（EmptyCell）没有格式
+            if fill is None:
+                return False
+            key = id(fill)
+            if key not in fill_is_target:
+                fill_is_target[key] = (getattr(fill, "fill_type", None) is not None
+                                       and _color_rgb(fill.fgColor, theme_colors) == rgb)
+            return fill_is_target[key]
+
+        rows = [[is_target(cell) for cell in row] for row in ws.iter_rows()]
+        return _pad_rows(rows, max((len(row) for row in rows), default=0)) > 0
+    finally:
+        wb.close()
+
+
+def read_fill_mask(excel_file: str, sheet_name: str, rgb: Tuple[int, int, int] = YELLOW_RGB) -> np.ndarray:
+    """
+    读取工作表的填充色掩码（按扩展名选择.xls或.xlsx的读取方式）
+
+    Args:
+        excel_file: 工作簿路径
+        sheet_name: 工作表名称
+        rgb: 目标填充色
+
+    Returns:
+        ndarray: (行数, 列数)布尔掩码，[0, 0]对应A1
+    """
+    if os.path.splitext(excel_file)[1].lower() == ".xls":
+        return read_fill_mask_xls(excel_file, sheet_name, rgb)
+    return read_fill_mask_xlsx(excel_file, sheet_name, rgb)
+
+
+def align_mask(mask: np.ndarray, shape: Tuple[int, int], header_rows: int = 1) -> np.ndarray:
+    """
+    将工作表坐标的掩码对齐到pandas读取的DataFrame（去掉表头行，按DataFrame形状截取或补齐）
+
+    Args:
+        mask: 工作表坐标的掩码
+        shape: DataFrame的形状
+        header_rows: 作为表头的行数（pandas默认1行）
+
+    Returns:
+        ndarray: 与DataFrame形状相同的掩码
+    """
+    aligned = np.zeros(shape, dtype=bool)
+    body = mask[header_rows:header_rows + shape[0], :shape[1]]
+    aligned[:body.shape[0], :body.shape[1]] = body
+    return aligned
+
+
+class InputCellIndex:
+    """
+    输入单元格的稀疏坐标索引：各输入模块内黄色单元格的(行, 列)坐标
+
+    坐标为模块内的相对位置（与DataLoader.get_input_module返回的模块DataFrame对应）。
+    """
+
+    def __init__(self, mask: np.ndarray, module_ranges: Optional[Dict[str, Tuple[int, int]]] = None):
+        """
+        Args:
+            mask: 与输入工作表DataFrame对齐的掩码
+            module_ranges: 模块名称到行范围的映射，默认为get_input_module_ranges()
+        """
+        self.mask = mask
+        self.module_ranges = module_ranges or get_input_module_ranges()
+        rows, cols = np.nonzero(mask)
+        self._modules: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for module_name, (start_row, end_row) in self.module_ranges.items():
+            # 行范围从1开始，与DataFrame的iloc[start_row-1:end_row]对应
+            lo, hi = np.searchsorted(rows, [start_row - 1, end_row])
+            self._modules[module_name] = (rows[lo:hi] - (start_row - 1), cols[lo:hi])
+
+    def __len__(self) -> int:
+        """各模块内输入单元格总数"""
+        return int(sum(len(rows) for rows, _ in self._modules.values()))
+
+    def module_coords(self, module_name: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        模块内输入单元格的坐标
+
+        Args:
+            module_name: 模块名称
+
+        Returns:
+            tuple: (行坐标数组, 列坐标数组)
+        """
+        if module_name not in self._modules:
+            raise ValueError(f"未知模块: {module_name}")
+        return self._modules[module_name]
+
+    def cells(self, module_name: str) -> List[Tuple[int, int]]:
+        """
+        模块内输入单元格的坐标列表
+
+        Args:
+            module_name: 模块名称
+
+        Returns:
+            list: [(row, col), ...]
+        """
+        rows, cols = self.module_coords(module_name)
+        return list(zip(rows.tolist(), cols.tolist()))
+
+    def modules(self) -> Iterable[str]:
+        """模块名称"""
+        return self._modules.keys()
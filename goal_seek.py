@@ -0,0 +1,218 @@
+"""
+目标求解（单变量求解）
+求使财务指标（IRR、NPV）达到目标值的输入参数值，如"资产销售总价为多少时FIRR = 8%"。
+先扩展区间直至目标函数变号，再用Brent法求根；每次试算只使受该参数影响的计算节点失效，
+并且只计算财务指标节点，其余中间结果直接复用计算引擎的缓存。
+"""
+import copy
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from year_generator import YearGenerator
+from data_models import InputData
+from calculation_engine import CalculationEngine
+from batch_engine import get_input_value, apply_override
+
+
+# 可求解的指标
+METRICS = ["npv", "irr", "payback_period"]
+
+
+class GoalSeekResult:
+    """目标求解结果"""
+
+    def __init__(self, path: str, metric: str, target: float, value: float, achieved: float,
+                 converged: bool, history: List[Tuple[float, float]]):
+        """
+        Args:
+            path: 求解的参数路径
+            metric: 指标名称
+            target: 目标值
+            value: 求得的参数值
+            achieved: 该参数值下的指标值
+            converged: 是否收敛
+            history: 各次试算的(参数值, 指标值)
+        """
+        self.path = path
+        self.metric = metric
+        self.target = target
+        self.value = value
+        self.achieved = achieved
+        self.converged = converged
+        self.history = history
+
+    @property
+    def evaluations(self) -> int:
+        """试算次数"""
+        return len(self.history)
+
+    def history_frame(self) -> pd.DataFrame:
+        """各次试算记录"""
+        return pd.DataFrame(self.history, columns=["参数值", "指标值"])
+
+
+class GoalSeek:
+    """目标求解"""
+
+    def __init__(self, year_generator: YearGenerator, input_data: InputData):
+        """
+        初始化目标求解
+
+        Args:
+            year_generator: 年份生成器
+            input_data: 基准输入数据（不会被修改，应为未经计算的原始输入）
+        """
+        self.yg = year_generator
+        self.input = input_data
+        self.engine = CalculationEngine(year_generator, copy.deepcopy(input_data))
+        self.engine.set_input(input_data)
+
+    def evaluate(self, path: str, value: float, metric: str) -> float:
+        """
+        计算参数取给定值时的指标（增量计算，只计算财务指标节点）
+
+        Args:
+            path: 参数路径
+            value: 参数值
+            metric: 指标名称
+
+        Returns:
+            float: 指标值
+        """
+        trial = copy.copy(self.input)
+        section = path.split(".")[0]
+        setattr(trial, section, copy.deepcopy(getattr(self.input, section)))
+        apply_override(trial, path, value, self.yg)
+        self.engine.set_input(trial)
+        return float(self.engine.graph.get("kpis")[metric])
+
+    def solve(self, path: str, metric: str, target: float, low: Optional[float] = None,
+              high: Optional[float] = None, tol: float = 1e-9, max_iter: int = 50,
+              max_expand: int = 30) -> GoalSeekResult:
+        """
+        求使指标达到目标值的参数值
+
+        未给出区间时，从基准值±10%出发向外扩展区间，直至指标与目标值之差变号。
+
+        Args:
+            path: 参数路径，如"asset_sales_plan.total_sales_price"、"sales_revenue.annual_revenue[第4年]"
+            metric: 指标名称，npv（万元）、irr（小数，如0.08）或payback_period（年）
+            target: 目标值
+            low: 区间下限
+            high: 区间上限
+            tol: 收敛精度（参数值的相对变化量）
+            max_iter: Brent法最大迭代次数
+            max_expand: 最大区间扩展次数
+
+        Returns:
+            GoalSeekResult: 求解结果
+        """
+        if metric not in METRICS:
+            raise ValueError(f"不支持的指标: {metric}")
+        base = get_input_value(self.input, path)
+        if isinstance(base, (dict, list)):
+            raise ValueError(f"目标求解只支持标量参数，请带下标指定: {path}")
+
+        history: List[Tuple[float, float]] = []
+
+        def f(x: float) -> float:
+            achieved = self.evaluate(path, x, metric)
+            history.append((x, achieved))
+            if np.isnan(achieved):
+                raise ValueError(f"参数值为{x:g}时{metric}无解，请指定求解区间")
+            return achieved - target
+
+        base = float(base)
+        step = abs(base) * 0.1 or 1.0
+        a = base - step if low is None else low
+        b = base + step if high is None else high
+        fa, fb = f(a), f(b)
+
+        # 扩展区间直至变号（给定的端点保持不动）：优先沿弦截方向外推并越过弦截点半个区间宽度，
+        # 指标对参数近似线性时一步即可括住根；外推过远或方向不允许时按1.6倍扩展
+        for _ in range(max_expand):
+            if fa * fb <= 0 or (low is not None and high is not None):
+                break
+            width = b - a
+            secant = b - fb * width / (fb - fa) if fb != fa else np.nan
+            if np.isfinite(secant) and a - 100 * width <= secant < a and low is None:
+                a = secant - 0.5 * width
+                fa = f(a)
+            elif np.isfinite(secant) and b < secant <= b + 100 * width and high is None:
+                b = secant + 0.5 * width
+                fb = f(b)
+            elif high is not None or (low is None and abs(fa) < abs(fb)):
+                a = a - 1.6 * width
+                fa = f(a)
+            else:
+                b = b + 1.6 * width
+                fb = f(b)
+        if fa * fb > 0:
+            raise ValueError(f"在区间[{a:g}, {b:g}]内找不到使{metric}达到{target:g}的参数值")
+
+        value, converged = self._brent(f, a, b, fa, fb, tol, max_iter)
+        achieved = next(y for x, y in reversed(history) if x == value)
+        return GoalSeekResult(path, metric, target, value, achieved, converged, history)
+
+    @staticmethod
+    def _brent(f, a: float, b: float, fa: float, fb: float, tol: float, max_iter: int) -> Tuple[float, bool]:
+        """
+        Brent法求根（逆二次插值/弦截法，步长不理想时退回二分）
+
+        Args:
+            f: 目标函数
+            a, b: 有根区间
+            fa, fb: 区间端点的函数值（异号）
+            tol: 收敛精度（相对）
+            max_iter: 最大迭代次数
+
+        Returns:
+            tuple: (根, 是否收敛)
+        """
+        if fa == 0:
+            return a, True
+        if fb == 0:
+            return b, True
+
+        c, fc = a, fa
+        d = e = b - a
+        for _ in range(max_iter):
+            if fb * fc > 0:
+                c, fc = a, fa
+                d = e = b - a
+            if abs(fc) < abs(fb):
+                a, b, c = b, c, b
+                fa, fb, fc = fb, fc, fb
+
+            tol1 = 2 * np.finfo(float).eps * abs(b) + 0.5 * tol * max(abs(b), 1.0)
+            m = 0.5 * (c - b)
+            if abs(m) <= tol1 or fb == 0:
+                return b, True
+
+            if abs(e) >= tol1 and abs(fa) > abs(fb):
+                s = fb / fa
+                if a == c:
+                    # 弦截法
+                    p, q = 2 * m * s, 1 - s
+                else:
+                    # 逆二次插值
+                    q, r = fa / fc, fb / fc
+                    p = s * (2 * m * q * (q - r) - (b - a) * (r - 1))
+                    q = (q - 1) * (r - 1) * (s - 1)
+                if p > 0:
+                    q = -q
+                p = abs(p)
+                if 2 * p < min(3 * m * q - abs(tol1 * q), abs(e * q)):
+                    e, d = d, p / q
+                else:
+                    d = e = m
+            else:
+                d = e = m
+
+            a, fa = b, fb
+            b += d if abs(d) > tol1 else (tol1 if m > 0 else -tol1)
+            fb = f(b)
+
+        return b, False
@@ -1,10 +1,13 @@
 """
 输入数据收集器
-从Streamlit表单收集数据并构建InputData对象
+由表单控件的取值（控件key到值的映射）构建InputData对象。
+build_input_data不依赖Streamlit，可供批处理脚本直接使用；collect_input_data从Streamlit session state读取。
+控件key与InputData字段的对应关系统一定义在input_mapping中。
 """
-import streamlit as st
+from typing import Any, Mapping
+
 from data_models import InputData
-from year_generator import YearGenerator
+from input_mapping import build_from_form
 
 
 def collect_input_data(construction_period: int, operation_period: int) -> InputData:
@@ -18,168 +21,22 @@ def collect_input_data(construction_period: int, operation_period: int) -> Input
     Returns:
         InputData: 输入数据对象
     """
-    # 获取session state中的所有输入值
-    input_data = InputData()
-
-    # 1. 基础信息
-    input_data.basic_info.project_name = st.session_state.get("project_name", "")
-    input_data.basic_info.construction_period = construction_period
-    input_data.basic_info.operation_period = operation_period
-
-    # 2. 项目投资
-    inv = input_data.project_investment
-    inv.building_cost = st.session_state.get("building_cost", 0.0)
-    inv.building_equipment_cost = st.session_state.get("building_equipment", 0.0)
-    inv.building_installation_cost = st.session_state.get("building_install", 0.0)
-    inv.production_equipment_cost = st.session_state.get("production_equipment", 0.0)
-    inv.production_installation_cost = st.session_state.get("production_install", 0.0)
-    inv.management_fee = st.session_state.get("management_fee", 0.0)
-    inv.tech_service_fee = st.session_state.get("tech_service_fee", 0.0)
-    inv.supporting_fee = st.session_state.get("supporting_fee", 0.0)
-    inv.land_use_fee = st.session_state.get("land_use_fee", 0.0)
-    inv.patent_fee = st.session_state.get("patent_fee", 0.0)
-    inv.preparation_fee = st.session_state.get("preparation_fee", 0.0)
-    inv.basic_reserve_rate = st.session_state.get("basic_reserve_rate", 0.0)
-    inv.price_reserve_rate = st.session_state.get("price_reserve_rate", 0.0)
-    inv.construction_interest = st.session_state.get("construction_interest", 0.0)  # 建设期利息
-    inv.equipment_tax_rate = st.session_state.get("equipment_tax_rate", 13.0)  # 默认13%
-    inv.construction_tax_rate = st.session_state.get("construction_tax_rate", 9.0)  # 默认9%
-    inv.service_tax_rate = st.session_state.get("service_tax_rate", 6.0)  # 默认6%
-
-    # 3. 资产形成（根据Excel Row 32-45）
-    asset_form = input_data.asset_formation
-
-    # 固定资产 - 房屋建筑
-    asset_form.building_fixed_asset.depreciation_years = st.session_state.get("building_depr_years", 20)
-    asset_form.building_fixed_asset.salvage_rate = st.session_state.get("building_salvage_rate", 5.0)
-
-    # 固定资产 - 机械设备
-    asset_form.equipment_fixed_asset.depreciation_years = st.session_state.get("equipment_depr_years", 10)
-    asset_form.equipment_fixed_asset.salvage_rate = st.session_state.get("equipment_salvage_rate", 5.0)
-
-    # 无形资产 - 土地使用权
-    asset_form.land_intangible_asset.amortization_years = st.session_state.get("land_amort_years", 50)
-
-    # 无形资产 - 专利权
-    asset_form.patent_intangible_asset.amortization_years = st.session_state.get("patent_amort_years", 6)
-
-    # 其他资产
-    asset_form.other_asset.amortization_years = st.session_state.get("other_amort_years", 5)
-
-    # 4. 资产销售计划
-    sales_plan = input_data.asset_sales_plan
-    sales_plan.asset_sell_ratio = st.session_state.get("building_sell_ratio", 25.0) / 100
-    sales_plan.land_sell_ratio = st.session_state.get("land_sell_ratio", 25.0) / 100
-    sales_plan.self_hold_ratio = st.session_state.get("self_hold_ratio", 75.0) / 100
-    sales_plan.asset_sales_revenue = st.session_state.get("total_sales_price", 66285.86)
-    
-    # 收集年度销售比例（固定10年销售期）
-    # annual_ratio_0 ~ annual_ratio_9 对应运营期第1-10年
-    annual_sales_ratios = []
-    for i in range(10):
-        ratio = st.session_state.get(f"annual_ratio_{i}", 0.0)
-        annual_sales_ratios.append(ratio)
-
-    sales_plan.annual_sales_ratios = annual_sales_ratios
-
-    # 5. 销售收入
-    sales_rev = input_data.sales_revenue
-    # 需要创建 year_generator 来获取年份列表
-    yg = YearGenerator(construction_period, operation_period)
-    years = yg.generate_year_names()
-    sales_rev.annual_revenue = {}
-    for year in years:
-        year_num = yg.get_year_index(year)
-        if yg.is_construction_year(year_num):
-            # 建设期自动设为0
-            sales_rev.annual_revenue[year] = 0.0
-        else:
-            key = f"sales_{year}"
-            sales_rev.annual_revenue[year] = st.session_state.get(key, 10000.0)
+    import streamlit as st
 
-    # 6. 材料成本
-    mat_cost = input_data.material_cost
-    for year in years:
-        year_num = yg.get_year_index(year)
-        if yg.is_construction_year(year_num):
-            # 建设期自动设为0
-            for i in range(1, 9):
-                getattr(mat_cost, f"material_{i}", {}).__setitem__(year, 0.0)
-        else:
-            # 收集所有8种材料
-            for i in range(1, 9):
-                key = f"mat{i}_{year}"
-                getattr(mat_cost, f"material_{i}", {}).__setitem__(year, st.session_state.get(key, 0.0))
+    return build_input_data(st.session_state, construction_period, operation_period)
 
-    # 7. 燃料成本
-    fuel_cost = input_data.fuel_cost
-    for year in years:
-        year_num = yg.get_year_index(year)
-        if yg.is_construction_year(year_num):
-            # 建设期自动设为0
-            for i in range(1, 9):
-                getattr(fuel_cost, f"fuel_{i}", {}).__setitem__(year, 0.0)
-        else:
-            # 收集所有8种燃料
-            for i in range(1, 9):
-                key = f"fuel{i}_{year}"
-                getattr(fuel_cost, f"fuel_{i}", {}).__setitem__(year, st.session_state.get(key, 0.0))
 
-    # 8. 人工成本
-    labor = input_data.labor_cost
-    labor.admin_persons = st.session_state.get("admin_persons", 0)
-    labor.admin_salary = st.session_state.get("admin_salary", 0.0)
-    labor.tech_persons = st.session_state.get("tech_persons", 0)
-    labor.tech_salary = st.session_state.get("tech_salary", 0.0)
-    labor.security_persons = st.session_state.get("security_persons", 0)
-    labor.security_salary = st.session_state.get("security_salary", 0.0)
-    labor.cleaning_persons = st.session_state.get("cleaning_persons", 0)
-    labor.cleaning_salary = st.session_state.get("cleaning_salary", 0.0)
-    labor.welfare_rate = st.session_state.get("welfare_rate", 14.0) / 100
-
-    # 9. 其他费用
-    other = input_data.other_costs
-    other.repair_rate = st.session_state.get("repair_rate", 0.5) / 100
-    other.other_mfg_rate = st.session_state.get("other_mfg_rate", 0.0) / 100
-    other.other_mgt_rate = st.session_state.get("other_mgt_rate", 0.0) / 100
-    other.other_sales_rate = st.session_state.get("other_sales_rate", 0.0) / 100
-
-    # 10. 税收参数
-    tax = input_data.tax_params
-    tax.corporate_tax_rate = st.session_state.get("corporate_tax_rate", 25.0) / 100
-    tax.city_tax_rate = st.session_state.get("city_tax_rate", 7.0) / 100
-    tax.education_tax_rate = st.session_state.get("education_tax_rate", 5.0) / 100
-    tax.discount_rate = st.session_state.get("discount_rate", 6.0) / 100
-
-    # 11. 银行借款
-    loan = input_data.bank_loan_plan
-    loan.interest_rate = st.session_state.get("loan_interest_rate", 5.88)
-    loan.repayment_period = st.session_state.get("repayment_years", 15)
-    loan.repayment_method = st.session_state.get("repayment_method", "等额本金")
-    loan.grace_period = st.session_state.get("grace_period", 2)
-
-    # 收集建设期年度借款金额
-    investment_years = years[:construction_period]  # 只显示建设期年份
-    loan.loan_years = [i + 1 for i in range(construction_period)]  # 借款年份 (1, 2, 3...)
-    loan.loan_amounts = []
-    for year in investment_years:
-        yearly_loan = st.session_state.get(f"yearly_loan_{year}", 5000.0)
-        loan.loan_amounts.append(yearly_loan)
-
-    # 10.1 投融资计划
-    inv_plan = input_data.investment_plan
-    inv_plan.equity_fund = []
-    inv_plan.loan_fund = []
-    for year in investment_years:
-        equity = st.session_state.get(f"equity_{year}", 10000.0)
-        loan_fund = st.session_state.get(f"loan_{year}", 5000.0)
-        inv_plan.equity_fund.append(equity)
-        inv_plan.loan_fund.append(loan_fund)
+def build_input_data(values: Mapping[str, Any], construction_period: int, operation_period: int) -> InputData:
+    """
+    由表单控件的取值构建输入数据（缺少的控件取默认值）
 
-    # 12. 其他参数
-    tax.reserve_fund_rate = st.session_state.get("reserve_fund_rate", 10.0) / 100
-    tax.loss_carryforward_years = st.session_state.get("loss_carryforward_years", 5)
-    tax.tax_benefit_coefficient = st.session_state.get("tax_benefit_coeff", 1.0)
-    tax.subsidy_income = {}  # 目前暂无补贴收入输入
+    Args:
+        values: 控件key到值的映射，如st.session_state或从文件读取的字典
+        construction_period: 建设期（年）
+        operation_period: 运营期（年）
 
-    return input_data
+    Returns:
+        InputData: 输入数据对象
+    """
+    # 控件key、默认值及单位换算见input_mapping中的映射表
+    return build_from_form(values, construction_period, operation_period)
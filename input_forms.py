@@ -512,8 +512,8 @@ class InputForms:
         """
         years = generate_years(construction_period, operation_period)
 
-        # 加载输入数据
-        input_values = self.data_loader.extract_input_values(
+        # 加载输入默认值（进程内共享缓存，工作簿未变化时不重新读取）
+        input_values = self.data_loader.get_input_defaults(
             construction_period, operation_period
         )
 
@@ -0,0 +1,543 @@
+"""
+输入字段映射表
+以一张声明式映射表统一描述每个输入字段：InputData字段路径、表单控件key、参数工作表（JZGCCW01）单元格地址及单位约定。
+由表单取值构建InputData（input_collector.build_input_data）和从工作簿导入InputData（load_input_data）都按此表进行；
+工作簿导入时将映射表编译为行列下标数组，对工作表数组做一次下标取值即可得到所有字段的值。
+
+单位约定：工作表中的税率、比例按小数存储（如0.25），表单中按百分数输入（如25）；
+InputData中的比例字段按各字段原有约定存储，PERCENT为百分数（如残值率5.0），FRACTION为小数（如所得税税率0.25）。
+"""
+from __future__ import annotations
+
+import functools
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+import config
+from data_models import InputData
+from utils import lazy_import
+from year_generator import YearGenerator
+
+pd = lazy_import("pandas")
+
+
+# 单位
+AMOUNT = "万元"
+YEARS = "年"
+COUNT = "人"
+PERCENT = "%"        # InputData中为百分数（表单同为百分数，工作表为小数）
+FRACTION = "比例"    # InputData中为小数（表单为百分数，工作表同为小数）
+FACTOR = "系数"
+TEXT = "文本"
+
+# 按年取值的字段的取值范围
+OPERATION = "operation"          # 按年字典，建设期各年为0
+CONSTRUCTION = "construction"    # 建设期各年的列表
+SALES = "sales"                  # 从运营期第1年起的定长列表
+
+# 工作表中第1年所在的列
+FIRST_YEAR_COLUMN = "H"
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """
+    单值输入字段
+
+    Attributes:
+        path: InputData字段路径，如"project_investment.building_cost"
+        unit: 单位
+        form_key: 表单控件key，为None时表单不提供该字段
+        default: 表单未填写时的默认值（表单单位）
+        cell: 工作表单元格地址，如"F12"，为None时工作表不提供该字段
+    """
+    path: str
+    unit: str
+    form_key: Optional[str] = None
+    default: Any = 0.0
+    cell: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class SeriesSpec:
+    """
+    按年（或按序号）取值的输入字段
+
+    Attributes:
+        path: InputData字段路径
+        unit: 单位
+        form_key: 表单控件key模板，{year}为年份名称（如"第4年"），{i}为序号（从0开始）
+        default: 表单未填写时的默认值（表单单位）
+        rows: 工作表行号，多行时逐年求和（如各收入项合计为年度销售收入）
+        span: 取值范围，OPERATION、CONSTRUCTION或SALES
+        length: span为SALES时的列表长度
+        sheet_years: 工作表中该行的年份列数（之后为合计等其他列），0表示不限
+    """
+    path: str
+    unit: str
+    form_key: str
+    default: Any
+    rows: Tuple[int, ...]
+    span: str = OPERATION
+    length: int = 0
+    sheet_years: int = 0
+
+
+# 资产销售计划模块中供表单显示的计算结果：(key, 单元格地址, 单位)
+SALES_PLAN_SUMMARY_CELLS = [
+    ("sales_building_value", "G51", AMOUNT),
+    ("building_sell_ratio", "F51", FRACTION),
+    ("hold_building_value", "G54", AMOUNT),
+    ("hold_land_value", "G55", AMOUNT),
+    ("sales_land_value", "G52", AMOUNT),
+    ("land_sell_ratio", "F52", FRACTION),
+]
+
+# 工作表中的建设期、运营期
+PERIOD_CELLS = {"construction_period": "E3", "operation_period": "E4"}
+
+FIELDS: List[FieldSpec] = [
+    # 1. 基础信息
+    FieldSpec("basic_info.project_name", TEXT, "project_name", "", "E2"),
+
+    # 2. 项目投资
+    FieldSpec("project_investment.building_cost", AMOUNT, "building_cost", 0.0, "F12"),
+    FieldSpec("project_investment.building_equipment_cost", AMOUNT, "building_equipment", 0.0, "F13"),
+    FieldSpec("project_investment.building_installation_cost", AMOUNT, "building_install", 0.0, "F14"),
+    FieldSpec("project_investment.production_equipment_cost", AMOUNT, "production_equipment", 0.0, "F15"),
+    FieldSpec("project_investment.production_installation_cost", AMOUNT, "production_install", 0.0, "F16"),
+    FieldSpec("project_investment.management_fee", AMOUNT, "management_fee", 0.0, "F19"),
+    FieldSpec("project_investment.tech_service_fee", AMOUNT, "tech_service_fee", 0.0, "F20"),
+    FieldSpec("project_investment.supporting_fee", AMOUNT, "supporting_fee", 0.0, "F21"),
+    FieldSpec("project_investment.land_use_fee", AMOUNT, "land_use_fee", 0.0, "F22"),
+    FieldSpec("project_investment.patent_fee", AMOUNT, "patent_fee", 0.0, "F23"),
+    FieldSpec("project_investment.preparation_fee", AMOUNT, "preparation_fee", 0.0, "F24"),
+    FieldSpec("project_investment.basic_reserve", AMOUNT, cell="F25"),
+    FieldSpec("project_investment.price_reserve", AMOUNT, cell="F26"),
+    FieldSpec("project_investment.basic_reserve_rate", PERCENT, "basic_reserve_rate", 0.0),
+    FieldSpec("project_investment.price_reserve_rate", PERCENT, "price_reserve_rate", 0.0),
+    FieldSpec("project_investment.construction_interest", AMOUNT, "construction_interest", 0.0, "F27"),
+    FieldSpec("project_investment.equipment_tax_rate", PERCENT, "equipment_tax_rate", 13.0, "I13"),
+    FieldSpec("project_investment.construction_tax_rate", PERCENT, "construction_tax_rate", 9.0, "I12"),
+    FieldSpec("project_investment.service_tax_rate", PERCENT, "service_tax_rate", 6.0, "I19"),
+
+    # 3. 资产形成
+    FieldSpec("asset_formation.building_fixed_asset.depreciation_years", YEARS, "building_depr_years", 20, "K37"),
+    FieldSpec("asset_formation.building_fixed_asset.salvage_rate", PERCENT, "building_salvage_rate", 5.0, "L37"),
+    FieldSpec("asset_formation.equipment_fixed_asset.depreciation_years", YEARS, "equipment_depr_years", 10, "K38"),
+    FieldSpec("asset_formation.equipment_fixed_asset.salvage_rate", PERCENT, "equipment_salvage_rate", 5.0, "L38"),
+    FieldSpec("asset_formation.building_fixed_asset.depreciation_method", TEXT, "building_depr_method", "直线法"),
+    FieldSpec("asset_formation.equipment_fixed_asset.depreciation_method", TEXT, "equipment_depr_method", "直线法"),
+    FieldSpec("asset_formation.land_intangible_asset.amortization_years", YEARS, "land_amort_years", 50, "K40"),
+    FieldSpec("asset_formation.patent_intangible_asset.amortization_years", YEARS, "patent_amort_years", 6, "K41"),
+    FieldSpec("asset_formation.other_asset.amortization_years", YEARS, "other_amort_years", 5, "K42"),
+
+    # 4. 资产销售计划
+    FieldSpec("asset_sales_plan.building_sell_ratio", FRACTION, "building_sell_ratio", 25.0, "F51"),
+    FieldSpec("asset_sales_plan.land_sell_ratio", FRACTION, "land_sell_ratio", 25.0, "F52"),
+    FieldSpec("asset_sales_plan.self_hold_ratio", FRACTION, "self_hold_ratio", 75.0, "F54"),
+    FieldSpec("asset_sales_plan.total_sales_price", AMOUNT, "total_sales_price", 66285.86, "G53"),
+
+    # 8. 人工成本
+    FieldSpec("labor_cost.admin_persons", COUNT, "admin_persons", 0, "F216"),
+    FieldSpec("labor_cost.admin_salary", AMOUNT, "admin_salary", 0.0, "F217"),
+    FieldSpec("labor_cost.tech_persons", COUNT, "tech_persons", 0, "F220"),
+    FieldSpec("labor_cost.tech_salary", AMOUNT, "tech_salary", 0.0, "F221"),
+    FieldSpec("labor_cost.security_persons", COUNT, "security_persons", 0, "F224"),
+    FieldSpec("labor_cost.security_salary", AMOUNT, "security_salary", 0.0, "F225"),
+    FieldSpec("labor_cost.cleaning_persons", COUNT, "cleaning_persons", 0, "F228"),
+    FieldSpec("labor_cost.cleaning_salary", AMOUNT, "cleaning_salary", 0.0, "F229"),
+    FieldSpec("labor_cost.welfare_rate", FRACTION, "welfare_rate", 14.0, "F232"),
+
+    # 9. 其他费用（工作表中修理费、其他费用按年填写金额，没有费率单元格）
+    FieldSpec("other_costs.repair_rate", FRACTION, "repair_rate", 0.5),
+    FieldSpec("other_costs.other_mfg_rate", FRACTION, "other_mfg_rate", 0.0),
+    FieldSpec("other_costs.other_mgt_rate", FRACTION, "other_mgt_rate", 0.0),
+    FieldSpec("other_costs.other_sales_rate", FRACTION, "other_sales_rate", 0.0),
+
+    # 10. 税收参数
+    FieldSpec("tax_params.corporate_tax_rate", FRACTION, "corporate_tax_rate", 25.0, "F248"),
+    FieldSpec("tax_params.city_tax_rate", FRACTION, "city_tax_rate", 7.0, "F257"),
+    FieldSpec("tax_params.education_tax_rate", FRACTION, "education_tax_rate", 5.0, "F258"),
+    FieldSpec("tax_params.discount_rate", FRACTION, "discount_rate", 6.0, "F250"),
+
+    # 11. 银行借款
+    FieldSpec("bank_loan_plan.interest_rate", FRACTION, "loan_interest_rate", 5.88, "F102"),
+    FieldSpec("bank_loan_plan.repayment_period", YEARS, "repayment_years", 15, "J101"),
+    FieldSpec("bank_loan_plan.repayment_method", TEXT, "repayment_method", "等额本金"),
+    FieldSpec("bank_loan_plan.grace_period", YEARS, "grace_period", 2),
+    FieldSpec("bank_loan_plan.loan_limit", AMOUNT, "loan_limit", 0.0),
+
+    # 12. 其他参数（税收优惠系数取第1年的值）
+    FieldSpec("tax_params.reserve_fund_rate", FRACTION, "reserve_fund_rate", 10.0, "F249"),
+    FieldSpec("tax_params.loss_carryforward_years", YEARS, "loss_carryforward_years", 5, "H248"),
+    FieldSpec("tax_params.tax_benefit_coefficient", FACTOR, "tax_benefit_coeff", 1.0, "H249"),
+]
+
+SERIES: List[SeriesSpec] = [
+    # 4. 资产销售计划：annual_ratio_0 ~ annual_ratio_9 对应运营期第1-10年（工作表中只有第1-10年的列）
+    SeriesSpec("asset_sales_plan.annual_sales_ratios", PERCENT, "annual_ratio_{i}", 0.0, (50,), SALES, 10, 10),
+
+    # 5. 销售收入：各收入项的含税年收入合计
+    SeriesSpec("sales_revenue.annual_revenue", AMOUNT, "sales_{year}", 10000.0, tuple(range(119, 138, 3))),
+
+    # 6-7. 材料、燃料成本：各项的含税年成本
+    *[SeriesSpec(f"material_cost.material_{i}", AMOUNT, f"mat{i}_{{year}}", 0.0, (147 + 3 * i,))
+      for i in range(1, 9)],
+    *[SeriesSpec(f"fuel_cost.fuel_{i}", AMOUNT, f"fuel{i}_{{year}}", 0.0, (180 + 3 * i,))
+      for i in range(1, 9)],
+
+    # 10.1 投融资计划、11. 银行借款：建设期各年
+    SeriesSpec("bank_loan_plan.loan_amounts", AMOUNT, "yearly_loan_{year}", 5000.0, (108,), CONSTRUCTION),
+    SeriesSpec("investment_plan.equity_fund", AMOUNT, "equity_{year}", 10000.0, (103,), CONSTRUCTION),
+    SeriesSpec("investment_plan.loan_fund", AMOUNT, "loan_{year}", 5000.0, (108,), CONSTRUCTION),
+]
+
+
+def cell_index(address: str) -> Tuple[int, int]:
+    """
+    单元格地址转为从0开始的(行, 列)下标
+
+    Args:
+        address: 单元格地址，如"F12"
+
+    Returns:
+        tuple: (行下标, 列下标)，"A1"对应(0, 0)
+    """
+    match = re.fullmatch(r"([A-Z]+)(\d+)", address)
+    if match is None:
+        raise ValueError(f"无效的单元格地址: {address}")
+    col = 0
+    for letter in match.group(1):
+        col = col * 26 + ord(letter) - ord("A") + 1
+    return int(match.group(2)) - 1, col - 1
+
+
+def _set_path(input_data: InputData, path: str, value: Any) -> None:
+    """按字段路径赋值"""
+    *owners, name = path.split(".")
+    obj = input_data
+    for owner in owners:
+        obj = getattr(obj, owner)
+    setattr(obj, name, value)
+
+
+def _get_path(input_data: InputData, path: str) -> Any:
+    """按字段路径取值"""
+    obj = input_data
+    for name in path.split("."):
+        obj = getattr(obj, name)
+    return obj
+
+
+def _from_form(unit: str, value: Any) -> Any:
+    """表单取值转为InputData取值"""
+    return value / 100 if unit == FRACTION else value
+
+
+def _to_form(unit: str, value: Any) -> Any:
+    """InputData取值转为表单取值"""
+    return round(value * 100, 10) if unit == FRACTION else value
+
+
+def _from_sheet(unit: str, value: Any) -> Any:
+    """工作表取值转为InputData取值（工作表中的比例为小数）"""
+    if unit == TEXT:
+        return str(value)
+    if unit in (YEARS, COUNT):
+        return int(value)
+    if unit == PERCENT:
+        return round(float(value) * 100, 10)
+    return float(value)
+
+
+def sheet_to_form(unit: str, value: Any) -> Any:
+    """
+    工作表取值转为表单取值（表单中的比例为百分数）
+
+    Args:
+        unit: 单位
+        value: 工作表中的值
+
+    Returns:
+        表单中的值
+    """
+    if unit in (PERCENT, FRACTION):
+        return round(float(value) * 100, 10)
+    return _from_sheet(unit, value)
+
+
+def build_from_form(values: Mapping[str, Any], construction_period: int, operation_period: int) -> InputData:
+    """
+    按映射表由表单控件的取值构建输入数据（缺少的控件取默认值）
+
+    Args:
+        values: 控件key到值的映射
+        construction_period: 建设期（年）
+        operation_period: 运营期（年）
+
+    Returns:
+        InputData: 输入数据对象
+    """
+    input_data = InputData()
+    input_data.basic_info.construction_period = construction_period
+    input_data.basic_info.operation_period = operation_period
+
+    for spec in FIELDS:
+        if spec.form_key is not None:
+            _set_path(input_data, spec.path, _from_form(spec.unit, values.get(spec.form_key, spec.default)))
+
+    yg = YearGenerator(construction_period, operation_period)
+    years = yg.generate_year_names()
+    for spec in SERIES:
+        if spec.span == SALES:
+            value = [_from_form(spec.unit, values.get(spec.form_key.format(i=i), spec.default))
+                     for i in range(spec.length)]
+        elif spec.span == CONSTRUCTION:
+            value = [_from_form(spec.unit, values.get(spec.form_key.format(year=year), spec.default))
+                     for year in years[:construction_period]]
+        else:
+            value = {
+                year: 0.0 if yg.is_construction_year(yg.get_year_index(year))
+                else _from_form(spec.unit, values.get(spec.form_key.format(year=year), spec.default))
+                for year in years
+            }
+        _set_path(input_data, spec.path, value)
+
+    input_data.bank_loan_plan.loan_years = [i + 1 for i in range(construction_period)]
+    input_data.tax_params.subsidy_income = {}  # 目前暂无补贴收入输入
+    return input_data
+
+
+def form_values(input_data: InputData) -> Dict[str, Any]:
+    """
+    输入数据转为表单控件的取值（build_from_form的逆映射，用于以已有数据填充表单）
+
+    Args:
+        input_data: 输入数据
+
+    Returns:
+        dict: 控件key到值的映射
+    """
+    construction_period = input_data.basic_info.construction_period
+    values: Dict[str, Any] = {}
+    for spec in FIELDS:
+        if spec.form_key is not None:
+            values[spec.form_key] = _to_form(spec.unit, _get_path(input_data, spec.path))
+
+    for spec in SERIES:
+        value = _get_path(input_data, spec.path)
+        if spec.span == SALES:
+            for i, item in enumerate(value):
+                values[spec.form_key.format(i=i)] = _to_form(spec.unit, item)
+        elif spec.span == CONSTRUCTION:
+            for i, item in enumerate(value):
+                values[spec.form_key.format(year=f"第{i + 1}年")] = _to_form(spec.unit, item)
+        else:
+            for year, item in value.items():
+                if int(year[1:-1]) > construction_period:
+                    values[spec.form_key.format(year=year)] = _to_form(spec.unit, item)
+    return values
+
+
+class CompiledInputMap:
+    """
+    编译后的映射表：所有需要读取的单元格的行列下标数组
+
+    对工作表数组做一次下标取值得到全部单元格的值，再按各字段在结果中的位置切片赋值。
+    """
+
+    def __init__(self, construction_period: int, operation_period: int,
+                 fields: Sequence[FieldSpec] = FIELDS, series: Sequence[SeriesSpec] = SERIES):
+        """
+        Args:
+            construction_period: 建设期（年）
+            operation_period: 运营期（年）
+            fields: 单值字段
+            series: 按年取值的字段
+        """
+        self.construction_period = construction_period
+        self.operation_period = operation_period
+        first_year_col = cell_index(f"{FIRST_YEAR_COLUMN}1")[1]
+
+        rows: List[int] = []
+        cols: List[int] = []
+        # 各字段：(字段, 在取值结果中的起始位置, 行数, 列数)
+        self._slots: List[Tuple[Any, int, int, int]] = []
+
+        for spec in fields:
+            if spec.cell is None:
+                continue
+            row, col = cell_index(spec.cell)
+            self._slots.append((spec, len(rows), 1, 1))
+            rows.append(row)
+            cols.append(col)
+
+        for spec in series:
+            if spec.span == SALES:
+                year_nums = np.arange(spec.length) + construction_period + 1
+            elif spec.span == CONSTRUCTION:
+                year_nums = np.arange(1, construction_period + 1)
+            else:
+                year_nums = np.arange(1, construction_period + operation_period + 1)
+            year_cols = first_year_col + year_nums - 1
+            if spec.sheet_years:
+                # 超出年份列的年份不读取（列下标记为-1）
+                year_cols = np.where(year_nums <= spec.sheet_years, year_cols, -1)
+            spec_rows = np.repeat(np.asarray(spec.rows) - 1, len(year_nums))
+            spec_cols = np.tile(year_cols, len(spec.rows))
+            self._slots.append((spec, len(rows), len(spec.rows), len(year_nums)))
+            rows.extend(spec_rows.tolist())
+            cols.extend(spec_cols.tolist())
+
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.cols = np.asarray(cols, dtype=np.int64)
+
+    def gather(self, values: np.ndarray, header_rows: int = 1) -> np.ndarray:
+        """
+        一次下标取值得到所有单元格的值
+
+        Args:
+            values: 工作表数组（DataFrame.to_numpy()，表头行已去掉）
+            header_rows: 作为表头去掉的行数
+
+        Returns:
+            ndarray: 与self.rows等长的object数组，超出工作表范围或不读取的单元格为None
+        """
+        rows = self.rows - header_rows
+        valid = (rows >= 0) & (rows < values.shape[0]) & (self.cols >= 0) & (self.cols < values.shape[1])
+        gathered = np.full(len(rows), None, dtype=object)
+        gathered[valid] = values[rows[valid], self.cols[valid]]
+        return gathered
+
+    def read(self, values: np.ndarray, header_rows: int = 1) -> Dict[str, Any]:
+        """
+        读取工作表中的各字段（InputData单位）
+
+        Args:
+            values: 工作表数组（表头行已去掉）
+            header_rows: 作为表头去掉的行数
+
+        Returns:
+            dict: 字段路径到值的映射；单值字段的单元格为空时不包含该字段，按年字段的空单元格按0计
+        """
+        gathered = self.gather(values, header_rows)
+        numbers = pd.to_numeric(pd.Series(gathered), errors="coerce").to_numpy(dtype=float)
+        years = [f"第{i + 1}年" for i in range(self.construction_period + self.operation_period)]
+
+        result: Dict[str, Any] = {}
+        for spec, start, n_rows, n_cols in self._slots:
+            if isinstance(spec, FieldSpec):
+                raw = gathered[start] if spec.unit == TEXT else numbers[start]
+                if not pd.isna(raw) and raw != "":
+                    result[spec.path] = _from_sheet(spec.unit, raw)
+                continue
+
+            block = numbers[start:start + n_rows * n_cols].reshape(n_rows, n_cols)
+            totals = [_from_sheet(spec.unit, x) for x in np.nansum(block, axis=0)]
+            if spec.span == OPERATION:
+                result[spec.path] = {
+                    year: 0.0 if i < self.construction_period else totals[i]
+                    for i, year in enumerate(years)
+                }
+            else:
+                result[spec.path] = totals
+        return result
+
+
+@functools.lru_cache(maxsize=32)
+def compile_map(construction_period: int, operation_period: int) -> CompiledInputMap:
+    """
+    编译映射表（按计算期缓存）
+
+    Args:
+        construction_period: 建设期（年）
+        operation_period: 运营期（年）
+
+    Returns:
+        CompiledInputMap
+    """
+    return CompiledInputMap(construction_period, operation_period)
+
+
+def read_periods(values: np.ndarray, header_rows: int = 1) -> Tuple[int, int]:
+    """
+    读取工作表中的建设期和运营期
+
+    Args:
+        values: 工作表数组（表头行已去掉）
+        header_rows: 作为表头去掉的行数
+
+    Returns:
+        tuple: (建设期, 运营期)
+    """
+    periods = []
+    for name, address in PERIOD_CELLS.items():
+        row, col = cell_index(address)
+        value = pd.to_numeric(values[row - header_rows, col], errors="coerce")
+        if pd.isna(value):
+            raise ValueError(f"工作表{address}单元格缺少{name}")
+        periods.append(int(value))
+    return periods[0], periods[1]
+
+
+def read_cells(values: np.ndarray, cells: Sequence[Tuple[str, str, str]], header_rows: int = 1) -> Dict[str, Any]:
+    """
+    读取一组单元格并转为表单单位（空单元格不包含在结果中）
+
+    Args:
+        values: 工作表数组（表头行已去掉）
+        cells: [(key, 单元格地址, 单位), ...]
+        header_rows: 作为表头去掉的行数
+
+    Returns:
+        dict: key到值的映射
+    """
+    index = np.array([cell_index(address) for _, address, _ in cells], dtype=np.int64).reshape(-1, 2)
+    rows = index[:, 0] - header_rows
+    cols = index[:, 1]
+    valid = (rows >= 0) & (rows < values.shape[0]) & (cols < values.shape[1])
+    gathered = np.full(len(cells), None, dtype=object)
+    gathered[valid] = values[rows[valid], cols[valid]]
+    return {
+        key: sheet_to_form(unit, value)
+        for (key, _, unit), value in zip(cells, gathered)
+        if pd.notna(value)
+    }
+
+
+def load_input_data(source=None, construction_period: Optional[int] = None,
+                    operation_period: Optional[int] = None) -> InputData:
+    """
+    从工作簿的参数工作表导入输入数据
+
+    工作表不提供的字段取表单默认值（与未修改表单时收集到的输入数据一致）。
+
+    Args:
+        source: DataLoader或工作簿路径，默认为config.EXCEL_FILE
+        construction_period: 建设期（年），默认取工作表中的值
+        operation_period: 运营期（年），默认取工作表中的值
+
+    Returns:
+        InputData: 输入数据对象
+    """
+    from data_loader import DataLoader
+
+    loader = source if isinstance(source, DataLoader) else DataLoader(source)
+    df = loader.get_sheet(config.INPUT_SHEET_NAME)
+    if df is None:
+        raise ValueError(f"工作簿中没有工作表: {config.INPUT_SHEET_NAME}")
+    values = df.to_numpy(dtype=object)
+
+    if construction_period is None or operation_period is None:
+        sheet_cp, sheet_op = read_periods(values)
+        construction_period = sheet_cp if construction_period is None else construction_period
+        operation_period = sheet_op if operation_period is None else operation_period
+
+    input_data = build_from_form({}, construction_period, operation_period)
+    for path, value in compile_map(construction_period, operation_period).read(values).items():
+        _set_path(input_data, path, value)
+    return input_data
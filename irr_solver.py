@@ -0,0 +1,187 @@
+"""
+内部收益率（IRR）求解器
+按行批量求解二维现金流数组的内部收益率：带区间保护的牛顿法，步长越界时退回二分，
+支持热启动初值，并标记无解和可能存在多个解的现金流。
+"""
+from typing import Optional
+
+import numpy as np
+
+
+class IRRResult:
+    """批量IRR求解结果"""
+
+    def __init__(self, rate: np.ndarray, converged: np.ndarray, no_root: np.ndarray,
+                 multiple_roots: np.ndarray, iterations: int):
+        """
+        初始化求解结果
+
+        Args:
+            rate: (S,)内部收益率，无解时为NaN
+            converged: (S,)是否收敛
+            no_root: (S,)在搜索区间内无解
+            multiple_roots: (S,)在搜索区间内存在多个解（rate为离初值最近的一个）
+            iterations: 牛顿迭代次数
+        """
+        self.rate = rate
+        self.converged = converged
+        self.no_root = no_root
+        self.multiple_roots = multiple_roots
+        self.iterations = iterations
+
+
+def npv_and_derivative(cash_flows: np.ndarray, rate: np.ndarray):
+    """
+    计算各行现金流在给定折现率下的净现值及其对折现率的导数
+
+    Args:
+        cash_flows: (S, N)现金流，第0列为第1年（不折现）
+        rate: (S,)折现率
+
+    Returns:
+        tuple: (净现值, 导数)，均为(S,)
+    """
+    periods = np.arange(cash_flows.shape[1])
+    discount = (1.0 + rate[:, None]) ** -periods
+    npv = np.sum(cash_flows * discount, axis=1)
+    derivative = -np.sum(periods * cash_flows * discount, axis=1) / (1.0 + rate)
+    return npv, derivative
+
+
+def _sign_changes(cash_flows: np.ndarray) -> np.ndarray:
+    """各行现金流的符号变化次数（忽略0）"""
+    signs = np.sign(cash_flows)
+    # 用前一个非零符号填充0，使0不产生符号变化
+    last_nonzero = np.maximum.accumulate(np.where(signs != 0, np.arange(signs.shape[1]), 0), axis=1)
+    filled = np.take_along_axis(signs, last_nonzero, axis=1)
+    changes = (filled[:, 1:] * filled[:, :-1]) < 0
+    return changes.sum(axis=1)
+
+
+def _scan_brackets(cash_flows: np.ndarray, low: float, high: float, guess: np.ndarray, grid_size: int):
+    """
+    在[low, high]网格上扫描净现值符号变化，得到离初值最近的有根区间
+
+    Returns:
+        tuple: (区间左端, 区间右端, 区间内根的个数)
+    """
+    # 网格在(1 + r)的对数空间上均匀分布，低利率处更密
+    grid = np.expm1(np.linspace(np.log1p(low), np.log1p(high), grid_size))
+    periods = np.arange(cash_flows.shape[1])
+    values = cash_flows @ ((1.0 + grid[None, :]) ** -periods[:, None])    # (S, G)
+
+    crossings = np.sign(values[:, 1:]) * np.sign(values[:, :-1]) <= 0
+    crossings &= ~((values[:, 1:] == 0) & (values[:, :-1] == 0))
+    root_count = crossings.sum(axis=1)
+
+    # 初值到各区间的距离（初值在区间内时为0）
+    gap = np.maximum(grid[None, :-1] - guess[:, None], guess[:, None] - grid[None, 1:]).clip(min=0)
+    distance = np.where(crossings, gap, np.inf)
+    nearest = distance.argmin(axis=1)
+    return grid[nearest], grid[nearest + 1], root_count
+
+
+def solve_irr(cash_flows, guess=None, low: float = -0.99, high: float = 10.0,
+              tol: float = 1e-10, max_iter: int = 100, grid_size: int = 64) -> IRRResult:
+    """
+    批量求解内部收益率
+
+    未给出初值时，先在网格上扫描净现值的符号变化，取离10%最近的有根区间并以弦截点作为牛顿法初值；
+    给出初值（热启动）时，符号只变化一次的行（在(-1, +∞)内有唯一解）跳过扫描，
+    直接以[low, high]为保护区间从初值开始迭代。符号变化多于一次的行总会扫描，用以统计区间内根的个数。
+
+    Args:
+        cash_flows: (S, N)或(N,)现金流
+        guess: 初值（标量或(S,)），如上一次求解的结果；为None时取10%
+        low: 搜索下限（须大于-1）
+        high: 搜索上限
+        tol: 收敛精度（折现率的绝对变化量）
+        max_iter: 最大迭代次数
+        grid_size: 扫描网格点数
+
+    Returns:
+        IRRResult: 求解结果
+    """
+    cash_flows = np.atleast_2d(np.asarray(cash_flows, dtype=float))
+    size = cash_flows.shape[0]
+
+    warm_start = guess is not None
+    guess = np.broadcast_to(np.asarray(0.1 if guess is None else guess, dtype=float), (size,)).copy()
+    guess = np.where(np.isfinite(guess), guess, 0.1)
+
+    changes = _sign_changes(cash_flows)
+    no_root = changes == 0
+    multiple_roots = np.zeros(size, dtype=bool)
+
+    a = np.full(size, low)
+    b = np.full(size, high)
+
+    scan = (changes > 1) if warm_start else ~no_root
+    if scan.any():
+        scan_a, scan_b, root_count = _scan_brackets(cash_flows[scan], low, high, guess[scan], grid_size)
+        a[scan] = scan_a
+        b[scan] = scan_b
+        no_root[scan] = root_count == 0
+        multiple_roots[scan] = root_count > 1
+
+    fa, _ = npv_and_derivative(cash_flows, a)
+    fb, _ = npv_and_derivative(cash_flows, b)
+    # 唯一解落在搜索区间之外
+    no_root |= (np.sign(fa) * np.sign(fb) > 0)
+
+    active = ~no_root
+    with np.errstate(divide="ignore", invalid="ignore"):
+        secant = a - fa * (b - a) / (fb - fa)
+    inside = (guess > np.minimum(a, b)) & (guess < np.maximum(a, b))
+    x = np.where(warm_start & inside, guess, np.where(np.isfinite(secant), secant, (a + b) / 2))
+    converged = np.zeros(size, dtype=bool)
+    converged[active & (fa == 0)] = True
+    x[active & (fa == 0)] = a[active & (fa == 0)]
+    converged[active & (fb == 0)] = True
+    x[active & (fb == 0)] = b[active & (fb == 0)]
+    active &= ~converged
+
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        if not active.any():
+            break
+        idx = np.flatnonzero(active)
+        xi, ai, bi, fai = x[idx], a[idx], b[idx], fa[idx]
+
+        f, df = npv_and_derivative(cash_flows[idx], xi)
+
+        # 收缩有根区间
+        same_as_a = np.sign(f) == np.sign(fai)
+        ai = np.where(same_as_a, xi, ai)
+        fai = np.where(same_as_a, f, fai)
+        bi = np.where(same_as_a, bi, xi)
+
+        # 牛顿步，越出区间或导数为0时改用二分
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = xi - f / df
+        lower, upper = np.minimum(ai, bi), np.maximum(ai, bi)
+        bisect = ~np.isfinite(newton) | (newton < lower) | (newton > upper)
+        x_new = np.where(bisect, (ai + bi) / 2, newton)
+
+        done = (f == 0) | (~bisect & (np.abs(x_new - xi) <= tol)) | (upper - lower <= tol)
+        x[idx] = np.where(f == 0, xi, x_new)
+        a[idx], fa[idx], b[idx] = ai, fai, bi
+        converged[idx] = done
+        active[idx] = ~done
+
+    rate = np.where(no_root, np.nan, x)
+    return IRRResult(rate, converged & ~no_root, no_root, multiple_roots, iterations)
+
+
+def irr(cash_flows, guess: Optional[float] = None) -> float:
+    """
+    计算单个现金流的内部收益率
+
+    Args:
+        cash_flows: 现金流列表
+        guess: 初值
+
+    Returns:
+        float: 内部收益率，无解时为NaN
+    """
+    return float(solve_irr(cash_flows, guess).rate[0])
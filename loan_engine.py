@@ -0,0 +1,287 @@
+"""
+借款还本付息计算
+每笔借款（分笔提款）按提款年份、利率、宽限期、还款年数和还款方式以闭式公式生成各年的余额、利息和还本，
+多笔借款按年相加得到还本付息表；参数可带情景维度，一次计算多个融资方案。
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+from circularity import solve_fixed_point
+from data_models import BankLoanPlan
+from year_generator import YearGenerator
+
+
+# 还款方式（与输入界面的选项一致）
+METHODS = ("等额本金", "等额本息", "按期还息到期还本")
+
+# 还本付息表的行（与schedule返回的键对应）
+TABLE_ROWS = [
+    ("期初借款余额", "opening"),
+    ("当期借款", "drawdown"),
+    ("当期应计利息", "interest"),
+    ("当期还本付息", "payment"),
+    ("其中：还本", "principal"),
+    ("付息", "interest"),
+    ("期末借款余额", "closing"),
+]
+
+
+@dataclass(frozen=True)
+class Tranche:
+    """一笔借款"""
+    amount: float               # 借款金额（万元）
+    draw_year: int              # 提款年份（1为计算期第1年）
+    rate: float                 # 年利率（小数，如0.0588）
+    tenor: int                  # 还本年数
+    grace: int = 0              # 提款后只付息不还本的年数
+    method: str = "等额本金"    # 还款方式
+
+    @property
+    def start_year(self) -> int:
+        """首次还本的年份"""
+        return self.draw_year + self.grace + 1
+
+
+def method_code(method: str) -> int:
+    """
+    还款方式在METHODS中的编号
+
+    Args:
+        method: 还款方式名称
+
+    Returns:
+        int: 编号
+    """
+    try:
+        return METHODS.index(method)
+    except ValueError:
+        raise ValueError(f"不支持的还款方式: {method}（可选: {'、'.join(METHODS)}）") from None
+
+
+def _balance(amount: np.ndarray, rate: np.ndarray, tenor: np.ndarray, method: np.ndarray,
+             k: np.ndarray) -> np.ndarray:
+    """
+    第k次还本前的借款余额（k=0为开始还本时，k=tenor时已还清）
+
+    等额本金每年还本amount/tenor；等额本息每年还本付息相同，余额为年金现值；按期还息到期还本在最后一年一次还清。
+    """
+    share = k / tenor
+    growth_n = (1 + rate) ** tenor
+    growth_k = (1 + rate) ** k
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annuity = np.where(rate > 0, (growth_n - growth_k) / (growth_n - 1), 1 - share)
+    remaining = np.select(
+        [method == 0, method == 1],
+        [1 - share, annuity],
+        default=(k < tenor).astype(float),
+    )
+    return amount * remaining
+
+
+def schedule(amount, draw_index, start_index, tenor, rate, method, periods: int) -> Dict[str, np.ndarray]:
+    """
+    借款还本付息计划（闭式计算，不逐年循环）
+
+    各参数可为标量或形状可广播的数组（如(借款笔数,)或(情景数, 借款笔数)），结果在最后增加年份维度。
+
+    Args:
+        amount: 借款金额
+        draw_index: 提款年份下标（0为计算期第1年）
+        start_index: 首次还本的年份下标（不早于提款年份）
+        tenor: 还本年数（>=1）
+        rate: 年利率（小数）
+        method: 还款方式编号（见METHODS）
+        periods: 计算期年数
+
+    Returns:
+        dict: drawdown/opening/interest/principal/payment/closing，各为(..., periods)数组
+    """
+    amount, draw_index, start_index, tenor, rate, method = (
+        np.asarray(value)[..., None] for value in np.broadcast_arrays(
+            np.asarray(amount, dtype=float), np.asarray(draw_index, dtype=int),
+            np.asarray(start_index, dtype=int), np.asarray(tenor, dtype=int),
+            np.asarray(rate, dtype=float), np.asarray(method, dtype=int),
+        )
+    )
+    if (tenor < 1).any():
+        raise ValueError("还款年数必须大于0")
+    if (start_index < draw_index).any():
+        raise ValueError("开始还本年份不能早于提款年份")
+    if ((method < 0) | (method >= len(METHODS))).any():
+        raise ValueError("还款方式编号超出范围")
+
+    years = np.arange(periods)
+    drawn = years >= draw_index
+    k = years - start_index
+    # 年初（含当年提款）余额与年末余额：开始还本前为借款全额，还清后为0
+    opening = np.where(drawn, _balance(amount, rate, tenor, method, np.clip(k, 0, tenor)), 0.0)
+    closing = np.where(drawn, _balance(amount, rate, tenor, method, np.clip(k + 1, 0, tenor)), 0.0)
+    principal = opening - closing
+    interest = opening * rate
+    return {
+        "drawdown": np.where(years == draw_index, amount, 0.0),
+        "opening": opening,
+        "interest": interest,
+        "principal": principal,
+        "payment": principal + interest,
+        "closing": closing,
+    }
+
+
+def _tranche_arrays(tranches: Sequence[Tranche]) -> Dict[str, np.ndarray]:
+    """借款列表转为schedule的参数数组"""
+    return {
+        "amount": np.array([t.amount for t in tranches], dtype=float),
+        "draw_index": np.array([t.draw_year - 1 for t in tranches], dtype=int),
+        "start_index": np.array([t.start_year - 1 for t in tranches], dtype=int),
+        "tenor": np.array([t.tenor for t in tranches], dtype=int),
+        "rate": np.array([t.rate for t in tranches], dtype=float),
+        "method": np.array([method_code(t.method) for t in tranches], dtype=int),
+    }
+
+
+def loan_schedule(tranches: Sequence[Tranche], periods: int) -> Dict[str, np.ndarray]:
+    """
+    多笔借款合计的还本付息计划
+
+    Args:
+        tranches: 借款列表
+        periods: 计算期年数
+
+    Returns:
+        dict: 各项的(periods,)数组
+    """
+    if not tranches:
+        zeros = np.zeros(periods)
+        return {key: zeros.copy() for _, key in TABLE_ROWS}
+    parts = schedule(periods=periods, **_tranche_arrays(tranches))
+    return {key: values.sum(axis=0) for key, values in parts.items()}
+
+
+def batch_loan_schedule(scenarios: Iterable[Sequence[Tranche]], periods: int) -> Dict[str, np.ndarray]:
+    """
+    多个融资方案的还本付息计划（各方案的借款笔数可不同）
+
+    Args:
+        scenarios: 每个方案的借款列表
+        periods: 计算期年数
+
+    Returns:
+        dict: 各项的(方案数, periods)数组
+    """
+    scenarios = [list(tranches) for tranches in scenarios]
+    width = max((len(tranches) for tranches in scenarios), default=0)
+    if width == 0:
+        return {key: np.zeros((len(scenarios), periods)) for _, key in TABLE_ROWS}
+
+    # 借款笔数不足的方案用金额为0的借款补齐
+    blank = Tranche(0.0, 1, 0.0, 1)
+    arrays = [_tranche_arrays(tranches + [blank] * (width - len(tranches))) for tranches in scenarios]
+    params = {name: np.stack([a[name] for a in arrays]) for name in arrays[0]}
+    parts = schedule(periods=periods, **params)
+    return {key: values.sum(axis=1) for key, values in parts.items()}
+
+
+def plan_tranches(loan_plan: BankLoanPlan, year_generator: YearGenerator) -> List[Tranche]:
+    """
+    由银行借款计划生成各笔借款
+
+    建设期各年的借款为一笔借款；宽限期从首次提款起算，且运营期开始前不还本，各笔借款从同一年开始按还款方式还本。
+
+    Args:
+        loan_plan: 银行借款计划
+        year_generator: 年份生成器
+
+    Returns:
+        list: 借款列表（不含金额为0的年份）
+    """
+    years = loan_plan.loan_years or list(range(1, len(loan_plan.loan_amounts) + 1))
+    draws = [(int(year), float(amount)) for year, amount in zip(years, loan_plan.loan_amounts) if amount]
+    if not draws:
+        return []
+
+    method_code(loan_plan.repayment_method)
+    first_draw = min(year for year, _ in draws)
+    start_year = max(first_draw + int(loan_plan.grace_period), year_generator.construction_period) + 1
+    return [
+        Tranche(
+            amount=amount,
+            draw_year=year,
+            rate=loan_plan.interest_rate,
+            tenor=int(loan_plan.repayment_period),
+            grace=max(start_year - year - 1, 0),
+            method=loan_plan.repayment_method,
+        )
+        for year, amount in draws
+    ]
+
+
+def plan_schedule(loan_plan: BankLoanPlan, year_generator: YearGenerator, rate=None,
+                  method: str = "anderson", tol: float = 1e-9) -> Dict[str, np.ndarray]:
+    """
+    银行借款计划的还本付息计划（各笔借款合计，建设期利息资本化）
+
+    建设期各年的应计利息由当年追加借款支付（利息资本化），追加的借款又产生利息，
+    二者互为循环引用，用不动点迭代求解（见circularity.solve_fixed_point）。
+    借款额度（loan_plan.loan_limit，0为不限）先保证计划借款，剩余额度不足以支付的建设期利息由资本金支付。
+    资本化利息与计划借款一起提款，按同一还款方式在运营期偿还。
+
+    Args:
+        loan_plan: 银行借款计划
+        year_generator: 年份生成器
+        rate: 年利率（小数），可为(情景数,)数组；为None时取loan_plan.interest_rate
+        method: 迭代方法（见circularity.METHODS）
+        tol: 收敛精度（万元）
+
+    Returns:
+        dict: TABLE_ROWS中各项，以及capitalized（借款支付的建设期利息）、
+            equity_interest（资本金支付的建设期利息）；各为(periods,)数组，rate为数组时为(情景数, periods)
+    """
+    axis = year_generator.axis
+    periods = axis.total_period
+    rates = np.asarray(loan_plan.interest_rate if rate is None else rate, dtype=float)
+    tranches = plan_tranches(loan_plan, year_generator)
+    if not tranches:
+        zeros = np.zeros(rates.shape + (periods,))
+        return {key: zeros.copy() for key in [key for _, key in TABLE_ROWS] + ["capitalized", "equity_interest"]}
+
+    # 提款年份：计划借款的年份及首次提款后的各建设年份（追加借款支付当年利息）
+    planned = {t.draw_year: t.amount for t in tranches}
+    first_draw = min(planned)
+    years = sorted(set(planned) | set(range(first_draw, year_generator.construction_period + 1)))
+    draw_index = np.array(years) - 1
+    base = np.array([planned.get(year, 0.0) for year in years])
+    in_construction = draw_index < year_generator.construction_period
+    arrays = _tranche_arrays(tranches)
+    params = {
+        "draw_index": draw_index,
+        "start_index": arrays["start_index"][0],
+        "tenor": arrays["tenor"][0],
+        "method": arrays["method"][0],
+        "rate": rates[..., None],
+    }
+    limit = float(loan_plan.loan_limit) if loan_plan.loan_limit else np.inf
+
+    def capitalize(extra: np.ndarray) -> np.ndarray:
+        interest = schedule(amount=base + extra, periods=periods, **params)["interest"].sum(axis=-2)
+        accrued = interest[..., draw_index] * in_construction
+        capitalized_before = np.cumsum(extra, axis=-1) - extra
+        return np.clip(accrued, 0.0, np.maximum(limit - base.sum() - capitalized_before, 0.0))
+
+    initial = np.zeros(rates.shape + (len(years),))
+    result = solve_fixed_point(capitalize, initial, method, tol)
+    if not result.converged.all():
+        raise ValueError(f"建设期利息迭代未收敛（残差 {result.residual.max():.3g}，{result.iterations} 次迭代）")
+
+    extra = result.value
+    parts = schedule(amount=base + extra, periods=periods, **params)
+    totals = {key: values.sum(axis=-2) for key, values in parts.items()}
+    capitalized = np.zeros(rates.shape + (periods,))
+    capitalized[..., draw_index] = extra
+    totals["capitalized"] = capitalized
+    totals["equity_interest"] = np.maximum(totals["interest"] * axis.construction_mask - capitalized, 0.0)
+    return totals
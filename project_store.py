@@ -0,0 +1,330 @@
+"""
+项目库
+基于SQLite（标准库，不需要外部服务）的本地项目库：按项目和情景保存输入数据快照、计算结果和财务指标。
+- runs表每个(项目, 情景)一行，NPV、IRR、投资回收期、总投资为独立的列并建有索引，
+  可直接按指标筛选大量已保存的情景（如"IRR不低于8%且回收期不超过9年"）；
+- 输入数据和计算表以项目文件（serialization）的形式存于blobs表，按内容哈希去重，
+  读取已保存的计算结果时只解码所需的表，不重新计算。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from data_models import InputData
+from serialization import ProjectFile, dump_project
+from utils import lazy_import
+
+pd = lazy_import("pandas")
+
+
+# 默认数据库文件
+DEFAULT_DB_FILE = "projects.db"
+
+# 建有索引、可用于筛选和排序的财务指标列
+KPI_COLUMNS = ["npv", "irr", "payback_period", "total_investment"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    id INTEGER PRIMARY KEY,
+    sha256 TEXT NOT NULL UNIQUE,
+    content BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    scenario TEXT NOT NULL,
+    saved_at TEXT NOT NULL,
+    construction_period INTEGER,
+    operation_period INTEGER,
+    npv REAL,
+    irr REAL,
+    payback_period REAL,
+    total_investment REAL,
+    irr_no_root INTEGER,
+    metadata TEXT,
+    blob_id INTEGER REFERENCES blobs(id),
+    UNIQUE (project_id, scenario)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_npv ON runs(npv);
+CREATE INDEX IF NOT EXISTS idx_runs_irr ON runs(irr);
+CREATE INDEX IF NOT EXISTS idx_runs_payback ON runs(payback_period);
+CREATE INDEX IF NOT EXISTS idx_runs_investment ON runs(total_investment);
+CREATE INDEX IF NOT EXISTS idx_runs_blob ON runs(blob_id);
+"""
+
+_UPSERT_RUN = """
+INSERT INTO runs (project_id, scenario, saved_at, construction_period, operation_period,
+                  npv, irr, payback_period, total_investment, irr_no_root, metadata, blob_id)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (project_id, scenario) DO UPDATE SET
+    saved_at = excluded.saved_at,
+    construction_period = excluded.construction_period,
+    operation_period = excluded.operation_period,
+    npv = excluded.npv,
+    irr = excluded.irr,
+    payback_period = excluded.payback_period,
+    total_investment = excluded.total_investment,
+    irr_no_root = excluded.irr_no_root,
+    metadata = excluded.metadata,
+    blob_id = excluded.blob_id
+"""
+
+
+def _kpi_value(kpis: Dict[str, Any], name: str) -> Optional[float]:
+    """财务指标转为数据库中的值（NaN存为NULL）"""
+    value = kpis.get(name)
+    if value is None:
+        return None
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+class ProjectStore:
+    """SQLite项目库"""
+
+    def __init__(self, db_file: str = DEFAULT_DB_FILE):
+        """
+        打开（或新建）项目库
+
+        Args:
+            db_file: 数据库文件路径，":memory:"为内存数据库
+        """
+        self.db_file = db_file
+        # Streamlit各次重新运行可能在不同线程中执行，连接允许跨线程使用并以锁串行化
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA foreign_keys = ON")
+            if db_file != ":memory:":
+                self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        self._conn.close()
+
+    def __enter__(self) -> "ProjectStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _project_id(self, name: str) -> int:
+        """项目编号（不存在时新建），须在事务中调用"""
+        self._conn.execute(
+            "INSERT OR IGNORE INTO projects (name, created_at) VALUES (?, ?)",
+            (name, datetime.now().isoformat(timespec="seconds")),
+        )
+        return self._conn.execute("SELECT id FROM projects WHERE name = ?", (name,)).fetchone()[0]
+
+    def _blob_id(self, content: bytes) -> int:
+        """项目文件编号（相同内容只保存一份），须在事务中调用"""
+        sha256 = hashlib.sha256(content).hexdigest()
+        self._conn.execute("INSERT OR IGNORE INTO blobs (sha256, content) VALUES (?, ?)", (sha256, content))
+        return self._conn.execute("SELECT id FROM blobs WHERE sha256 = ?", (sha256,)).fetchone()[0]
+
+    def _run_row(self, project_id: int, scenario: str, input_data: InputData, kpis: Dict[str, Any],
+                 metadata: Optional[Dict[str, Any]], blob_id: Optional[int]) -> Tuple:
+        basic = input_data.basic_info
+        return (
+            project_id, scenario, datetime.now().isoformat(timespec="seconds"),
+            basic.construction_period, basic.operation_period,
+            *[_kpi_value(kpis, name) for name in KPI_COLUMNS],
+            int(bool(kpis.get("irr_no_root", False))),
+            json.dumps(metadata or {}, ensure_ascii=False),
+            blob_id,
+        )
+
+    def save_run(self, project: str, scenario: str, input_data: InputData,
+                 results: Optional[Dict[str, "pd.DataFrame"]] = None, kpis: Optional[Dict[str, Any]] = None,
+                 metadata: Optional[Dict[str, Any]] = None) -> int:
+        """
+        保存一个情景（同一项目下同名情景覆盖原记录）
+
+        Args:
+            project: 项目名称
+            scenario: 情景名称
+            input_data: 输入数据（应为未经计算的原始输入）
+            results: 计算表，可选
+            kpis: 财务指标（CalculationEngine的kpis节点），可选
+            metadata: 其他需要保存的信息（须可写入JSON），可选
+
+        Returns:
+            int: 情景记录编号
+        """
+        return self.save_runs([(project, scenario, input_data, results, kpis, metadata)])[0]
+
+    def save_runs(self, runs: Iterable[Tuple]) -> List[int]:
+        """
+        在一个事务中批量保存多个情景
+
+        Args:
+            runs: [(项目名称, 情景名称, 输入数据, 计算表, 财务指标, 其他信息), ...]，后三项可为None
+
+        Returns:
+            list: 各情景记录编号
+        """
+        ids = []
+        with self._lock, self._conn:
+            for project, scenario, input_data, results, kpis, metadata in runs:
+                kpis = kpis or {}
+                content = dump_project(input_data, results, kpis, metadata)
+                row = self._run_row(self._project_id(project), scenario, input_data, kpis, metadata,
+                                    self._blob_id(content))
+                self._conn.execute(_UPSERT_RUN, row)
+                ids.append(self._conn.execute(
+                    "SELECT id FROM runs WHERE project_id = ? AND scenario = ?", (row[0], scenario)
+                ).fetchone()[0])
+        return ids
+
+    def query(self, project: Optional[str] = None, min_npv: Optional[float] = None,
+              max_npv: Optional[float] = None, min_irr: Optional[float] = None, max_irr: Optional[float] = None,
+              max_payback: Optional[float] = None, max_investment: Optional[float] = None,
+              order_by: str = "irr", descending: bool = True, limit: Optional[int] = None) -> "pd.DataFrame":
+        """
+        按财务指标筛选情景（只读取指标列，不解码项目文件），范围均含端点
+
+        Args:
+            project: 项目名称，默认为所有项目
+            min_npv, max_npv: NPV范围（万元）
+            min_irr, max_irr: IRR范围（小数，如0.08）
+            max_payback: 投资回收期上限（年）
+            max_investment: 总投资上限（万元）
+            order_by: 排序的指标列
+            descending: 是否降序
+            limit: 最多返回的记录数
+
+        Returns:
+            DataFrame: 情景记录编号、项目、情景、保存时间、计算期及各指标
+        """
+        if order_by not in KPI_COLUMNS:
+            raise ValueError(f"不支持的排序指标: {order_by}")
+
+        conditions: List[str] = []
+        params: List[Any] = []
+        for sql, value in (
+            ("p.name = ?", project),
+            ("r.npv >= ?", min_npv),
+            ("r.npv <= ?", max_npv),
+            ("r.irr >= ?", min_irr),
+            ("r.irr <= ?", max_irr),
+            ("r.payback_period <= ?", max_payback),
+            ("r.total_investment <= ?", max_investment),
+        ):
+            if value is not None:
+                conditions.append(sql)
+                params.append(value)
+
+        sql = (
+            "SELECT r.id AS run_id, p.name AS project, r.scenario, r.saved_at, "
+            "r.construction_period, r.operation_period, r.npv, r.irr, r.payback_period, "
+            "r.total_investment, r.irr_no_root "
+            "FROM runs r JOIN projects p ON p.id = r.project_id"
+        )
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        # NULL（如IRR无解）排在最后
+        sql += f" ORDER BY r.{order_by} IS NULL, r.{order_by} {'DESC' if descending else 'ASC'}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, params=params)
+
+    def load(self, run_id: int) -> ProjectFile:
+        """
+        读取情景的项目文件（输入数据和计算表在访问时才解码）
+
+        Args:
+            run_id: 情景记录编号
+
+        Returns:
+            ProjectFile
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT b.content FROM runs r JOIN blobs b ON b.id = r.blob_id WHERE r.id = ?", (run_id,)
+            ).fetchone()
+        if row is None:
+            raise ValueError(f"项目库中没有该情景: {run_id}")
+        return ProjectFile(row[0])
+
+    def find(self, project: str, scenario: str) -> Optional[int]:
+        """
+        按项目和情景名称查找情景记录编号
+
+        Returns:
+            int: 情景记录编号，不存在时为None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT r.id FROM runs r JOIN projects p ON p.id = r.project_id "
+                "WHERE p.name = ? AND r.scenario = ?", (project, scenario)
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def projects(self) -> List[str]:
+        """项目名称列表"""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT name FROM projects ORDER BY name")]
+
+    def scenarios(self, project: str) -> List[str]:
+        """项目下的情景名称列表"""
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                "SELECT r.scenario FROM runs r JOIN projects p ON p.id = r.project_id "
+                "WHERE p.name = ? ORDER BY r.scenario", (project,)
+            )]
+
+    def delete_run(self, run_id: int) -> None:
+        """
+        删除情景（不再被引用的项目文件一并删除）
+
+        Args:
+            run_id: 情景记录编号
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+            self._conn.execute("DELETE FROM blobs WHERE id NOT IN (SELECT blob_id FROM runs WHERE blob_id IS NOT NULL)")
+
+    def delete_project(self, project: str) -> None:
+        """
+        删除项目及其所有情景
+
+        Args:
+            project: 项目名称
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM projects WHERE name = ?", (project,))
+            self._conn.execute("DELETE FROM blobs WHERE id NOT IN (SELECT blob_id FROM runs WHERE blob_id IS NOT NULL)")
+
+    def count(self) -> int:
+        """情景总数"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def explain(self, sql_filter: str) -> List[str]:
+        """
+        查询计划（用于确认筛选条件是否使用了指标索引）
+
+        Args:
+            sql_filter: WHERE子句（仅用于诊断，不要传入用户输入），如"irr >= 0.08 AND payback_period <= 9"
+
+        Returns:
+            list: 查询计划各步骤的说明
+        """
+        with self._lock:
+            rows = self._conn.execute(f"EXPLAIN QUERY PLAN SELECT id FROM runs WHERE {sql_filter}").fetchall()
+        return [row[-1] for row in rows]
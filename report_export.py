@@ -0,0 +1,259 @@
+"""
+Excel报告导出
+用openpyxl只写（流式）模式将计算表写入一个.xlsx工作簿：每个计算表一个工作表，按config.SHEET_MAPPING的顺序排列，
+表头、数值等格式预先注册为命名样式，各单元格只引用样式名称。
+批量导出多个项目或情景时逐个读取、写入后即释放，不同时在内存中保留所有计算表：
+可写入同一个工作簿（各情景依次排列在同名工作表中）或打包为zip（每个情景一个工作簿）。
+"""
+from __future__ import annotations
+
+import io
+import math
+import re
+import zipfile
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+import config
+from utils import lazy_import
+
+pd = lazy_import("pandas")
+openpyxl = lazy_import("openpyxl")
+
+
+# 预设样式：名称 -> 字体、填充、对齐、数字格式
+TITLE_STYLE = "报告标题"
+HEADER_STYLE = "报告表头"
+LABEL_STYLE = "报告项目"
+NUMBER_STYLE = "报告数值"
+
+NUMBER_FORMAT = "#,##0.00"
+
+# 列宽：第一列（项目名称）与其余各列
+LABEL_COLUMN_WIDTH = 30
+VALUE_COLUMN_WIDTH = 13
+
+# 工作表名称中不允许的字符及最大长度
+_INVALID_SHEET_CHARS = re.compile(r"[\[\]:*?/\\]")
+_MAX_SHEET_NAME = 31
+
+
+def _register_styles(wb) -> None:
+    """在工作簿中注册预设样式"""
+    from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+
+    thin = Side(style="thin", color="BFBFBF")
+    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+
+    title = NamedStyle(name=TITLE_STYLE)
+    title.font = Font(name="宋体", size=14, bold=True)
+
+    header = NamedStyle(name=HEADER_STYLE)
+    header.font = Font(name="宋体", size=10, bold=True)
+    header.fill = PatternFill("solid", fgColor="D9E1F2")
+    header.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    header.border = border
+
+    label = NamedStyle(name=LABEL_STYLE)
+    label.font = Font(name="宋体", size=10)
+    label.alignment = Alignment(horizontal="left", vertical="center")
+    label.border = border
+
+    number = NamedStyle(name=NUMBER_STYLE)
+    number.font = Font(name="宋体", size=10)
+    number.alignment = Alignment(horizontal="right", vertical="center")
+    number.border = border
+    number.number_format = NUMBER_FORMAT
+
+    for style in (title, header, label, number):
+        wb.add_named_style(style)
+
+
+def sheet_title(name: str, used: Optional[set] = None) -> str:
+    """
+    计算表名称转为合法且不重复的工作表名称
+
+    Args:
+        name: 计算表名称
+        used: 已使用的工作表名称（会加入新名称）
+
+    Returns:
+        str: 工作表名称
+    """
+    title = _INVALID_SHEET_CHARS.sub("_", name).strip()[:_MAX_SHEET_NAME] or "Sheet"
+    if used is not None:
+        base, n = title, 1
+        while title in used:
+            suffix = f"({n})"
+            title = base[:_MAX_SHEET_NAME - len(suffix)] + suffix
+            n += 1
+        used.add(title)
+    return title
+
+
+def _cell_value(value: Any) -> Any:
+    """单元格的值（numpy标量转为Python标量，NaN写为空单元格）"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+        return None
+    return value
+
+
+def ordered_tables(results: Mapping[str, "pd.DataFrame"]) -> List[str]:
+    """
+    计算表的导出顺序：先按SHEET_MAPPING的顺序，再按其余表的原有顺序
+
+    Args:
+        results: 计算表
+
+    Returns:
+        list: 表名
+    """
+    names = [name for name in config.SHEET_MAPPING if name in results]
+    return names + [name for name in results if name not in config.SHEET_MAPPING]
+
+
+class _SheetWriter:
+    """向只写模式的工作表追加一个计算表（标题行、表头行和数据行）"""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.rows = 0
+        self._widths_set = False
+
+    def _cell(self, value: Any, style: str):
+        from openpyxl.cell import WriteOnlyCell
+
+        cell = WriteOnlyCell(self.ws, value=_cell_value(value))
+        cell.style = style
+        return cell
+
+    def write(self, title: str, df: "pd.DataFrame") -> None:
+        if not self._widths_set:
+            # 只写模式下列宽须在写入第一行之前设置
+            from openpyxl.utils import get_column_letter
+
+            self.ws.column_dimensions["A"].width = LABEL_COLUMN_WIDTH
+            for i in range(2, df.shape[1] + 1):
+                self.ws.column_dimensions[get_column_letter(i)].width = VALUE_COLUMN_WIDTH
+            self._widths_set = True
+
+        if self.rows:
+            self.ws.append([])
+        self.ws.append([self._cell(title, TITLE_STYLE)])
+        self.ws.append([self._cell(str(col), HEADER_STYLE) for col in df.columns])
+        for row in df.itertuples(index=False, name=None):
+            self.ws.append([
+                self._cell(value, NUMBER_STYLE if isinstance(value, (int, float, np.number))
+                           and not isinstance(value, bool) else LABEL_STYLE)
+                for value in row
+            ])
+        self.rows += df.shape[0] + 3
+
+
+def _new_workbook():
+    wb = openpyxl.Workbook(write_only=True)
+    _register_styles(wb)
+    return wb
+
+
+def _save(wb, target: Union[str, io.BytesIO, None]) -> Optional[bytes]:
+    """保存工作簿到文件或内存"""
+    if target is None:
+        buffer = io.BytesIO()
+        wb.save(buffer)
+        return buffer.getvalue()
+    wb.save(target)
+    return None
+
+
+def export_report(results: Mapping[str, "pd.DataFrame"], target: Union[str, io.BytesIO, None] = None,
+                  title: Optional[str] = None) -> Optional[bytes]:
+    """
+    将一组计算表导出为Excel报告（每个计算表一个工作表）
+
+    Args:
+        results: 计算表（表名到DataFrame的映射）
+        target: 输出文件路径或缓冲区，为None时返回工作簿内容
+        title: 标题前缀（如项目名称），可选
+
+    Returns:
+        bytes: target为None时为工作簿内容，否则为None
+    """
+    wb = _new_workbook()
+    used: set = set()
+    for name in ordered_tables(results):
+        writer = _SheetWriter(wb.create_sheet(sheet_title(name, used)))
+        full_name = config.SHEET_MAPPING.get(name, name)
+        writer.write(f"{title} - {full_name}" if title else full_name, results[name])
+    return _save(wb, target)
+
+
+ScenarioResults = Union[Mapping[str, "pd.DataFrame"], Callable[[], Mapping[str, "pd.DataFrame"]]]
+
+
+def _resolve(results: ScenarioResults) -> Mapping[str, "pd.DataFrame"]:
+    """情景的计算表（可为延迟读取的函数）"""
+    return results() if callable(results) else results
+
+
+def export_batch(scenarios: Iterable[Tuple[str, ScenarioResults]], target: Union[str, io.BytesIO, None] = None,
+                 mode: str = "workbook") -> Optional[bytes]:
+    """
+    批量导出多个项目或情景
+
+    各情景依次读取、写入后即释放；计算表可以是延迟读取的函数（如ProjectFile.results），
+    使同一时间只有一个情景的计算表在内存中。
+
+    Args:
+        scenarios: [(情景名称, 计算表或返回计算表的函数), ...]，可为生成器
+        target: 输出文件路径或缓冲区，为None时返回文件内容
+        mode: "workbook"为写入同一个工作簿（每个计算表一个工作表，各情景依次排列），
+              "zip"为每个情景一个工作簿并打包为zip
+
+    Returns:
+        bytes: target为None时为文件内容，否则为None
+    """
+    if mode == "workbook":
+        wb = _new_workbook()
+        used: set = set()
+        writers: Dict[str, _SheetWriter] = {}
+        for scenario, results in scenarios:
+            results = _resolve(results)
+            for name in ordered_tables(results):
+                if name not in writers:
+                    writers[name] = _SheetWriter(wb.create_sheet(sheet_title(name, used)))
+                writers[name].write(f"{scenario} - {config.SHEET_MAPPING.get(name, name)}", results[name])
+            del results
+        return _save(wb, target)
+
+    if mode == "zip":
+        buffer = io.BytesIO() if target is None else target
+        used_names: set = set()
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for scenario, results in scenarios:
+                file_name = sheet_title(scenario, used_names)
+                with archive.open(f"{file_name}.xlsx", "w") as f:
+                    export_report(_resolve(results), f, title=scenario)
+        return buffer.getvalue() if target is None else None
+
+    raise ValueError(f"不支持的导出方式: {mode}")
+
+
+def iter_store_results(store, run_ids: Sequence[int]) -> Iterator[Tuple[str, Callable[[], Dict[str, "pd.DataFrame"]]]]:
+    """
+    项目库中各情景的计算表（延迟读取，供export_batch使用）
+
+    Args:
+        store: ProjectStore
+        run_ids: 情景记录编号
+
+    Yields:
+        tuple: ("项目-情景", 读取计算表的函数)
+    """
+    runs = store.query().set_index("run_id")
+    for run_id in run_ids:
+        run = runs.loc[run_id]
+        yield f"{run['project']}-{run['scenario']}", lambda run_id=run_id: store.load(run_id).results()
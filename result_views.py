@@ -0,0 +1,221 @@
+"""
+计算结果的显示与下载缓存
+每组计算结果按内容指纹缓存：格式化后的显示表、CSV/Parquet下载内容和打包的zip都在第一次用到时生成，之后直接复用，
+页面重新运行时不再对所有计算表重复格式化和序列化。
+"""
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import io
+import threading
+import zipfile
+from collections import OrderedDict
+from typing import Dict, List, Mapping, Optional
+
+import config
+from utils import lazy_import
+
+pd = lazy_import("pandas")
+
+
+# Parquet下载需要pyarrow，未安装时只提供CSV
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+# 进程内缓存的结果组数
+MAX_CACHED_RESULTS = 8
+
+FORMATS = ("csv", "parquet")
+
+
+def format_dataframe(df: "pd.DataFrame", decimals: int = 2) -> "pd.DataFrame":
+    """
+    格式化DataFrame中的数值列为指定小数位数
+
+    Args:
+        df: 原始DataFrame
+        decimals: 小数位数，默认2位
+
+    Returns:
+        格式化后的DataFrame
+    """
+    df_formatted = df.copy()
+    for col in df_formatted.columns:
+        # 跳过第一列（通常是"项目"列等非数值列）
+        if col == "项目":
+            continue
+
+        # 检查列是否为数值类型
+        if pd.api.types.is_numeric_dtype(df_formatted[col]):
+            # 将列转换为 float 类型，然后格式化为指定小数位数
+            df_formatted[col] = df_formatted[col].astype(float)
+            df_formatted[col] = df_formatted[col].round(decimals)
+        else:
+            # 如果不是数值类型但包含数值字符串，尝试转换
+            try:
+                df_formatted[col] = df_formatted[col].astype(float).round(decimals)
+            except (ValueError, TypeError):
+                # 无法转换，保持原样
+                pass
+
+    return df_formatted
+
+
+def results_fingerprint(results: Mapping[str, "pd.DataFrame"]) -> str:
+    """
+    计算结果的内容指纹（表名、列名和各单元格的值）
+
+    Args:
+        results: 计算表
+
+    Returns:
+        str: 十六进制SHA-256摘要
+    """
+    digest = hashlib.sha256()
+    for name, df in results.items():
+        digest.update(repr((name, list(df.columns), df.shape)).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _parquet_frame(df: "pd.DataFrame") -> "pd.DataFrame":
+    """Parquet要求列名为字符串、每列类型一致：混合类型的列转为字符串"""
+    df = df.copy()
+    df.columns = [str(col) for col in df.columns]
+    for col in df.columns:
+        if df[col].dtype == object and not df[col].map(lambda x: x is None or isinstance(x, str)).all():
+            df[col] = df[col].map(lambda x: None if x is None else str(x))
+    return df
+
+
+class ResultViews:
+    """一组计算结果的显示表和下载内容（按需生成并缓存）"""
+
+    def __init__(self, results: Mapping[str, "pd.DataFrame"], decimals: int = 2,
+                 fingerprint: Optional[str] = None):
+        """
+        Args:
+            results: 计算表
+            decimals: 显示和下载的小数位数
+            fingerprint: 内容指纹，默认由results计算
+        """
+        self.results = results
+        self.decimals = decimals
+        self.fingerprint = fingerprint or results_fingerprint(results)
+        self._displays: Dict[str, "pd.DataFrame"] = {}
+        self._payloads: Dict[tuple, bytes] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def names(self) -> List[str]:
+        """计算表名称"""
+        return list(self.results)
+
+    @staticmethod
+    def title(name: str) -> str:
+        """计算表的完整名称"""
+        return config.SHEET_MAPPING.get(name, name)
+
+    def display(self, name: str) -> "pd.DataFrame":
+        """
+        格式化后的显示表（与下载内容一致）
+
+        Args:
+            name: 计算表名称
+
+        Returns:
+            DataFrame
+        """
+        df = self._displays.get(name)
+        if df is None:
+            df = format_dataframe(self.results[name], decimals=self.decimals)
+            self._displays[name] = df
+        return df
+
+    def download(self, name: str, fmt: str = "csv") -> bytes:
+        """
+        单个计算表的下载内容
+
+        Args:
+            name: 计算表名称
+            fmt: "csv"（UTF-8带BOM，Excel可直接打开）或"parquet"
+
+        Returns:
+            bytes
+        """
+        return self._payload((name, fmt), lambda: self._serialize(self.display(name), fmt))
+
+    def bundle(self, fmt: str = "csv") -> bytes:
+        """
+        所有计算表打包的zip
+
+        Args:
+            fmt: 各计算表的格式，"csv"或"parquet"
+
+        Returns:
+            bytes: zip内容
+        """
+        def build() -> bytes:
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                for name in self.names:
+                    archive.writestr(self.file_name(name, fmt), self.download(name, fmt))
+            return buffer.getvalue()
+
+        return self._payload(("*", fmt), build)
+
+    @staticmethod
+    def file_name(name: str, fmt: str = "csv") -> str:
+        """下载文件名"""
+        return f"{name.strip()}_result.{fmt}"
+
+    def _payload(self, key: tuple, build) -> bytes:
+        with self._lock:
+            content = self._payloads.get(key)
+        if content is None:
+            content = build()
+            with self._lock:
+                self._payloads[key] = content
+        return content
+
+    @staticmethod
+    def _serialize(df: "pd.DataFrame", fmt: str) -> bytes:
+        if fmt == "csv":
+            return df.to_csv(index=False).encode("utf-8-sig")
+        if fmt == "parquet":
+            if not PARQUET_AVAILABLE:
+                raise ValueError("保存为Parquet需要安装pyarrow")
+            buffer = io.BytesIO()
+            _parquet_frame(df).to_parquet(buffer, index=False)
+            return buffer.getvalue()
+        raise ValueError(f"不支持的下载格式: {fmt}")
+
+
+# 按内容指纹缓存的结果组（最近使用的在末尾）
+_views: "OrderedDict[str, ResultViews]" = OrderedDict()
+_views_lock = threading.Lock()
+
+
+def get_views(results: Mapping[str, "pd.DataFrame"], decimals: int = 2) -> ResultViews:
+    """
+    计算结果对应的ResultViews（内容相同的结果共用同一缓存）
+
+    Args:
+        results: 计算表
+        decimals: 小数位数
+
+    Returns:
+        ResultViews
+    """
+    fingerprint = results_fingerprint(results)
+    key = f"{fingerprint}-{decimals}"
+    with _views_lock:
+        views = _views.get(key)
+        if views is not None:
+            _views.move_to_end(key)
+            return views
+        views = ResultViews(results, decimals, fingerprint)
+        _views[key] = views
+        while len(_views) > MAX_CACHED_RESULTS:
+            _views.popitem(last=False)
+    return views
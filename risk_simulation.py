@@ -0,0 +1,321 @@
+"""
+蒙特卡洛风险模拟
+为输入字段指定概率分布，抽样生成大量情景并通过批量计算引擎一次性计算，
+统计NPV、IRR、投资回收期的分布、P10/P50/P90以及NPV<0的概率。
+"""
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from year_generator import YearGenerator
+from data_models import InputData
+from batch_engine import BatchEngine, BatchResult, get_input_value
+
+
+class Distribution(ABC):
+    """概率分布基类"""
+
+    # 为True时抽样值为相对基准值的倍数
+    relative = False
+
+    @abstractmethod
+    def sample(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        """
+        抽样
+
+        Args:
+            size: 样本数
+            rng: 随机数生成器
+
+        Returns:
+            ndarray: (size,)样本
+        """
+
+
+class Uniform(Distribution):
+    """均匀分布"""
+
+    def __init__(self, low: float, high: float, relative: bool = False):
+        """
+        Args:
+            low: 下限
+            high: 上限
+            relative: 是否为相对基准值的倍数
+        """
+        self.low = low
+        self.high = high
+        self.relative = relative
+
+    def sample(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        return rng.uniform(self.low, self.high, size)
+
+
+class Triangular(Distribution):
+    """三角分布"""
+
+    def __init__(self, low: float, mode: float, high: float, relative: bool = False):
+        """
+        Args:
+            low: 最小值
+            mode: 最可能值
+            high: 最大值
+            relative: 是否为相对基准值的倍数
+        """
+        self.low = low
+        self.mode = mode
+        self.high = high
+        self.relative = relative
+
+    def sample(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        return rng.triangular(self.low, self.mode, self.high, size)
+
+
+class PERT(Distribution):
+    """PERT分布（按三点估算构造的Beta分布，常用于造价估算）"""
+
+    def __init__(self, low: float, mode: float, high: float, relative: bool = False, shape: float = 4.0):
+        """
+        Args:
+            low: 最小值
+            mode: 最可能值
+            high: 最大值
+            relative: 是否为相对基准值的倍数
+            shape: 形状参数，越大越集中于最可能值
+        """
+        if not low <= mode <= high or low == high:
+            raise ValueError("PERT分布参数须满足 low <= mode <= high 且 low < high")
+        self.low = low
+        self.mode = mode
+        self.high = high
+        self.relative = relative
+        self.shape = shape
+
+    def sample(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        span = self.high - self.low
+        alpha = 1 + self.shape * (self.mode - self.low) / span
+        beta = 1 + self.shape * (self.high - self.mode) / span
+        return self.low + rng.beta(alpha, beta, size) * span
+
+
+class Normal(Distribution):
+    """正态分布（可截断）"""
+
+    def __init__(self, mean: float, std: float, low: Optional[float] = None, high: Optional[float] = None,
+                 relative: bool = False):
+        """
+        Args:
+            mean: 均值
+            std: 标准差
+            low: 截断下限
+            high: 截断上限
+            relative: 是否为相对基准值的倍数
+        """
+        self.mean = mean
+        self.std = std
+        self.low = low
+        self.high = high
+        self.relative = relative
+
+    def sample(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        values = rng.normal(self.mean, self.std, size)
+        if self.low is not None or self.high is not None:
+            values = np.clip(values, self.low, self.high)
+        return values
+
+
+class Dirichlet(Distribution):
+    """
+    狄利克雷分布：在一组比例上抽样并保持总和不变（如年度销售比例）
+
+    抽样结果为(size, k)，对应列表字段的k个元素
+    """
+
+    def __init__(self, weights: Sequence[float], concentration: float = 100.0, total: Optional[float] = None):
+        """
+        Args:
+            weights: 各元素的期望比例（如基准年度销售比例）
+            concentration: 集中度，越大越接近期望比例
+            total: 各元素之和，默认与weights之和相同
+        """
+        weights = np.asarray(weights, dtype=float)
+        self.k = len(weights)
+        self.total = float(weights.sum()) if total is None else total
+        # 期望为0的元素保持为0
+        self.active = weights > 0
+        self.alpha = weights[self.active] / weights.sum() * concentration
+
+    def sample(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        values = np.zeros((size, self.k))
+        values[:, self.active] = rng.dirichlet(self.alpha, size) * self.total
+        return values
+
+
+class SimulationResult:
+    """风险模拟结果"""
+
+    # 统计的指标
+    METRICS = ["npv", "irr", "payback_period"]
+
+    def __init__(self, draws: pd.DataFrame, batch: BatchResult):
+        """
+        Args:
+            draws: 各次抽样的参数取值（每行一次抽样）
+            batch: 批量计算结果
+        """
+        self.draws = draws
+        self.batch = batch
+        self.kpis = batch.kpis
+
+    @property
+    def prob_npv_negative(self) -> float:
+        """NPV < 0 的概率"""
+        return float((self.kpis["npv"] < 0).mean())
+
+    def percentile(self, metric: str, q: float) -> float:
+        """
+        指标的分位数（IRR无解的抽样不参与统计）
+
+        Args:
+            metric: 指标名称
+            q: 分位（0-100）
+
+        Returns:
+            float
+        """
+        return float(np.nanpercentile(self.kpis[metric].to_numpy(dtype=float), q))
+
+    def summary(self) -> pd.DataFrame:
+        """
+        各指标的分布统计
+
+        Returns:
+            DataFrame: 行为指标，列为均值、标准差、P10、P50、P90、有效样本数
+        """
+        rows = []
+        for metric in self.METRICS:
+            values = self.kpis[metric].to_numpy(dtype=float)
+            valid = values[~np.isnan(values)]
+            rows.append({
+                "指标": metric,
+                "均值": valid.mean() if valid.size else np.nan,
+                "标准差": valid.std() if valid.size else np.nan,
+                "P10": np.percentile(valid, 10) if valid.size else np.nan,
+                "P50": np.percentile(valid, 50) if valid.size else np.nan,
+                "P90": np.percentile(valid, 90) if valid.size else np.nan,
+                "有效样本数": int(valid.size),
+            })
+        return pd.DataFrame(rows).set_index("指标")
+
+    def histogram(self, metric: str, bins: int = 50) -> pd.DataFrame:
+        """
+        指标的频数分布（用于绘图）
+
+        Args:
+            metric: 指标名称
+            bins: 分组数
+
+        Returns:
+            DataFrame: 区间下限、区间上限、频数、累计概率
+        """
+        values = self.kpis[metric].to_numpy(dtype=float)
+        values = values[~np.isnan(values)]
+        counts, edges = np.histogram(values, bins=bins)
+        return pd.DataFrame({
+            "区间下限": edges[:-1],
+            "区间上限": edges[1:],
+            "频数": counts,
+            "累计概率": np.cumsum(counts) / max(values.size, 1),
+        })
+
+
+class RiskSimulation:
+    """蒙特卡洛风险模拟"""
+
+    def __init__(self, year_generator: YearGenerator, input_data: InputData):
+        """
+        初始化风险模拟
+
+        Args:
+            year_generator: 年份生成器
+            input_data: 基准输入数据（不会被修改）
+        """
+        self.yg = year_generator
+        self.input = input_data
+        self.distributions: Dict[str, Distribution] = {}
+
+    def add_distribution(self, path: str, distribution: Distribution) -> "RiskSimulation":
+        """
+        为输入字段指定概率分布
+
+        path与批量计算引擎的参数路径相同，如"project_investment.building_cost"、
+        "sales_revenue.annual_revenue"（按年字典：绝对值写入运营期各年，相对倍数逐年乘以基准值）、
+        "asset_sales_plan.annual_sales_ratios"（列表字段，配合Dirichlet分布）。
+
+        不影响财务指标的参数（如基准输入中没有借款时的借款利率）抽样没有意义，直接拒绝。
+
+        Args:
+            path: 参数路径
+            distribution: 概率分布
+
+        Returns:
+            RiskSimulation: 自身，便于链式调用
+        """
+        if BatchEngine(self.yg, self.input).inert_paths([path]):
+            raise ValueError(f"参数不影响财务指标（NPV、IRR、投资回收期），不能指定概率分布: {path}")
+        self.distributions[path] = distribution
+        return self
+
+    def sample(self, draws: int, seed: Optional[int] = None) -> pd.DataFrame:
+        """
+        抽样生成参数覆盖表
+
+        Args:
+            draws: 抽样次数
+            seed: 随机种子
+
+        Returns:
+            DataFrame: 每行一次抽样，每列一个参数路径
+        """
+        rng = np.random.default_rng(seed)
+        columns: Dict[str, np.ndarray] = {}
+
+        for path, distribution in self.distributions.items():
+            values = distribution.sample(draws, rng)
+            base = get_input_value(self.input, path)
+
+            if isinstance(base, list):
+                values = values.reshape(draws, -1)
+                if values.shape[1] > len(base):
+                    raise ValueError(f"抽样维数超过列表长度: {path}")
+                for i in range(values.shape[1]):
+                    factor = base[i] if distribution.relative else 1.0
+                    columns[f"{path}[{i}]"] = values[:, i] * factor
+            elif isinstance(base, dict) and distribution.relative:
+                # 相对倍数：运营期各年分别乘以基准值
+                base_values = self.yg.axis.from_year_dict(base)
+                for label, value, is_operation in zip(self.yg.axis.labels, base_values, self.yg.axis.operation_mask):
+                    if is_operation:
+                        columns[f"{path}[{label}]"] = values * value
+            elif distribution.relative:
+                columns[path] = values * float(base)
+            else:
+                columns[path] = values
+
+        return pd.DataFrame(columns)
+
+    def run(self, draws: int = 10000, seed: Optional[int] = None) -> SimulationResult:
+        """
+        运行模拟
+
+        Args:
+            draws: 抽样次数
+            seed: 随机种子
+
+        Returns:
+            SimulationResult: 模拟结果
+        """
+        overrides = self.sample(draws, seed)
+        batch = BatchEngine(self.yg, self.input).evaluate(overrides)
+        return SimulationResult(overrides, batch)
@@ -0,0 +1,249 @@
+"""
+敏感性分析
+对关键输入逐一按±X%扰动，计算NPV、IRR的变化，生成龙卷风图和蜘蛛图数据。
+各扰动情景分块分发到进程池中并行计算，每个情景只计算计算引擎的财务指标节点（不生成计算表）。
+"""
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from year_generator import YearGenerator
+from data_models import InputData
+from calculation_engine import CalculationEngine
+from batch_engine import BatchEngine, get_input_value, apply_override
+
+
+# 默认分析的变量：(参数路径, 名称)
+DEFAULT_VARIABLES = [
+    ("project_investment.building_cost", "建筑工程费"),
+    ("project_investment.building_equipment_cost", "建筑设备费"),
+    ("project_investment.building_installation_cost", "设备安装费"),
+    ("project_investment.production_equipment_cost", "生产设备购置费"),
+    ("project_investment.production_installation_cost", "生产设备安装费"),
+    ("project_investment.management_fee", "项目管理咨询费"),
+    ("project_investment.tech_service_fee", "技术服务费"),
+    ("project_investment.supporting_fee", "配套设施费"),
+    ("project_investment.land_use_fee", "土地使用费"),
+    ("project_investment.patent_fee", "专利费"),
+    ("project_investment.preparation_fee", "开办费"),
+    ("project_investment.basic_reserve", "基本预备费"),
+    ("project_investment.price_reserve", "涨价预备费"),
+    ("asset_sales_plan.total_sales_price", "资产销售总价"),
+    ("sales_revenue.annual_revenue", "年度销售收入"),
+    ("labor_cost.admin_salary", "管理人员工资"),
+    ("labor_cost.tech_salary", "技术人员工资"),
+    ("labor_cost.security_salary", "保安人员工资"),
+    ("labor_cost.cleaning_salary", "保洁人员工资"),
+    ("other_costs.repair_rate", "修理费率"),
+    ("bank_loan_plan.interest_rate", "借款利率"),
+    ("tax_params.corporate_tax_rate", "所得税税率"),
+    ("tax_params.city_tax_rate", "城市维护建设税税率"),
+    ("tax_params.education_tax_rate", "教育费附加税率"),
+    ("tax_params.discount_rate", "折现率"),
+]
+
+# 统计的指标
+METRICS = ["npv", "irr"]
+
+
+def scale_input(input_data: InputData, path: str, factor: float, year_generator: YearGenerator) -> None:
+    """
+    将输入字段按倍数缩放（原地修改），按年字典字段逐年缩放
+
+    Args:
+        input_data: 输入数据
+        path: 参数路径
+        factor: 倍数，如1.1表示+10%
+        year_generator: 年份生成器
+    """
+    base = get_input_value(input_data, path)
+    if isinstance(base, dict):
+        for year in list(base):
+            base[year] = base[year] * factor
+    else:
+        apply_override(input_data, path, base * factor, year_generator)
+
+
+def _evaluate_chunk(construction_period: int, operation_period: int, input_data: InputData,
+                    scenarios: Sequence[Tuple[str, float]]) -> List[Dict[str, float]]:
+    """
+    计算一组扰动情景的财务指标（在工作进程中执行）
+
+    Args:
+        construction_period: 建设期
+        operation_period: 运营期
+        input_data: 基准输入数据
+        scenarios: [(参数路径, 倍数), ...]
+
+    Returns:
+        list: 每个情景的指标
+    """
+    year_generator = YearGenerator(construction_period, operation_period)
+    results = []
+    for path, factor in scenarios:
+        scenario_input = copy.deepcopy(input_data)
+        if path is not None:
+            scale_input(scenario_input, path, factor, year_generator)
+        kpis = CalculationEngine(year_generator, scenario_input).graph.get("kpis")
+        results.append({metric: kpis[metric] for metric in METRICS})
+    return results
+
+
+class SensitivityResult:
+    """敏感性分析结果"""
+
+    def __init__(self, table: pd.DataFrame, base: Dict[str, float], skipped: Optional[pd.DataFrame] = None):
+        """
+        Args:
+            table: 每个扰动情景一行：变量、名称、变动幅度、参数值及各指标
+            base: 基准情景的各指标
+            skipped: 未参与分析的变量：变量、名称、原因
+        """
+        self.table = table
+        self.base = base
+        self.skipped = pd.DataFrame(columns=["变量", "名称", "原因"]) if skipped is None else skipped
+
+    def tornado(self, metric: str = "npv") -> pd.DataFrame:
+        """
+        龙卷风图数据：各变量在最大负向、正向扰动下的指标值，按波动范围从大到小排列
+
+        Args:
+            metric: 指标名称
+
+        Returns:
+            DataFrame: 变量、名称、低值、高值、波动范围
+        """
+        table = self.table
+        low_change = table["变动幅度"].min()
+        high_change = table["变动幅度"].max()
+        low = table[table["变动幅度"] == low_change].set_index("变量")
+        high = table[table["变动幅度"] == high_change].set_index("变量")
+
+        data = pd.DataFrame({
+            "名称": low["名称"],
+            "低值": low[metric],
+            "高值": high[metric].reindex(low.index),
+        })
+        data["波动范围"] = (data["高值"] - data["低值"]).abs()
+        return data.sort_values("波动范围", ascending=False).reset_index()
+
+    def spider(self, metric: str = "npv") -> pd.DataFrame:
+        """
+        蜘蛛图数据：行为变动幅度，列为变量名称
+
+        Args:
+            metric: 指标名称
+
+        Returns:
+            DataFrame
+        """
+        return self.table.pivot(index="变动幅度", columns="名称", values=metric)
+
+
+class SensitivityAnalysis:
+    """敏感性分析"""
+
+    def __init__(self, year_generator: YearGenerator, input_data: InputData,
+                 variables: Optional[Sequence[Tuple[str, str]]] = None):
+        """
+        初始化敏感性分析
+
+        Args:
+            year_generator: 年份生成器
+            input_data: 基准输入数据（不会被修改，应为未经计算的原始输入）
+            variables: [(参数路径, 名称), ...]，默认为DEFAULT_VARIABLES
+        """
+        self.yg = year_generator
+        self.input = input_data
+        self.variables = list(DEFAULT_VARIABLES if variables is None else variables)
+
+    def active_variables(self) -> List[Tuple[str, str]]:
+        """参与分析的变量（基准值不为0且扰动后财务指标有变化）"""
+        skipped = {path for path, _, _ in self.inactive_variables()}
+        return [(path, name) for path, name in self.variables if path not in skipped]
+
+    def inactive_variables(self) -> List[Tuple[str, str, str]]:
+        """
+        不参与分析的变量
+
+        基准值为0时按比例扰动没有意义；扰动后NPV、IRR均不变的变量（如没有借款时的借款利率）
+        在龙卷风图中波动范围恒为0，也不参与分析。
+
+        Returns:
+            list: [(参数路径, 名称, 原因), ...]
+        """
+        inactive, nonzero = [], []
+        for path, name in self.variables:
+            base = get_input_value(self.input, path)
+            if isinstance(base, dict):
+                base = sum(abs(value) for value in base.values())
+            if base == 0:
+                inactive.append((path, name, "基准值为0"))
+            else:
+                nonzero.append((path, name))
+
+        inert = set(BatchEngine(self.yg, self.input).inert_paths([path for path, _ in nonzero]))
+        inactive.extend((path, name, "不影响财务指标") for path, name in nonzero if path in inert)
+        order = {path: i for i, (path, _) in enumerate(self.variables)}
+        return sorted(inactive, key=lambda item: order[item[0]])
+
+    def run(self, variation: float = 0.2, points: int = 11, max_workers: Optional[int] = None,
+            chunk_size: Optional[int] = None) -> SensitivityResult:
+        """
+        运行敏感性分析
+
+        Args:
+            variation: 最大变动幅度，如0.2表示±20%
+            points: 每个变量的扰动点数（含基准点），如11表示-20%、-16%、...、+20%
+            max_workers: 进程数，默认为CPU核数；为1时在当前进程中串行计算
+            chunk_size: 每次分发给工作进程的情景数，默认按进程数均分为若干块
+
+        Returns:
+            SensitivityResult: 分析结果
+        """
+        inactive = self.inactive_variables()
+        skipped = {path for path, _, _ in inactive}
+        variables = [(path, name) for path, name in self.variables if path not in skipped]
+        changes = np.round(np.linspace(-variation, variation, points), 10)
+
+        # 第一个情景为基准情景，变动幅度为0的点直接取基准结果
+        scenarios = [(None, 1.0)] + [
+            (path, 1.0 + change) for path, _ in variables for change in changes if change != 0
+        ]
+
+        workers = max_workers or os.cpu_count() or 1
+        if chunk_size is None:
+            chunk_size = max(1, -(-len(scenarios) // (workers * 4)))
+        chunks = [scenarios[i:i + chunk_size] for i in range(0, len(scenarios), chunk_size)]
+        args = (self.yg.construction_period, self.yg.operation_period, self.input)
+
+        if workers == 1 or len(chunks) == 1:
+            outputs = [_evaluate_chunk(*args, chunk) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(_evaluate_chunk, *args, chunk) for chunk in chunks]
+                outputs = [future.result() for future in futures]
+
+        results = [row for output in outputs for row in output]
+        base = results[0]
+        scenario_metrics = dict(zip(scenarios[1:], results[1:]))
+
+        rows = []
+        for path, name in variables:
+            base_value = get_input_value(self.input, path)
+            for change in changes:
+                factor = 1.0 + change
+                rows.append({
+                    "变量": path,
+                    "名称": name,
+                    "变动幅度": change,
+                    "参数值": np.nan if isinstance(base_value, dict) else base_value * factor,
+                    **(base if change == 0 else scenario_metrics[(path, factor)]),
+                })
+
+        return SensitivityResult(pd.DataFrame(rows), base,
+                                 pd.DataFrame(inactive, columns=["变量", "名称", "原因"]))
@@ -0,0 +1,447 @@
+"""
+项目文件序列化
+将InputData及计算结果（计算表、财务指标）保存为带版本号的紧凑项目文件（zip）：
+- project.json：版本号、计算期、输入数据的字段树、各计算表的列信息和文本列、财务指标，
+  按键排序缩进输出，不同版本的项目文件可直接做文本比较；
+- input_series.npy：输入数据中所有按年字典（年度收入、各项材料燃料成本等）按计算期对齐为一个浮点数组；
+- tables/<序号>.npy：各计算表的数值列。
+读取时只解析project.json，输入数据和各计算表在首次访问时才解码；旧版本的文件按迁移函数逐版升级。
+"""
+from __future__ import annotations
+
+import dataclasses
+import io
+import json
+import re
+import zipfile
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from data_models import InputData
+from utils import lazy_import
+
+pd = lazy_import("pandas")
+
+
+# 项目文件格式标识及版本：字段树或文件结构变化时递增，并用register_migration登记旧版本的升级函数
+FORMAT_NAME = "jzgccw-project"
+SCHEMA_VERSION = 3
+
+# 项目文件扩展名
+PROJECT_EXTENSION = ".jzp"
+
+_MANIFEST = "project.json"
+_INPUT_SERIES = "input_series.npy"
+_YEAR_LABEL = re.compile(r"第(\d+)年")
+
+# 迁移函数：起始版本 -> 将该版本的project.json内容升级到下一版本的函数
+_MIGRATIONS: Dict[int, Callable[[Dict[str, Any]], Dict[str, Any]]] = {}
+
+
+def register_migration(from_version: int):
+    """
+    登记迁移函数（装饰器）：将from_version版本的project.json内容升级到from_version + 1版本
+
+    Args:
+        from_version: 起始版本
+    """
+    def decorator(func: Callable[[Dict[str, Any]], Dict[str, Any]]):
+        _MIGRATIONS[from_version] = func
+        return func
+    return decorator
+
+
+def _migrate(manifest: Dict[str, Any]) -> Dict[str, Any]:
+    """将project.json内容逐版升级到当前版本"""
+    if manifest.get("format") != FORMAT_NAME:
+        raise ValueError("不是项目文件")
+    version = manifest.get("schema_version", 0)
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"项目文件版本({version})高于当前支持的版本({SCHEMA_VERSION})，请升级程序")
+    while version < SCHEMA_VERSION:
+        if version not in _MIGRATIONS:
+            raise ValueError(f"缺少项目文件版本{version}的迁移函数")
+        manifest = _MIGRATIONS[version](manifest)
+        version += 1
+        manifest["schema_version"] = version
+    return manifest
+
+
+# 版本2：资产形成、资产销售的计算结果改为派生状态（derived_state），不再保存在输入数据中
+_DERIVED_FIELDS_V2: Dict[str, Tuple[str, ...]] = {
+    "project_investment": (
+        "building_cost_no_tax", "building_equipment_cost_no_tax", "building_installation_cost_no_tax",
+        "management_fee_no_tax", "tech_service_fee_no_tax", "supporting_fee_no_tax", "land_use_fee_no_tax",
+        "patent_fee_no_tax", "preparation_fee_no_tax",
+    ),
+    "asset_formation": (
+        "deductible_input_tax", "fixed_asset_total", "intangible_asset_total", "other_asset_total",
+        "investment_total", "fixed_asset_original_value",
+    ),
+    "asset_formation.building_fixed_asset": (
+        "engineering_fee", "other_fixed_fee", "reserve_fee", "construction_interest", "total",
+    ),
+    "asset_formation.equipment_fixed_asset": (
+        "engineering_fee", "other_fixed_fee", "reserve_fee", "construction_interest", "total",
+    ),
+    "asset_formation.land_intangible_asset": ("total",),
+    "asset_formation.patent_intangible_asset": ("total",),
+    "asset_formation.sales_land_intangible_asset": ("total",),
+    "asset_formation.other_asset": ("total",),
+    "asset_sales_plan": (
+        "building_hold_ratio", "land_hold_ratio", "sales_building_value", "hold_building_value",
+        "sales_land_value", "hold_land_value", "annual_sales_revenue", "annual_sales_cost",
+        "annual_land_amortization", "sales_assets_cost",
+    ),
+}
+
+
+@register_migration(1)
+def _drop_derived_fields(manifest: Dict[str, Any]) -> Dict[str, Any]:
+    """版本1 -> 2：删除输入数据中已改为派生状态的字段"""
+    for section, names in _DERIVED_FIELDS_V2.items():
+        tree = manifest.get("input", {})
+        for attr in section.split("."):
+            tree = tree.get(attr) if isinstance(tree, dict) else None
+        if isinstance(tree, dict):
+            for name in names:
+                tree.pop(name, None)
+    return manifest
+
+
+@register_migration(2)
+def _loan_rate_to_fraction(manifest: Dict[str, Any]) -> Dict[str, Any]:
+    """版本2 -> 3：借款年利率由百分数（如4.2）改为与BankLoanPlan默认值一致的小数（如0.042）"""
+    loan_plan = manifest.get("input", {}).get("bank_loan_plan")
+    if isinstance(loan_plan, dict) and isinstance(loan_plan.get("interest_rate"), (int, float)):
+        loan_plan["interest_rate"] = loan_plan["interest_rate"] / 100
+    return manifest
+
+
+def _plain(value: Any) -> Any:
+    """numpy标量转为Python标量（便于写入JSON）"""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class _InputEncoder:
+    """输入数据的字段树编码：按年字典收集到一个浮点数组中，字段树中只记录其所在行"""
+
+    def __init__(self, total_years: int):
+        self.total_years = total_years
+        self.series: List[np.ndarray] = []
+
+    def encode(self, value: Any) -> Any:
+        if dataclasses.is_dataclass(value):
+            # 包含输入收集时附加的非dataclass字段
+            return {name: self.encode(item) for name, item in vars(value).items()}
+        if isinstance(value, dict):
+            return self._encode_dict(value)
+        if isinstance(value, (list, tuple)):
+            return [self.encode(item) for item in value]
+        return _plain(value)
+
+    def _encode_dict(self, value: Dict) -> Any:
+        years = []
+        for key, item in value.items():
+            match = _YEAR_LABEL.fullmatch(key) if isinstance(key, str) else None
+            if match is None or not isinstance(_plain(item), (int, float)) or isinstance(item, bool):
+                return {str(key): self.encode(item) for key, item in value.items()}
+            years.append(int(match.group(1)))
+        if not years:
+            return {}
+
+        width = max(self.total_years, max(years))
+        row = np.full(width, np.nan)
+        row[np.asarray(years) - 1] = list(value.values())
+        ref: Dict[str, Any] = {"$series": len(self.series)}
+        # 年份不是完整的第1年至第N年时记录年份
+        if years != list(range(1, self.total_years + 1)):
+            ref["years"] = years
+        self.series.append(row)
+        return ref
+
+
+def _decode_into(obj: Any, tree: Dict[str, Any], series: Callable[[], np.ndarray], total_years: int) -> None:
+    """将字段树写入对象（dataclass字段递归写入，按年字典由浮点数组还原）"""
+    for name, value in tree.items():
+        current = getattr(obj, name, None)
+        if dataclasses.is_dataclass(current) and isinstance(value, dict):
+            _decode_into(current, value, series, total_years)
+        elif isinstance(value, dict) and "$series" in value:
+            years = value.get("years", range(1, total_years + 1))
+            row = series()[value["$series"]]
+            setattr(obj, name, {f"第{year}年": float(row[year - 1]) for year in years})
+        else:
+            setattr(obj, name, value)
+
+
+def _encode_table(df: "pd.DataFrame", index: int) -> Tuple[Dict[str, Any], Optional[np.ndarray]]:
+    """计算表拆分为列信息、文本列（写入JSON）和数值列（浮点数组），列按位置记录（列名可能不是字符串）"""
+    dtypes = df.dtypes.tolist()
+    numeric = [i for i, dtype in enumerate(dtypes) if pd.api.types.is_float_dtype(dtype)]
+    text = [i for i in range(len(dtypes)) if i not in numeric]
+    meta: Dict[str, Any] = {
+        "columns": [_plain(col) for col in df.columns],
+        "numeric": numeric,
+        "text": {
+            str(i): [_plain(v) for v in df.iloc[:, i].tolist()] for i in text
+        },
+        "rows": len(df),
+    }
+    if not isinstance(df.index, pd.RangeIndex) or df.index.start != 0 or df.index.step != 1:
+        meta["index"] = [_plain(v) for v in df.index.tolist()]
+    if not numeric:
+        return meta, None
+    meta["array"] = f"tables/{index}.npy"
+    return meta, df.iloc[:, numeric].to_numpy(dtype=np.float64)
+
+
+def _zip_info(member: str) -> zipfile.ZipInfo:
+    """固定时间戳的压缩包条目（相同内容序列化得到相同的字节）"""
+    info = zipfile.ZipInfo(member, date_time=(1980, 1, 1, 0, 0, 0))
+    info.compress_type = zipfile.ZIP_DEFLATED
+    return info
+
+
+def _npy_bytes(array: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    np.save(buffer, array, allow_pickle=False)
+    return buffer.getvalue()
+
+
+def dump_project(input_data: InputData, results: Optional[Dict[str, "pd.DataFrame"]] = None,
+                 kpis: Optional[Dict[str, Any]] = None, metadata: Optional[Dict[str, Any]] = None) -> bytes:
+    """
+    序列化项目
+
+    Args:
+        input_data: 输入数据（应为未经计算的原始输入）
+        results: 计算表（表名到DataFrame的映射），可选
+        kpis: 财务指标，可选
+        metadata: 其他需要保存的信息（须可写入JSON），可选
+
+    Returns:
+        bytes: 项目文件内容
+    """
+    basic = input_data.basic_info
+    encoder = _InputEncoder(basic.construction_period + basic.operation_period)
+    manifest: Dict[str, Any] = {
+        "format": FORMAT_NAME,
+        "schema_version": SCHEMA_VERSION,
+        "construction_period": basic.construction_period,
+        "operation_period": basic.operation_period,
+        "input": encoder.encode(input_data),
+        "kpis": {key: _plain(value) for key, value in (kpis or {}).items()},
+        "metadata": metadata or {},
+        "tables": {},
+        "table_order": list(results or {}),
+    }
+
+    arrays: Dict[str, np.ndarray] = {}
+    for i, (name, df) in enumerate((results or {}).items()):
+        meta, array = _encode_table(df, i)
+        manifest["tables"][name] = meta
+        if array is not None:
+            arrays[meta["array"]] = array
+    if encoder.series:
+        width = max(len(row) for row in encoder.series)
+        arrays[_INPUT_SERIES] = np.vstack([
+            np.pad(row, (0, width - len(row)), constant_values=np.nan) for row in encoder.series
+        ])
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        text = json.dumps(manifest, ensure_ascii=False, indent=1, sort_keys=True)
+        archive.writestr(_zip_info(_MANIFEST), text)
+        for member, array in arrays.items():
+            archive.writestr(_zip_info(member), _npy_bytes(array))
+    return buffer.getvalue()
+
+
+def save_project(path: str, input_data: InputData, results: Optional[Dict[str, "pd.DataFrame"]] = None,
+                 kpis: Optional[Dict[str, Any]] = None, metadata: Optional[Dict[str, Any]] = None) -> None:
+    """
+    保存项目文件
+
+    Args:
+        path: 文件路径
+        input_data: 输入数据
+        results: 计算表，可选
+        kpis: 财务指标，可选
+        metadata: 其他需要保存的信息，可选
+    """
+    content = dump_project(input_data, results, kpis, metadata)
+    with open(path, "wb") as f:
+        f.write(content)
+
+
+class ProjectFile:
+    """
+    项目文件（延迟解码）
+
+    打开时只读取project.json；输入数据和各计算表在首次访问时才从数组解码。
+    """
+
+    def __init__(self, source: Union[str, bytes]):
+        """
+        Args:
+            source: 文件路径或项目文件内容
+        """
+        if isinstance(source, (bytes, bytearray)):
+            self._content = bytes(source)
+        else:
+            with open(source, "rb") as f:
+                self._content = f.read()
+        try:
+            self._archive = zipfile.ZipFile(io.BytesIO(self._content))
+            manifest = json.loads(self._archive.read(_MANIFEST).decode("utf-8"))
+        except (zipfile.BadZipFile, KeyError, ValueError) as e:
+            raise ValueError(f"无法读取项目文件: {e}") from e
+        self.manifest = _migrate(manifest)
+        self._input_series: Optional[np.ndarray] = None
+        self._tables: Dict[str, "pd.DataFrame"] = {}
+
+    @property
+    def schema_version(self) -> int:
+        """读取后的版本（已升级到当前版本）"""
+        return self.manifest["schema_version"]
+
+    @property
+    def construction_period(self) -> int:
+        return self.manifest["construction_period"]
+
+    @property
+    def operation_period(self) -> int:
+        return self.manifest["operation_period"]
+
+    @property
+    def kpis(self) -> Dict[str, Any]:
+        """财务指标"""
+        return self.manifest["kpis"]
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self.manifest["metadata"]
+
+    @property
+    def table_names(self) -> List[str]:
+        """计算表名称（按保存时的顺序）"""
+        return list(self.manifest["table_order"])
+
+    def _read_array(self, member: str) -> np.ndarray:
+        with self._archive.open(member) as f:
+            return np.load(io.BytesIO(f.read()), allow_pickle=False)
+
+    def _series(self) -> np.ndarray:
+        if self._input_series is None:
+            self._input_series = self._read_array(_INPUT_SERIES)
+        return self._input_series
+
+    def input_data(self) -> InputData:
+        """
+        解码输入数据（每次返回新的对象）
+
+        Returns:
+            InputData: 输入数据对象
+        """
+        input_data = InputData()
+        total_years = self.construction_period + self.operation_period
+        _decode_into(input_data, self.manifest["input"], self._series, total_years)
+        return input_data
+
+    def table(self, name: str) -> "pd.DataFrame":
+        """
+        解码单个计算表
+
+        Args:
+            name: 表名
+
+        Returns:
+            DataFrame
+        """
+        if name not in self._tables:
+            if name not in self.manifest["tables"]:
+                raise ValueError(f"项目文件中没有计算表: {name}")
+            meta = self.manifest["tables"][name]
+            data: Dict[int, Any] = {int(i): values for i, values in meta["text"].items()}
+            if "array" in meta:
+                array = self._read_array(meta["array"])
+                for j, i in enumerate(meta["numeric"]):
+                    data[i] = array[:, j]
+            df = pd.DataFrame({i: data[i] for i in range(len(meta["columns"]))},
+                              index=meta.get("index", pd.RangeIndex(meta["rows"])))
+            df.columns = meta["columns"]
+            self._tables[name] = df
+        return self._tables[name].copy()
+
+    def results(self) -> Dict[str, "pd.DataFrame"]:
+        """
+        解码全部计算表
+
+        Returns:
+            dict: 表名到DataFrame的映射
+        """
+        return {name: self.table(name) for name in self.table_names}
+
+    def content(self) -> bytes:
+        """项目文件内容"""
+        return self._content
+
+
+def load_project(source: Union[str, bytes]) -> ProjectFile:
+    """
+    打开项目文件
+
+    Args:
+        source: 文件路径或项目文件内容
+
+    Returns:
+        ProjectFile: 项目文件（输入数据和计算表在访问时才解码）
+    """
+    return ProjectFile(source)
+
+
+def _flatten(tree: Any, prefix: str = "") -> Dict[str, Any]:
+    """字段树展开为"路径 -> 值"（按年字典展开为"路径[年份]"）"""
+    if dataclasses.is_dataclass(tree):
+        tree = vars(tree)
+    if isinstance(tree, dict) and tree and all(isinstance(key, str) for key in tree):
+        flat: Dict[str, Any] = {}
+        for key, value in tree.items():
+            if _YEAR_LABEL.fullmatch(key):
+                flat[f"{prefix}[{key}]"] = value
+            else:
+                flat.update(_flatten(value, f"{prefix}.{key}" if prefix else key))
+        return flat
+    if isinstance(tree, list):
+        return {f"{prefix}[{i}]": value for i, value in enumerate(tree)}
+    return {prefix: tree}
+
+
+def diff_projects(old: ProjectFile, new: ProjectFile) -> "pd.DataFrame":
+    """
+    比较两个项目文件的输入数据和财务指标
+
+    Args:
+        old: 原项目文件
+        new: 新项目文件
+
+    Returns:
+        DataFrame: 字段、原值、新值（只包含不同的字段，缺少的字段为None）
+    """
+    rows = []
+    for section, old_tree, new_tree in (
+        ("输入", old.input_data(), new.input_data()),
+        ("指标", old.kpis, new.kpis),
+    ):
+        old_flat, new_flat = _flatten(old_tree), _flatten(new_tree)
+        for key in list(old_flat) + [key for key in new_flat if key not in old_flat]:
+            old_value, new_value = old_flat.get(key), new_flat.get(key)
+            same = old_value == new_value or (
+                isinstance(old_value, float) and isinstance(new_value, float)
+                and np.isnan(old_value) and np.isnan(new_value)
+            )
+            if not same:
+                rows.append({"类别": section, "字段": key, "原值": old_value, "新值": new_value})
+    return pd.DataFrame(rows, columns=["类别", "字段", "原值", "新值"])
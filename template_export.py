@@ -0,0 +1,657 @@
+"""
+按原工作簿版式导出
+将JZGCCW01.xls一次转换为.xlsx模板（保留文字、格式、合并单元格、列宽行高，数值单元格置0作为待填写位置）并缓存，
+导出时只替换模板工作表XML中需要填写的单元格：计算表各年的值、合计列、年份行、建设期/运营期表头和表尾的项目信息，
+其余部件原样复制，不逐个单元格重建格式。
+模板按工作簿内容哈希缓存在工作簿所在目录的DEFAULT_CACHE_DIR下，进程内只解析一次。
+"""
+from __future__ import annotations
+
+import functools
+import io
+import math
+import numbers
+import os
+import posixpath
+import re
+import zipfile
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+from xml.sax.saxutils import escape
+
+import config
+from input_mapping import cell_index
+from utils import lazy_import
+from workbook_cache import DEFAULT_CACHE_DIR, _write_atomic, content_hash
+
+openpyxl = lazy_import("openpyxl")
+
+
+# 模板转换方式变化时递增，使已缓存的模板失效
+TEMPLATE_VERSION = 1
+
+# 计算表各行在原工作表中的行号（Excel行号）
+# 行名为计算表第一列的名称；有"说明"列的表（折旧、摊销）为"分项/说明"，分项名称去掉了序号
+TEMPLATE_ROWS: Dict[str, Dict[str, int]] = {
+    "2流动资金": {"流动资金（万元）": 18},
+    "3投资计划": {"合计": 5, "工程费": 6, "其他费": 7, "预备费": 13},
+    "4还本付息": {
+        "期初借款余额": 37, "当期借款": 38, "当期应计利息": 39, "当期还本付息": 40,
+        "其中：还本": 41, "付息": 42, "期末借款余额": 43,
+    },
+    "5-1材料": {"材料1": 6, "材料2": 10, "合计": 32},
+    "5-2燃料": {"燃料动力1": 6, "合计": 23},
+    "5-3工资": {
+        "管理人员工资": 8, "技术人员工资": 12, "保安人员工资": 16, "保洁人员工资": 20,
+        "工资小计": 21, "福利费": 22, "合计": 23,
+    },
+    "5-4折旧": {
+        "建筑物（20年）/原值": 5, "建筑物（20年）/当期折旧费": 6, "建筑物（20年）/净值": 7,
+        "机器设备（10年）/原值": 9, "机器设备（10年）/当期折旧费": 10, "机器设备（10年）/净值": 11,
+        "销售固定资产/销售固定资产成本": 13, "销售固定资产/固定资产成本摊销额": 14,
+        "销售固定资产/剩余待销售资产净值": 15,
+        "合计/原值": 17, "合计/当期折旧、摊销": 18, "合计/净值": 19,
+    },
+    "5-5摊销": {
+        "土地使用权（50年）/原值": 5, "土地使用权（50年）/当期摊销费": 6, "土地使用权（50年）/净值": 7,
+        "专利权（6年）/原值": 9, "专利权（6年）/当期摊销费": 10, "专利权（6年）/净值": 11,
+        "其他资产（5年）/原值": 13, "其他资产（5年）/当期摊销费": 14, "其他资产（5年）/净值": 15,
+        "销售地产土地权摊销/原值": 17, "销售地产土地权摊销/当期摊销费": 18, "销售地产土地权摊销/净值": 19,
+        "合计/原值": 21, "合计/当期摊销费": 22, "合计/净值": 23,
+    },
+    "5总成本": {
+        "材料成本": 5, "燃料成本": 6, "人工成本": 7, "修理费": 8,
+        "折旧费": 14, "摊销费": 15, "总成本": 17,
+    },
+    "6收入 ": {"营业收入": 5, "营业税金及附加": 33, "增值税": 39},
+    "7利润": {"营业收入": 5, "营业税金及附加": 6, "总成本": 7, "财务费用": 11, "利润总额": 13, "所得税": 16, "净利润": 17},
+    "8财务现金": {"净现金流": 41, "累计净现金流": 42},
+    "9资产负债": {
+        "资产合计": 4, "流动资产合计": 5, "货币资金": 6, "应收账款": 9, "存货": 11,
+        "在建工程": 14, "固定资产净值": 15, "无形及其他资产净值": 16,
+        "负债及所有者权益合计": 17, "负债合计": 18, "流动负债合计": 19, "应付账款": 21,
+        "建设投资借款": 24, "所有者权益": 27, "项目资本金": 28, "资本公积": 29, "累计未分配利润": 31,
+    },
+    "10项目现金": {"现金流入": 4, "现金流出": 10, "净现金流": 21, "累计净现金流": 22},
+    "11资本金现金 ": {"现金流入": 4, "现金流出": 11, "净现金流": 21},
+    "12各方现金": {
+        "现金流入": 4, "实分利润": 5, "资产处置收益分配": 6, "租赁费收入": 10, "技术转让或使用收入": 11,
+        "其他现金流入": 12, "现金流出": 13, "实缴资本": 14, "租赁资产支出": 15, "其他现金流出": 16,
+        "净现金流量": 17,
+    },
+    "房产销售及土增": {"销售收入": 8, "销售费用": 13, "销售税金及附加": 17, "土地增值税": 26},
+}
+
+# 模板的年份列数：原表年份列较少的工作表在转换时按最后一列的格式向右补齐
+TEMPLATE_YEARS = 30
+# 不补齐年份列的工作表（投资计划只列建设期各年）
+FIXED_YEAR_SHEETS = ("3投资计划",)
+
+# 合计列的表头
+TOTAL_HEADERS = ("合计", "总金额")
+
+# 表尾项目信息的标签（右侧单元格依次为项目名称或年数，再右侧第3个单元格为起始年份或计算期）
+FOOTER_PROJECT_NAME = "项目名称"
+FOOTER_CONSTRUCTION = "建设（筹建期）"
+FOOTER_OPERATION = "运营期"
+
+# 年份行上方的期间表头
+BAND_CONSTRUCTION = "建设期"
+BAND_OPERATION = "运营期"
+
+_NUMBER_PREFIX = re.compile(r"^\d+\.\s*")
+_CELL = re.compile(r'<c r="([A-Z]+\d+)"([^>]*?)(?:/>|>.*?</c>)', re.S)
+_STYLE = re.compile(r'\ss="(\d+)"')
+_MERGE_CELLS = re.compile(r"<mergeCells[^>]*>(.*?)</mergeCells>|<mergeCells[^>]*/>", re.S)
+_MERGE_REF = re.compile(r'<mergeCell ref="([A-Z]+\d+):([A-Z]+\d+)"\s*/>')
+
+# xlrd格式记录中的边框、对齐编号
+_BORDER_STYLES = {
+    1: "thin", 2: "medium", 3: "dashed", 4: "dotted", 5: "thick", 6: "double", 7: "hair",
+    8: "mediumDashed", 9: "dashDot", 10: "mediumDashDot", 11: "dashDotDot", 12: "mediumDashDotDot",
+    13: "slantDashDot",
+}
+_HORIZONTAL = {1: "left", 2: "center", 3: "right", 4: "fill", 5: "justify", 6: "centerContinuous", 7: "distributed"}
+_VERTICAL = {0: "top", 1: "center", 2: "bottom", 3: "justify", 4: "distributed"}
+
+
+def row_labels(df: "pd.DataFrame") -> List[str]:
+    """
+    计算表各行的行名（TEMPLATE_ROWS中使用的名称）
+
+    Args:
+        df: 计算表
+
+    Returns:
+        list: 各行行名；有"说明"列时为"分项/说明"
+    """
+    if "说明" not in df.columns:
+        return [str(item).strip() for item in df.iloc[:, 0]]
+    labels = []
+    section = ""
+    for item, note in zip(df.iloc[:, 0], df["说明"]):
+        item = str(item).strip()
+        if item:
+            section = _NUMBER_PREFIX.sub("", item)
+            labels.append(section)
+        else:
+            labels.append(f"{section}/{str(note).strip()}")
+    return labels
+
+
+def _year_columns(df: "pd.DataFrame") -> List[Tuple[int, Any]]:
+    """计算表中的年份列：[(年份序号（从1开始）, 列名)]"""
+    years = []
+    for col in df.columns:
+        match = re.fullmatch(r"第(\d+)年", str(col))
+        if match:
+            years.append((int(match.group(1)), col))
+    return years
+
+
+def _column_letter(col: int) -> str:
+    """列下标（从0开始）转为列字母"""
+    letters = ""
+    col += 1
+    while col:
+        col, rem = divmod(col - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _ref(row: int, col: int) -> str:
+    """行列下标（从0开始）转为单元格地址"""
+    return f"{_column_letter(col)}{row + 1}"
+
+
+def _number(value: Any) -> Optional[float]:
+    """数值单元格的值，非数值或NaN为None"""
+    if isinstance(value, bool) or not isinstance(value, numbers.Real):
+        return None
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+# ===== 模板转换 =====
+
+def _find_year_row(values: Sequence[Sequence[Any]]) -> Optional[Tuple[int, int, int]]:
+    """
+    查找年份行：同一行中从某列起依次为1, 2, 3, ...
+
+    Returns:
+        tuple: (行下标, 第1年所在列下标, 年数)，没有年份行时为None
+    """
+    for r, row in enumerate(values[:10]):
+        for c in range(len(row) - 2):
+            if [_number(v) for v in row[c:c + 3]] == [1.0, 2.0, 3.0]:
+                n = 3
+                while c + n < len(row) and _number(row[c + n]) == n + 1:
+                    n += 1
+                return r, c, n
+    return None
+
+
+def _total_column(values: Sequence[Sequence[Any]], year_row: int, first_col: int) -> Optional[int]:
+    """年份列左侧的合计列下标，没有合计列时为None"""
+    col = first_col - 1
+    for r in range(year_row + 1):
+        if col < len(values[r]) and isinstance(values[r][col], str) and values[r][col].strip() in TOTAL_HEADERS:
+            return col
+    return None
+
+
+def _xls_style(book, xf_index: int, cache: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+    """xlrd格式记录转为openpyxl的字体、填充、边框、对齐和数字格式（按格式编号缓存）"""
+    if xf_index in cache:
+        return cache[xf_index]
+    from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+
+    def color(index) -> Optional[str]:
+        rgb = book.colour_map.get(index)
+        return None if rgb is None else "FF%02X%02X%02X" % rgb
+
+    xf = book.xf_list[xf_index]
+    font = book.font_list[xf.font_index]
+    style: Dict[str, Any] = {
+        "font": Font(name=font.name, size=font.height / 20, bold=bool(font.bold), italic=bool(font.italic),
+                     underline="single" if font.underline_type else None, strike=bool(font.struck_out),
+                     color=color(font.colour_index)),
+        "number_format": book.format_map[xf.format_key].format_str if xf.format_key in book.format_map
+        else "General",
+        "alignment": Alignment(horizontal=_HORIZONTAL.get(xf.alignment.hor_align),
+                               vertical=_VERTICAL.get(xf.alignment.vert_align),
+                               wrap_text=bool(xf.alignment.text_wrapped)),
+    }
+    if xf.background.fill_pattern == 1 and color(xf.background.pattern_colour_index):
+        style["fill"] = PatternFill("solid", fgColor=color(xf.background.pattern_colour_index))
+    sides = {}
+    for side in ("left", "right", "top", "bottom"):
+        line = _BORDER_STYLES.get(getattr(xf.border, f"{side}_line_style"))
+        if line:
+            sides[side] = Side(style=line, color=color(getattr(xf.border, f"{side}_colour_index")))
+    if sides:
+        style["border"] = Border(**sides)
+    cache[xf_index] = style
+    return style
+
+
+def convert_template(excel_file: str, template_file: str, sheets: Optional[Sequence[str]] = None) -> None:
+    """
+    将.xls工作簿转换为.xlsx模板
+
+    只保留sheets中的工作表；年份行以外、从合计列（或第1年列）起的数值单元格置0，作为导出时填写的位置；
+    年份行上方的建设期/运营期表头不合并，导出时按各项目的建设期重新合并。
+
+    Args:
+        excel_file: 原工作簿（.xls）
+        template_file: 输出的模板（.xlsx）
+        sheets: 转换的工作表，默认为TEMPLATE_ROWS中的计算表
+    """
+    import xlrd
+
+    sheets = list(TEMPLATE_ROWS) if sheets is None else list(sheets)
+    book = xlrd.open_workbook(excel_file, formatting_info=True)
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    styles: Dict[int, Dict[str, Any]] = {}
+
+    for name in book.sheet_names():
+        if name not in sheets:
+            continue
+        sheet = book.sheet_by_name(name)
+        ws = wb.create_sheet(name)
+        values = [sheet.row_values(r) for r in range(sheet.nrows)]
+        year = _find_year_row(values)
+        if year is not None:
+            year_row, first_col, n_years = year
+            total_col = _total_column(values, year_row, first_col)
+            region_col = first_col if total_col is None else total_col
+            last_col = first_col + n_years - 1
+            band_row = year_row - 1
+
+        for r in range(sheet.nrows):
+            for c in range(sheet.ncols):
+                cell = sheet.cell(r, c)
+                if cell.ctype == xlrd.XL_CELL_EMPTY:
+                    continue
+                value = cell.value
+                if cell.ctype in (xlrd.XL_CELL_ERROR, xlrd.XL_CELL_BLANK) or value == "":
+                    value = None
+                elif cell.ctype == xlrd.XL_CELL_BOOLEAN:
+                    value = bool(value)
+                if year is not None and r != year_row and region_col <= c <= last_col and isinstance(value, float):
+                    value = 0.0
+                target = ws.cell(row=r + 1, column=c + 1, value=value)
+                style = _xls_style(book, cell.xf_index, styles)
+                target.font = style["font"]
+                target.number_format = style["number_format"]
+                target.alignment = style["alignment"]
+                if "fill" in style:
+                    target.fill = style["fill"]
+                if "border" in style:
+                    target.border = style["border"]
+
+        if year is not None and name not in FIXED_YEAR_SHEETS and n_years < TEMPLATE_YEARS:
+            from copy import copy
+
+            for c in range(last_col + 1, first_col + TEMPLATE_YEARS):
+                for r in range(sheet.nrows):
+                    source = ws.cell(row=r + 1, column=last_col + 1)
+                    if r == year_row:
+                        value = float(c - first_col + 1)
+                    else:
+                        value = 0.0 if isinstance(source.value, float) else None
+                    target = ws.cell(row=r + 1, column=c + 1, value=value)
+                    if source.has_style:
+                        target._style = copy(source._style)
+                if last_col in sheet.colinfo_map:
+                    ws.column_dimensions[_column_letter(c)].width = sheet.colinfo_map[last_col].width / 256
+            last_col = first_col + TEMPLATE_YEARS - 1
+
+        if year is not None:
+            # 导出时填写的行、年份行和期间表头的各单元格都写入模板，替换时只需改写已有的单元格
+            for row in list(TEMPLATE_ROWS.get(name, {}).values()) + [year_row + 1, band_row + 1]:
+                for c in range(region_col, last_col + 1):
+                    ws.cell(row=row, column=c + 1)
+
+        for r_lo, r_hi, c_lo, c_hi in sheet.merged_cells:
+            if year is not None and r_lo <= band_row < r_hi and c_hi > first_col and c_lo <= last_col:
+                continue
+            ws.merge_cells(start_row=r_lo + 1, end_row=r_hi, start_column=c_lo + 1, end_column=c_hi)
+        for c, info in sheet.colinfo_map.items():
+            ws.column_dimensions[_column_letter(c)].width = info.width / 256
+        for r, info in sheet.rowinfo_map.items():
+            ws.row_dimensions[r + 1].height = info.height / 20
+
+    wb.save(template_file)
+
+
+def template_file(excel_file: Optional[str] = None, cache_dir: Optional[str] = None) -> str:
+    """
+    已转换的模板路径，不存在或原工作簿已变化时重新转换
+
+    Args:
+        excel_file: 原工作簿，默认为config.EXCEL_FILE
+        cache_dir: 缓存目录，默认为工作簿所在目录下的DEFAULT_CACHE_DIR
+
+    Returns:
+        str: 模板（.xlsx）路径
+    """
+    excel_file = os.path.abspath(excel_file or config.EXCEL_FILE)
+    cache_dir = cache_dir or os.path.join(os.path.dirname(excel_file), DEFAULT_CACHE_DIR)
+    path = os.path.join(cache_dir, f"template-{content_hash(excel_file)[:32]}-v{TEMPLATE_VERSION}.xlsx")
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        _write_atomic(path, lambda tmp: convert_template(excel_file, tmp))
+    return path
+
+
+# ===== 填写模板 =====
+
+class _SheetLayout:
+    """一个工作表模板：工作表XML按待填写的单元格切分为片段，填写时依次拼接"""
+
+    def __init__(self, name: str, xml: str, values: List[List[Any]]):
+        self.name = name
+        year = _find_year_row(values)
+        if year is None:
+            raise ValueError(f"模板工作表中没有年份行: {name}")
+        self.year_row, self.first_col, self.n_years = year
+        self.total_col = _total_column(values, self.year_row, self.first_col)
+        self.rows = TEMPLATE_ROWS.get(name, {})
+        last_col = self.first_col + self.n_years - 1
+        region_col = self.first_col if self.total_col is None else self.total_col
+        band_row = self.year_row - 1
+
+        slots = set()
+        # 数值单元格（转换时置0）：填写计算值，没有计算值时为空
+        for r, row in enumerate(values):
+            for c in range(region_col, min(len(row), last_col + 1)):
+                if r != self.year_row and _number(row[c]) is not None:
+                    slots.add((r, c))
+        # 计算表各行、年份行
+        for excel_row in self.rows.values():
+            slots.update((excel_row - 1, c) for c in range(self.first_col, last_col + 1))
+        slots.update((self.year_row, c) for c in range(self.first_col, last_col + 1))
+        # 期间表头：原表有建设期/运营期表头时按各项目的建设期重写
+        self.band_row = None
+        if band_row >= 0 and any(isinstance(v, str) and v.strip() in (BAND_CONSTRUCTION, BAND_OPERATION)
+                                 for v in values[band_row][self.first_col:last_col + 1]):
+            self.band_row = band_row
+            slots.update((band_row, c) for c in range(self.first_col, last_col + 1))
+        # 表尾项目信息
+        self.footer: Dict[Tuple[int, int], str] = {}
+        for r, row in enumerate(values):
+            if r <= self.year_row:
+                continue
+            for c, v in enumerate(row[:self.first_col]):
+                if isinstance(v, str) and v.strip() in (FOOTER_PROJECT_NAME, FOOTER_CONSTRUCTION, FOOTER_OPERATION):
+                    key = v.strip()
+                    if key == FOOTER_PROJECT_NAME:
+                        self.footer[(r, c + 1)] = "project_name"
+                    elif key == FOOTER_CONSTRUCTION:
+                        self.footer[(r, c + 1)] = "construction_period"
+                        self.footer[(r, c + 4)] = "first_operation_year"
+                    else:
+                        self.footer[(r, c + 1)] = "operation_period"
+                        self.footer[(r, c + 4)] = "total_years"
+        slots.update(self.footer)
+        self._slot_cells = slots
+
+        refs = {_ref(r, c): (r, c) for r, c in slots}
+        self._pieces: List[str] = []
+        self._slots: List[Tuple[Tuple[int, int], str]] = []
+        position = 0
+        for match in _CELL.finditer(xml):
+            cell = refs.get(match.group(1))
+            if cell is None:
+                continue
+            style = _STYLE.search(match.group(2))
+            self._pieces.append(xml[position:match.start()])
+            self._slots.append((cell, f' s="{style.group(1)}"' if style else ""))
+            position = match.end()
+        self._pieces.append(xml[position:])
+
+        # 合并单元格：期间表头的合并区域按各项目重新生成
+        self._merges: List[str] = []
+        if self.band_row is not None:
+            tail = self._pieces[-1]
+            match = _MERGE_CELLS.search(tail)
+            if match:
+                self._merges = [
+                    f"{a}:{b}" for a, b in _MERGE_REF.findall(match.group(1) or "")
+                    if not self._is_band_merge(a, b)
+                ]
+                self._pieces[-1] = tail[:match.start()]
+                self._merge_tail = tail[match.end():]
+            else:
+                end = tail.index("</sheetData>") + len("</sheetData>")
+                self._pieces[-1] = tail[:end]
+                self._merge_tail = tail[end:]
+
+    def _is_band_merge(self, start: str, end: str) -> bool:
+        """合并区域是否位于期间表头行的年份列"""
+        r0, c0 = cell_index(start)
+        r1, c1 = cell_index(end)
+        last_col = self.first_col + self.n_years - 1
+        return r0 <= self.band_row <= r1 and c1 >= self.first_col and c0 <= last_col
+
+    def fill(self, results: Mapping[str, "pd.DataFrame"], info: Dict[str, Any]) -> str:
+        """
+        生成填写后的工作表XML
+
+        Args:
+            results: 计算表
+            info: 项目信息（project_name、construction_period、operation_period等）
+
+        Returns:
+            str: 工作表XML
+        """
+        # 原表年份列少于计算期时（如投资计划只列建设期各年）只填写前若干年，之后各年须均为0
+        n_years = min(info["total_years"], self.n_years)
+
+        cells: Dict[Tuple[int, int], Any] = {}
+        for i in range(n_years):
+            cells[(self.year_row, self.first_col + i)] = i + 1
+        if self.band_row is not None:
+            cells[(self.band_row, self.first_col)] = BAND_CONSTRUCTION
+            if info["construction_period"] < n_years:
+                cells[(self.band_row, self.first_col + info["construction_period"])] = BAND_OPERATION
+        for key, field in self.footer.items():
+            cells[key] = info[field]
+
+        df = results.get(self.name)
+        if df is not None:
+            years = [(year, df.columns.get_loc(col)) for year, col in _year_columns(df)]
+            for label, values in zip(row_labels(df), df.itertuples(index=False, name=None)):
+                excel_row = self.rows.get(label)
+                if excel_row is None:
+                    continue
+                numbers = [_number(values[i]) for year, i in years]
+                for (year, _), number in zip(years, numbers):
+                    if year <= self.n_years:
+                        cells[(excel_row - 1, self.first_col + year - 1)] = number
+                    elif number:
+                        raise ValueError(f"“{self.name}”{label}第{year}年有数值，超出模板的年份列数（{self.n_years}年）")
+                # 合计列只在原表有合计值的行填写（余额、净值等行不合计）
+                if self.total_col is not None and (excel_row - 1, self.total_col) in self._slot_cells:
+                    present = [x for x in numbers if x is not None]
+                    cells[(excel_row - 1, self.total_col)] = sum(present) if present else None
+
+        parts = [self._pieces[0]]
+        for (cell, style), piece in zip(self._slots, self._pieces[1:]):
+            parts.append(_cell_xml(_ref(*cell), style, cells.get(cell)))
+            parts.append(piece)
+        if self.band_row is not None:
+            cp = min(info["construction_period"], n_years)
+            merges = list(self._merges)
+            for start, end in ((0, cp - 1), (cp, n_years - 1)):
+                if end > start:
+                    merges.append(f"{_ref(self.band_row, self.first_col + start)}:"
+                                  f"{_ref(self.band_row, self.first_col + end)}")
+            if merges:
+                parts.append(f'<mergeCells count="{len(merges)}">'
+                             + "".join(f'<mergeCell ref="{m}"/>' for m in merges) + "</mergeCells>")
+            parts.append(self._merge_tail)
+        return "".join(parts)
+
+
+def _cell_xml(ref: str, style: str, value: Any) -> str:
+    """单元格XML（数值或行内字符串，None为空单元格）"""
+    if value is None or value == "":
+        return f'<c r="{ref}"{style}/>'
+    if isinstance(value, str):
+        return f'<c r="{ref}"{style} t="inlineStr"><is><t>{escape(value)}</t></is></c>'
+    return f'<c r="{ref}"{style}><v>{repr(float(value)) if isinstance(value, float) else value}</v></c>'
+
+
+def _sheet_parts(parts: Mapping[str, bytes]) -> Dict[str, str]:
+    """工作表名称到工作表XML部件名称的映射"""
+    rels = parts["xl/_rels/workbook.xml.rels"].decode("utf-8")
+    targets = {}
+    for rel in re.finditer(r"<Relationship\b[^>]*>", rels):
+        rel_id = re.search(r'\bId="([^"]+)"', rel.group(0)).group(1)
+        target = re.search(r'\bTarget="([^"]+)"', rel.group(0)).group(1)
+        targets[rel_id] = target.lstrip("/") if target.startswith("/") else posixpath.normpath(f"xl/{target}")
+    workbook = parts["xl/workbook.xml"].decode("utf-8")
+    sheets = {}
+    for sheet in re.finditer(r"<sheet\b[^>]*>", workbook):
+        name = re.search(r'\bname="([^"]+)"', sheet.group(0)).group(1)
+        rel_id = re.search(r'\br:id="([^"]+)"', sheet.group(0)).group(1)
+        sheets[_unescape(name)] = targets[rel_id]
+    return sheets
+
+
+def _unescape(text: str) -> str:
+    from xml.sax.saxutils import unescape
+    return unescape(text, {"&quot;": '"', "&apos;": "'"})
+
+
+class TemplateExporter:
+    """按原工作簿版式导出计算结果"""
+
+    def __init__(self, template: Optional[str] = None, compresslevel: int = 1):
+        """
+        解析模板（只在初始化时读取一次）
+
+        Args:
+            template: 已转换的模板（.xlsx），默认为template_file()
+            compresslevel: 输出文件的压缩级别
+        """
+        self.template = template or template_file()
+        self.compresslevel = compresslevel
+        with zipfile.ZipFile(self.template) as archive:
+            self._parts = [(item, archive.read(item)) for item in archive.infolist()]
+        parts = {item.filename: content for item, content in self._parts}
+
+        wb = openpyxl.load_workbook(self.template, read_only=True)
+        try:
+            self._layouts: Dict[str, _SheetLayout] = {}
+            for name, part in _sheet_parts(parts).items():
+                values = [list(row) for row in wb[name].iter_rows(values_only=True)]
+                if _find_year_row(values) is None:
+                    continue
+                self._layouts[part] = _SheetLayout(name, parts[part].decode("utf-8"), values)
+        finally:
+            wb.close()
+
+    @property
+    def sheet_names(self) -> List[str]:
+        """模板中按年份填写的工作表"""
+        return [layout.name for layout in self._layouts.values()]
+
+    def export(self, results: Mapping[str, "pd.DataFrame"], construction_period: int,
+               project_name: str = "", target: Union[str, io.BytesIO, None] = None) -> Optional[bytes]:
+        """
+        填写模板并输出工作簿
+
+        Args:
+            results: 计算表
+            construction_period: 建设期（年）
+            project_name: 项目名称（写入表尾）
+            target: 输出文件路径或缓冲区，为None时返回工作簿内容
+
+        Returns:
+            bytes: target为None时为工作簿内容，否则为None
+        """
+        years = [year for df in results.values() for year, _ in _year_columns(df)]
+        total_years = max(years) if years else construction_period
+        info = {
+            "project_name": project_name,
+            "construction_period": construction_period,
+            "operation_period": total_years - construction_period,
+            "first_operation_year": construction_period + 1,
+            "total_years": total_years,
+        }
+
+        buffer = io.BytesIO() if target is None else target
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED,
+                             compresslevel=self.compresslevel) as archive:
+            for item, content in self._parts:
+                layout = self._layouts.get(item.filename)
+                if layout is not None:
+                    content = layout.fill(results, info).encode("utf-8")
+                archive.writestr(item.filename, content)
+        return buffer.getvalue() if target is None else None
+
+
+@functools.lru_cache(maxsize=4)
+def _cached_exporter(template: str) -> TemplateExporter:
+    """按模板路径缓存（模板文件名含原工作簿的内容哈希）"""
+    return TemplateExporter(template)
+
+
+def get_exporter(excel_file: Optional[str] = None) -> TemplateExporter:
+    """
+    进程内缓存的模板导出器（原工作簿变化时重新转换和解析）
+
+    Args:
+        excel_file: 原工作簿，默认为config.EXCEL_FILE
+
+    Returns:
+        TemplateExporter
+    """
+    return _cached_exporter(template_file(excel_file))
+
+
+def export_template(results: Mapping[str, "pd.DataFrame"], construction_period: int, project_name: str = "",
+                    target: Union[str, io.BytesIO, None] = None) -> Optional[bytes]:
+    """
+    按原工作簿版式导出一组计算结果
+
+    Args:
+        results: 计算表
+        construction_period: 建设期（年）
+        project_name: 项目名称
+        target: 输出文件路径或缓冲区，为None时返回工作簿内容
+
+    Returns:
+        bytes: target为None时为工作簿内容，否则为None
+    """
+    return get_exporter().export(results, construction_period, project_name, target)
+
+
+def export_projects(projects: Iterable[Tuple[str, Any]], target: Union[str, io.BytesIO, None] = None,
+                    exporter: Optional[TemplateExporter] = None) -> Optional[bytes]:
+    """
+    批量按原工作簿版式导出，每个项目一个工作簿，打包为zip
+
+    Args:
+        projects: [(文件名, ProjectFile或返回ProjectFile的函数), ...]，可为生成器；项目文件须含计算结果
+        target: 输出文件路径或缓冲区，为None时返回zip内容
+        exporter: 模板导出器，默认为get_exporter()
+
+    Returns:
+        bytes: target为None时为zip内容，否则为None
+    """
+    from report_export import sheet_title
+
+    exporter = exporter or get_exporter()
+    buffer = io.BytesIO() if target is None else target
+    used: set = set()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as archive:
+        for name, project in projects:
+            project = project() if callable(project) else project
+            content = exporter.export(project.results(), project.construction_period,
+                                      project.input_data().basic_info.project_name)
+            archive.writestr(f"{sheet_title(name, used)}.xlsx", content)
+    return buffer.getvalue() if target is None else None
@@ -0,0 +1,177 @@
+"""
+测试资产登记簿
+"""
+import copy
+import time
+
+import numpy as np
+
+from year_generator import YearGenerator
+from calculation_engine import CalculationEngine
+from input_mapping import load_input_data
+from serialization import dump_project, load_project
+from asset_register import CATEGORIES, Asset, AssetRegister, depreciation_kernel
+
+print("=" * 60)
+print("测试资产登记簿")
+print("=" * 60)
+
+print("\n1. 单位折旧核...")
+kernel = depreciation_kernel("直线法", 20, 5.0)
+assert kernel.shape == (20,) and np.isclose(kernel.sum(), 0.95)
+assert depreciation_kernel("直线法", 0).size == 0
+try:
+    depreciation_kernel("工作量法", 10)
+    raise AssertionError("应拒绝不支持的折旧方法")
+except ValueError as e:
+    print(f"  [拒绝] {e}")
+
+# 双倍余额递减法：10年、残值率5%，前8年按20%计提，最后两年平均摊销净值扣除残值后的余额
+kernel = depreciation_kernel("双倍余额递减法", 10, 5.0)
+book = 1.0
+for year in range(8):
+    assert np.isclose(kernel[year], book * 0.2)
+    book -= kernel[year]
+assert np.allclose(kernel[8:], (book - 0.05) / 2)
+assert np.isclose(kernel.sum(), 0.95)
+# 残值率较高时不提过头
+assert np.isclose(depreciation_kernel("双倍余额递减法", 10, 30.0).sum(), 0.70)
+assert (depreciation_kernel("双倍余额递减法", 10, 30.0) >= 0).all()
+assert np.isclose(depreciation_kernel("双倍余额递减法", 2, 5.0).sum(), 0.95)
+
+# 年数总和法：5年、残值率5%，折旧率依次为5/15、4/15…1/15
+kernel = depreciation_kernel("年数总和法", 5, 5.0)
+assert np.allclose(kernel, 0.95 * np.array([5, 4, 3, 2, 1]) / 15)
+
+# 同一方法、年限、残值率的折旧核只计算一次，且不可修改
+assert depreciation_kernel("年数总和法", 5, 5.0) is kernel
+assert not kernel.flags.writeable
+
+print("\n2. 卷积结果与逐项逐年计算一致...")
+periods = 30
+rng = np.random.default_rng(0)
+assets = [
+    Asset(f"资产{i}", str(rng.choice(["building", "equipment", "other_asset"])), float(rng.uniform(10, 1000)),
+          int(rng.integers(1, 35)), int(rng.choice([5, 10, 20])), float(rng.choice([0.0, 5.0])))
+    for i in range(300)
+]
+register = AssetRegister(periods)
+register.extend(assets)
+schedules = register.schedules()
+assert set(schedules) == set(CATEGORIES)
+for category in ("building", "equipment", "other_asset"):
+    expected = np.zeros(periods)
+    added = np.zeros(periods)
+    for asset in assets:
+        if asset.category != category or asset.in_service_year > periods:
+            continue
+        added[asset.in_service_year - 1] += asset.cost
+        annual = asset.cost * (1 - asset.salvage_rate / 100) / asset.life
+        for year in range(asset.in_service_year - 1, min(asset.in_service_year - 1 + asset.life, periods)):
+            expected[year] += annual
+    assert np.allclose(schedules[category]["amount"], expected), category
+    assert np.allclose(schedules[category]["original_value"], added), category
+    assert np.allclose(schedules[category]["net_value"], np.cumsum(added) - np.cumsum(expected)), category
+assert not schedules["land"]["amount"].any()
+
+# 不同折旧方法的资产分组计算
+register = AssetRegister(12)
+register.add(Asset("设备A", "equipment", 100.0, 2, 5, 5.0, "年数总和法"))
+register.add(Asset("设备B", "equipment", 200.0, 3, 4, 5.0, "双倍余额递减法"))
+expected = np.zeros(12)
+expected[1:6] += 100.0 * depreciation_kernel("年数总和法", 5, 5.0)
+expected[2:6] += 200.0 * depreciation_kernel("双倍余额递减法", 4, 5.0)
+schedule = register.schedules(["equipment"])["equipment"]
+assert np.allclose(schedule["amount"], expected)
+assert np.isclose(schedule["net_value"][-1], 300.0 * 0.05)
+
+# 按比例结转的资产
+register = AssetRegister(6)
+register.add(Asset("出售资产", "sales_assets", 1000.0, 2, pattern=(0.1, 0.3, 0.3, 0.3)))
+schedule = register.schedules(["sales_assets"])["sales_assets"]
+assert np.allclose(schedule["amount"], [0, 100, 300, 300, 300, 0])
+assert np.allclose(schedule["net_value"], [0, 900, 600, 300, 0, 0])
+
+try:
+    register.add(Asset("车辆", "vehicle", 10.0, 1, 5))
+    raise AssertionError("应拒绝未知的资产类别")
+except ValueError as e:
+    print(f"  [拒绝] {e}")
+
+print("\n3. 大量资产...")
+many = [
+    Asset(f"设备{i}", "equipment", float(rng.uniform(1, 100)), int(rng.integers(4, 21)),
+          int(rng.choice([5, 8, 10, 15])), 5.0)
+    for i in range(5000)
+]
+register = AssetRegister(20)
+register.extend(many)
+start = time.perf_counter()
+total = register.schedules()["equipment"]
+elapsed = (time.perf_counter() - start) * 1000
+print(f"  {len(many)} 项资产耗时 {elapsed:.1f} ms")
+assert elapsed < 200
+assert np.isclose(total["original_value"].sum(), sum(asset.cost for asset in many))
+
+print("\n4. 计算表...")
+input_data = load_input_data()
+yg = YearGenerator(3, 17)
+results = CalculationEngine(yg, copy.deepcopy(input_data)).run_all_calculations()
+amortization = results["5-5摊销"]
+life = input_data.asset_formation.other_asset.amortization_years
+row = amortization.index[amortization["说明"] == "当期摊销费"][2]
+values = amortization.loc[row, [f"第{y}年" for y in range(1, 21)]].to_numpy(dtype=float)
+assert (values[3:3 + life] > 0).all() and not values[3 + life:].any(), "其他资产摊销到年限为止"
+# 总成本表的摊销费与摊销表合计一致
+years = [f"第{y}年" for y in range(1, 21)]
+total_amortization = amortization.loc[amortization["说明"] == "当期摊销费", years].iloc[-1].to_numpy(dtype=float)
+cost_amortization = results["5总成本"].set_index("项目").loc["摊销费", years].to_numpy(dtype=float)
+assert np.allclose(cost_amortization, total_amortization)
+# 折旧费与折旧表合计一致（出售资产的成本与摊销费同样按销售进度结转）
+total_depreciation = results["5-4折旧"].set_index("说明").loc["当期折旧、摊销", years].to_numpy(dtype=float)
+cost_depreciation = results["5总成本"].set_index("项目").loc["折旧费", years].to_numpy(dtype=float)
+assert np.allclose(cost_depreciation, total_depreciation)
+
+# 运营期第10年更新设备
+changed = copy.deepcopy(input_data)
+changed.asset_formation.additional_assets = [
+    {"name": "设备更新", "category": "equipment", "cost": 2000.0, "in_service_year": 13, "life": 5,
+     "salvage_rate": 5.0},
+]
+changed_results = CalculationEngine(yg, changed).run_all_calculations()
+depreciation = changed_results["5-4折旧"]
+base = results["5-4折旧"]
+years = [f"第{y}年" for y in range(1, 21)]
+equipment = depreciation.iloc[5:8][years].to_numpy(dtype=float) - base.iloc[5:8][years].to_numpy(dtype=float)
+assert equipment[0, 12] == 2000.0 and equipment[0].sum() == 2000.0
+assert np.allclose(equipment[1, 12:17], 380.0) and not equipment[1, 17:].any()
+assert np.isclose(equipment[2, -1], 100.0), "年限届满后保留残值"
+# 追加资产的折旧进入总成本和利润，投资计入当年现金流出，从而影响财务指标
+cost_change = (changed_results["5总成本"].set_index("项目").loc["折旧费", years].to_numpy(dtype=float) -
+               results["5总成本"].set_index("项目").loc["折旧费", years].to_numpy(dtype=float))
+assert np.allclose(cost_change[12:17], 380.0) and not cost_change[:12].any()
+profit_change = (changed_results["7利润"].set_index("项目").loc["利润总额", years].to_numpy(dtype=float) -
+                 results["7利润"].set_index("项目").loc["利润总额", years].to_numpy(dtype=float))
+assert np.allclose(profit_change[12:17], -380.0, atol=0.02)
+outflow_change = (changed_results["8财务现金"].set_index("项目").loc["现金流出", years].to_numpy(dtype=float) -
+                  results["8财务现金"].set_index("项目").loc["现金流出", years].to_numpy(dtype=float))
+assert outflow_change[12] > 1500.0, "追加投资计入当年现金流出（扣除折旧减少的所得税）"
+base_kpis = CalculationEngine(yg, copy.deepcopy(input_data)).graph.get("kpis")
+changed_kpis = CalculationEngine(yg, copy.deepcopy(changed)).graph.get("kpis")
+print(f"  追加设备: NPV {base_kpis['npv']:,.2f} -> {changed_kpis['npv']:,.2f}")
+assert changed_kpis["npv"] < base_kpis["npv"]
+
+# 折旧方法
+accelerated = copy.deepcopy(input_data)
+accelerated.asset_formation.building_fixed_asset.depreciation_method = "双倍余额递减法"
+accelerated_results = CalculationEngine(yg, accelerated).run_all_calculations()
+building = accelerated_results["5-4折旧"].iloc[1:4][years].to_numpy(dtype=float)
+base_building = base.iloc[1:4][years].to_numpy(dtype=float)
+assert building[1, 3] > base_building[1, 3] and np.isclose(building[1, 3], building[0, 3] * 0.1)
+assert building[1].sum() < building[0].sum() * 0.95 + 1e-6
+
+# 追加资产随项目文件保存
+restored = load_project(dump_project(changed)).input_data()
+assert restored.asset_formation.additional_assets == changed.asset_formation.additional_assets
+
+print("\n[OK] 资产登记簿测试通过")
@@ -0,0 +1,130 @@
+"""
+测试批量情景计算引擎
+"""
+import copy
+import numpy as np
+import pandas as pd
+from year_generator import YearGenerator
+from data_models import InputData
+from calculation_engine import CalculationEngine
+from batch_engine import BatchEngine, apply_override
+
+print("=" * 60)
+print("测试批量情景计算引擎")
+print("=" * 60)
+
+year_generator = YearGenerator(construction_period=3, operation_period=17)
+
+input_data = InputData()
+inv = input_data.project_investment
+inv.building_cost = 67062.86
+inv.building_installation_cost = 18299.19
+inv.management_fee = 2994.8
+inv.land_use_fee = 6505.72
+inv.basic_reserve = 10532.08
+input_data.asset_sales_plan.total_sales_price = 66285.86
+for year in year_generator.generate_year_names():
+    if year_generator.is_operation_year(year_generator.get_year_index(year)):
+        input_data.sales_revenue.annual_revenue[year] = 15000.0
+        input_data.material_cost.material_1[year] = 300.0
+input_data.labor_cost.admin_persons = 5
+input_data.labor_cost.admin_salary = 12.0
+input_data.bank_loan_plan.interest_rate = 0.049
+input_data.tax_params.corporate_tax_rate = 0.25
+input_data.tax_params.discount_rate = 0.06
+
+overrides = pd.DataFrame({
+    "tax_params.discount_rate": [0.06, 0.08, np.nan, 0.05],
+    "project_investment.building_cost": [67062.86, 67062.86, 80000.0, 60000.0],
+    "asset_sales_plan.building_sell_ratio": [25.0, 25.0, 50.0, 0.0],
+    "sales_revenue.annual_revenue": [15000.0, 18000.0, 12000.0, np.nan],
+    "sales_revenue.annual_revenue[第6年]": [np.nan, 0.0, np.nan, 20000.0],
+    "labor_cost.admin_persons": [5, 8, 3, 5],
+}, index=["基准", "乐观", "悲观", "其他"])
+
+print("\n1. 批量计算...")
+result = BatchEngine(year_generator, input_data).evaluate(overrides, return_series=True)
+print(result.kpis.to_string())
+assert list(result.kpis.index) == list(overrides.index)
+assert result.series["净现金流"].shape == (4, 20)
+
+print("\n2. 与逐个情景的计算引擎结果比较...")
+for i, name in enumerate(overrides.index):
+    scenario_input = copy.deepcopy(input_data)
+    for path, value in overrides.loc[name].items():
+        if not np.isnan(value):
+            apply_override(scenario_input, path, value, year_generator)
+    engine = CalculationEngine(YearGenerator(3, 17), scenario_input)
+    kpis = engine.graph.get("kpis")
+    cashflow = engine.graph.get("finance_cashflow")
+
+    assert np.isclose(kpis["npv"], result.kpis.loc[name, "npv"])
+    assert np.isclose(kpis["total_investment"], result.kpis.loc[name, "total_investment"])
+    assert kpis["payback_period"] == result.kpis.loc[name, "payback_period"]
+    assert np.allclose(cashflow["净现金流"], result.series_frame("净现金流").loc[name].to_numpy())
+    print(f"  {name}: NPV一致")
+
+# 内部收益率处净现值为0
+irr = result.kpis.loc["基准", "irr"]
+net_cashflow = result.series["净现金流"][0]
+assert abs(np.sum(net_cashflow / (1 + irr) ** np.arange(20))) < 1e-4
+
+print("\n3. 折旧方法作为情景参数（选项序号）...")
+methods = pd.DataFrame({
+    "asset_formation.building_fixed_asset.depreciation_method": [0, 1, 2, np.nan],
+    "asset_formation.building_fixed_asset.depreciation_years": [20, 10, 10, np.nan],
+})
+result = BatchEngine(year_generator, input_data).evaluate(methods, return_series=True)
+for i, method in enumerate(["直线法", "双倍余额递减法", "年数总和法", "直线法"]):
+    scenario_input = copy.deepcopy(input_data)
+    scenario_input.asset_formation.building_fixed_asset.depreciation_method = method
+    if i in (1, 2):
+        scenario_input.asset_formation.building_fixed_asset.depreciation_years = 10
+    engine = CalculationEngine(YearGenerator(3, 17), scenario_input)
+    assert np.allclose(engine.graph.get("yearly_depreciation"), result.series["折旧"][i]), method
+assert result.series["折旧"][1, 3] > result.series["折旧"][2, 3] > result.series["折旧"][0, 3]
+
+try:
+    BatchEngine(year_generator, input_data).evaluate(
+        pd.DataFrame({"asset_formation.building_fixed_asset.depreciation_method": [5]}))
+    raise AssertionError("应拒绝超出范围的选项序号")
+except ValueError as e:
+    print(f"  [拒绝] {e}")
+
+print("\n4. 资产销售总价、借款参数作为情景参数...")
+loan_input = copy.deepcopy(input_data)
+loan_input.bank_loan_plan.loan_years = [1, 2, 3]
+loan_input.bank_loan_plan.loan_amounts = [10000.0, 20000.0, 10000.0]
+financing = pd.DataFrame({
+    "asset_sales_plan.total_sales_price": [66285.86, 80000.0, 66285.86, 0.0],
+    "bank_loan_plan.interest_rate": [0.049, 0.049, 0.06, 0.035],
+    "bank_loan_plan.loan_amounts[1]": [20000.0, np.nan, 30000.0, 0.0],
+    "bank_loan_plan.repayment_method": [0, 1, 2, np.nan],
+    "bank_loan_plan.loan_limit": [0.0, 0.0, 52000.0, 0.0],
+})
+result = BatchEngine(year_generator, loan_input).evaluate(financing, return_series=True)
+for i, name in enumerate(financing.index):
+    scenario_input = copy.deepcopy(loan_input)
+    scenario_input.asset_sales_plan.total_sales_price = financing.iloc[i, 0]
+    scenario_input.bank_loan_plan.interest_rate = financing.iloc[i, 1]
+    if not np.isnan(financing.iloc[i, 2]):
+        scenario_input.bank_loan_plan.loan_amounts[1] = financing.iloc[i, 2]
+    if i < 3:
+        scenario_input.bank_loan_plan.repayment_method = ["等额本金", "等额本息", "按期还息到期还本"][i]
+    scenario_input.bank_loan_plan.loan_limit = financing.iloc[i, 4]
+    engine = CalculationEngine(YearGenerator(3, 17), scenario_input)
+    profit = engine.graph.get("profit")
+    assert np.allclose(engine.graph.get("construction_interest"), result.series["建设期利息"][i])
+    assert np.isclose(engine.graph.get("investment_summary")["项目总投资（含利息）"],
+                      result.kpis["total_investment"].iloc[i])
+    assert np.allclose(profit["财务费用"], result.series["财务费用"][i])
+    assert np.allclose(profit["营业收入"], result.series["营业收入"][i])
+    assert np.isclose(engine.graph.get("kpis")["npv"], result.kpis["npv"].iloc[i])
+# 资产销售收入、借款利息进入财务指标
+npv = result.kpis["npv"].to_numpy()
+assert npv[1] > npv[0] > npv[2]
+print(f"  NPV: {np.round(npv, 2).tolist()}")
+
+print("\n" + "=" * 60)
+print("测试完成！")
+print("=" * 60)
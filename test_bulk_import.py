@@ -0,0 +1,78 @@
+"""
+测试批量导入项目工作簿
+"""
+import os
+import shutil
+import tempfile
+import time
+
+import config
+from bulk_import import (
+    FILE_COLUMN, bulk_import, find_workbooks, flatten_input, input_from_row, load_table
+)
+from input_mapping import load_input_data
+
+print("=" * 60)
+print("测试批量导入项目工作簿")
+print("=" * 60)
+
+temp_dir = tempfile.mkdtemp()
+try:
+    # 4个正常工作簿、1个损坏的工作簿、1个Excel临时文件和1个非工作簿文件
+    for i in range(4):
+        shutil.copy(config.EXCEL_FILE, os.path.join(temp_dir, f"project_{i}.xls"))
+    with open(os.path.join(temp_dir, "broken.xls"), "wb") as f:
+        f.write(b"not a workbook")
+    with open(os.path.join(temp_dir, "~$project_0.xls"), "wb") as f:
+        f.write(b"lock")
+    with open(os.path.join(temp_dir, "notes.txt"), "w") as f:
+        f.write("notes")
+
+    print("\n1. 查找工作簿...")
+    paths = find_workbooks(temp_dir)
+    assert [os.path.basename(p) for p in paths] == [
+        "broken.xls", "project_0.xls", "project_1.xls", "project_2.xls", "project_3.xls"
+    ]
+    assert find_workbooks(os.path.join(temp_dir, "project_*.xls")) == paths[1:]
+
+    print("\n2. 串行导入...")
+    serial = bulk_import(temp_dir, max_workers=1, use_cache=False)
+    print(f"  成功 {len(serial)} 个，失败 {len(serial.errors)} 个，耗时 {serial.seconds:.2f} 秒")
+    assert len(serial) == 4
+    assert serial.errors[FILE_COLUMN].tolist() == [paths[0]]
+    print(f"  错误信息: {serial.errors['错误'].iloc[0]}")
+
+    print("\n3. 进程池导入...")
+    start = time.perf_counter()
+    parallel = bulk_import(temp_dir, max_workers=2, chunk_size=1, use_cache=False)
+    print(f"  耗时 {(time.perf_counter() - start):.2f} 秒")
+    assert parallel.table.equals(serial.table)
+    assert parallel.errors.equals(serial.errors)
+
+    print("\n4. 与单个导入结果一致...")
+    expected = load_input_data(paths[1])
+    assert serial.table.iloc[0].drop(FILE_COLUMN).to_dict() == flatten_input(expected)
+    restored = serial.input_data(paths[1])
+    assert flatten_input(restored) == flatten_input(expected)
+
+    print("\n5. 保存列式表...")
+    for name in ("portfolio.parquet", "portfolio.csv"):
+        output = os.path.join(temp_dir, name)
+        serial.save(output)
+        table = load_table(output)
+        assert len(table) == 4
+        assert table[FILE_COLUMN].tolist() == serial.table[FILE_COLUMN].tolist()
+        restored = input_from_row(table.iloc[0])
+        assert restored.asset_formation.building_fixed_asset.depreciation_years == 20
+        assert restored.project_investment.building_cost == expected.project_investment.building_cost
+        assert restored.sales_revenue.annual_revenue == expected.sales_revenue.annual_revenue
+        print(f"  {name}: {table.shape[1]} 列")
+    try:
+        serial.save(os.path.join(temp_dir, "portfolio.json"))
+        raise AssertionError("应拒绝不支持的格式")
+    except ValueError:
+        pass
+finally:
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+print("\n[OK] 批量导入测试通过")
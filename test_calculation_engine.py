@@ -1,6 +1,8 @@
 """
 测试计算引擎
 """
+import numpy as np
+
 from year_generator import YearGenerator
 from data_models import InputData
 from calculation_engine import CalculationEngine
@@ -40,13 +42,6 @@ asset_form = input_data.asset_formation
 asset_form.depreciation_years = 20
 asset_form.salvage_rate = 5.0
 asset_form.amortization_years = 10
-# 使用新的资产形成结构
-asset_form.building_fixed_asset.total = 100000.0
-asset_form.equipment_fixed_asset.total = 0.0
-asset_form.land_intangible_asset.total = 6505.72
-asset_form.patent_intangible_asset.total = 0.0
-asset_form.fixed_asset_total = 100000.0
-asset_form.intangible_asset_total = 6505.72
 
 # 销售收入
 years = year_generator.generate_year_names()
@@ -81,10 +76,13 @@ tax.discount_rate = 0.06
 
 # 银行借款
 loan = input_data.bank_loan_plan
-loan.interest_rate = 5.88
+loan.interest_rate = 0.0588
 loan.repayment_years = 15
 loan.repayment_method = "等额本金"
 
+import copy
+base_input = copy.deepcopy(input_data)  # 计算会写入派生字段，保留一份原始输入
+
 print("\n1. 创建计算引擎...")
 calc_engine = CalculationEngine(year_generator, input_data)
 
@@ -111,6 +109,54 @@ if "5总成本" in results:
     df = results["5总成本"]
     print(df.head(6).to_string(index=False))
 
+print("\n7. 计算节点统计:")
+report = calc_engine.get_calculation_report()
+print(report.to_string(index=False))
+# 每个节点在一次运行中最多计算一次
+assert (report["计算次数"] <= 1).all()
+assert report.set_index("节点").loc["asset_formation", "计算次数"] == 1
+
+# 再次运行结果一致
+results_again = calc_engine.run_all_calculations()
+for sheet_name, df in results.items():
+    assert df.equals(results_again[sheet_name]), sheet_name
+
+print("\n8. 增量计算（修改折现率）:")
+calc_engine = CalculationEngine(YearGenerator(3, 17), copy.deepcopy(base_input))
+calc_engine.run_all_calculations()
+new_input = copy.deepcopy(base_input)
+new_input.tax_params.discount_rate = 0.08
+updated = calc_engine.update(new_input)
+report = calc_engine.get_calculation_report().set_index("节点")
+recomputed = [name for name in calc_engine.TABLE_NAMES if report.loc[name, "计算次数"] > 0]
+print(f"  变化字段: {calc_engine.changed_inputs}")
+print(f"  重新计算的表格: {recomputed}")
+assert calc_engine.changed_inputs == ["tax_params.discount_rate"]
+assert recomputed == ["财务分析结果汇总"]
+assert new_input.tax_params.discount_rate == 0.08  # 调用方的输入不被修改
+
+# 与完整计算结果一致
+full_results = CalculationEngine(YearGenerator(3, 17), copy.deepcopy(new_input)).run_all_calculations()
+for sheet_name, df in full_results.items():
+    assert df.equals(updated[sheet_name]), sheet_name
+
+print("\n9. 税金按小数税率计算:")
+profit = CalculationEngine(YearGenerator(3, 17), copy.deepcopy(base_input)).graph.get("profit")
+year = int(np.argmax(profit["利润总额"]))
+assert profit["利润总额"][year] > 0
+# 某个盈利年份增加1000万元收入：税金及附加增加1000×(7%+5%)=120，所得税增加(1000-120)×25%=220
+more_revenue = copy.deepcopy(base_input)
+year_name = YearGenerator(3, 17).generate_year_names()[year]
+more_revenue.sales_revenue.annual_revenue[year_name] = more_revenue.sales_revenue.annual_revenue.get(year_name, 0.0) + 1000.0
+changed_engine = CalculationEngine(YearGenerator(3, 17), more_revenue)
+changed = changed_engine.graph.get("profit")
+print(f"  {year_name}: 税金及附加 +{changed['营业税金及附加'][year] - profit['营业税金及附加'][year]:.2f}, "
+      f"所得税 +{changed['所得税'][year] - profit['所得税'][year]:.2f}")
+assert abs(changed["营业税金及附加"][year] - profit["营业税金及附加"][year] - 120.0) < 1e-6
+assert abs(changed["所得税"][year] - profit["所得税"][year] - 220.0) < 1e-6
+summary = changed_engine.run_all_calculations()["财务分析结果汇总"]
+assert "折现率6.0%" in summary.to_string()
+
 print("\n" + "=" * 60)
 print("测试完成！")
 print("=" * 60)
@@ -0,0 +1,112 @@
+"""
+测试循环引用（不动点）求解器
+"""
+import copy
+import time
+
+import numpy as np
+
+from year_generator import YearGenerator
+from calculation_engine import CalculationEngine
+from input_mapping import load_input_data
+from circularity import METHODS, construction_financing, revolver, solve_fixed_point
+
+print("=" * 60)
+print("测试循环引用（不动点）求解器")
+print("=" * 60)
+
+print("\n1. 各迭代方法收敛到同一不动点...")
+# x = cos(x)的不动点，按行缩放后互相独立
+scale = np.linspace(0.5, 1.5, 200)[:, None] * np.ones((1, 3))
+expected = None
+for method in METHODS:
+    result = solve_fixed_point(lambda x: np.cos(x / scale) * scale, np.zeros_like(scale), method, tol=1e-12)
+    assert result.converged.all(), method
+    assert np.abs(np.cos(result.value / scale) * scale - result.value).max() <= 1e-12
+    if expected is None:
+        expected = result.value
+    assert np.allclose(result.value, expected, atol=1e-10)
+    print(f"  {method}: {result.iterations} 次迭代, {result.evaluations} 次计算, 残差 {result.residual.max():.1e}")
+    if method == "picard":
+        assert result.iterations > 20
+    else:
+        assert result.iterations < 15, "加速方法应显著减少迭代次数"
+
+# 一维初值、不收敛时的标记
+result = solve_fixed_point(lambda x: 0.5 * x + 1, np.zeros(4))
+assert result.value.shape == (4,) and np.allclose(result.value, 2.0)
+result = solve_fixed_point(lambda x: 2 * x + 1, np.zeros((2, 3)), "picard", max_iter=10)
+assert not result.converged.any() and result.iterations == 10 and len(result.history) == 10
+
+try:
+    solve_fixed_point(lambda x: x, np.zeros(3), "newton")
+    raise AssertionError("应拒绝不支持的迭代方法")
+except ValueError as e:
+    print(f"  [拒绝] {e}")
+
+print("\n2. 建设期利息资本化...")
+investment = np.array([30000.0, 30000.0, 30000.0, 0.0, 0.0])
+construction = investment > 0
+financing = construction_financing(investment, 0.0588, construction)
+loan, interest = financing["借款"], financing["建设期利息"]
+# 借款为当年投资与利息之和的一半，利息按年初余额加当年借款的一半计算
+assert np.allclose(loan, 0.5 * (investment + interest))
+assert np.allclose(interest, (np.cumsum(loan) - loan + loan / 2) * 0.0588 * construction)
+assert np.allclose(financing["资本金"] + loan, investment + interest)
+# 逐年的解析解
+opening, exact = 0.0, []
+for amount in investment[construction]:
+    draw = 0.5 * (amount + opening * 0.0588) / (1 - 0.5 * 0.0588 / 2)
+    exact.append((opening + draw / 2) * 0.0588)
+    opening += draw
+assert np.allclose(interest[construction], exact)
+print(f"  建设期利息 {interest.sum():,.2f}（不计利息再借款时 {sum((i + 0.5) * 15000 * 0.0588 for i in range(3)):,.2f}）")
+
+# 借款额度不足时资本金补足缺口
+limited = construction_financing(investment, 0.0588, construction, loan_limit=40000.0)
+assert abs(limited["借款余额"][-1] - 40000.0) < 1e-6
+assert limited["资本金"].sum() > financing["资本金"].sum()
+
+print("\n3. 循环借款...")
+cash_flow = np.array([-100.0, -50.0, 20.0, 80.0, 100.0, 100.0])
+facility = revolver(cash_flow, 0.06, opening_cash=10.0, minimum_cash=10.0)
+balance = facility["循环借款余额"]
+previous = np.concatenate([[0.0], balance[:-1]])
+assert np.allclose(facility["利息"], 0.06 * (previous + balance) / 2)
+assert np.allclose(facility["提款"] - facility["还款"], balance - previous)
+cash = 10.0 + np.cumsum(cash_flow - facility["利息"] + facility["提款"] - facility["还款"])
+assert np.allclose(facility["现金余额"], cash)
+assert (facility["现金余额"] >= 10.0 - 1e-9).all()
+assert ((balance == 0) | np.isclose(facility["现金余额"], 10.0)).all(), "有借款余额时不应持有多余现金"
+assert balance[-1] == 0 and facility["现金余额"][-1] > 10.0
+
+print("\n4. 多情景批量求解...")
+size = 2000
+rng = np.random.default_rng(0)
+rates = rng.uniform(0.03, 0.08, size)
+batch_investment = np.tile(investment, (size, 1)) * rng.uniform(0.5, 1.5, (size, 1))
+limits = rng.uniform(2e4, 6e4, size)
+start = time.perf_counter()
+batch = construction_financing(batch_investment, rates, construction, loan_limit=limits)
+flows = rng.normal(0, 100, (size, 20))
+batch_facility = revolver(flows, rates)
+print(f"  {size} 个情景耗时 {(time.perf_counter() - start) * 1000:.1f} ms")
+for i in (0, 999):
+    single = construction_financing(batch_investment[i], rates[i], construction, loan_limit=limits[i])
+    assert np.allclose(single["建设期利息"], batch["建设期利息"][i])
+    assert np.allclose(revolver(flows[i], rates[i])["利息"], batch_facility["利息"][i])
+
+print("\n5. 计算引擎的建设期利息...")
+input_data = load_input_data()
+engine = CalculationEngine(YearGenerator(3, 17), copy.deepcopy(input_data))
+interest = engine.graph.get("construction_interest")
+loan = engine.graph.get("loan_schedule")
+construction = engine.yg.axis.construction_mask
+# 建设期利息取自借款计划，且已资本化计入当年提款
+assert np.allclose(interest, loan["interest"] * construction)
+assert np.allclose(loan["capitalized"], interest)
+assert abs(loan["drawdown"].sum() - sum(input_data.bank_loan_plan.loan_amounts) - interest.sum()) < 1e-6
+summary = engine.graph.get("investment_summary")
+assert abs(summary["建设期利息合计"] - interest.sum()) < 1e-6
+
+print("\n[OK] 循环引用求解器测试通过")
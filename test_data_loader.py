@@ -0,0 +1,52 @@
+"""
+测试数据加载器按需加载工作表
+"""
+import time
+
+import pandas as pd
+
+from data_loader import DataLoader, XLRD_AVAILABLE
+
+print("=" * 60)
+print("测试按需加载工作表")
+print("=" * 60)
+
+loader = DataLoader(use_cache=False, max_cached_sheets=2)
+
+print("\n1. 按需解析单个工作表...")
+start = time.perf_counter()
+summary = loader.get_sheet("财务分析结果汇总")
+print(f"  财务分析结果汇总: {summary.shape}, 耗时 {(time.perf_counter() - start) * 1000:.1f} ms")
+assert loader.all_sheets is None
+assert list(loader._sheets) == ["财务分析结果汇总"]
+if XLRD_AVAILABLE:
+    # 解析后释放xlrd中的原始数据，其余工作表从未解析
+    assert not any(loader._book.sheet_loaded(name) for name in loader.sheet_names())
+assert loader.get_sheet("不存在的工作表") is None
+
+print("\n2. LRU淘汰...")
+book = loader._book
+names = [name for name in loader.sheet_names() if name != "财务分析结果汇总"][:2]
+loader.get_sheet(names[0])
+loader.get_sheet("财务分析结果汇总")
+loader.get_sheet(names[1])
+print(f"  缓存中的工作表: {list(loader._sheets)}")
+assert list(loader._sheets) == ["财务分析结果汇总", names[1]]
+
+print("\n3. 原始数据复用同一个工作簿句柄...")
+raw = loader.get_sheet_raw_data("财务分析结果汇总")
+pd.testing.assert_frame_equal(raw, summary)
+assert loader._book is book
+
+print("\n4. 与一次性加载的结果一致...")
+all_sheets = DataLoader(use_cache=False).load_all_sheets()
+assert list(all_sheets) == loader.sheet_names()
+for name in names:
+    pd.testing.assert_frame_equal(loader.get_sheet(name), all_sheets[name])
+
+loader.close()
+assert loader._book is None and not loader._sheets
+
+print("\n" + "=" * 60)
+print("测试完成！")
+print("=" * 60)
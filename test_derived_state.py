@@ -0,0 +1,110 @@
+"""
+测试派生状态（资产形成、资产销售计划）不修改输入
+"""
+import copy
+import dataclasses
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from year_generator import YearGenerator
+from calculation_engine import CalculationEngine
+from calculations import AssetSalesCalculator, DepreciationCalculator, InvestmentCalculator
+from input_mapping import load_input_data
+from derived_state import cache_info, clear_cache
+
+print("=" * 60)
+print("测试派生状态")
+print("=" * 60)
+
+input_data = load_input_data()
+input_data.asset_sales_plan.total_sales_price = 66285.86
+input_data.asset_sales_plan.building_sell_ratio = 25.0  # 按百分比输入
+yg = YearGenerator(3, 17)
+
+print("\n1. 计算不修改输入...")
+before = input_data.fingerprint()
+results = CalculationEngine(yg, input_data).run_all_calculations()
+assert input_data.fingerprint() == before
+assert input_data.asset_sales_plan.building_sell_ratio == 25.0, "占比不应被原地换算为小数"
+
+formation = InvestmentCalculator(yg, input_data).calculate_asset_formation()
+sales_plan = AssetSalesCalculator(yg, input_data).calculate_annual_sales()
+try:
+    formation.fixed_asset_total = 0.0
+    raise AssertionError("派生状态应不可修改")
+except dataclasses.FrozenInstanceError:
+    pass
+assert not sales_plan.annual_sales_cost.flags.writeable
+assert np.isclose(sales_plan.building_hold_ratio, 0.75)
+assert np.isclose(sales_plan.sales_building_value + sales_plan.hold_building_value, formation.building_total)
+assert np.isclose(sales_plan.annual_sales_revenue.sum(), 66285.86)
+
+# 占比按百分比或小数输入结果相同
+fraction = copy.deepcopy(input_data)
+fraction.asset_sales_plan.building_sell_ratio = 0.25
+assert np.allclose(AssetSalesCalculator(yg, fraction).get_annual_sales_cost(), sales_plan.annual_sales_cost)
+
+print("\n2. 结果与调用顺序无关...")
+fresh = copy.deepcopy(input_data)
+depreciation_first = DepreciationCalculator(yg, fresh).get_yearly_depreciation()
+engine = CalculationEngine(yg, copy.deepcopy(input_data))
+assert np.array_equal(depreciation_first, engine.graph.get("yearly_depreciation"))
+assert np.array_equal(DepreciationCalculator(yg, fresh).get_yearly_depreciation(), depreciation_first)
+
+print("\n3. 按输入内容缓存...")
+clear_cache()
+first = InvestmentCalculator(yg, copy.deepcopy(input_data)).calculate_asset_formation()
+second = InvestmentCalculator(yg, copy.deepcopy(input_data)).calculate_asset_formation()
+assert first is second, "内容相同的输入应共用同一派生状态"
+assert cache_info()["hits"] == 1 and cache_info()["misses"] == 1
+
+changed = copy.deepcopy(input_data)
+changed.project_investment.building_cost += 1000.0
+assert InvestmentCalculator(yg, changed).calculate_asset_formation().building_total > first.building_total
+
+# 多次运行引擎时派生状态只计算一次
+clear_cache()
+for _ in range(3):
+    CalculationEngine(yg, copy.deepcopy(input_data)).run_all_calculations()
+info = cache_info()
+print(f"  命中 {info['hits']} 次, 计算 {info['misses']} 次")
+assert info["misses"] == 2
+
+print("\n4. 多线程共享同一输入...")
+variants = []
+for rate in (0.03, 0.045, 0.0588, 0.07):
+    variant = copy.deepcopy(input_data)
+    variant.bank_loan_plan.interest_rate = rate
+    variants.append(variant)
+expected = [CalculationEngine(yg, copy.deepcopy(v)).run_all_calculations() for v in variants]
+
+shared = copy.deepcopy(input_data)
+shared_before = shared.fingerprint()
+clear_cache()
+with ThreadPoolExecutor(max_workers=8) as pool:
+    parallel = list(pool.map(lambda _: CalculationEngine(yg, shared).run_all_calculations(), range(8)))
+    parallel_variants = list(pool.map(lambda v: CalculationEngine(yg, v).run_all_calculations(), variants))
+assert shared.fingerprint() == shared_before
+for tables in parallel:
+    for name, df in results.items():
+        assert df.equals(tables[name]), name
+for tables, reference in zip(parallel_variants, expected):
+    for name, df in reference.items():
+        assert df.equals(tables[name]), name
+
+print("\n5. 增量计算...")
+engine = CalculationEngine(yg, copy.deepcopy(input_data))
+engine.run_all_calculations()
+new_input = copy.deepcopy(input_data)
+new_input.asset_sales_plan.building_sell_ratio = 40.0
+updated = engine.update(new_input)
+assert engine.changed_inputs == ["asset_sales_plan.building_sell_ratio"]
+report = engine.get_calculation_report().set_index("节点")
+assert report.loc["asset_formation", "计算次数"] == 0, "资产形成不读取出售固定资产占比"
+full = CalculationEngine(yg, copy.deepcopy(new_input)).run_all_calculations()
+for name, df in full.items():
+    assert df.equals(updated[name]), name
+assert not updated["5-4折旧"].equals(results["5-4折旧"])
+
+print("\n[OK] 派生状态测试通过")
@@ -0,0 +1,99 @@
+"""
+测试单元格填充色提取
+"""
+import os
+import tempfile
+import time
+
+import numpy as np
+import openpyxl
+from openpyxl.styles import PatternFill
+from openpyxl.styles.colors import Color
+from openpyxl.writer.theme import theme_xml
+
+import config
+from data_loader import DataLoader
+from fill_mask import read_fill_mask, align_mask, InputCellIndex
+
+print("=" * 60)
+print("测试单元格填充色提取")
+print("=" * 60)
+
+print("\n1. .xls输入工作表...")
+start = time.perf_counter()
+mask = read_fill_mask(config.EXCEL_FILE, config.INPUT_SHEET_NAME)
+print(f"  形状 {mask.shape}, 黄色单元格 {int(mask.sum())} 个, 耗时 {(time.perf_counter() - start) * 1000:.1f} ms")
+assert mask.any()
+
+# 与xlrd逐个单元格判断的结果一致
+import xlrd
+book = xlrd.open_workbook(config.EXCEL_FILE, formatting_info=True)
+sheet = book.sheet_by_name(config.INPUT_SHEET_NAME)
+expected = np.zeros((sheet.nrows, sheet.ncols), dtype=bool)
+for r in range(sheet.nrows):
+    for c in range(sheet.row_len(r)):
+        background = book.xf_list[sheet.cell_xf_index(r, c)].background
+        expected[r, c] = background.fill_pattern != 0 and book.colour_map.get(background.pattern_colour_index) == (255, 255, 0)
+assert np.array_equal(mask, expected)
+
+print("\n2. .xlsx工作表...")
+temp_dir = tempfile.mkdtemp()
+xlsx_file = os.path.join(temp_dir, "fills.xlsx")
+wb = openpyxl.Workbook()
+ws = wb.active
+ws.title = "参数"
+ws["A1"] = "标签"
+ws["B2"] = 1.0
+ws["B2"].fill = PatternFill("solid", start_color="FFFF00")
+ws["C3"] = 2.0
+ws["C3"].fill = PatternFill("solid", start_color="FF0000")
+ws["D4"] = 3.0
+ws["D4"].fill = PatternFill("solid", start_color="FFFFFF00")
+# 调色板序号5为黄色；主题颜色4（accent1）改为黄色，带明暗调整时不视为黄色
+ws["A5"] = 4.0
+ws["A5"].fill = PatternFill("solid", start_color=Color(indexed=5))
+ws["B5"] = 5.0
+ws["B5"].fill = PatternFill("solid", start_color=Color(theme=4))
+ws["C5"] = 6.0
+ws["C5"].fill = PatternFill("solid", start_color=Color(theme=4, tint=0.4))
+ws["D5"] = 7.0
+ws["D5"].fill = PatternFill("solid", start_color=Color(theme=5))
+wb.loaded_theme = theme_xml.replace('<a:srgbClr val="4F81BD"/>', '<a:srgbClr val="FFFF00"/>')
+wb.save(xlsx_file)
+
+xlsx_mask = read_fill_mask(xlsx_file, "参数")
+print(f"  黄色单元格坐标: {list(zip(*np.nonzero(xlsx_mask)))}")
+# openpyxl将"FFFF00"保存为"00FFFF00"，按RGB比较（忽略透明度）时两种写法都识别为黄色
+assert xlsx_mask.shape == (5, 4)
+assert [tuple(map(int, rc)) for rc in zip(*np.nonzero(xlsx_mask))] == [(1, 1), (3, 3), (4, 0), (4, 1)]
+os.remove(xlsx_file)
+os.rmdir(temp_dir)
+
+print("\n3. 模块稀疏坐标索引...")
+ranges = {"A": (1, 2), "B": (3, 4)}
+index = InputCellIndex(align_mask(np.array([
+    [0, 0, 0],
+    [1, 0, 0],
+    [0, 0, 1],
+    [0, 1, 0],
+    [1, 1, 0],
+], dtype=bool), (4, 3)), ranges)
+assert index.cells("A") == [(0, 0), (1, 2)]
+assert index.cells("B") == [(0, 1), (1, 0), (1, 1)]
+assert len(index) == 5
+
+print("\n4. DataLoader中的黄色单元格...")
+loader = DataLoader(use_cache=False)
+start = time.perf_counter()
+loader.load_input_sheet()
+print(f"  {len(loader.input_cells)}个输入单元格, 加载耗时 {(time.perf_counter() - start) * 1000:.1f} ms")
+for module_name in config.INPUT_MODULES:
+    cells = loader.get_yellow_cells_by_module(module_name)
+    module_df, module_yellow = loader.get_input_module(module_name)
+    assert all(module_yellow.iloc[r, c] for r, c in cells)
+    assert len(cells) == int(module_yellow.to_numpy().sum())
+assert len(loader.get_yellow_cells_by_module("2. 项目投资")) > 0
+
+print("\n" + "=" * 60)
+print("测试完成！")
+print("=" * 60)
@@ -0,0 +1,93 @@
+"""
+测试目标求解
+"""
+import copy
+import time
+from year_generator import YearGenerator
+from data_models import InputData
+from calculation_engine import CalculationEngine
+from goal_seek import GoalSeek
+
+print("=" * 60)
+print("测试目标求解")
+print("=" * 60)
+
+year_generator = YearGenerator(construction_period=3, operation_period=17)
+
+input_data = InputData()
+inv = input_data.project_investment
+inv.building_cost = 67062.86
+inv.building_installation_cost = 18299.19
+inv.management_fee = 2994.8
+inv.land_use_fee = 6505.72
+inv.basic_reserve = 10532.08
+for year in year_generator.generate_year_names():
+    if year_generator.is_operation_year(year_generator.get_year_index(year)):
+        input_data.sales_revenue.annual_revenue[year] = 15000.0
+input_data.labor_cost.admin_persons = 5
+input_data.labor_cost.admin_salary = 12.0
+input_data.tax_params.discount_rate = 0.06
+
+goal_seek = GoalSeek(year_generator, input_data)
+
+print("\n1. 求建筑工程费上限使IRR = 8%...")
+start = time.perf_counter()
+result = goal_seek.solve("project_investment.building_cost", "irr", 0.08)
+print(f"  建筑工程费 = {result.value:,.2f}, IRR = {result.achieved:.6%}, "
+      f"试算{result.evaluations}次, 耗时 {(time.perf_counter() - start) * 1000:.1f} ms")
+assert result.converged
+assert abs(result.achieved - 0.08) < 1e-6
+
+# 用完整计算复核
+check_input = copy.deepcopy(input_data)
+check_input.project_investment.building_cost = result.value
+kpis = CalculationEngine(year_generator, check_input).graph.get("kpis")
+assert abs(kpis["irr"] - result.achieved) < 1e-12
+
+print("\n2. 求第4年销售收入使NPV = 0...")
+year = year_generator.generate_year_names()[3]
+result = goal_seek.solve(f"sales_revenue.annual_revenue[{year}]", "npv", 0.0)
+print(f"  {year}销售收入 = {result.value:,.2f}, NPV = {result.achieved:.6f}, 试算{result.evaluations}次")
+assert result.converged
+assert abs(result.achieved) < 1e-4
+# NPV对收入分段线性（利润为负的年份不计所得税、现金不足的年份提取短期借款），几次弦截外推即可括住根
+assert result.evaluations <= 10
+
+print("\n3. 增量计算只重算受影响的节点...")
+goal_seek.evaluate("tax_params.discount_rate", 0.08, "npv")
+report = goal_seek.engine.get_calculation_report().set_index("节点")
+computed = report[report["计算次数"] > 0].index.tolist()
+print(f"  修改折现率后重新计算的节点: {computed}")
+assert "total_investment" not in computed
+assert "kpis" in computed
+
+print("\n4. 基准输入不被修改...")
+assert input_data.project_investment.building_cost == 67062.86
+assert input_data.sales_revenue.annual_revenue[year] == 15000.0
+
+print("\n5. 区间内无解...")
+try:
+    goal_seek.solve("labor_cost.admin_salary", "irr", 0.08, low=0.0, high=1.0)
+    raise AssertionError("应抛出ValueError")
+except ValueError as e:
+    print(f"  {e}")
+
+print("\n6. 求资产销售总价使IRR = 8%...")
+sales_input = copy.deepcopy(input_data)
+for year in year_generator.generate_year_names():
+    if year_generator.is_operation_year(year_generator.get_year_index(year)):
+        sales_input.sales_revenue.annual_revenue[year] = 11000.0
+result = GoalSeek(year_generator, sales_input).solve("asset_sales_plan.total_sales_price", "irr", 0.08)
+print(f"  资产销售总价 = {result.value:,.2f}, IRR = {result.achieved:.6%}, 试算{result.evaluations}次")
+assert result.converged
+assert result.value > 0
+assert abs(result.achieved - 0.08) < 1e-6
+
+# 用完整计算复核
+sales_input.asset_sales_plan.total_sales_price = result.value
+kpis = CalculationEngine(year_generator, sales_input).graph.get("kpis")
+assert abs(kpis["irr"] - result.achieved) < 1e-12
+
+print("\n" + "=" * 60)
+print("测试完成！")
+print("=" * 60)
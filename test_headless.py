@@ -0,0 +1,63 @@
+"""
+测试计算核心可在无Streamlit环境下使用（不导入streamlit，pandas延迟导入）
+"""
+import subprocess
+import sys
+
+print("=" * 60)
+print("测试无界面计算核心")
+print("=" * 60)
+
+
+def run(code: str) -> str:
+    """在新的解释器进程中执行代码，返回标准输出"""
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, encoding="utf-8")
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip()
+
+
+print("\n1. 导入计算核心...")
+output = run(
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "import config, data_models, year_generator, calculations, calc_graph, calculation_engine, data_loader, input_collector\n"
+    "print(f'{(time.perf_counter() - start) * 1000:.1f}', 'streamlit' in sys.modules, 'pandas' in sys.modules)\n"
+)
+elapsed, has_streamlit, has_pandas = output.split()
+print(f"  导入耗时: {elapsed} ms, streamlit已导入: {has_streamlit}, pandas已导入: {has_pandas}")
+assert has_streamlit == "False"
+assert has_pandas == "False"
+
+print("\n2. 由表单取值构建输入并计算财务指标...")
+output = run(
+    "import sys\n"
+    "from year_generator import YearGenerator\n"
+    "from input_collector import build_input_data\n"
+    "from calculation_engine import CalculationEngine\n"
+    "values = {'building_cost': 67062.86, 'land_use_fee': 6505.72, 'discount_rate': 6.0}\n"
+    "input_data = build_input_data(values, 3, 17)\n"
+    "engine = CalculationEngine(YearGenerator(3, 17), input_data)\n"
+    "kpis = engine.graph.get('kpis')\n"
+    "print(f\"{kpis['npv']:.2f}\", 'pandas' in sys.modules)\n"
+    "tables = engine.run_all_calculations()\n"
+    "print(type(tables['1建设投资']).__name__, 'streamlit' in sys.modules)\n"
+)
+first, second = output.splitlines()
+npv, has_pandas = first.split()
+table_type, has_streamlit = second.split()
+print(f"  NPV = {npv}, 计算财务指标后pandas已导入: {has_pandas}")
+print(f"  计算表类型: {table_type}, streamlit已导入: {has_streamlit}")
+assert has_pandas == "False"
+assert table_type == "DataFrame"
+assert has_streamlit == "False"
+
+print("\n3. build_input_data与默认值...")
+from input_collector import build_input_data
+input_data = build_input_data({"discount_rate": 8.0}, 3, 17)
+assert input_data.tax_params.discount_rate == 0.08
+assert input_data.tax_params.corporate_tax_rate == 0.25
+assert len(input_data.bank_loan_plan.loan_amounts) == 3
+
+print("\n" + "=" * 60)
+print("测试完成！")
+print("=" * 60)
@@ -0,0 +1,97 @@
+"""
+测试输入字段映射表
+"""
+import time
+
+import numpy as np
+
+import config
+from data_loader import DataLoader
+from year_generator import YearGenerator
+from calculation_engine import CalculationEngine
+from input_collector import build_input_data
+from input_mapping import (
+    FIELDS, SERIES, cell_index, compile_map, form_values, load_input_data, read_periods
+)
+
+print("=" * 60)
+print("测试输入字段映射表")
+print("=" * 60)
+
+print("\n1. 单元格地址...")
+assert cell_index("A1") == (0, 0)
+assert cell_index("F12") == (11, 5)
+assert cell_index("AA3") == (2, 26)
+try:
+    cell_index("12F")
+    raise AssertionError("应拒绝无效地址")
+except ValueError:
+    pass
+
+print("\n2. 映射表中的路径与控件key...")
+form_keys = [spec.form_key for spec in FIELDS if spec.form_key] + [spec.form_key for spec in SERIES]
+assert len(form_keys) == len(set(form_keys)), "控件key重复"
+paths = [spec.path for spec in FIELDS] + [spec.path for spec in SERIES]
+assert len(paths) == len(set(paths)), "字段路径重复"
+
+print("\n3. 表单取值 <-> 输入数据...")
+input_data = build_input_data({}, 3, 17)
+assert input_data.tax_params.corporate_tax_rate == 0.25
+assert input_data.asset_formation.building_fixed_asset.salvage_rate == 5.0
+assert input_data.sales_revenue.annual_revenue["第3年"] == 0.0
+assert input_data.sales_revenue.annual_revenue["第4年"] == 10000.0
+assert input_data.bank_loan_plan.loan_years == [1, 2, 3]
+
+values = form_values(input_data)
+values["corporate_tax_rate"] = 15.0
+values["sales_第5年"] = 12345.0
+values["annual_ratio_1"] = 40.0
+rebuilt = build_input_data(values, 3, 17)
+assert rebuilt.tax_params.corporate_tax_rate == 0.15
+assert rebuilt.sales_revenue.annual_revenue["第5年"] == 12345.0
+assert rebuilt.asset_sales_plan.annual_sales_ratios[1] == 40.0
+assert form_values(rebuilt) == values
+print(f"  控件 {len(values)} 个")
+
+print("\n4. 从工作簿导入...")
+loader = DataLoader()
+sheet = loader.get_sheet(config.INPUT_SHEET_NAME).to_numpy(dtype=object)
+assert read_periods(sheet) == (3, 17)
+
+compiled = compile_map(3, 17)
+assert compile_map(3, 17) is compiled
+print(f"  一次取值 {len(compiled.rows)} 个单元格")
+
+start = time.perf_counter()
+imported = load_input_data(loader)
+print(f"  导入耗时 {(time.perf_counter() - start) * 1000:.1f} ms")
+assert imported.basic_info.construction_period == 3
+assert imported.basic_info.operation_period == 17
+assert imported.project_investment.building_cost == 67062.86
+# 工作表中的小数按各字段的约定换算
+assert imported.tax_params.corporate_tax_rate == 0.25
+assert imported.project_investment.equipment_tax_rate == 13.0
+assert imported.asset_formation.building_fixed_asset.salvage_rate == 5.0
+assert imported.bank_loan_plan.interest_rate == 0.042
+assert imported.asset_sales_plan.annual_sales_ratios[:4] == [10.0, 30.0, 30.0, 30.0]
+assert sum(imported.asset_sales_plan.annual_sales_ratios) == 100.0
+assert len(imported.bank_loan_plan.loan_amounts) == 3
+# 年度销售收入为各收入项之和，建设期为0
+assert imported.sales_revenue.annual_revenue["第1年"] == 0.0
+assert np.isclose(imported.sales_revenue.annual_revenue["第4年"], 9840 + 3450 + 464 + 90 + 655)
+# 工作表不提供的字段取表单默认值
+assert imported.other_costs.repair_rate == 0.005
+
+print("\n5. 指定计算期导入...")
+short = load_input_data(loader, construction_period=2, operation_period=10)
+assert len(short.sales_revenue.annual_revenue) == 12
+assert short.asset_sales_plan.annual_sales_ratios[:5] == [0.0, 10.0, 30.0, 30.0, 30.0]
+
+print("\n6. 导入的数据可直接计算...")
+engine = CalculationEngine(YearGenerator(3, 17), imported)
+kpis = engine.graph.get("kpis")
+print(f"  NPV {kpis['npv']:.2f} 万元")
+assert np.isfinite(kpis["npv"])
+
+loader.close()
+print("\n[OK] 输入字段映射表测试通过")
@@ -0,0 +1,52 @@
+"""
+测试内部收益率求解器
+"""
+import time
+import numpy as np
+from irr_solver import solve_irr, irr, npv_and_derivative
+
+print("=" * 60)
+print("测试IRR求解器")
+print("=" * 60)
+
+print("\n1. 单个现金流...")
+rate = irr([-100, 0, 0, 121])
+print(f"  [-100, 0, 0, 121] IRR = {rate:.6%}")
+assert abs(rate - (1.21 ** (1 / 3) - 1)) < 1e-10
+assert abs(irr([-100, 110]) - 0.1) < 1e-12
+
+print("\n2. 无解与多解...")
+result = solve_irr(np.array([
+    [-100.0, 230.0, -132.0],   # 10%和20%两个解
+    [100.0, 100.0, 100.0],     # 无符号变化
+    [-100.0, 50.0, 60.0],      # 常规现金流
+]))
+print(f"  rate={result.rate}, no_root={result.no_root}, multiple_roots={result.multiple_roots}")
+assert result.multiple_roots.tolist() == [True, False, False]
+assert result.no_root.tolist() == [False, True, False]
+assert np.isnan(result.rate[1])
+assert abs(result.rate[0] - 0.1) < 1e-10
+# 初值靠近另一个解时取该解
+assert abs(solve_irr([-100.0, 230.0, -132.0], guess=0.22).rate[0] - 0.2) < 1e-10
+
+print("\n3. 批量求解...")
+rng = np.random.default_rng(0)
+count, years = 20000, 20
+cash_flows = np.hstack([-rng.uniform(1000, 5000, (count, 3)), rng.uniform(0, 1200, (count, years - 3))])
+
+start = time.perf_counter()
+result = solve_irr(cash_flows)
+elapsed = time.perf_counter() - start
+print(f"  {count}行冷启动: {elapsed * 1000:.1f} ms, 迭代{result.iterations}次")
+assert result.converged.all()
+npv, _ = npv_and_derivative(cash_flows, result.rate)
+assert np.abs(npv).max() < 1e-6
+
+start = time.perf_counter()
+warm = solve_irr(cash_flows, guess=result.rate + 0.002)
+print(f"  {count}行热启动: {(time.perf_counter() - start) * 1000:.1f} ms, 迭代{warm.iterations}次")
+assert np.allclose(warm.rate, result.rate, atol=1e-9)
+
+print("\n" + "=" * 60)
+print("测试完成！")
+print("=" * 60)
@@ -12,7 +12,7 @@ except Exception as e:
     print(f"[!] app_v3.py 导入失败: {e}")
 
 try:
-    from input_collector import collect_input_data
+    from input_collector import collect_input_data, build_input_data
     print("[√] input_collector.py 导入成功")
 except Exception as e:
     print(f"[!] input_collector.py 导入失败: {e}")
@@ -30,31 +30,31 @@ try:
 except Exception as e:
     print(f"[!] grace_period 检查失败: {e}")
 
-# 检查 input_collector 源码
+# 检查输入映射表（build_input_data按input_mapping中的字段表收集）
 try:
-    import inspect
-    source = inspect.getsource(collect_input_data)
-    if 'grace_period' in source:
+    from input_mapping import FIELDS, SERIES
+    paths = {spec.path for spec in list(FIELDS) + list(SERIES)}
+    if 'bank_loan_plan.grace_period' in paths:
         print("[√] input_collector.py 已更新 grace_period 收集")
     else:
         print("[!] input_collector.py 缺少 grace_period 收集")
 
-    if 'investment_plan' in source:
+    if any(path.startswith('investment_plan.') for path in paths):
         print("[√] input_collector.py 已更新投资计划收集")
     else:
         print("[!] input_collector.py 缺少投资计划收集")
 
-    if 'fuel_8' in source:
+    if 'fuel_cost.fuel_8' in paths:
         print("[√] input_collector.py 已完整收集8种燃料")
     else:
         print("[!] input_collector.py 燃料收集不完整")
 
-    if 'material_8' in source:
+    if 'material_cost.material_8' in paths:
         print("[√] input_collector.py 已完整收集8种材料")
     else:
         print("[!] input_collector.py 材料收集不完整")
 except Exception as e:
-    print(f"[!] input_collector 源码检查失败: {e}")
+    print(f"[!] 输入映射表检查失败: {e}")
 
 print("="*50)
 print("测试完成")
@@ -0,0 +1,147 @@
+"""
+测试借款还本付息计算
+"""
+import copy
+import time
+
+import numpy as np
+
+from year_generator import YearGenerator
+from calculation_engine import CalculationEngine
+from data_models import BankLoanPlan
+from input_mapping import load_input_data
+from loan_engine import METHODS, Tranche, batch_loan_schedule, loan_schedule, plan_schedule, plan_tranches
+
+print("=" * 60)
+print("测试借款还本付息计算")
+print("=" * 60)
+
+
+def reference(tranche, periods):
+    """逐年循环的参照计算"""
+    opening = np.zeros(periods)
+    principal = np.zeros(periods)
+    interest = np.zeros(periods)
+    balance = 0.0
+    r, n = tranche.rate, tranche.tenor
+    payment = tranche.amount * r / (1 - (1 + r) ** -n) if r > 0 else tranche.amount / n
+    for i in range(periods):
+        if i == tranche.draw_year - 1:
+            balance = tranche.amount
+        opening[i] = balance
+        interest[i] = balance * r
+        k = i - (tranche.start_year - 1)
+        if balance > 1e-9 and 0 <= k < n:
+            if tranche.method == "等额本金":
+                paid = tranche.amount / n
+            elif tranche.method == "等额本息":
+                paid = payment - balance * r
+            else:
+                paid = balance if k == n - 1 else 0.0
+            principal[i] = min(paid, balance)
+            balance -= principal[i]
+    return opening, principal, interest
+
+
+print("\n1. 各还款方式与逐年计算一致...")
+periods = 25
+for method in METHODS:
+    for rate in (0.0, 0.049):
+        tranche = Tranche(10000.0, 2, rate, 8, grace=3, method=method)
+        result = loan_schedule([tranche], periods)
+        opening, principal, interest = reference(tranche, periods)
+        assert np.allclose(result["opening"], opening), method
+        assert np.allclose(result["principal"], principal), method
+        assert np.allclose(result["interest"], interest), method
+        assert abs(result["principal"].sum() - 10000.0) < 1e-6, "还本合计应等于借款金额"
+        assert result["principal"][:5].sum() == 0, "宽限期内不还本"
+        assert np.allclose(result["closing"][:-1] + result["drawdown"][1:], result["opening"][1:]), "期初余额为上年期末余额加当年借款"
+    print(f"  [√] {method}")
+
+# 等额本息各年还本付息相同
+result = loan_schedule([Tranche(10000.0, 1, 0.05, 10, method="等额本息")], 12)
+assert np.allclose(result["payment"][1:11], result["payment"][1])
+
+# 计算期结束时未还清的余额保留在期末余额中
+result = loan_schedule([Tranche(10000.0, 1, 0.05, 30)], 10)
+assert result["closing"][-1] > 0
+
+try:
+    loan_schedule([Tranche(100.0, 1, 0.05, 5, method="气球贷")], 10)
+    raise AssertionError("应拒绝不支持的还款方式")
+except ValueError as e:
+    print(f"  [拒绝] {e}")
+
+print("\n2. 由借款计划生成各笔借款...")
+input_data = load_input_data()
+yg = YearGenerator(3, 17)
+plan = input_data.bank_loan_plan
+tranches = plan_tranches(plan, yg)
+assert [t.draw_year for t in tranches] == plan.loan_years
+assert [t.amount for t in tranches] == plan.loan_amounts
+assert {t.start_year for t in tranches} == {4}, "各笔借款在运营期第1年开始还本"
+
+longer = copy.deepcopy(plan)
+longer.grace_period = 4
+assert {t.start_year for t in plan_tranches(longer, yg)} == {6}, "宽限期从首次提款起算"
+# 利率与BankLoanPlan一致按小数
+assert {t.rate for t in tranches} == {plan.interest_rate} and plan.interest_rate < 1
+assert plan_tranches(BankLoanPlan(loan_years=[1], loan_amounts=[1000.0]), yg)[0].rate == 0.0588
+
+print("\n3. 还本付息表...")
+engine = CalculationEngine(yg, copy.deepcopy(input_data))
+table = engine.run_all_calculations()["4还本付息"].set_index("项目")
+years = [f"第{y}年" for y in range(1, 21)]
+construction_years = [f"第{y}年" for y in range(1, 4)]
+# 建设期利息资本化：提款为计划借款额加资本化利息，资本化利息等于建设期应计利息
+capitalized = table.loc["其中：资本化利息", years].sum()
+assert capitalized > 0
+assert abs(capitalized - table.loc["当期应计利息", construction_years].sum()) < 0.1
+assert abs(table.loc["当期借款", years].sum() - sum(plan.loan_amounts) - capitalized) < 0.1
+assert abs(table.loc["其中：还本", years].sum() - table.loc["当期借款", years].sum()) < 0.1
+# 建设投资表的建设期利息与还本付息表出自同一借款计划
+investment_table = engine.run_all_calculations()["1建设投资"].set_index("项目")
+assert abs(investment_table.loc["建设期利息", "金额（万元）"] - capitalized) < 0.1
+assert table.loc["期末借款余额", "第20年"] == 0
+assert table.loc["其中：还本", "第4年"] == table.loc["其中：还本", "第5年"], "等额本金每年还本相同"
+
+for method in METHODS:
+    changed = copy.deepcopy(input_data)
+    changed.bank_loan_plan.repayment_method = method
+    table = CalculationEngine(yg, changed).run_all_calculations()["4还本付息"].set_index("项目")
+    assert abs(table.loc["其中：还本", years].sum() - table.loc["当期借款", years].sum()) < 0.1, method
+    print(f"  [√] {method}: 利息合计 {table.loc['付息', years].sum():,.2f}")
+
+# 没有借款时还本付息表各项为0（不再按每年固定借款额生成）
+no_loan = copy.deepcopy(input_data)
+no_loan.bank_loan_plan.loan_amounts = []
+table = CalculationEngine(yg, no_loan).run_all_calculations()["4还本付息"].set_index("项目")
+assert not table[years].to_numpy(dtype=float).any()
+assert not plan_schedule(no_loan.bank_loan_plan, yg)["interest"].any()
+
+# 借款额度不足时，超出额度的建设期利息由资本金支付
+limited = copy.deepcopy(input_data)
+limited.bank_loan_plan.loan_limit = sum(plan.loan_amounts)
+schedule = plan_schedule(limited.bank_loan_plan, yg)
+assert not schedule["capitalized"].any()
+assert abs(schedule["drawdown"].sum() - limited.bank_loan_plan.loan_limit) < 1e-6
+assert np.allclose(schedule["equity_interest"], schedule["interest"] * yg.axis.construction_mask)
+
+print("\n4. 多方案批量计算...")
+rng = np.random.default_rng(0)
+scenarios = [
+    [Tranche(float(rng.uniform(1000, 5000)), int(rng.integers(1, 4)), float(rng.uniform(0.03, 0.07)),
+             int(rng.integers(5, 16)), grace=int(rng.integers(0, 3)), method=METHODS[int(rng.integers(0, 3))])
+     for _ in range(int(rng.integers(1, 6)))]
+    for _ in range(1000)
+]
+start = time.perf_counter()
+batch = batch_loan_schedule(scenarios, 20)
+print(f"  {len(scenarios)} 个方案耗时 {(time.perf_counter() - start) * 1000:.1f} ms")
+assert batch["principal"].shape == (1000, 20)
+for i in (0, 17, 999):
+    single = loan_schedule(scenarios[i], 20)
+    for key, values in single.items():
+        assert np.allclose(batch[key][i], values), key
+
+print("\n[OK] 借款还本付息计算测试通过")
@@ -0,0 +1,100 @@
+"""
+测试SQLite项目库
+"""
+import copy
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from year_generator import YearGenerator
+from calculation_engine import CalculationEngine
+from batch_engine import BatchEngine, apply_override
+from input_mapping import load_input_data
+from project_store import ProjectStore
+
+print("=" * 60)
+print("测试SQLite项目库")
+print("=" * 60)
+
+input_data = load_input_data()
+year_generator = YearGenerator(3, 17)
+engine = CalculationEngine(year_generator, copy.deepcopy(input_data))
+results = engine.run_all_calculations()
+kpis = engine.graph.get("kpis")
+
+temp_dir = tempfile.mkdtemp()
+db_file = os.path.join(temp_dir, "projects.db")
+
+print("\n1. 保存并读取计算结果（不重新计算）...")
+with ProjectStore(db_file) as store:
+    run_id = store.save_run("东兴三期", "基准", input_data, results, kpis, {"备注": "工作簿导入"})
+    assert store.save_run("东兴三期", "基准", input_data, results, kpis, {"备注": "工作簿导入"}) == run_id
+    assert store.count() == 1
+
+with ProjectStore(db_file) as store:
+    assert store.projects() == ["东兴三期"]
+    assert store.find("东兴三期", "基准") == run_id
+    start = time.perf_counter()
+    project = store.load(run_id)
+    table = project.table("7利润")
+    print(f"  读取单个计算表耗时 {(time.perf_counter() - start) * 1000:.1f} ms")
+    pd.testing.assert_frame_equal(table, results["7利润"])
+    assert project.input_data() == input_data
+    assert project.metadata == {"备注": "工作簿导入"}
+
+    print("\n2. 批量保存情景...")
+    base_revenue = year_generator.axis.from_year_dict(input_data.sales_revenue.annual_revenue)
+    factors = np.linspace(0.5, 1.5, 400)
+    overrides = pd.DataFrame({
+        f"sales_revenue.annual_revenue[{label}]": np.outer(factors, base_revenue)[:, i]
+        for i, label in enumerate(year_generator.axis.labels)
+    })
+    batch_kpis = BatchEngine(year_generator, input_data).evaluate(overrides).kpis
+
+    runs = []
+    for i, factor in enumerate(factors):
+        scenario_input = copy.deepcopy(input_data)
+        for column in overrides.columns:
+            apply_override(scenario_input, column, overrides.at[i, column], year_generator)
+        runs.append(("东兴三期", f"收入×{factor:.4f}", scenario_input, None,
+                     batch_kpis.iloc[i].to_dict(), None))
+    start = time.perf_counter()
+    store.save_runs(runs)
+    print(f"  保存 {len(runs)} 个情景耗时 {(time.perf_counter() - start):.2f} 秒")
+    assert store.count() == len(runs) + 1
+
+    print("\n3. 按指标筛选...")
+    start = time.perf_counter()
+    selected = store.query(min_irr=0.08, max_payback=12, order_by="npv")
+    print(f"  筛选出 {len(selected)} 个情景，耗时 {(time.perf_counter() - start) * 1000:.1f} ms")
+    all_runs = store.query(limit=None)
+    expected = all_runs[(all_runs["irr"] >= 0.08) & (all_runs["payback_period"] <= 12)]
+    assert sorted(selected["run_id"]) == sorted(expected["run_id"])
+    assert selected["npv"].is_monotonic_decreasing
+    assert len(store.query(limit=5)) == 5
+    plan = store.explain("irr >= 0.08 AND payback_period <= 12")
+    print(f"  查询计划: {plan}")
+    assert any("idx_runs" in step for step in plan)
+    try:
+        store.query(order_by="name")
+        raise AssertionError("应拒绝不支持的排序列")
+    except ValueError:
+        pass
+
+    print("\n4. 删除...")
+    store.delete_run(run_id)
+    try:
+        store.load(run_id)
+        raise AssertionError("已删除的情景不应能读取")
+    except ValueError:
+        pass
+    store.delete_project("东兴三期")
+    assert store.count() == 0
+    assert store._conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0] == 0
+
+shutil.rmtree(temp_dir, ignore_errors=True)
+print("\n[OK] 项目库测试通过")
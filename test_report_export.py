@@ -0,0 +1,105 @@
+"""
+测试Excel报告导出
+"""
+import copy
+import io
+import os
+import tempfile
+import time
+import zipfile
+
+import openpyxl
+
+import config
+from year_generator import YearGenerator
+from calculation_engine import CalculationEngine
+from input_mapping import load_input_data
+from project_store import ProjectStore
+from report_export import (HEADER_STYLE, NUMBER_STYLE, TITLE_STYLE, export_batch, export_report,
+                           iter_store_results, sheet_title)
+
+print("=" * 60)
+print("测试Excel报告导出")
+print("=" * 60)
+
+input_data = load_input_data()
+year_generator = YearGenerator(3, 17)
+engine = CalculationEngine(year_generator, copy.deepcopy(input_data))
+results = engine.run_all_calculations()
+
+print("\n1. 导出单个项目报告...")
+start = time.perf_counter()
+content = export_report(results, title="测试项目")
+print(f"  {len(results)} 个计算表, {len(content) / 1024:.1f} KB, 耗时 {(time.perf_counter() - start) * 1000:.1f} ms")
+
+wb = openpyxl.load_workbook(io.BytesIO(content))
+expected = [name for name in config.SHEET_MAPPING if name in results]
+assert wb.sheetnames[:len(expected)] == [sheet_title(name) for name in expected], "工作表应按SHEET_MAPPING的顺序排列"
+assert len(wb.sheetnames) == len(results)
+assert set(wb.named_styles) >= {TITLE_STYLE, HEADER_STYLE, NUMBER_STYLE}
+
+for name, df in results.items():
+    ws = wb[sheet_title(name)]
+    assert ws["A1"].value == f"测试项目 - {config.SHEET_MAPPING.get(name, name)}"
+    assert ws["A1"].style == TITLE_STYLE
+    assert [c.value for c in ws[2]][:df.shape[1]] == [str(c) for c in df.columns]
+    assert ws["A2"].style == HEADER_STYLE
+    assert ws.max_row == df.shape[0] + 2
+    for i, row in enumerate(df.itertuples(index=False, name=None)):
+        for j, value in enumerate(row):
+            cell = ws.cell(row=i + 3, column=j + 1)
+            if isinstance(value, float) and value == value:
+                assert abs(cell.value - value) < 1e-9, f"{name} {cell.coordinate}"
+                assert cell.style == NUMBER_STYLE
+            elif isinstance(value, str):
+                # 空字符串读回为空单元格
+                assert cell.value == (value or None), f"{name} {cell.coordinate}"
+
+print("\n2. 工作表名称...")
+used = set()
+assert sheet_title("a/b:c", used) == "a_b_c"
+assert sheet_title("a/b:c", used) == "a_b_c(1)"
+assert len(sheet_title("x" * 40)) == 31
+
+print("\n3. 批量导出到一个工作簿（生成器输入）...")
+calls = []
+
+
+def scenarios():
+    for name in ("基准", "乐观", "悲观"):
+        def load(name=name):
+            calls.append(name)
+            return results
+        yield name, load
+
+
+content = export_batch(scenarios(), mode="workbook")
+assert calls == ["基准", "乐观", "悲观"]
+wb = openpyxl.load_workbook(io.BytesIO(content))
+assert len(wb.sheetnames) == len(results)
+name = expected[0]
+ws = wb[sheet_title(name)]
+rows = results[name].shape[0]
+titles = [ws.cell(row=1 + k * (rows + 3), column=1).value for k in range(3)]
+assert titles == [f"{s} - {config.SHEET_MAPPING[name]}" for s in ("基准", "乐观", "悲观")], titles
+
+print("\n4. 批量导出为zip（来自项目库）...")
+temp_dir = tempfile.mkdtemp()
+with ProjectStore(os.path.join(temp_dir, "projects.db")) as store:
+    kpis = engine.graph.get("kpis")
+    run_ids = [store.save_run("项目A", s, input_data, results, kpis) for s in ("基准", "乐观")]
+    path = os.path.join(temp_dir, "batch.zip")
+    assert export_batch(iter_store_results(store, run_ids), path, mode="zip") is None
+with zipfile.ZipFile(path) as archive:
+    names = archive.namelist()
+    assert names == ["项目A-基准.xlsx", "项目A-乐观.xlsx"], names
+    wb = openpyxl.load_workbook(io.BytesIO(archive.read(names[1])))
+    assert wb[sheet_title(expected[0])]["A1"].value.startswith("项目A-乐观")
+
+try:
+    export_batch([], mode="csv")
+    raise AssertionError("应拒绝不支持的导出方式")
+except ValueError as e:
+    print(f"  [拒绝] {e}")
+
+print("\n[OK] Excel报告导出测试通过")
@@ -0,0 +1,83 @@
+"""
+测试计算结果的显示与下载缓存
+"""
+import copy
+import io
+import time
+import zipfile
+
+import pandas as pd
+
+import result_views
+from year_generator import YearGenerator
+from calculation_engine import CalculationEngine
+from input_mapping import load_input_data
+from result_views import PARQUET_AVAILABLE, format_dataframe, get_views, results_fingerprint
+
+print("=" * 60)
+print("测试计算结果的显示与下载缓存")
+print("=" * 60)
+
+input_data = load_input_data()
+engine = CalculationEngine(YearGenerator(3, 17), copy.deepcopy(input_data))
+results = engine.run_all_calculations()
+
+print("\n1. 内容指纹...")
+fingerprint = results_fingerprint(results)
+same = {name: df.copy() for name, df in results.items()}
+assert results_fingerprint(same) == fingerprint, "内容相同的结果指纹应相同"
+changed = dict(same)
+changed["7利润"] = same["7利润"].copy()
+changed["7利润"].iloc[0, 5] += 1
+assert results_fingerprint(changed) != fingerprint
+
+print("\n2. 同一结果共用缓存...")
+views = get_views(results)
+assert get_views(same) is views
+assert get_views(changed) is not views
+
+print("\n3. 显示表与下载内容只生成一次...")
+start = time.perf_counter()
+first = views.display("5-4折旧")
+elapsed = time.perf_counter() - start
+assert views.display("5-4折旧") is first
+pd.testing.assert_frame_equal(first, format_dataframe(results["5-4折旧"]))
+assert views._displays.keys() == {"5-4折旧"}, "未用到的计算表不应格式化"
+
+csv = views.download("5-4折旧")
+assert views.download("5-4折旧") is csv
+assert csv.startswith("﻿".encode("utf-8")), "CSV应带BOM以便Excel识别编码"
+assert csv.decode("utf-8-sig") == first.to_csv(index=False)
+pd.testing.assert_frame_equal(pd.read_csv(io.BytesIO(views.download("7利润")), encoding="utf-8-sig"),
+                              views.display("7利润"), check_dtype=False)
+print(f"  首次格式化 {elapsed * 1000:.2f} ms")
+
+print("\n4. 打包下载...")
+for fmt in ("csv", "parquet") if PARQUET_AVAILABLE else ("csv",):
+    bundle = views.bundle(fmt)
+    assert views.bundle(fmt) is bundle
+    with zipfile.ZipFile(io.BytesIO(bundle)) as archive:
+        assert len(archive.namelist()) == len(results)
+        if fmt == "parquet":
+            # 列名为整数、列中混有文字和数值的表也能保存
+            summary = pd.read_parquet(io.BytesIO(archive.read(views.file_name("财务分析结果汇总", fmt))))
+            assert summary.shape == results["财务分析结果汇总"].shape
+            table = pd.read_parquet(io.BytesIO(archive.read(views.file_name("7利润", fmt))))
+            pd.testing.assert_frame_equal(table, views.display("7利润"), check_dtype=False)
+    print(f"  {fmt}: {len(bundle) / 1024:.1f} KB")
+
+try:
+    views.download("7利润", "xml")
+    raise AssertionError("应拒绝不支持的格式")
+except ValueError as e:
+    print(f"  [拒绝] {e}")
+
+print("\n5. 缓存数量有上限...")
+for i in range(result_views.MAX_CACHED_RESULTS + 2):
+    other = dict(results)
+    other["7利润"] = results["7利润"].copy()
+    other["7利润"].iloc[0, 5] = 1000.0 + i
+    get_views(other)
+assert len(result_views._views) == result_views.MAX_CACHED_RESULTS
+
+print("\n[OK] 计算结果显示与下载缓存测试通过")
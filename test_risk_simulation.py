@@ -0,0 +1,88 @@
+"""
+测试蒙特卡洛风险模拟
+"""
+import time
+import numpy as np
+from year_generator import YearGenerator
+from data_models import InputData
+from risk_simulation import Distribution, RiskSimulation, Triangular, Normal, PERT, Uniform, Dirichlet
+
+print("=" * 60)
+print("测试蒙特卡洛风险模拟")
+print("=" * 60)
+
+year_generator = YearGenerator(construction_period=3, operation_period=17)
+
+input_data = InputData()
+inv = input_data.project_investment
+inv.building_cost = 67062.86
+inv.building_installation_cost = 18299.19
+inv.land_use_fee = 6505.72
+inv.basic_reserve = 10532.08
+input_data.asset_sales_plan.total_sales_price = 66285.86
+for year in year_generator.generate_year_names():
+    if year_generator.is_operation_year(year_generator.get_year_index(year)):
+        input_data.sales_revenue.annual_revenue[year] = 15000.0
+input_data.bank_loan_plan.interest_rate = 0.049
+input_data.bank_loan_plan.loan_years = [1, 2, 3]
+input_data.bank_loan_plan.loan_amounts = [10000.0, 20000.0, 10000.0]
+input_data.tax_params.corporate_tax_rate = 0.25
+input_data.tax_params.discount_rate = 0.06
+
+simulation = (
+    RiskSimulation(year_generator, input_data)
+    .add_distribution("project_investment.building_cost", PERT(0.9, 1.0, 1.3, relative=True))
+    .add_distribution("asset_sales_plan.total_sales_price", Triangular(55000, 66285.86, 70000))
+    .add_distribution("sales_revenue.annual_revenue", Normal(1.0, 0.1, low=0.5, relative=True))
+    .add_distribution("bank_loan_plan.interest_rate", Uniform(0.035, 0.06))
+    .add_distribution("asset_sales_plan.annual_sales_ratios", Dirichlet([10, 30, 30, 30]))
+)
+
+print("\n1. 抽样...")
+draws = simulation.sample(1000, seed=1)
+ratios = draws[[f"asset_sales_plan.annual_sales_ratios[{i}]" for i in range(4)]].sum(axis=1)
+assert np.allclose(ratios, 100.0)
+assert (draws["bank_loan_plan.interest_rate"].between(0.035, 0.06)).all()
+assert "sales_revenue.annual_revenue[第4年]" in draws.columns
+# 分布须实现sample
+try:
+    type("NoSample", (Distribution,), {})()
+    raise AssertionError("未实现sample的分布不应能实例化")
+except TypeError:
+    pass
+
+print("\n2. 运行10000次模拟...")
+start = time.perf_counter()
+result = simulation.run(10000, seed=42)
+print(f"  耗时: {(time.perf_counter() - start) * 1000:.1f} ms")
+print(result.summary().to_string())
+print(f"  P(NPV<0) = {result.prob_npv_negative:.2%}")
+
+summary = result.summary()
+assert summary.loc["npv", "P10"] <= summary.loc["npv", "P50"] <= summary.loc["npv", "P90"]
+assert 0.0 <= result.prob_npv_negative <= 1.0
+assert len(result.kpis) == 10000
+assert result.histogram("npv", bins=20)["频数"].sum() == 10000
+
+# 相同种子结果可复现
+assert result.kpis["npv"].equals(simulation.run(10000, seed=42).kpis["npv"])
+
+print("\n3. 单个参数的分布都反映到财务指标...")
+for path, distribution in [
+    ("asset_sales_plan.total_sales_price", Triangular(55000, 66285.86, 70000)),
+    ("bank_loan_plan.interest_rate", Uniform(0.035, 0.06)),
+]:
+    single = RiskSimulation(year_generator, input_data).add_distribution(path, distribution).run(1000, seed=7)
+    print(f"  {path}: NPV标准差 = {single.kpis['npv'].std():,.2f}")
+    assert single.kpis["npv"].std() > 1.0
+
+print("\n4. 拒绝不影响财务指标的参数...")
+try:
+    RiskSimulation(year_generator, input_data).add_distribution("labor_cost.tech_salary", Uniform(8.0, 12.0))
+    raise AssertionError("应抛出ValueError")
+except ValueError as e:
+    print(f"  [拒绝] {e}")
+
+print("\n" + "=" * 60)
+print("测试完成！")
+print("=" * 60)
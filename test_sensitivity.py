@@ -0,0 +1,77 @@
+"""
+测试敏感性分析
+"""
+import copy
+import time
+import numpy as np
+from year_generator import YearGenerator
+from data_models import InputData
+from sensitivity import SensitivityAnalysis
+
+print("=" * 60)
+print("测试敏感性分析")
+print("=" * 60)
+
+year_generator = YearGenerator(construction_period=3, operation_period=17)
+
+input_data = InputData()
+inv = input_data.project_investment
+inv.building_cost = 67062.86
+inv.building_installation_cost = 18299.19
+inv.management_fee = 2994.8
+inv.land_use_fee = 6505.72
+inv.basic_reserve = 10532.08
+for year in year_generator.generate_year_names():
+    if year_generator.is_operation_year(year_generator.get_year_index(year)):
+        input_data.sales_revenue.annual_revenue[year] = 15000.0
+input_data.labor_cost.admin_persons = 5
+input_data.labor_cost.admin_salary = 12.0
+input_data.bank_loan_plan.interest_rate = 0.049
+input_data.tax_params.corporate_tax_rate = 0.25
+input_data.tax_params.discount_rate = 0.06
+
+analysis = SensitivityAnalysis(year_generator, input_data)
+print(f"\n有效变量: {[name for _, name in analysis.active_variables()]}")
+
+print("\n1. 串行计算...")
+start = time.perf_counter()
+serial = analysis.run(variation=0.2, points=5, max_workers=1)
+print(f"  耗时: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+print("\n2. 进程池计算...")
+start = time.perf_counter()
+parallel = analysis.run(variation=0.2, points=5, max_workers=2, chunk_size=4)
+print(f"  耗时: {(time.perf_counter() - start) * 1000:.1f} ms")
+assert np.allclose(serial.table["npv"], parallel.table["npv"])
+
+print("\n3. 龙卷风图数据（NPV）:")
+tornado = serial.tornado("npv")
+print(tornado.to_string(index=False))
+assert tornado["波动范围"].is_monotonic_decreasing
+# 不影响财务指标的变量不参与分析（没有借款时借款利率不影响NPV）
+assert (tornado["波动范围"] > 0).all()
+skipped = serial.skipped.set_index("名称")["原因"]
+print(f"  未参与分析: {skipped.to_dict()}")
+assert skipped["借款利率"] == "不影响财务指标"
+assert skipped["资产销售总价"] == "基准值为0"
+
+# 有借款、有资产销售时两者都参与分析
+financed = copy.deepcopy(input_data)
+financed.asset_sales_plan.total_sales_price = 66285.86
+financed.bank_loan_plan.loan_years = [1, 2, 3]
+financed.bank_loan_plan.loan_amounts = [10000.0, 20000.0, 10000.0]
+active = [name for _, name in SensitivityAnalysis(year_generator, financed).active_variables()]
+assert "借款利率" in active and "资产销售总价" in active
+assert tornado.iloc[0]["名称"] == "年度销售收入"
+
+print("\n4. 蜘蛛图数据（IRR）:")
+spider = serial.spider("irr")
+print(spider.round(4).to_string())
+assert list(spider.index) == [-0.2, -0.1, 0.0, 0.1, 0.2]
+assert np.allclose(spider.loc[0.0], serial.base["irr"])
+# 折现率不影响IRR
+assert np.allclose(spider["折现率"], serial.base["irr"])
+
+print("\n" + "=" * 60)
+print("测试完成！")
+print("=" * 60)
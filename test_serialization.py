@@ -0,0 +1,129 @@
+"""
+测试项目文件序列化
+"""
+import copy
+import json
+import os
+import tempfile
+import time
+import zipfile
+
+import pandas as pd
+
+import serialization
+from year_generator import YearGenerator
+from calculation_engine import CalculationEngine
+from input_mapping import load_input_data
+from serialization import SCHEMA_VERSION, diff_projects, dump_project, load_project, save_project
+
+print("=" * 60)
+print("测试项目文件序列化")
+print("=" * 60)
+
+input_data = load_input_data()
+year_generator = YearGenerator(3, 17)
+engine = CalculationEngine(year_generator, copy.deepcopy(input_data))
+results = engine.run_all_calculations()
+kpis = engine.graph.get("kpis")
+
+print("\n1. 序列化...")
+start = time.perf_counter()
+content = dump_project(input_data, results, kpis, {"scenario": "基准"})
+print(f"  {len(content) / 1024:.1f} KB, 耗时 {(time.perf_counter() - start) * 1000:.1f} ms")
+assert dump_project(input_data, results, kpis, {"scenario": "基准"}) == content, "相同内容应得到相同字节"
+with zipfile.ZipFile(__import__("io").BytesIO(content)) as archive:
+    manifest = json.loads(archive.read("project.json"))
+    # 按年字典不以标签字典的形式写入JSON
+    assert "$series" in manifest["input"]["sales_revenue"]["annual_revenue"]
+
+print("\n2. 读取（延迟解码）...")
+start = time.perf_counter()
+project = load_project(content)
+assert project._input_series is None and not project._tables
+restored = project.input_data()
+tables = project.results()
+print(f"  耗时 {(time.perf_counter() - start) * 1000:.1f} ms")
+assert project.schema_version == SCHEMA_VERSION
+assert project.metadata == {"scenario": "基准"}
+assert project.table_names == list(results)
+assert project.kpis["npv"] == kpis["npv"]
+
+assert restored == input_data
+assert list(restored.sales_revenue.annual_revenue) == list(input_data.sales_revenue.annual_revenue)
+for name, df in results.items():
+    pd.testing.assert_frame_equal(tables[name], df)
+
+print("\n3. 由恢复的输入数据计算得到相同结果...")
+engine2 = CalculationEngine(year_generator, restored)
+assert engine2.graph.get("kpis")["npv"] == kpis["npv"]
+
+print("\n4. 保存到文件并比较差异...")
+temp_dir = tempfile.mkdtemp()
+path_a = os.path.join(temp_dir, "a.jzp")
+path_b = os.path.join(temp_dir, "b.jzp")
+save_project(path_a, input_data)
+changed = copy.deepcopy(input_data)
+changed.project_investment.building_cost += 100.0
+changed.sales_revenue.annual_revenue["第5年"] = 1.0
+save_project(path_b, changed)
+diff = diff_projects(load_project(path_a), load_project(path_b))
+print(diff.to_string(index=False))
+assert set(diff["字段"]) == {"project_investment.building_cost", "sales_revenue.annual_revenue[第5年]"}
+assert load_project(path_a).table_names == []
+
+print("\n5. 版本迁移...")
+legacy = dict(manifest, schema_version=0)
+legacy["input"] = dict(legacy["input"])
+legacy["input"]["basic_info"] = {"name": "旧版项目", "construction_period": 3, "operation_period": 17}
+
+
+@serialization.register_migration(0)
+def _rename_project_name(old):
+    """版本0中项目名称字段为name"""
+    old["input"]["basic_info"]["project_name"] = old["input"]["basic_info"].pop("name")
+    return old
+
+
+legacy_path = os.path.join(temp_dir, "legacy.jzp")
+with zipfile.ZipFile(__import__("io").BytesIO(content)) as source, zipfile.ZipFile(legacy_path, "w") as target:
+    for item in source.infolist():
+        data = json.dumps(legacy).encode() if item.filename == "project.json" else source.read(item)
+        target.writestr(item.filename, data)
+migrated = load_project(legacy_path)
+assert migrated.schema_version == SCHEMA_VERSION
+assert migrated.input_data().basic_info.project_name == "旧版项目"
+del serialization._MIGRATIONS[0]
+
+# 版本1的输入数据中保存了资产形成、资产销售的计算结果，升级时删除
+version1 = json.loads(json.dumps(manifest))
+version1["schema_version"] = 1
+version1["input"]["project_investment"]["building_cost_no_tax"] = 61525.56
+version1["input"]["asset_formation"]["fixed_asset_total"] = 100000.0
+version1["input"]["asset_formation"]["land_intangible_asset"]["total"] = 6505.72
+version1["input"]["asset_sales_plan"]["annual_sales_revenue"] = [0.0] * 20
+# 版本2及以前借款年利率为百分数
+version1["input"]["bank_loan_plan"]["interest_rate"] = input_data.bank_loan_plan.interest_rate * 100
+version1_path = os.path.join(temp_dir, "version1.jzp")
+with zipfile.ZipFile(__import__("io").BytesIO(content)) as source, zipfile.ZipFile(version1_path, "w") as target:
+    for item in source.infolist():
+        data = json.dumps(version1).encode() if item.filename == "project.json" else source.read(item)
+        target.writestr(item.filename, data)
+upgraded = load_project(version1_path)
+assert upgraded.schema_version == SCHEMA_VERSION
+assert upgraded.input_data() == input_data
+assert not hasattr(upgraded.input_data().asset_formation, "fixed_asset_total")
+assert not hasattr(upgraded.input_data().asset_formation.land_intangible_asset, "total")
+assert abs(upgraded.input_data().bank_loan_plan.interest_rate - input_data.bank_loan_plan.interest_rate) < 1e-12
+
+newer = dict(manifest, schema_version=SCHEMA_VERSION + 1)
+newer_path = os.path.join(temp_dir, "newer.jzp")
+with zipfile.ZipFile(newer_path, "w") as target:
+    target.writestr("project.json", json.dumps(newer))
+for bad in (newer_path, b"not a project"):
+    try:
+        load_project(bad)
+        raise AssertionError("应拒绝无法读取的项目文件")
+    except ValueError as e:
+        print(f"  [拒绝] {e}")
+
+print("\n[OK] 项目文件序列化测试通过")
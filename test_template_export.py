@@ -0,0 +1,107 @@
+"""
+测试按原工作簿版式导出
+"""
+import copy
+import io
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+
+import openpyxl
+
+import config
+from year_generator import YearGenerator
+from calculation_engine import CalculationEngine
+from input_mapping import load_input_data
+from serialization import dump_project, load_project
+from template_export import (TEMPLATE_ROWS, TemplateExporter, export_projects, row_labels, template_file)
+
+print("=" * 60)
+print("测试按原工作簿版式导出")
+print("=" * 60)
+
+temp_dir = tempfile.mkdtemp()
+excel_file = os.path.join(temp_dir, "template.xls")
+shutil.copy(config.EXCEL_FILE, excel_file)
+
+print("\n1. 转换并缓存模板...")
+start = time.perf_counter()
+path = template_file(excel_file)
+print(f"  首次转换耗时 {time.perf_counter() - start:.2f} s")
+start = time.perf_counter()
+assert template_file(excel_file) == path
+assert time.perf_counter() - start < 1, "已缓存的模板不应重新转换"
+
+start = time.perf_counter()
+exporter = TemplateExporter(path)
+print(f"  解析模板耗时 {(time.perf_counter() - start) * 1000:.0f} ms")
+assert set(exporter.sheet_names) == set(TEMPLATE_ROWS)
+
+print("\n2. 计算表行名与模板行号对应...")
+input_data = load_input_data()
+year_generator = YearGenerator(3, 17)
+engine = CalculationEngine(year_generator, copy.deepcopy(input_data))
+results = engine.run_all_calculations()
+for name, rows in TEMPLATE_ROWS.items():
+    missing = set(rows) - set(row_labels(results[name]))
+    assert not missing, f"{name} 中没有以下行: {missing}"
+
+print("\n3. 填写模板...")
+content = exporter.export(results, 3, "测试项目")
+wb = openpyxl.load_workbook(io.BytesIO(content))
+assert wb.sheetnames == [name for name in exporter.sheet_names]
+
+# 折旧表：年份行从E3开始，各年的值写入对应行，合计列只在原表有合计值的行填写
+ws = wb["5-4折旧"]
+df = results["5-4折旧"]
+assert [ws.cell(row=3, column=5 + i).value for i in range(3)] == [1, 2, 3]
+depreciation = df.iloc[2]
+for year in range(1, 21):
+    assert ws.cell(row=6, column=4 + year).value == depreciation[f"第{year}年"]
+assert ws.cell(row=3, column=25).value is None, "计算期以外的年份列应为空"
+assert abs(ws["D6"].value - sum(depreciation[f"第{y}年"] for y in range(1, 21))) < 1e-6
+assert ws["D7"].value is None, "净值行不合计"
+# 期间表头按建设期重新合并
+assert ws["E2"].value == "建设期" and ws["H2"].value == "运营期"
+assert {str(r) for r in ws.merged_cells.ranges} >= {"E2:G2", "H2:X2"}
+# 原表的文字和格式保留
+assert ws["C5"].value == "原值"
+assert ws["C5"].font.name == openpyxl.load_workbook(path)["5-4折旧"]["C5"].font.name
+
+# 利润表中没有计算值的行为空，不保留原表的示例数据
+ws = wb["7利润"]
+assert ws["E8"].value is None and ws["H5"].value == results["7利润"].iloc[0]["第4年"]
+# 表尾项目信息
+footer = {ws.cell(row=r, column=3).value: r for r in range(80, ws.max_row + 1)}
+assert ws.cell(row=footer["项目名称"], column=4).value == "测试项目"
+assert ws.cell(row=footer["建设（筹建期）"], column=4).value == 3
+assert ws.cell(row=footer["运营期"], column=7).value == 20
+
+# 原表年份列较少的工作表按最后一列向右补齐
+ws = wb["房产销售及土增"]
+assert ws.cell(row=7, column=6 + 19).value == 20
+assert ws.cell(row=8, column=6 + 19).value == results["房产销售及土增"].iloc[0]["第20年"]
+
+print("\n4. 不同建设期...")
+engine4 = CalculationEngine(YearGenerator(2, 10), load_input_data(construction_period=2, operation_period=10))
+content = exporter.export(engine4.run_all_calculations(), 2)
+ws = openpyxl.load_workbook(io.BytesIO(content))["9资产负债"]
+assert ws["D2"].value == "建设期" and ws["F2"].value == "运营期"
+assert {str(r) for r in ws.merged_cells.ranges} >= {"D2:E2", "F2:O2"}
+assert ws["O3"].value == 12 and ws["P3"].value is None
+
+print("\n5. 批量导出...")
+project = dump_project(input_data, results, engine.graph.get("kpis"))
+count = 50
+start = time.perf_counter()
+content = export_projects(((f"项目{i}", lambda: load_project(project)) for i in range(count)), exporter=exporter)
+elapsed = time.perf_counter() - start
+print(f"  {count} 个项目耗时 {elapsed:.2f} s（{elapsed / count * 1000:.0f} ms/个）")
+with zipfile.ZipFile(io.BytesIO(content)) as archive:
+    assert len(archive.namelist()) == count
+    wb = openpyxl.load_workbook(io.BytesIO(archive.read("项目7.xlsx")))
+    assert wb["5-4折旧"]["H6"].value == depreciation["第4年"]
+
+print("\n[OK] 按原工作簿版式导出测试通过")
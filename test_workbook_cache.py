@@ -0,0 +1,104 @@
+"""
+测试工作簿快照缓存
+"""
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from data_loader import DataLoader
+from workbook_cache import WorkbookCache, content_hash
+import config
+
+print("=" * 60)
+print("测试工作簿快照缓存")
+print("=" * 60)
+
+temp_dir = tempfile.mkdtemp()
+try:
+    excel_file = os.path.join(temp_dir, "JZGCCW01.xls")
+    shutil.copy(config.EXCEL_FILE, excel_file)
+
+    print("\n1. 首次加载（解析工作簿并写入快照）...")
+    start = time.perf_counter()
+    first = DataLoader(excel_file).load_all_sheets()
+    print(f"  {len(first)}个工作表, 耗时 {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    print("\n2. 再次加载（读取快照）...")
+    start = time.perf_counter()
+    loader = DataLoader(excel_file)
+    second = loader.load_all_sheets()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"  {len(second)}个工作表, 耗时 {elapsed:.1f} ms")
+    assert list(first) == list(second)
+    for name in first:
+        pd.testing.assert_frame_equal(first[name], second[name])
+
+    # 输入工作表直接取自已加载的工作表
+    input_df, _ = loader.load_input_sheet()
+    pd.testing.assert_frame_equal(input_df, DataLoader(excel_file, use_cache=False).load_input_sheet()[0])
+
+    print("\n3. 只读取输入工作表...")
+    start = time.perf_counter()
+    values = DataLoader(excel_file).extract_input_values()
+    print(f"  {len(values)}个模块, 耗时 {(time.perf_counter() - start) * 1000:.1f} ms")
+    assert values == DataLoader(excel_file, use_cache=False).extract_input_values()
+
+    print("\n4. 进程内共享的输入默认值...")
+    start = time.perf_counter()
+    defaults = DataLoader(excel_file).get_input_defaults(3, 17)
+    first_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    again = DataLoader(excel_file).get_input_defaults(3, 17)
+    print(f"  首次 {first_ms:.1f} ms, 再次 {(time.perf_counter() - start) * 1000:.3f} ms")
+    assert again is defaults
+    assert defaults == values
+    assert DataLoader(excel_file).get_input_defaults(2, 10) is not defaults
+    try:
+        defaults["2. 项目投资"]["建筑工程费"] = 0
+        raise AssertionError("默认值应为只读")
+    except TypeError:
+        pass
+    # 只修改时间变化（内容不变）时仍命中
+    os.utime(excel_file, (time.time() + 10, time.time() + 10))
+    assert DataLoader(excel_file).get_input_defaults(3, 17) is defaults
+
+    print("\n5. 工作簿变化后快照失效...")
+    source = os.path.join(temp_dir, "book.bin")
+    with open(source, "wb") as f:
+        f.write(b"version 1")
+    parse_count = []
+
+    def parse_all():
+        parse_count.append(1)
+        with open(source, "rb") as f:
+            return {"Sheet1": pd.DataFrame({"内容": [f.read().decode()]})}
+
+    cache = WorkbookCache(source)
+    old_hash = content_hash(source)
+    assert cache.load_all(parse_all)["Sheet1"].iloc[0, 0] == "version 1"
+    assert WorkbookCache(source).load_all(parse_all)["Sheet1"].iloc[0, 0] == "version 1"
+    assert len(parse_count) == 1
+    old_snapshot = cache.snapshot_dir
+
+    # 只修改时间变化（内容不变）时仍命中快照
+    os.utime(source, (time.time() + 10, time.time() + 10))
+    assert WorkbookCache(source).load_all(parse_all)["Sheet1"].iloc[0, 0] == "version 1"
+    assert len(parse_count) == 1
+
+    with open(source, "wb") as f:
+        f.write(b"version 2")
+    assert content_hash(source) != old_hash
+    cache = WorkbookCache(source)
+    assert cache.load_all(parse_all)["Sheet1"].iloc[0, 0] == "version 2"
+    assert len(parse_count) == 2
+    assert not os.path.exists(old_snapshot)
+    print(f"  解析次数: {len(parse_count)}, 旧快照已清理")
+finally:
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+print("\n" + "=" * 60)
+print("测试完成！")
+print("=" * 60)
@@ -45,4 +45,32 @@ print("\n空年度表格:")
 empty_df = builder.build_yearly_table(["收入", "成本", "利润"])
 print(empty_df)
 
+print("\n=== 测试年份轴 ===")
+import numpy as np
+
+axis = generator.axis
+print(f"年份数字: {axis.year_numbers[:5]} ...")
+print(f"建设期掩码: {axis.construction_mask[:5]} ...")
+print(f"运营期年序号: {axis.operation_year[:6]} ...")
+assert axis.labels == year_names
+assert axis.construction_mask.sum() == 3 and axis.operation_mask.sum() == 17
+assert axis.operation_year[3] == 1 and axis.first_operation_mask.sum() == 1
+
+# 字典与向量互转
+series = axis.from_year_dict({"第2年": 5.0, "第4年": 7.0})
+assert series[1] == 5.0 and series[3] == 7.0 and series.sum() == 12.0
+assert axis.to_year_dict(series)["第4年"] == 7.0
+
+# 运营期序列放置（超出计算期部分截断）
+placed = axis.place_operation_series([1.0, 2.0])
+assert placed[3] == 1.0 and placed[4] == 2.0 and placed.sum() == 3.0
+
+# 渲染为横向表格
+frame = axis.frame({"项目": ["收入", "标题"]}, [axis.operation_values(100.0), ""])
+print(frame.iloc[:, :6])
+assert list(frame.columns) == ["项目"] + year_names
+
+long_axis = YearGenerator(construction_period=10, operation_period=50).axis
+assert long_axis.total_period == 60 and long_axis.place_operation_series([1.0] * 60).sum() == 50.0
+
 print("\n测试完成!")
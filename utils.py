@@ -1,12 +1,51 @@
 """
 工具函数
 """
-import pandas as pd
-import openpyxl
-from openpyxl.styles import PatternFill
+import importlib
+import types
+
 import numpy as np
 
 
+class LazyModule(types.ModuleType):
+    """
+    延迟导入的模块：首次访问其属性时才真正导入
+
+    计算核心以此引用pandas、openpyxl等较重的依赖，只计算财务指标的批处理脚本和工作进程
+    不必为用不到的依赖付出导入时间。引用方须使用`from __future__ import annotations`，
+    以免类型注解在定义时触发导入。
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._module = None
+
+    def __getattr__(self, attr):
+        # copy、pickle、inspect等探测的特殊属性不触发导入
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        if self._module is None:
+            self._module = importlib.import_module(self.__name__)
+        return getattr(self._module, attr)
+
+
+def lazy_import(name: str) -> LazyModule:
+    """
+    延迟导入模块
+
+    Args:
+        name: 模块名，如"pandas"
+
+    Returns:
+        LazyModule: 模块代理
+    """
+    return LazyModule(name)
+
+
+pd = lazy_import("pandas")
+openpyxl = lazy_import("openpyxl")
+
+
 def generate_years(construction_period, operation_period):
     """
     根据建设期和运营期生成年份列表
@@ -89,26 +128,16 @@ def load_excel_with_colors(file_path, sheet_name):
     Returns:
         tuple: (DataFrame, 标记黄色的DataFrame)
     """
-    wb = openpyxl.load_workbook(file_path, data_only=True)
-    ws = wb[sheet_name]
-
-    # 数据
-    data = []
-    yellow_mask = []
-
-    for row in ws.iter_rows():
-        row_data = []
-        row_yellow = []
-        for cell in row:
-            row_data.append(cell.value)
-            row_yellow.append(is_yellow_cell(cell))
-        data.append(row_data)
-        yellow_mask.append(row_yellow)
+    from fill_mask import read_fill_mask, align_mask
 
+    wb = openpyxl.load_workbook(file_path, data_only=True, read_only=True)
+    ws = wb[sheet_name]
+    data = [list(row) for row in ws.iter_rows(values_only=True)]
     wb.close()
 
     df = pd.DataFrame(data)
-    yellow_df = pd.DataFrame(yellow_mask)
+    # 黄色标记按格式编号整体查表得到，不逐个单元格判断
+    yellow_df = pd.DataFrame(align_mask(read_fill_mask(file_path, sheet_name), df.shape, header_rows=0))
 
     return df, yellow_df
 
@@ -0,0 +1,223 @@
+"""
+工作簿快照缓存
+将解析后的各工作表DataFrame按工作簿内容哈希保存为二进制快照（每个工作表一个pickle文件），
+再次加载同一工作簿时直接读取快照，不再经过xlrd和pandas解析。
+工作簿内容变化时哈希随之变化，旧快照自动失效并被清理。
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
+import importlib.metadata
+import os
+import pickle
+import shutil
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils import lazy_import
+
+pd = lazy_import("pandas")
+
+
+# 快照格式版本：快照结构或解析方式变化时递增，使旧快照失效
+CACHE_VERSION = 1
+
+# 默认缓存目录（位于工作簿所在目录下）
+DEFAULT_CACHE_DIR = ".workbook_cache"
+
+# 快照目录中记录所属工作簿的文件
+SOURCE_FILE = "source.pkl"
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    计算文件内容的SHA-256
+
+    Args:
+        path: 文件路径
+        chunk_size: 每次读取的字节数
+
+    Returns:
+        str: 十六进制摘要
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# 进程内记录的各工作簿(修改时间, 大小, 内容哈希)
+_content_hashes: Dict[str, Tuple[int, int, str]] = {}
+_content_hashes_lock = threading.Lock()
+
+
+def content_hash(path: str) -> str:
+    """
+    工作簿内容哈希（进程内按修改时间和大小缓存，二者未变时不重新读取文件）
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        str: 十六进制SHA-256摘要
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    with _content_hashes_lock:
+        record = _content_hashes.get(path)
+    if record is not None and record[:2] == (stat.st_mtime_ns, stat.st_size):
+        return record[2]
+
+    sha256 = file_sha256(path)
+    with _content_hashes_lock:
+        _content_hashes[path] = (stat.st_mtime_ns, stat.st_size, sha256)
+    return sha256
+
+
+@functools.lru_cache(maxsize=None)
+def _pandas_version() -> str:
+    """pandas版本（快照由pandas序列化，版本变化时快照失效；查询元数据不必导入pandas）"""
+    return importlib.metadata.version("pandas")
+
+
+def _write_atomic(path: str, writer: Callable[[str], None]) -> None:
+    """先写入临时文件再替换，避免并发读取到写了一半的文件"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        writer(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class WorkbookCache:
+    """工作簿快照缓存"""
+
+    def __init__(self, excel_file: str, cache_dir: Optional[str] = None):
+        """
+        初始化快照缓存
+
+        Args:
+            excel_file: 工作簿路径
+            cache_dir: 缓存目录，默认为工作簿所在目录下的DEFAULT_CACHE_DIR
+        """
+        self.excel_file = os.path.abspath(excel_file)
+        self.cache_dir = cache_dir or os.path.join(os.path.dirname(self.excel_file), DEFAULT_CACHE_DIR)
+
+    def key(self) -> str:
+        """
+        当前工作簿内容对应的快照键
+
+        Returns:
+            str: 内容哈希（见content_hash）与快照格式版本组成的键
+        """
+        return f"{content_hash(self.excel_file)[:32]}-v{CACHE_VERSION}-pd{_pandas_version()}"
+
+    @property
+    def snapshot_dir(self) -> str:
+        """当前工作簿快照所在目录"""
+        return os.path.join(self.cache_dir, self.key())
+
+    def sheet_names(self) -> Optional[List[str]]:
+        """
+        快照中的工作表名称（按工作簿中的顺序）
+
+        Returns:
+            list: 工作表名称，快照不存在时为None
+        """
+        manifest = self._read_pickle(os.path.join(self.snapshot_dir, "manifest.pkl"))
+        return None if manifest is None else manifest["sheet_names"]
+
+    def load_sheet(self, sheet_name: str, parse: Callable[[], "pd.DataFrame"]) -> "pd.DataFrame":
+        """
+        读取单个工作表，快照中没有时调用parse解析并写入快照
+
+        Args:
+            sheet_name: 工作表名称
+            parse: 解析该工作表的函数，工作表不存在时返回None
+
+        Returns:
+            DataFrame，工作表不存在时为None
+        """
+        path = self._sheet_path(sheet_name)
+        df = self._read_pickle(path)
+        if df is None:
+            df = parse()
+            if df is not None:
+                self._write(path, lambda tmp: df.to_pickle(tmp))
+        return df
+
+    def load_all(self, parse_all: Callable[[], Dict[str, "pd.DataFrame"]]) -> Dict[str, "pd.DataFrame"]:
+        """
+        读取所有工作表，快照不完整时调用parse_all解析整个工作簿并重写快照
+
+        Args:
+            parse_all: 解析整个工作簿的函数，返回工作表名称到DataFrame的映射
+
+        Returns:
+            dict: 工作表名称到DataFrame的映射
+        """
+        names = self.sheet_names()
+        if names is not None:
+            sheets = {}
+            for name in names:
+                df = self._read_pickle(self._sheet_path(name))
+                if df is None:
+                    break
+                sheets[name] = df
+            else:
+                return sheets
+
+        sheets = parse_all()
+        for name, df in sheets.items():
+            self._write(self._sheet_path(name), lambda tmp, df=df: df.to_pickle(tmp))
+        manifest = {"sheet_names": list(sheets), "excel_file": self.excel_file}
+        self._write(os.path.join(self.snapshot_dir, "manifest.pkl"),
+                    lambda tmp: self._dump_pickle(manifest, tmp))
+        return sheets
+
+    def clear(self) -> None:
+        """删除当前工作簿的快照"""
+        shutil.rmtree(self.snapshot_dir, ignore_errors=True)
+
+    def _sheet_path(self, sheet_name: str) -> str:
+        """工作表快照文件路径（工作表名可能含有不能用于文件名的字符，按哈希命名）"""
+        name_digest = hashlib.md5(sheet_name.encode("utf-8")).hexdigest()
+        return os.path.join(self.snapshot_dir, f"{name_digest}.pkl")
+
+    def _write(self, path: str, writer: Callable[[str], None]) -> None:
+        """写入快照文件，缓存目录不可写时跳过（缓存只影响速度，不影响结果）"""
+        try:
+            directory = os.path.dirname(path)
+            if not os.path.isdir(directory):
+                self._create_snapshot_dir(directory)
+            _write_atomic(path, writer)
+        except OSError:
+            pass
+
+    def _create_snapshot_dir(self, directory: str) -> None:
+        """创建快照目录并记录其所属工作簿，同时清理该工作簿内容变化前的旧快照"""
+        os.makedirs(directory, exist_ok=True)
+        source = {"excel_file": self.excel_file}
+        _write_atomic(os.path.join(directory, SOURCE_FILE), lambda tmp: self._dump_pickle(source, tmp))
+        for entry in os.listdir(self.cache_dir):
+            other = os.path.join(self.cache_dir, entry)
+            if other != directory and self._read_pickle(os.path.join(other, SOURCE_FILE)) == source:
+                shutil.rmtree(other, ignore_errors=True)
+
+    @staticmethod
+    def _dump_pickle(obj, path: str) -> None:
+        with open(path, "wb") as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _read_pickle(path: str):
+        """读取缓存文件，不存在或已损坏时返回None"""
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError):
+            return None
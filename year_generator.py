@@ -2,8 +2,184 @@
 动态年份生成器
 根据建设期和运营期动态生成年份列和相关数据结构
 """
-from typing import Dict, List
-import pandas as pd
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from utils import lazy_import
+
+pd = lazy_import("pandas")
+
+
+class PeriodAxis:
+    """
+    计算期年份轴
+
+    以整数年序号（从1开始）和预先计算好的建设期/运营期掩码表示计算期，
+    各计算器直接在 float64 向量上运算；"第N年"标签只在生成DataFrame时使用。
+    """
+
+    def __init__(self, construction_period: int, operation_period: int):
+        """
+        初始化年份轴
+
+        Args:
+            construction_period: 建设期（年）
+            operation_period: 运营期（年）
+        """
+        self.construction_period = construction_period
+        self.operation_period = operation_period
+        self.total_period = construction_period + operation_period
+
+        # 年份数字 [1, 2, ..., N]
+        self.year_numbers = np.arange(1, self.total_period + 1)
+        # 建设期/运营期掩码
+        self.construction_mask = self.year_numbers <= construction_period
+        self.operation_mask = ~self.construction_mask
+        # 运营期年序号（建设期为0，运营期第1年为1）
+        self.operation_year = np.where(self.operation_mask, self.year_numbers - construction_period, 0)
+        # 运营期第1年掩码（资产原值计入年份）
+        self.first_operation_mask = self.operation_year == 1
+
+        self._labels: Optional[List[str]] = None
+        self._label_index: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return self.total_period
+
+    @property
+    def labels(self) -> List[str]:
+        """
+        年份标签（仅用于展示）
+
+        Returns:
+            list: ["第1年", "第2年", ..., "第N年"]
+        """
+        if self._labels is None:
+            self._labels = [f"第{i}年" for i in self.year_numbers]
+        return self._labels
+
+    @property
+    def label_index(self) -> Dict[str, int]:
+        """年份标签到数组下标的映射"""
+        if self._label_index is None:
+            self._label_index = {label: i for i, label in enumerate(self.labels)}
+        return self._label_index
+
+    def zeros(self) -> np.ndarray:
+        """
+        创建全0年度向量
+
+        Returns:
+            ndarray: 长度为计算期的float64向量
+        """
+        return np.zeros(self.total_period)
+
+    def construction_values(self, value) -> np.ndarray:
+        """
+        建设期各年取value，运营期为0
+
+        Args:
+            value: 标量或与计算期等长的向量
+
+        Returns:
+            ndarray: 年度向量
+        """
+        return np.where(self.construction_mask, value, 0.0)
+
+    def operation_values(self, value) -> np.ndarray:
+        """
+        运营期各年取value，建设期为0
+
+        Args:
+            value: 标量或与计算期等长的向量
+
+        Returns:
+            ndarray: 年度向量
+        """
+        return np.where(self.operation_mask, value, 0.0)
+
+    def first_operation_values(self, value) -> np.ndarray:
+        """
+        仅运营期第1年取value（如资产原值计入）
+
+        Args:
+            value: 标量
+
+        Returns:
+            ndarray: 年度向量
+        """
+        return np.where(self.first_operation_mask, value, 0.0)
+
+    def place_operation_series(self, values: Sequence[float]) -> np.ndarray:
+        """
+        将从运营期第1年开始的序列放入年度向量（超出计算期的部分截断）
+
+        Args:
+            values: 运营期第1年起的数值序列
+
+        Returns:
+            ndarray: 年度向量
+        """
+        result = self.zeros()
+        count = min(len(values), self.operation_period)
+        if count > 0:
+            start = self.construction_period
+            result[start:start + count] = np.asarray(values[:count], dtype=float)
+        return result
+
+    def from_year_dict(self, data_dict: Optional[Dict[str, float]]) -> np.ndarray:
+        """
+        将按"第N年"存储的字典转换为年度向量（缺失年份为0）
+
+        Args:
+            data_dict: 按年存储的字典
+
+        Returns:
+            ndarray: 年度向量
+        """
+        if not data_dict:
+            return self.zeros()
+        return np.fromiter(
+            (data_dict.get(label, 0.0) for label in self.labels),
+            dtype=float,
+            count=self.total_period
+        )
+
+    def to_year_dict(self, values: np.ndarray) -> Dict[str, float]:
+        """
+        将年度向量转换为按"第N年"存储的字典
+
+        Args:
+            values: 年度向量
+
+        Returns:
+            dict: {"第1年": 值, ...}
+        """
+        return dict(zip(self.labels, np.asarray(values, dtype=float).tolist()))
+
+    def frame(self, label_columns: Dict[str, Sequence], rows: Sequence) -> pd.DataFrame:
+        """
+        将按行组织的年度向量渲染为横向表格（年份为列）
+
+        Args:
+            label_columns: 左侧标签列，如 {"项目": [...]} 或 {"项目": [...], "说明": [...]}
+            rows: 各行数据，每行为年度向量或标量（标量会广播到所有年份，如标题行的""）
+
+        Returns:
+            DataFrame: 标签列 + "第1年"..."第N年"
+        """
+        if all(isinstance(row, np.ndarray) and row.dtype.kind in "fiu" for row in rows):
+            matrix = np.vstack(rows).astype(float) if rows else np.empty((0, self.total_period))
+        else:
+            matrix = np.empty((len(rows), self.total_period), dtype=object)
+            for i, row in enumerate(rows):
+                matrix[i, :] = row.tolist() if isinstance(row, np.ndarray) else row
+
+        df = pd.DataFrame(matrix, columns=self.labels)
+        for position, (name, values) in enumerate(label_columns.items()):
+            df.insert(position, name, list(values))
+        return df
 
 
 class YearGenerator:
@@ -20,6 +196,7 @@ class YearGenerator:
         self.construction_period = construction_period
         self.operation_period = operation_period
         self.total_period = construction_period + operation_period
+        self.axis = PeriodAxis(construction_period, operation_period)
 
     def generate_year_names(self) -> List[str]:
         """
@@ -28,7 +205,7 @@ class YearGenerator:
         Returns:
             list: ["第1年", "第2年", ..., "第20年"]
         """
-        return [f"第{i+1}年" for i in range(self.total_period)]
+        return list(self.axis.labels)
 
     def generate_year_numbers(self) -> List[int]:
         """
@@ -37,7 +214,7 @@ class YearGenerator:
         Returns:
             list: [1, 2, ..., 20]
         """
-        return list(range(1, self.total_period + 1))
+        return self.axis.year_numbers.tolist()
 
     def is_construction_year(self, year_num: int) -> bool:
         """
@@ -101,9 +278,9 @@ class YearGenerator:
         data = {
             "年份名称": year_names,
             "年份数字": year_numbers,
-            "年份类型": [self.get_year_type(y) for y in year_numbers],
-            "是否建设期": [self.is_construction_year(y) for y in year_numbers],
-            "是否运营期": [self.is_operation_year(y) for y in year_numbers],
+            "年份类型": np.where(self.axis.construction_mask, "建设期", "运营期").tolist(),
+            "是否建设期": self.axis.construction_mask.tolist(),
+            "是否运营期": self.axis.operation_mask.tolist(),
         }
 
         return pd.DataFrame(data)
@@ -131,12 +308,11 @@ class YearGenerator:
         Returns:
             dict: 只包含建设期数据的字典
         """
-        filtered = {}
-        for year_name, value in data_dict.items():
-            year_num = self.get_year_index(year_name)
-            if self.is_construction_year(year_num):
-                filtered[year_name] = value
-        return filtered
+        index = self.axis.label_index
+        return {
+            year_name: value for year_name, value in data_dict.items()
+            if year_name in index and self.axis.construction_mask[index[year_name]]
+        }
 
     def filter_operation_years(self, data_dict: Dict[str, float]) -> Dict[str, float]:
         """
@@ -148,12 +324,11 @@ class YearGenerator:
         Returns:
             dict: 只包含运营期数据的字典
         """
-        filtered = {}
-        for year_name, value in data_dict.items():
-            year_num = self.get_year_index(year_name)
-            if self.is_operation_year(year_num):
-                filtered[year_name] = value
-        return filtered
+        index = self.axis.label_index
+        return {
+            year_name: value for year_name, value in data_dict.items()
+            if year_name in index and self.axis.operation_mask[index[year_name]]
+        }
 
     def get_cumulative_sum(self, data_dict: Dict[str, float]) -> Dict[str, float]:
         """
@@ -165,15 +340,7 @@ class YearGenerator:
         Returns:
             dict: 累计值字典
         """
-        years = self.generate_year_names()
-        cumulative = {}
-        total = 0.0
-
-        for year in years:
-            total += data_dict.get(year, 0.0)
-            cumulative[year] = total
-
-        return cumulative
+        return self.axis.to_year_dict(np.cumsum(self.axis.from_year_dict(data_dict)))
 
     def scale_data(self, data_dict: Dict[str, float], scale_factor: float) -> Dict[str, float]:
         """